@@ -4,15 +4,31 @@ data_generator
 
 Reusable, secure generation engine for producing scenario-specific synthetic
 datasets with Azure OpenAI & Semantic-Kernel.
+
+Importing the package is cheap: :class:`DataGenerator` and
+:class:`GeneratedRecord` (and with them the Semantic-Kernel / OpenAI SDKs)
+are imported on first access, and tools are loaded by scenario name through
+:py:meth:`DataGeneratorTool.from_name`.
 """
 
-from .engine import DataGenerator  # noqa: F401  (re-export)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 from .tool import DataGeneratorTool  # NEW export
 
-# ↓ auto-import tools to trigger registry registration
-from .tools import (
-    retail_product,  # noqa: F401  (import for side-effect)
-    tech_support,  # noqa: F401  (import for side-effect)
-)
+if TYPE_CHECKING:
+    from .engine import DataGenerator, GeneratedRecord
+
+__all__: list[str] = ["DataGenerator", "DataGeneratorTool", "GeneratedRecord"]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import the engine classes on first access (PEP 562)."""
+    if name in ("DataGenerator", "GeneratedRecord"):
+        from . import engine
 
-__all__: list[str] = ["DataGenerator", "DataGeneratorTool"]
+        value = getattr(engine, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,114 @@
+"""
+Adaptive completion-token budgets.
+
+This module provides :class:`CompletionBudget`, which learns how many
+completion tokens (visible output plus reasoning) the records of one tool
+and format actually take and derives ``max_completion_tokens`` from a high
+percentile of that distribution plus headroom.
+
+Azure OpenAI reserves the requested ``max_completion_tokens`` against the
+deployment's TPM quota when a request is admitted, so a generous fixed cap
+throttles a run long before the tokens are really spent; a cap that follows
+the observed sizes lets several times more requests run on the same quota.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Final
+
+__all__: list[str] = ["CompletionBudget"]
+
+# Limits are rounded up to a multiple of this many tokens
+_ROUNDING: Final[int] = 64
+
+
+class CompletionBudget:
+    """
+    ``max_completion_tokens`` for the records of one tool and format.
+
+    Until *min_samples* records were observed, and whenever an *override* is
+    set, the limit is fixed (the override, else *ceiling*). Afterwards it is
+    the *percentile* of the last *window* per-record completion sizes times
+    *headroom*, at least *floor* and at most *ceiling*. A reply cut off at
+    the limit raises the floor to twice that limit, so retries and later
+    records get more room.
+
+    Parameters
+    ----------
+    ceiling:
+        Largest limit ever requested; also the limit before enough samples.
+    override:
+        Fixed per-record limit that disables adaptation.
+    percentile / headroom:
+        Quantile of the observed sizes and the factor added on top of it.
+    min_samples / window:
+        Observations needed before adapting, and how many are kept.
+    floor:
+        Smallest limit ever requested.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        ceiling: int,
+        override: int | None = None,
+        percentile: float = 0.95,
+        headroom: float = 1.25,
+        min_samples: int = 20,
+        window: int = 500,
+        floor: int = 256,
+    ) -> None:
+        if override is not None and override < 1:
+            raise ValueError("max_completion_tokens must be at least 1.")
+        if not 0 < percentile <= 1:
+            raise ValueError("percentile must be in (0, 1].")
+        self.ceiling = ceiling
+        self.override = override
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.floor = min(floor, ceiling)
+        self.truncated = 0
+        self.reasoning_tokens = 0
+        self._samples: deque[int] = deque(maxlen=window)
+
+    @property
+    def samples(self) -> int:
+        """Number of per-record sizes currently held."""
+        return len(self._samples)
+
+    @property
+    def adaptive(self) -> bool:
+        """True once the limit follows the observed sizes."""
+        return self.override is None and self.samples >= self.min_samples
+
+    def observed(self) -> int:
+        """The *percentile* of the observed per-record sizes (0 if none)."""
+        if not self._samples:
+            return 0
+        ordered = sorted(self._samples)
+        rank = math.ceil(self.percentile * len(ordered)) - 1
+        return ordered[max(rank, 0)]
+
+    def limit(self, records: int = 1) -> int:
+        """``max_completion_tokens`` for a call producing *records* records."""
+        if self.override is not None:
+            return self.override * records
+        if not self.adaptive:
+            return self.ceiling
+        per_record = max(self.observed() * self.headroom, self.floor)
+        wanted = math.ceil(per_record * records / _ROUNDING) * _ROUNDING
+        return min(wanted, self.ceiling)
+
+    def record(self, completion_tokens: int, reasoning_tokens: int = 0) -> None:
+        """Add the completion size of one record (reasoning included)."""
+        self._samples.append(completion_tokens)
+        self.reasoning_tokens += reasoning_tokens
+
+    def record_truncated(self, limit: int, records: int = 1) -> None:
+        """A reply of *records* records hit *limit*; give the next ones more."""
+        self.truncated += 1
+        if self.override is None:
+            self.floor = min(max(self.floor, 2 * limit // records), self.ceiling)
@@ -0,0 +1,287 @@
+"""
+On-disk cache of model completions.
+
+This module provides :class:`ResponseCache`, a SQLite database of completions
+keyed by a hash of the rendered prompt, the deployment and the execution
+settings (see :func:`cache_key`). Besides the content-addressed lookups that
+spare repeated calls, every entry remembers the scenario, output format,
+record id and output directory it was generated for, so that
+
+* a resumed run can persist completions that were paid for but never stored
+  before a crash, and
+* ``--replay`` can push cached completions through ``post_process`` and the
+  output sink again without calling the model at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections.abc import Collection, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Final
+
+from data_generator.usage import TokenUsage
+
+__all__: list[str] = [
+    "CacheMissError",
+    "CachedResponse",
+    "ResponseCache",
+    "cache_key",
+]
+
+_logger = logging.getLogger(__name__)
+
+_SCHEMA: Final[str] = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    text          TEXT NOT NULL,
+    usage         TEXT,
+    scenario      TEXT,
+    output_format TEXT,
+    unique_id     TEXT,
+    origin        TEXT,
+    size          INTEGER NOT NULL,
+    created       REAL NOT NULL,
+    used          REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_run
+    ON responses (scenario, output_format, origin);
+"""
+_COLUMNS: Final[str] = (
+    "key, text, usage, scenario, output_format, unique_id, origin, created"
+)
+
+
+class CacheMissError(LookupError):
+    """Replay mode was asked for a completion that is not in the cache."""
+
+
+def cache_key(prompt: str, deployment: str, settings: Mapping[str, Any]) -> str:
+    """
+    Content address of a completion: SHA-256 over the rendered *prompt*, the
+    *deployment* name and the execution *settings*.
+    """
+    payload = json.dumps(
+        {"prompt": prompt, "deployment": deployment, "settings": settings},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """One cached completion and where it was generated."""
+
+    key: str
+    text: str
+    usage: TokenUsage | None = None
+    scenario: str | None = None
+    output_format: str | None = None
+    unique_id: str | None = None
+    origin: str | None = None
+    created: float = 0.0
+
+
+class ResponseCache:
+    """
+    SQLite-backed completion cache.
+
+    Entries older than *max_age_seconds* are dropped, then the least recently
+    used ones until the stored text fits in *max_bytes*; this happens when the
+    cache is opened and again when it is closed.
+
+    Parameters
+    ----------
+    path:
+        Database file; parent directories are created.
+    max_bytes / max_age_seconds:
+        Optional eviction limits.
+    replay:
+        Serve only from the cache: lookups that miss raise
+        :class:`CacheMissError` instead of letting the caller call the model.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int | None = None,
+        max_age_seconds: float | None = None,
+        replay: bool = False,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;" + _SCHEMA
+        )
+        self.evict()
+
+    # ------------------------------------------------------------------ #
+    # Content-addressed access                                           #
+    # ------------------------------------------------------------------ #
+    def get(self, *keys: str) -> CachedResponse | None:
+        """
+        Return the entry stored under the first of *keys* that is present,
+        counting one hit or one miss.
+        """
+        for key in keys:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                break
+        else:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._db:
+            self._db.execute(
+                "UPDATE responses SET used = ? WHERE key = ?", (time.time(), key)
+            )
+        return self._from_row(row)
+
+    def put(  # noqa: PLR0913
+        self,
+        key: str,
+        text: str,
+        *,
+        usage: TokenUsage | None = None,
+        scenario: str | None = None,
+        output_format: str | None = None,
+        unique_id: str | None = None,
+        origin: str | None = None,
+    ) -> None:
+        """Store a completion under *key*, replacing any previous entry."""
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (
+                    key,
+                    text,
+                    json.dumps(asdict(usage)) if usage is not None else None,
+                    scenario,
+                    output_format,
+                    unique_id,
+                    origin,
+                    len(text.encode("utf-8")),
+                    now,
+                    now,
+                ),
+            )
+
+    def discard(self, key: str) -> None:
+        """Drop the entry under *key*, e.g. because its text did not parse."""
+        with self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    # ------------------------------------------------------------------ #
+    # Replay                                                             #
+    # ------------------------------------------------------------------ #
+    def entries(
+        self,
+        *,
+        scenario: str,
+        output_format: str,
+        origin: str | None = None,
+        exclude_ids: Collection[str] = (),
+        limit: int | None = None,
+    ) -> list[CachedResponse]:
+        """
+        Return cached completions of *scenario* in *output_format*, oldest
+        first, optionally restricted to one *origin* (output directory) and
+        skipping the record ids in *exclude_ids*.
+        """
+        query = (
+            f"SELECT {_COLUMNS} FROM responses "
+            "WHERE scenario = ? AND output_format = ?"
+        )
+        params: list[Any] = [scenario, output_format]
+        if origin is not None:
+            query += " AND origin = ?"
+            params.append(origin)
+        query += " ORDER BY created, key"
+        found = []
+        for row in self._db.execute(query, params):
+            entry = self._from_row(row)
+            if entry.unique_id in exclude_ids:
+                continue
+            found.append(entry)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    # ------------------------------------------------------------------ #
+    # Housekeeping                                                       #
+    # ------------------------------------------------------------------ #
+    def evict(self) -> int:
+        """Apply the age and size limits; return the number of entries dropped."""
+        dropped = 0
+        with self._db:
+            if self.max_age_seconds is not None:
+                dropped += self._db.execute(
+                    "DELETE FROM responses WHERE created < ?",
+                    (time.time() - self.max_age_seconds,),
+                ).rowcount
+            if self.max_bytes is not None:
+                total = self._db.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()[0]
+                if total > self.max_bytes:
+                    stale = []
+                    for key, size in self._db.execute(
+                        "SELECT key, size FROM responses ORDER BY used, created"
+                    ):
+                        if total <= self.max_bytes:
+                            break
+                        stale.append((key,))
+                        total -= size
+                    self._db.executemany(
+                        "DELETE FROM responses WHERE key = ?", stale
+                    )
+                    dropped += len(stale)
+        if dropped:
+            _logger.info("Response cache: evicted %s entries.", dropped)
+        return dropped
+
+    def close(self) -> None:
+        """Apply the eviction limits and close the database."""
+        self.evict()
+        self._db.close()
+
+    def __enter__(self) -> ResponseCache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return int(self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0])
+
+    @staticmethod
+    def _from_row(row: tuple[Any, ...]) -> CachedResponse:
+        """Build a :class:`CachedResponse` from a ``_COLUMNS`` row."""
+        key, text, usage, scenario, output_format, unique_id, origin, created = row
+        return CachedResponse(
+            key=key,
+            text=text,
+            usage=TokenUsage(**json.loads(usage)) if usage else None,
+            scenario=scenario,
+            output_format=output_format,
+            unique_id=unique_id,
+            origin=origin,
+            created=created,
+        )
@@ -12,6 +12,10 @@ The script performs a *two-phase* argparse parse:
     `DataGeneratorTool`.
 2.  Inject the tool-specific arguments, re-parse and hand validation over
     to the tool instance.
+
+Only the requested tool's module is imported, and the engine (with the
+Semantic-Kernel and OpenAI SDKs) only once the arguments are valid, so
+``--help`` and argument errors return quickly.
 """
 
 from __future__ import annotations
@@ -21,10 +25,29 @@ import sys
 from pathlib import Path
 from typing import Any
 
-from .engine import DataGenerator
+from .cache import ResponseCache
+from .deployments import ROUTING_POLICIES, Deployment, load_deployments
+from .routing import Route, load_routes
+from .sinks import SINKS
 from .tool import DataGeneratorTool
 
 
+def _positive_int(value: str) -> int:
+    """argparse type: an integer of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    """argparse type: a number greater than 0."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
 def _add_common_args(p: argparse.ArgumentParser) -> None:
     """Register the arguments shared by all scenarios.
 
@@ -42,10 +65,201 @@ def _add_common_args(p: argparse.ArgumentParser) -> None:
         default="json",
         help="File format for generated records.",
     )
+    p.add_argument(
+        "--output-formats",
+        nargs="+",
+        choices=["json", "yaml", "txt"],
+        default=None,
+        help="Generate each record once as JSON and store it in all of these "
+        "formats, rendered locally (one subdirectory per format). Overrides "
+        "--output-format.",
+    )
+    p.add_argument(
+        "--records-per-call",
+        type=_positive_int,
+        default=1,
+        help="Ask for this many records per model call (as a JSON array) so "
+        "the instructions are paid for once; needs JSON output.",
+    )
+    p.add_argument(
+        "--structured-outputs",
+        action="store_true",
+        help="Request the scenario's JSON schema as the response format so "
+        "every reply parses and validates (needs a deployment with "
+        "structured-output support and JSON output).",
+    )
+    p.add_argument(
+        "--hierarchical",
+        action="store_true",
+        help="Write long documents as an outline plus one call per section, "
+        "with the sections generated concurrently (scenarios with sections; "
+        "needs JSON output).",
+    )
+    p.add_argument(
+        "--max-sections",
+        type=_positive_int,
+        default=None,
+        help="With --hierarchical, the most sections written per document; "
+        "longer outlines are cut. Defaults to the concurrency ceiling.",
+    )
+    p.add_argument(
+        "--max-completion-tokens",
+        type=_positive_int,
+        default=None,
+        help="Fixed completion-token limit per record. By default the limit "
+        "follows the completion sizes observed for the scenario (p95 plus "
+        "headroom) so less TPM quota is reserved per request.",
+    )
+    p.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=8,
+        help="Simultaneous Azure OpenAI requests (starting point when adaptive).",
+    )
+    p.add_argument(
+        "--max-concurrency",
+        type=_positive_int,
+        default=None,
+        help="Enable adaptive concurrency, growing up to this many requests "
+        "while latency is stable and backing off on HTTP 429s.",
+    )
+    p.add_argument(
+        "--timeout-seconds",
+        type=_positive_float,
+        default=300.0,
+        help="Timeout for a single Azure OpenAI request (queue time excluded).",
+    )
+    p.add_argument(
+        "--deadline-seconds",
+        type=_positive_float,
+        default=None,
+        help="Optional overall run deadline; records not started in time are "
+        "skipped.",
+    )
+    p.add_argument(
+        "--rpm",
+        type=_positive_int,
+        default=None,
+        help="Requests-per-minute budget for this process (share of quota).",
+    )
+    p.add_argument(
+        "--tpm",
+        type=_positive_int,
+        default=None,
+        help="Tokens-per-minute budget for this process (share of quota).",
+    )
+    p.add_argument(
+        "--sink",
+        choices=sorted(SINKS),
+        default="files",
+        help="Output layout: one file per record, or rotating JSONL / Parquet "
+        "shards.",
+    )
+    p.add_argument(
+        "--records-per-shard",
+        type=_positive_int,
+        default=1000,
+        help="Records per shard for the jsonl and parquet sinks.",
+    )
+    p.add_argument(
+        "--compression",
+        choices=["zstd"],
+        default=None,
+        help="Compress jsonl shards (requires the 'zstandard' package).",
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: only generate the records still "
+        "missing from the manifest in --out-dir.",
+    )
+    p.add_argument(
+        "--report",
+        action="store_true",
+        help="Write run-report.json to --out-dir: queue wait, time to first "
+        "byte and latency percentiles, token counts, retries and outcomes. "
+        "Metrics also go to OpenTelemetry when a MeterProvider is configured "
+        "(e.g. under opentelemetry-instrument).",
+    )
+    p.add_argument(
+        "--process-workers",
+        type=_positive_int,
+        default=None,
+        metavar="N",
+        help="Parse, validate and serialise records in N worker processes "
+        "instead of on the event loop; helps with large (YAML) records at "
+        "high concurrency.",
+    )
+    p.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="SQLite file caching model completions by prompt, deployment and "
+        "settings; repeated prompts are not sent again.",
+    )
+    p.add_argument(
+        "--cache-max-mb",
+        type=_positive_float,
+        default=None,
+        help="Evict least recently used cache entries beyond this size.",
+    )
+    p.add_argument(
+        "--cache-max-age-days",
+        type=_positive_float,
+        default=None,
+        help="Evict cache entries older than this.",
+    )
+    p.add_argument(
+        "--replay",
+        action="store_true",
+        help="Serve only from --cache: re-run post-processing and output of "
+        "cached completions without calling the model.",
+    )
+    p.add_argument(
+        "--entity-pool",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Directory of shared customer, product and employee pools "
+        "(generated there on first use). Scenarios that refer to such "
+        "entities sample them from the pool, so datasets join across "
+        "scenarios.",
+    )
+    p.add_argument(
+        "--entity-pool-size",
+        type=_positive_int,
+        default=None,
+        metavar="N",
+        help="Entities per pool generated in --entity-pool (default: 1000 "
+        "customers, 500 products, 200 employees); existing pools are kept.",
+    )
     # Optional Azure overrides
     p.add_argument("--azure-openai-endpoint")
     p.add_argument("--azure-openai-deployment")
     p.add_argument("--azure-openai-api-key")
+    p.add_argument(
+        "--deployments",
+        type=Path,
+        default=None,
+        help="YAML/JSON file listing several endpoint/deployment pairs to "
+        "spread the load over (replaces --azure-openai-endpoint/-deployment).",
+    )
+    p.add_argument(
+        "--routing",
+        choices=ROUTING_POLICIES,
+        default="least-outstanding",
+        help="How requests are spread over --deployments: fewest requests in "
+        "flight per weight, or most TPM quota left.",
+    )
+    p.add_argument(
+        "--routes",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="YAML/JSON routing table sending runs, by scenario, complexity "
+        "and output format, to named --deployments with their own reasoning "
+        "effort, concurrency and RPM/TPM quota.",
+    )
 
 
 def main(argv: list[str] | None = None) -> None:  # noqa: C901 (argparse flow)
@@ -68,7 +282,10 @@ def main(argv: list[str] | None = None) -> None:  # noqa: C901 (argparse flow)
     try:
         tool: DataGeneratorTool = DataGeneratorTool.from_name(known.scenario)
     except KeyError as exc:
-        phase1.error(str(exc))
+        phase1.error(
+            f"{exc.args[0]} Available scenarios: "
+            f"{', '.join(DataGeneratorTool.available_names())}."
+        )
         return  # unreachable, but keeps mypy happy
 
     # ---------------- Phase-2: full parser ----------------------------- #
@@ -91,19 +308,91 @@ def main(argv: list[str] | None = None) -> None:  # noqa: C901 (argparse flow)
     # Validate scenario specific args
     tool.validate_args(args)
 
-    # ---------------- Kick off generation ----------------------------- #
-    gen = DataGenerator(
-        tool,
-        azure_openai_endpoint=args.azure_openai_endpoint,
-        azure_openai_deployment=args.azure_openai_deployment,
-        azure_openai_api_key=args.azure_openai_api_key,
-    )
-    gen.run(
-        count=args.count,
-        out_dir=args.out_dir,
-        output_format=args.output_format,
+    if args.replay and args.cache is None:
+        parser.error("--replay requires --cache.")
+    if args.max_concurrency is not None and args.max_concurrency < args.concurrency:
+        parser.error("--max-concurrency must not be below --concurrency.")
+
+    if args.entity_pool is not None:
+        from .entities import EntityPool
+
+        try:
+            tool.use_entity_pool(
+                EntityPool(args.entity_pool, size=args.entity_pool_size)
+            )
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+
+    deployments: list[Deployment] | None = None
+    if args.deployments is not None:
+        try:
+            deployments = load_deployments(args.deployments)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+
+    routes: list[Route] | None = None
+    if args.routes is not None:
+        try:
+            routes = load_routes(args.routes)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+
+    cache = (
+        ResponseCache(
+            args.cache,
+            max_bytes=(
+                int(args.cache_max_mb * 2**20) if args.cache_max_mb else None
+            ),
+            max_age_seconds=(
+                args.cache_max_age_days * 86400 if args.cache_max_age_days else None
+            ),
+            replay=args.replay,
+        )
+        if args.cache is not None
+        else None
     )
 
+    # ---------------- Kick off generation ----------------------------- #
+    from .engine import DataGenerator  # heavy SDK imports, deferred
+
+    try:
+        gen = DataGenerator(
+            tool,
+            azure_openai_endpoint=args.azure_openai_endpoint,
+            azure_openai_deployment=args.azure_openai_deployment,
+            azure_openai_api_key=args.azure_openai_api_key,
+            deployments=deployments,
+            routes=routes,
+            cache=cache,
+        )
+        gen.run(
+            count=args.count,
+            out_dir=args.out_dir,
+            output_format=args.output_format,
+            concurrency=args.concurrency,
+            max_concurrency=args.max_concurrency,
+            timeout_seconds=args.timeout_seconds,
+            deadline_seconds=args.deadline_seconds,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            resume=args.resume,
+            sink=args.sink,
+            records_per_shard=args.records_per_shard,
+            compression=args.compression,
+            routing=args.routing,
+            output_formats=args.output_formats,
+            records_per_call=args.records_per_call,
+            structured_outputs=args.structured_outputs,
+            max_completion_tokens=args.max_completion_tokens,
+            report=args.report,
+            process_workers=args.process_workers,
+            hierarchical=args.hierarchical,
+            max_sections=args.max_sections,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,209 @@
+"""
+Adaptive concurrency control for the generation engine.
+
+This module provides :class:`AdaptiveConcurrencyLimiter`, an AIMD (additive
+increase / multiplicative decrease) gate that decides how many Azure OpenAI
+requests the :class:`data_generator.engine.DataGenerator` keeps in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import statistics
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Final
+
+__all__: list[str] = ["AdaptiveConcurrencyLimiter"]
+
+_logger = logging.getLogger(__name__)
+
+# Smoothing applied to the healthy-latency baseline after every clean window.
+_BASELINE_SMOOTHING: Final[float] = 0.2
+# Smallest number of completions evaluated as one AIMD window.
+_MIN_WINDOW: Final[int] = 8
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Gate the number of requests in flight using AIMD.
+
+    The limit grows by ``increase_step`` after every window of successful
+    requests whose p95 latency stays within ``latency_spike_ratio`` of the
+    healthy baseline. It is multiplied by ``decrease_factor`` on a throttling
+    response (HTTP 429), a timeout or a latency spike. At most one decrease
+    is applied per typical request latency, so a burst of 429s caused by a
+    single overload only cuts the limit once.
+
+    When ``minimum == maximum`` the limiter behaves like a fixed semaphore;
+    this is the default unless a ``maximum`` above ``initial`` is given.
+
+    Feedback (``record_success`` / ``record_congestion``) is expected while
+    the caller still holds its slot: releasing the slot is what wakes the
+    workers waiting for a raised limit.
+
+    Parameters
+    ----------
+    initial:
+        Starting number of requests allowed in flight.
+    minimum / maximum:
+        Bounds for the adaptive limit. ``maximum`` defaults to ``initial``;
+        ``minimum`` defaults to 1 when adaptive, otherwise to ``initial``.
+    increase_step:
+        Additive increase applied after a clean window.
+    decrease_factor:
+        Multiplicative factor (0 < f < 1) applied on congestion.
+    latency_spike_ratio:
+        A window whose p95 latency exceeds ``baseline * ratio`` counts as
+        congestion.
+    logger:
+        Logger used to report limit changes (defaults to the module logger).
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        initial: int,
+        minimum: int | None = None,
+        maximum: int | None = None,
+        increase_step: int = 1,
+        decrease_factor: float = 0.5,
+        latency_spike_ratio: float = 2.0,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        maximum = initial if maximum is None else maximum
+        if minimum is None:
+            minimum = 1 if maximum > initial else initial
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError(
+                "Concurrency bounds must satisfy 1 <= minimum <= initial <= maximum."
+            )
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1.")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_spike_ratio = latency_spike_ratio
+        self.logger = logger or _logger
+
+        self._limit = initial
+        self._peak = initial
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._window: deque[float] = deque()
+        self._recent: deque[float] = deque(maxlen=100)
+        self._baseline_p95: float | None = None
+        self._last_decrease = -math.inf
+
+    # ------------------------------------------------------------------ #
+    # Introspection                                                      #
+    # ------------------------------------------------------------------ #
+    @property
+    def adaptive(self) -> bool:
+        """True when the limit is allowed to move."""
+        return self.minimum < self.maximum
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return self._limit
+
+    @property
+    def peak(self) -> int:
+        """Highest limit reached so far."""
+        return self._peak
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    # ------------------------------------------------------------------ #
+    # Slot management                                                    #
+    # ------------------------------------------------------------------ #
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the ``async with`` block."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    # ------------------------------------------------------------------ #
+    # Feedback                                                           #
+    # ------------------------------------------------------------------ #
+    def record_success(self, latency: float) -> None:
+        """Feed the latency of a successful request into the controller."""
+        self._recent.append(latency)
+        if not self.adaptive:
+            return
+        self._window.append(latency)
+        if len(self._window) < max(self._limit, _MIN_WINDOW):
+            return
+
+        p95 = _percentile(self._window, 95)
+        self._window.clear()
+        baseline = self._baseline_p95
+        if baseline is not None and p95 > baseline * self.latency_spike_ratio:
+            self._decrease(f"p95 latency spiked to {p95:.2f}s")
+            return
+
+        self._baseline_p95 = (
+            p95
+            if baseline is None
+            else baseline + _BASELINE_SMOOTHING * (p95 - baseline)
+        )
+        if self._limit < self.maximum:
+            self._set_limit(
+                min(self.maximum, self._limit + self.increase_step),
+                f"p95 latency stable at {p95:.2f}s",
+            )
+
+    def record_congestion(self, reason: str) -> None:
+        """Report a throttling response or timeout."""
+        if self.adaptive:
+            self._decrease(reason)
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                   #
+    # ------------------------------------------------------------------ #
+    def _decrease(self, reason: str) -> None:
+        """Apply one multiplicative decrease unless still cooling down."""
+        now = time.monotonic()
+        cooldown = statistics.median(self._recent) if self._recent else 0.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self._window.clear()
+        self._set_limit(
+            max(self.minimum, math.floor(self._limit * self.decrease_factor)),
+            reason,
+        )
+
+    def _set_limit(self, new_limit: int, reason: str) -> None:
+        """Update the limit and log the change."""
+        if new_limit == self._limit:
+            return
+        self.logger.info(
+            "Concurrency limit %s -> %s (%s).", self._limit, new_limit, reason
+        )
+        self._limit = new_limit
+        self._peak = max(self._peak, new_limit)
+
+
+def _percentile(values: deque[float], percent: float) -> float:
+    """Return the *percent* percentile of *values* (nearest-rank method)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -0,0 +1,298 @@
+"""
+Load balancing across several Azure OpenAI deployments.
+
+This module provides :class:`Deployment`, the connection details of one
+endpoint/deployment pair, :func:`load_deployments` to read a list of them
+from a YAML or JSON file, and :class:`DeploymentPool`, which routes each
+request to a deployment and takes throttled deployments out of rotation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final
+from urllib.parse import urlparse
+
+import yaml
+
+from data_generator.ratelimit import RateLimiter
+from data_generator.usage import TokenUsage
+
+__all__: list[str] = [
+    "ROUTING_POLICIES",
+    "Deployment",
+    "DeploymentPool",
+    "DeploymentState",
+    "load_deployments",
+]
+
+_logger = logging.getLogger(__name__)
+
+ROUTING_POLICIES: Final[tuple[str, ...]] = ("least-outstanding", "quota")
+# Cool-down after a throttled request doubles with every consecutive 429.
+_BASE_COOLDOWN: Final[float] = 1.0
+_MAX_COOLDOWN: Final[float] = 60.0
+
+
+@dataclass(frozen=True)
+class Deployment:
+    """
+    One Azure OpenAI endpoint/deployment pair.
+
+    Parameters
+    ----------
+    endpoint / deployment:
+        Connection details, as for a single-deployment generator.
+    api_key:
+        Key for this endpoint; None falls back to the generator's key or to
+        ``DefaultAzureCredential``.
+    weight:
+        Relative share of traffic; a deployment with twice the quota should
+        get twice the weight.
+    requests_per_minute / tokens_per_minute:
+        Optional client-side quota for this deployment.
+    name:
+        Label used in logs (defaults to ``<host>/<deployment>``).
+    """
+
+    endpoint: str
+    deployment: str
+    api_key: str | None = None
+    weight: float = 1.0
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    name: str | None = None
+
+    @property
+    def label(self) -> str:
+        """Human-readable identifier for logs and reports."""
+        return self.name or f"{urlparse(self.endpoint).hostname}/{self.deployment}"
+
+
+def load_deployments(path: Path) -> list[Deployment]:
+    """
+    Read deployments from a YAML or JSON file.
+
+    The file holds a list of mappings with ``endpoint`` and ``deployment``
+    plus the optional keys ``api_key``, ``api_key_env`` (name of an
+    environment variable holding the key), ``weight``, ``rpm``, ``tpm`` and
+    ``name``.
+    """
+    with path.open(encoding="utf-8") as fp:
+        entries = yaml.safe_load(fp)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must contain a non-empty list of deployments.")
+
+    deployments = []
+    for number, entry in enumerate(entries, start=1):
+        try:
+            api_key = entry.get("api_key")
+            if api_key is None and entry.get("api_key_env"):
+                api_key = os.environ[entry["api_key_env"]]
+            deployments.append(
+                Deployment(
+                    endpoint=entry["endpoint"],
+                    deployment=entry["deployment"],
+                    api_key=api_key,
+                    weight=float(entry.get("weight", 1.0)),
+                    requests_per_minute=entry.get("rpm"),
+                    tokens_per_minute=entry.get("tpm"),
+                    name=entry.get("name"),
+                )
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid deployment #{number} in {path}: {exc}") from exc
+        if deployments[-1].weight <= 0:
+            raise ValueError(f"Deployment #{number} in {path} needs a positive weight.")
+    return deployments
+
+
+@dataclass
+class DeploymentState:
+    """Routing state and counters of one deployment within a run."""
+
+    deployment: Deployment
+    service_id: str
+    rate_limiter: RateLimiter | None = None
+    in_flight: int = 0
+    records: int = 0
+    failures: int = 0
+    throttled: int = 0
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    cooldown_until: float = 0.0
+    consecutive_throttles: int = 0
+
+    def available(self, now: float) -> bool:
+        """True unless the deployment is cooling down after throttling."""
+        return now >= self.cooldown_until
+
+
+class DeploymentPool:
+    """
+    Route requests across deployments.
+
+    ``least-outstanding`` picks the deployment with the fewest requests in
+    flight relative to its weight. ``quota`` prefers the deployment with the
+    most TPM budget left (deployments without ``tokens_per_minute`` count as
+    unlimited), breaking ties by outstanding requests.
+
+    A deployment that answers HTTP 429 is taken out of rotation for its
+    ``Retry-After`` time, or for an exponentially growing cool-down. With a
+    single deployment there is nowhere else to go, so throttling is only
+    counted and left to the retry and concurrency controllers.
+
+    Parameters
+    ----------
+    targets:
+        ``(service_id, deployment)`` pairs registered on the kernel.
+    routing:
+        One of :data:`ROUTING_POLICIES`.
+    logger:
+        Logger used for rotation changes and the summary.
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[tuple[str, Deployment]],
+        *,
+        routing: str = "least-outstanding",
+        logger: logging.Logger | None = None,
+    ) -> None:
+        if not targets:
+            raise ValueError("At least one deployment is required.")
+        if routing not in ROUTING_POLICIES:
+            raise ValueError(
+                f"Unknown routing policy '{routing}'. "
+                f"Available: {', '.join(ROUTING_POLICIES)}."
+            )
+        self.routing = routing
+        self.logger = logger or _logger
+        self.states = [
+            DeploymentState(
+                deployment=deployment,
+                service_id=service_id,
+                rate_limiter=(
+                    RateLimiter(
+                        requests_per_minute=deployment.requests_per_minute,
+                        tokens_per_minute=deployment.tokens_per_minute,
+                    )
+                    if deployment.requests_per_minute or deployment.tokens_per_minute
+                    else None
+                ),
+            )
+            for service_id, deployment in targets
+        ]
+
+    @property
+    def multiple(self) -> bool:
+        """True when there is more than one deployment to choose from."""
+        return len(self.states) > 1
+
+    def has_alternative(self) -> bool:
+        """
+        True if throttled traffic can move elsewhere: there are several
+        deployments and at least one of them is in rotation.
+        """
+        now = time.monotonic()
+        return self.multiple and any(state.available(now) for state in self.states)
+
+    # ------------------------------------------------------------------ #
+    # Routing                                                            #
+    # ------------------------------------------------------------------ #
+    async def acquire(self, tokens: int) -> DeploymentState:
+        """
+        Choose a deployment for a request of about *tokens* tokens.
+
+        Waits while every deployment is cooling down, then reserves the
+        chosen deployment's own quota (if it has one).
+        """
+        while True:
+            now = time.monotonic()
+            candidates = [s for s in self.states if s.available(now)]
+            if candidates:
+                break
+            await asyncio.sleep(min(s.cooldown_until for s in self.states) - now)
+
+        state = min(candidates, key=self._score)
+        state.in_flight += 1
+        if state.rate_limiter is not None:
+            try:
+                await state.rate_limiter.acquire(tokens)
+            except BaseException:
+                state.in_flight -= 1
+                raise
+        return state
+
+    def release(self, state: DeploymentState) -> None:
+        """Mark the request routed to *state* as finished."""
+        state.in_flight -= 1
+
+    def _score(self, state: DeploymentState) -> tuple[float, float]:
+        """Sort key: lower is better."""
+        outstanding = (state.in_flight + 1) / state.deployment.weight
+        if self.routing == "quota":
+            bucket = state.rate_limiter.tokens if state.rate_limiter else None
+            headroom = bucket.available if bucket is not None else math.inf
+            return (-headroom / state.deployment.weight, outstanding)
+        return (outstanding, 0.0)
+
+    # ------------------------------------------------------------------ #
+    # Feedback                                                           #
+    # ------------------------------------------------------------------ #
+    def record_success(
+        self, state: DeploymentState, usage: TokenUsage | None, reserved: int
+    ) -> None:
+        """Count a completed request and reconcile the deployment's quota."""
+        state.records += 1
+        state.consecutive_throttles = 0
+        if usage is not None:
+            state.usage += usage
+            if state.rate_limiter is not None:
+                state.rate_limiter.reconcile(reserved, usage.total_tokens)
+
+    def record_failure(self, state: DeploymentState) -> None:
+        """Count a failed request that was not throttling."""
+        state.failures += 1
+
+    def record_throttled(
+        self, state: DeploymentState, retry_after: float | None
+    ) -> None:
+        """Count an HTTP 429 and take *state* out of rotation for a while."""
+        state.throttled += 1
+        if not self.multiple:
+            return
+        backoff = min(_MAX_COOLDOWN, _BASE_COOLDOWN * 2**state.consecutive_throttles)
+        cooldown = max(backoff, retry_after or 0.0)
+        state.consecutive_throttles += 1
+        now = time.monotonic()
+        if state.available(now):
+            self.logger.warning(
+                "Deployment %s throttled; out of rotation for %.1fs.",
+                state.deployment.label,
+                cooldown,
+            )
+        state.cooldown_until = max(state.cooldown_until, now + cooldown)
+
+    # ------------------------------------------------------------------ #
+    # Reporting                                                          #
+    # ------------------------------------------------------------------ #
+    def log_summary(self, elapsed: float) -> None:
+        """Log per-deployment throughput at INFO."""
+        for state in self.states:
+            self.logger.info(
+                "Deployment %s: %s records (%.2f rec/s), %s throttled, %s failed, "
+                "%s tokens.",
+                state.deployment.label,
+                state.records,
+                state.records / elapsed if elapsed > 0 else 0.0,
+                state.throttled,
+                state.failures,
+                state.usage.total_tokens,
+            )
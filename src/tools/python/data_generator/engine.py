@@ -8,33 +8,246 @@ persistence in various formats.
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import itertools
 import json
 import logging
 import os
-from collections.abc import Callable, MutableMapping, MutableSequence
+import re
+import statistics
+import time
+from collections import Counter, deque
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    MutableMapping,
+    MutableSequence,
+    Sequence,
+)
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Final
+from typing import Any, Final, cast
 
 import colorama
 import semantic_kernel as sk
-import yaml
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
+from openai import DefaultAsyncHttpxClient
+from opentelemetry.metrics import MeterProvider
+from pydantic import BaseModel
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.connectors.ai.prompt_execution_settings import (
     PromptExecutionSettings,
 )
+from semantic_kernel.contents.utils.finish_reason import FinishReason
+from semantic_kernel.functions import KernelArguments, KernelFunction
 from semantic_kernel.prompt_template import (
     InputVariable,
     PromptTemplateConfig,
 )
 
+from data_generator.budget import CompletionBudget
+from data_generator.cache import (
+    CachedResponse,
+    CacheMissError,
+    ResponseCache,
+    cache_key,
+)
+from data_generator.concurrency import AdaptiveConcurrencyLimiter
+from data_generator.deployments import Deployment, DeploymentPool, DeploymentState
+from data_generator.manifest import ManifestState, RunManifest
+from data_generator.processing import (
+    RecordProcessor,
+    assemble_record,
+    parse_outline,
+    parse_record,
+    parse_section,
+    split_records,
+)
+from data_generator.ratelimit import RateLimiter, estimate_tokens
+from data_generator.retry import (
+    ContentFilteredError,
+    ErrorClass,
+    OutputParseError,
+    RetryPolicy,
+    classify_error,
+    retry_after_seconds,
+)
+from data_generator.routing import Route, select_route
+from data_generator.schema import batch_model, json_schema_format
+from data_generator.sinks import SinkWriter, create_sink
+from data_generator.telemetry import RunTelemetry, mark_first_byte, time_request
 from data_generator.tool import DataGeneratorTool
+from data_generator.usage import TokenUsage
 
-__all__: list[str] = ["DataGenerator"]
+__all__: list[str] = ["REPORT_NAME", "DataGenerator", "GeneratedRecord"]
 
 _DEFAULT_LOG_FORMAT: Final[str] = "%(asctime)s %(levelname)-8s %(name)s :: %(message)s"
 _LOGGER_NAME:        Final[str] = "data-generator"
+# Reasoning models like gpt-5-mini use reasoning_tokens which count against the
+# limit, so we need a much higher limit than the visible output alone requires.
+_DEFAULT_MAX_TOKENS: Final[int] = 16000
+# Number of recent request latencies used to predict whether work can still
+# finish before the run deadline.
+_LATENCY_WINDOW: Final[int] = 100
+# Template of the cached generation function: the tool renders the full prompt
+# per record and passes it in as a kernel argument.
+_GENERATE_TEMPLATE: Final[str] = "{{$prompt}}"
+# Service id of the first (or only) deployment; further deployments get a
+# numeric suffix.
+_SERVICE_ID: Final[str] = "azure_open_ai"
+# Formats DataGeneratorTool.render can derive from a JSON record.
+_RENDERED_FORMATS: Final[tuple[str, ...]] = ("json", "yaml", "txt", "text")
+# Run report written to the output directory by run(report=True).
+REPORT_NAME: Final[str] = "run-report.json"
+
+PromptRunner = Callable[..., Awaitable[str]]
+
+
+def _execution_settings(kernel_function: KernelFunction) -> PromptExecutionSettings:
+    """
+    Settings *kernel_function* was registered with; only prompt functions
+    (``KernelFunctionFromPrompt``) have them, which is all the engine creates.
+    """
+    settings = cast(
+        "dict[str, PromptExecutionSettings]",
+        kernel_function.prompt_execution_settings,  # type: ignore[attr-defined]
+    )
+    return settings[_SERVICE_ID]
+
+
+def _tighter(limit: int | None, other: int | None) -> int | None:
+    """The smaller of two optional quotas (None is unlimited)."""
+    if limit is None or other is None:
+        return limit if other is None else other
+    return min(limit, other)
+
+
+def _cap_outline(
+    outline: dict[str, Any], fields: Sequence[str], limit: int
+) -> dict[str, Any]:
+    """
+    *outline* with its section lists *fields* shortened, longest first, to at
+    most *limit* headings in total.
+    """
+    lengths = {name: min(len(outline[name]), limit) for name in fields}
+    while sum(lengths.values()) > limit:
+        longest = max(lengths, key=lengths.__getitem__)
+        lengths[longest] -= 1
+    return {**outline, **{name: outline[name][:n] for name, n in lengths.items()}}
+
+
+@dataclass(frozen=True)
+class GeneratedRecord:
+    """
+    One record yielded by :py:meth:`DataGenerator.stream`.
+
+    *data* is what the tool's ``post_process`` returned (validated against
+    its record model for JSON); *usage* is the token usage of the model call
+    that produced it, or its share of a batched call.
+    """
+
+    index: int
+    unique_id: str
+    data: Any
+    usage: TokenUsage | None = None
+
+
+@dataclass
+class _Completion:
+    """Text returned by a prompt function plus the reported token usage."""
+
+    text: str
+    usage: TokenUsage | None = None
+    cache_key: str | None = None        # set once stored in / read from the cache
+    truncated: bool = False             # stopped at max_completion_tokens
+
+
+@dataclass
+class _RunContext:
+    """Per-run settings and the shared state used by the worker pool."""
+
+    out_dir: Path | None                   # None when records are streamed
+    output_format: str
+    timeout_seconds: float | None
+    limiter: AdaptiveConcurrencyLimiter
+    pool: DeploymentPool
+    rate_limiter: RateLimiter | None = None
+    route: Route | None = None             # routing-table row of the run
+    manifest: RunManifest | None = None
+    # One writer per stored format; the first one's path goes to the manifest
+    writers: dict[str, SinkWriter] = field(default_factory=dict)
+    # Bounded queue feeding DataGenerator.stream() instead of the writers
+    stream: asyncio.Queue[GeneratedRecord | None] | None = None
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    deadline: float | None = None          # absolute ``time.monotonic()`` value
+    latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=_LATENCY_WINDOW)
+    )
+    retries: Counter[ErrorClass] = field(default_factory=Counter)
+    usage: TokenUsage = field(default_factory=TokenUsage)   # model calls only
+    skipped: int = 0
+    replayed: int = 0
+    records_per_call: int = 1
+    batches: int = 0                       # multi-record model calls made
+    batch_fallbacks: int = 0               # batch records regenerated singly
+    hierarchical: bool = False             # outline call, then one per section
+    max_sections: int = 1                  # section items kept per outline
+    sections: int = 0                      # section calls made
+    # Record model requested through structured outputs, if any
+    response_model: type[BaseModel] | None = None
+    # Worker processes that parse, validate and serialise records, if any
+    processor: RecordProcessor | None = None
+    budget: CompletionBudget = field(
+        default_factory=lambda: CompletionBudget(ceiling=_DEFAULT_MAX_TOKENS)
+    )
+    telemetry: RunTelemetry = field(default_factory=RunTelemetry)
+
+    @property
+    def reasoning_effort(self) -> str | None:
+        """Reasoning effort requested on the run's route, if any."""
+        return self.route.reasoning_effort if self.route is not None else None
+
+    def remaining(self) -> float | None:
+        """Return seconds left before the run deadline, or None if unbounded."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def can_start(self) -> bool:
+        """
+        Return True if a new request is expected to finish before the deadline.
+
+        The estimate is the median of recently observed request latencies;
+        until the first request completes any positive remaining time counts.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        expected = statistics.median(self.latencies) if self.latencies else 0.0
+        return remaining > expected
+
+    def request_timeout(self) -> float | None:
+        """Per-request timeout, clipped to the time left before the deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return self.timeout_seconds
+        remaining = max(remaining, 0.0)
+        if self.timeout_seconds is None:
+            return remaining
+        return min(self.timeout_seconds, remaining)
+
+
+@dataclass
+class _WorkerStats:
+    """Counters accumulated by a single worker of the generation pool."""
+
+    worker_id: int
+    records: int = 0
+    failures: int = 0
+    busy_seconds: float = 0.0
 
 
 class DataGenerator:  # pylint: disable=too-many-instance-attributes
@@ -51,6 +264,25 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
     azure_openai_endpoint / azure_openai_deployment / azure_openai_api_key :
         Connection details for Azure OpenAI - can be provided as explicit
         arguments or via the corresponding environment variables.
+    deployments:
+        Several endpoint/deployment pairs to spread the load over (see
+        :class:`data_generator.deployments.DeploymentPool`). When given,
+        *azure_openai_endpoint* and *azure_openai_deployment* are not needed;
+        the API key, if any, is the fallback for deployments without one.
+    routes:
+        Routing table (see :mod:`data_generator.routing`). Each run uses the
+        first route matching the tool's scenario, ``complexity`` and the
+        output format: only the route's deployments serve it, with the
+        route's reasoning effort, concurrency and quota. Runs no route
+        matches use every deployment.
+    cache:
+        Optional :class:`data_generator.cache.ResponseCache`. Completions are
+        looked up before and stored after every model call; in replay mode
+        the model is never called. The caller owns (and closes) the cache.
+    meter_provider:
+        OpenTelemetry ``MeterProvider`` receiving the per-request metrics
+        (see :mod:`data_generator.telemetry`); the global one by default.
+        The metrics of the latest run are also kept in :attr:`telemetry`.
     """
 
     # ------------------------------------------------------------------ #
@@ -69,8 +301,15 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         azure_openai_endpoint: str | None = None,
         azure_openai_deployment: str | None = None,
         azure_openai_api_key: str | None = None,
+        deployments: Sequence[Deployment] | None = None,
+        routes: Sequence[Route] | None = None,
+        cache: ResponseCache | None = None,
+        meter_provider: MeterProvider | None = None,
     ) -> None:
         self.tool = tool
+        self.cache = cache
+        self.meter_provider = meter_provider
+        self.telemetry: RunTelemetry | None = None   # latest run or stream
         load_dotenv()  # Load .env from CWD or parent (no error if missing)
 
         # ---- Resolve connection settings ---------------------------------
@@ -84,12 +323,31 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
             azure_openai_api_key, "AZURE_OPENAI_API_KEY"
         )
 
-        if not self.azure_openai_endpoint or not self.azure_openai_deployment:
+        if deployments:
+            self.deployments = list(deployments)
+            self.azure_openai_endpoint = self.deployments[0].endpoint
+            self.azure_openai_deployment = self.deployments[0].deployment
+        elif not self.azure_openai_endpoint or not self.azure_openai_deployment:
             raise OSError(
                 "Azure OpenAI connection details missing. "
                 "Set --azure-openai-endpoint & --azure-openai-deployment CLI flags\n"
                 "or AZURE_OPENAI_ENDPOINT / AZURE_OPENAI_DEPLOYMENT env variables."
             )
+        else:
+            self.deployments = [
+                Deployment(
+                    endpoint=self.azure_openai_endpoint,
+                    deployment=self.azure_openai_deployment,
+                )
+            ]
+        # Kernel service id of each deployment, in the same order
+        self.service_ids = [
+            _SERVICE_ID if i == 0 else f"{_SERVICE_ID}_{i + 1}"
+            for i in range(len(self.deployments))
+        ]
+        self.routes = list(routes or ())
+        for route in self.routes:
+            self._route_targets(route)      # fail early on unknown deployments
 
         # ------------------------------------------------------------------ #
         # Logging configuration                                              #
@@ -98,25 +356,34 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         if not logging.getLogger().handlers:          # prevent duplicate handlers
             logging.basicConfig(format=_DEFAULT_LOG_FORMAT, level=log_level)
         self.logger = logging.getLogger(_LOGGER_NAME)
-        self.logger.debug(
-            "Using Azure OpenAI endpoint '%s', deployment '%s'.",
-            self.azure_openai_endpoint,
-            self.azure_openai_deployment,
-        )
+        for deployment in self.deployments:
+            self.logger.debug(
+                "Using Azure OpenAI endpoint '%s', deployment '%s'.",
+                deployment.endpoint,
+                deployment.deployment,
+            )
 
         # --------------------------------------------------------------------- #
         # Semantic-Kernel initialisation                                        #
         # --------------------------------------------------------------------- #
         self.kernel: sk.Kernel = self._create_kernel()
+        # Compiled generation functions keyed by (tool name, output format,
+        # response model, reasoning effort)
+        self._prompt_functions: dict[
+            tuple[str, str, type[BaseModel] | None, str | None], KernelFunction
+        ] = {}
+        # Completion sizes learnt per (tool, format), kept across runs
+        self._budgets: dict[tuple[str, str], CompletionBudget] = {}
 
     def _create_kernel(self) -> sk.Kernel:
         """
         Instantiate and return a Semantic-Kernel ``Kernel`` pre-configured with
-        an ``AzureChatCompletion`` service instance.
+        one ``AzureChatCompletion`` service per deployment.
 
         The method automatically selects authentication based on whether an
         explicit API key was supplied:
-        - If ``self.azure_openai_api_key`` is set, that key is used.
+        - If the deployment or ``self.azure_openai_api_key`` has a key, that
+          key is used.
         - Otherwise, a bearer token from ``DefaultAzureCredential`` is requested.
 
         Returns
@@ -125,31 +392,47 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
             Fully initialised kernel ready to register prompt functions.
         """
         kernel = sk.Kernel()
+        token_provider = None
 
-        if self.azure_openai_api_key:
-            self.logger.debug("Authenticating to Azure OpenAI with API key.")
-            service = AzureChatCompletion(
-                deployment_name=self.azure_openai_deployment,
-                endpoint=self.azure_openai_endpoint,
-                api_key=self.azure_openai_api_key,
-                service_id="azure_open_ai",
-            )
-        else:
-            self.logger.debug(
-                "Authenticating to Azure OpenAI with DefaultAzureCredential."
-            )
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default",
-            )
-            service = AzureChatCompletion(
-                deployment_name=self.azure_openai_deployment,
-                endpoint=self.azure_openai_endpoint,
-                ad_token_provider=token_provider,
-                service_id="azure_open_ai",
-            )
+        for service_id, deployment in zip(
+            self.service_ids, self.deployments, strict=True
+        ):
+            api_key = deployment.api_key or self.azure_openai_api_key
+            if api_key:
+                self.logger.debug("Authenticating to Azure OpenAI with API key.")
+                service = AzureChatCompletion(
+                    deployment_name=deployment.deployment,
+                    endpoint=deployment.endpoint,
+                    api_key=api_key,
+                    service_id=service_id,
+                )
+            else:
+                self.logger.debug(
+                    "Authenticating to Azure OpenAI with DefaultAzureCredential."
+                )
+                if token_provider is None:
+                    token_provider = get_bearer_token_provider(
+                        DefaultAzureCredential(),
+                        "https://cognitiveservices.azure.com/.default",
+                    )
+                service = AzureChatCompletion(
+                    deployment_name=deployment.deployment,
+                    endpoint=deployment.endpoint,
+                    ad_token_provider=token_provider,
+                    service_id=service_id,
+                )
 
-        kernel.add_service(service)
+            # The engine owns retries (see data_generator.retry): disabling the
+            # SDK's own retry loop lets 429s reach the adaptive concurrency
+            # controller and the deployment pool. The response hook times the
+            # first byte of every request (see data_generator.telemetry).
+            service.client = service.client.with_options(
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(
+                    event_hooks={"response": [mark_first_byte]}
+                ),
+            )
+            kernel.add_service(service)
         return kernel
 
     def create_prompt_function(  # noqa: PLR0913 (many params intentional)
@@ -163,10 +446,10 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         max_tokens: int,
         temperature: float = 0.7,
         top_p: float = 0.95,
-    ) -> Callable[..., str]:
+    ) -> PromptRunner:
         """
-        Register *template* as a Semantic-Kernel prompt function and return a
-        synchronous wrapper that can be executed in a thread-pool.
+        Register *template* as a Semantic-Kernel prompt function and return an
+        async wrapper that invokes it on the kernel.
 
         Parameters
         ----------
@@ -187,8 +470,60 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
 
         Returns
         -------
-        Callable[..., str]
-            A blocking callable delegating to the underlying async SK runtime.
+        PromptRunner
+            An async callable delegating to the underlying SK runtime.
+        """
+        kernel_function = self._register_prompt_function(
+            template=template,
+            function_name=function_name,
+            plugin_name=plugin_name,
+            prompt_description=prompt_description,
+            input_variables=input_variables,
+            max_tokens=max_tokens,
+        )
+
+        async def _async_runner(**kwargs: Any) -> str:
+            """Async helper that forwards the call to ``kernel.invoke``."""
+            if self.cache is None:
+                completion = await self._invoke_function(kernel_function, **kwargs)
+                return completion.text
+            rendered = await kernel_function.prompt_template.render(  # type: ignore[attr-defined]
+                self.kernel, KernelArguments(**kwargs)
+            )
+            cached = self._cache_lookup(kernel_function, rendered)
+            if cached is not None:
+                return cached.text
+            completion = await self._invoke_function(kernel_function, **kwargs)
+            self._cache_store(
+                kernel_function,
+                rendered,
+                completion,
+                deployment=self.deployments[0].deployment,
+            )
+            return completion.text
+
+        # Return the async function directly instead of wrapping it
+        return _async_runner
+
+    def _register_prompt_function(  # noqa: PLR0913
+        self,
+        *,
+        template: str,
+        function_name: str,
+        plugin_name: str,
+        prompt_description: str,
+        input_variables: list[dict[str, Any]],
+        max_tokens: int,
+        response_format: dict[str, Any] | None = None,
+        reasoning_effort: str | None = None,
+    ) -> KernelFunction:
+        """
+        Build the template config and execution settings for *template* and
+        register it on the kernel (see :py:meth:`create_prompt_function`).
+
+        *response_format* (see :func:`data_generator.schema.json_schema_format`)
+        constrains the reply to a JSON schema through structured outputs;
+        *reasoning_effort* is sent to reasoning models.
         """
         # Convert input_variables to InputVariable objects
         input_vars: MutableSequence[InputVariable] = [
@@ -201,16 +536,21 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         ]
 
         # Create execution settings with proper type
+        extension_data: dict[str, Any] = {
+            "max_completion_tokens": max_tokens,
+            # Note: Some models (like gpt-5-mini) only support default
+            # temperature/top_p
+            # "temperature": temperature,
+            # "top_p": top_p,
+        }
+        if response_format is not None:
+            extension_data["response_format"] = response_format
+        if reasoning_effort is not None:
+            extension_data["reasoning_effort"] = reasoning_effort
         exec_settings: MutableMapping[str, PromptExecutionSettings] = {
-            "azure_open_ai": PromptExecutionSettings(
-                service_id="azure_open_ai",
-                extension_data={
-                    "max_completion_tokens": max_tokens,
-                    # Note: Some models (like gpt-5-mini) only support default
-                    # temperature/top_p
-                    # "temperature": temperature,
-                    # "top_p": top_p,
-                }
+            _SERVICE_ID: PromptExecutionSettings(
+                service_id=_SERVICE_ID,
+                extension_data=extension_data,
             )
         }
 
@@ -222,7 +562,7 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
             execution_settings=exec_settings,
         )
 
-        # Register prompt and capture the resulting KernelFunction instance
+        # Register prompt and return the resulting KernelFunction instance
         kernel_function = self.kernel.add_function(
             function_name=function_name,
             plugin_name=plugin_name,
@@ -231,29 +571,173 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         self.logger.debug(
             "Prompt function '%s.%s' created.", plugin_name, function_name
         )
+        # add_function with a prompt config always yields a KernelFunction
+        return kernel_function  # type: ignore[return-value]
 
-        async def _async_runner(**kwargs: Any) -> str:
-            """Async helper that forwards the call to ``kernel.invoke``."""
-            # Adjust to ensure we're passing a valid KernelFunction
+    async def _invoke_function(
+        self,
+        kernel_function: KernelFunction,
+        *,
+        service_id: str | None = None,
+        max_tokens: int | None = None,
+        **kwargs: Any,
+    ) -> _Completion:
+        """
+        Invoke *kernel_function* and return its text together with the token
+        usage reported by Azure OpenAI (when available).
+
+        *service_id* sends the call to another deployment than the one the
+        function was registered with and *max_tokens* replaces its
+        ``max_completion_tokens``; the other settings are reused.
+        """
+        update: dict[str, Any] = {}
+        settings = _execution_settings(kernel_function)
+        if service_id is not None and service_id != _SERVICE_ID:
+            update["service_id"] = service_id
+        if max_tokens is not None:
+            update["extension_data"] = {
+                **settings.extension_data,
+                "max_completion_tokens": max_tokens,
+            }
+        if not update:
+            result = await self.kernel.invoke(kernel_function, **kwargs)
+        else:
             result = await self.kernel.invoke(
-                kernel_function,  # type: ignore
-                **kwargs
-            )
-            # Extract content from SK FunctionResult
-            # Result is a FunctionResult with a .value containing list of
-            # ChatMessageContent
-            if result is not None and hasattr(result, 'value') and result.value:
-                # result.value is a list of ChatMessageContent objects
-                if isinstance(result.value, list) and result.value:
-                    # Get the content from the first message
-                    first_message = result.value[0]
-                    if hasattr(first_message, 'content'):
-                        return str(first_message.content)
-                return str(result.value)
-            return str(result) if result is not None else ""
+                kernel_function,
+                KernelArguments(settings=settings.model_copy(update=update), **kwargs),
+            )
+        # Extract content from SK FunctionResult
+        # Result is a FunctionResult with a .value containing list of
+        # ChatMessageContent
+        if result is not None and hasattr(result, 'value') and result.value:
+            # result.value is a list of ChatMessageContent objects
+            if isinstance(result.value, list) and result.value:
+                # Get the content from the first message
+                first_message = result.value[0]
+                if (
+                    getattr(first_message, "finish_reason", None)
+                    == FinishReason.CONTENT_FILTER
+                ):
+                    raise ContentFilteredError(
+                        "Completion was stopped by the content filter."
+                    )
+                if hasattr(first_message, 'content'):
+                    return _Completion(
+                        text=str(first_message.content),
+                        usage=TokenUsage.from_message(first_message),
+                        truncated=getattr(first_message, "finish_reason", None)
+                        == FinishReason.LENGTH,
+                    )
+            return _Completion(text=str(result.value))
+        return _Completion(text=str(result) if result is not None else "")
 
-        # Return the async function directly instead of wrapping it
-        return _async_runner  # type: ignore[return-value]
+    # --------------------------------------------------------------------- #
+    # Model routing                                                         #
+    # --------------------------------------------------------------------- #
+    def _route_targets(self, route: Route) -> list[tuple[str, Deployment]]:
+        """
+        ``(service_id, deployment)`` pairs of the deployments *route* names,
+        by label or deployment name; raises *ValueError* for unknown names.
+        """
+        targets: list[tuple[str, Deployment]] = []
+        for name in route.deployments:
+            matched = [
+                (service_id, deployment)
+                for service_id, deployment in zip(
+                    self.service_ids, self.deployments, strict=True
+                )
+                if name in (deployment.label, deployment.deployment)
+            ]
+            if not matched:
+                raise ValueError(
+                    f"Route '{route.label}' names unknown deployment '{name}'. "
+                    f"Available: {', '.join(d.label for d in self.deployments)}."
+                )
+            targets.extend(t for t in matched if t not in targets)
+        return targets
+
+    def _select_route(self, output_format: str) -> Route | None:
+        """The first route matching this tool in *output_format*, or None."""
+        return select_route(
+            self.routes,
+            scenario=self.tool.name,
+            complexity=self.tool.complexity,
+            output_format=output_format,
+        )
+
+    # --------------------------------------------------------------------- #
+    # Response cache                                                        #
+    # --------------------------------------------------------------------- #
+    @staticmethod
+    def _cache_settings(kernel_function: KernelFunction) -> dict[str, Any]:
+        """Execution settings of *kernel_function* as they enter the cache key."""
+        settings = _execution_settings(kernel_function)
+        return settings.model_dump(exclude={"service_id"}, exclude_none=True)
+
+    def _cache_lookup(
+        self,
+        kernel_function: KernelFunction,
+        rendered: str,
+        deployments: Sequence[Deployment] | None = None,
+    ) -> _Completion | None:
+        """
+        Return the cached completion of the *rendered* prompt on any of the
+        *deployments* (by default every configured one), or None on a miss.
+
+        Raises :class:`CacheMissError` on a miss in replay mode.
+        """
+        if self.cache is None:
+            return None
+        settings = self._cache_settings(kernel_function)
+        keys = [
+            cache_key(rendered, name, settings)
+            for name in dict.fromkeys(
+                d.deployment for d in deployments or self.deployments
+            )
+        ]
+        hit = self.cache.get(*keys)
+        if hit is not None:
+            return _Completion(text=hit.text, usage=hit.usage, cache_key=hit.key)
+        if self.cache.replay:
+            raise CacheMissError("Replay mode: the prompt has no cached completion.")
+        return None
+
+    def _cache_store(  # noqa: PLR0913
+        self,
+        kernel_function: KernelFunction,
+        rendered: str,
+        completion: _Completion,
+        *,
+        deployment: str,
+        unique_id: str | None = None,
+        ctx: _RunContext | None = None,
+        batch: bool = False,
+    ) -> None:
+        """
+        Store *completion* of the *rendered* prompt served by *deployment*.
+
+        A *batch* reply holds several records, or only part of one, so it is
+        only kept for content-addressed lookups, not offered to replay or
+        resume.
+        """
+        if self.cache is None:
+            return
+        key = cache_key(rendered, deployment, self._cache_settings(kernel_function))
+        run = ctx if ctx is not None and not batch else None
+        self.cache.put(
+            key,
+            completion.text,
+            usage=completion.usage,
+            scenario=self.tool.name if not batch else None,
+            output_format=run.output_format if run is not None else None,
+            unique_id=unique_id,
+            origin=(
+                str(run.out_dir.resolve())
+                if run is not None and run.out_dir is not None
+                else None
+            ),
+        )
+        completion.cache_key = key
 
     # --------------------------------------------------------------------- #
     # Public façades                                                        #
@@ -265,7 +749,25 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         out_dir: Path,
         output_format: str = "json",
         concurrency: int = 8,
+        max_concurrency: int | None = None,
         timeout_seconds: float | None = 300.0,
+        deadline_seconds: float | None = None,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        retry_policy: RetryPolicy | None = None,
+        resume: bool = False,
+        sink: str = "files",
+        records_per_shard: int = 1000,
+        compression: str | None = None,
+        routing: str = "least-outstanding",
+        output_formats: Sequence[str] | None = None,
+        records_per_call: int = 1,
+        structured_outputs: bool = False,
+        max_completion_tokens: int | None = None,
+        report: bool = False,
+        process_workers: int | None = None,
+        hierarchical: bool = False,
+        max_sections: int | None = None,
     ) -> None:
         """
         Blocking helper that delegates to the async implementation.
@@ -279,10 +781,99 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         output_format:
             One of ``json``, ``yaml`` or ``txt``.
         concurrency:
-            Upper bound on simultaneous Azure OpenAI requests.
+            Number of simultaneous Azure OpenAI requests. When
+            *max_concurrency* is set this is the starting point of the
+            adaptive controller.
+        max_concurrency:
+            Enables adaptive (AIMD) concurrency when greater than
+            *concurrency*: the in-flight limit rises while p95 latency is
+            stable and is cut back on HTTP 429s, timeouts or latency spikes.
         timeout_seconds:
-            Maximum time in seconds to wait for a single generation task.
-            If None, no timeout is applied.
+            Maximum time in seconds to wait for a single Azure OpenAI request.
+            The clock starts when the request is sent, not when the record is
+            queued. If None, no per-request timeout is applied.
+        deadline_seconds:
+            Optional wall-clock budget for the whole run. Once the remaining
+            time is shorter than a typical request, no new records are
+            started and the rest are reported as skipped.
+        requests_per_minute / tokens_per_minute:
+            Optional client-side RPM / TPM budget for this process. Set them to
+            this process's share of the deployment quota when several
+            generators target the same deployment.
+        retry_policy:
+            Per-error-class retry budgets and backoff settings for HTTP 429,
+            5xx, timeouts, unparseable output and content-filter stops.
+            Defaults to :class:`RetryPolicy`; pass ``RetryPolicy.disabled()``
+            to fail fast.
+        resume:
+            Continue an interrupted run: read the manifest in *out_dir* and
+            only generate the records still missing to reach *count*. With a
+            response cache, completions of this run that were cached but
+            never stored are persisted first, without new model calls.
+        sink:
+            Output layout, one of :data:`data_generator.sinks.SINKS`:
+            ``files`` (one file per record), ``jsonl`` or ``parquet``
+            (rotating shards of *records_per_shard* records).
+        records_per_shard:
+            Shard size for the ``jsonl`` and ``parquet`` sinks.
+        compression:
+            ``zstd`` to compress ``jsonl`` shards.
+        routing:
+            How requests are spread over several deployments, one of
+            :data:`data_generator.deployments.ROUTING_POLICIES`.
+        output_formats:
+            Store every record in each of these formats. The model is asked
+            for JSON once per record (*output_format* is ignored) and the
+            other formats are rendered locally with
+            :py:meth:`DataGeneratorTool.render`. With more than one format
+            each gets its own subdirectory of *out_dir*.
+        records_per_call:
+            Ask for this many records per model call (as a JSON array, see
+            :py:meth:`DataGeneratorTool.build_batch_prompt`), so the static
+            instructions are paid for once per call rather than per record.
+            Records missing from or malformed in the reply are regenerated
+            one at a time. Requires JSON output (or *output_formats*).
+        structured_outputs:
+            Send the tool's :attr:`DataGeneratorTool.response_model` (its
+            record model, or the part of it the model writes) as a JSON
+            schema ``response_format``, so that the deployment only returns
+            records that parse and validate. Needs a deployment and API
+            version with structured-output support, JSON output and a tool
+            that publishes a record model. JSON records are validated against
+            the model either way; a record that fails is retried like any
+            unparseable output instead of being stored as raw text.
+        max_completion_tokens:
+            Fixed completion-token limit per record, overriding the tool's
+            :attr:`DataGeneratorTool.max_completion_tokens`. When neither is
+            set the limit adapts: after the first records it follows a high
+            percentile of the completion sizes observed for this tool and
+            format (see :class:`data_generator.budget.CompletionBudget`),
+            which is also what the rate limiter and deployment quota reserve.
+        report:
+            Write a JSON run report (:data:`REPORT_NAME`) to *out_dir*: record
+            and request outcomes, retries, queue wait / time to first byte /
+            latency percentiles and token counts, see
+            :py:meth:`data_generator.telemetry.RunTelemetry.report`. The same
+            measurements go to OpenTelemetry either way.
+        process_workers:
+            Parse, validate and serialise records in this many worker
+            processes (see :class:`data_generator.processing.RecordProcessor`)
+            instead of on the event loop. Worth it for large records, YAML in
+            particular, at high concurrency; the pool size is independent of
+            *concurrency*, typically the number of spare CPU cores.
+        hierarchical:
+            Write each record as an outline first and then every item of the
+            tool's :attr:`DataGeneratorTool.section_fields` in its own call,
+            all sections of a record at once, within the *concurrency* limit.
+            A long document then takes about as long as its outline plus its
+            longest section instead of the whole text, and no single reply
+            has to fit the entire document. Requires JSON output (or
+            *output_formats*) and a tool with sections.
+        max_sections:
+            Most section items written for one record, by default the
+            concurrency ceiling (*max_concurrency*, or *concurrency*). Longer
+            outlines are cut to this many headings, and a record never has
+            more section calls in flight than the current concurrency limit.
         """
         asyncio.run(
             self._run_async(
@@ -290,7 +881,25 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
                 out_dir=out_dir,
                 output_format=output_format,
                 concurrency=concurrency,
+                max_concurrency=max_concurrency,
                 timeout_seconds=timeout_seconds,
+                deadline_seconds=deadline_seconds,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+                retry_policy=retry_policy,
+                resume=resume,
+                sink=sink,
+                records_per_shard=records_per_shard,
+                compression=compression,
+                routing=routing,
+                output_formats=output_formats,
+                records_per_call=records_per_call,
+                structured_outputs=structured_outputs,
+                max_completion_tokens=max_completion_tokens,
+                report=report,
+                process_workers=process_workers,
+                hierarchical=hierarchical,
+                max_sections=max_sections,
             )
         )
 
@@ -305,152 +914,1378 @@ class DataGenerator:  # pylint: disable=too-many-instance-attributes
         output_format: str,
         concurrency: int,
         timeout_seconds: float | None,
+        max_concurrency: int | None = None,
+        deadline_seconds: float | None = None,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        retry_policy: RetryPolicy | None = None,
+        resume: bool = False,
+        sink: str = "files",
+        records_per_shard: int = 1000,
+        compression: str | None = None,
+        routing: str = "least-outstanding",
+        output_formats: Sequence[str] | None = None,
+        records_per_call: int = 1,
+        structured_outputs: bool = False,
+        max_completion_tokens: int | None = None,
+        report: bool = False,
+        process_workers: int | None = None,
+        hierarchical: bool = False,
+        max_sections: int | None = None,
     ) -> None:
         """
-        Drive *count* asynchronous generation tasks while honouring
-        *concurrency* and an optional *timeout_seconds* per task.
+        Drive *count* record generations through a fixed pool of workers,
+        honouring an optional per-request *timeout_seconds* and an optional
+        overall *deadline_seconds*.
+
+        The pool holds ``max(concurrency, max_concurrency)`` workers; an
+        :class:`AdaptiveConcurrencyLimiter` decides how many of them may have
+        a request in flight, and an optional :class:`RateLimiter` keeps the
+        run inside its RPM / TPM budget. A :class:`DeploymentPool` routes each
+        request to one of the configured deployments. Work items are pulled
+        lazily from a shared iterator, so memory use is bounded by the pool
+        size rather than by *count*.
+
+        Records are stored by a :class:`SinkWriter` task feeding the *sink*,
+        one per format when *output_formats* asks for locally rendered
+        copies. Every settled record is appended to the :class:`RunManifest`
+        in *out_dir*; with *resume* the records already listed there count
+        towards *count*. Cached completions that should be persisted without
+        a model call (see :py:meth:`_cached_work`) are handed out first. With
+        *process_workers* a :class:`RecordProcessor` parses and serialises
+        the records; with *hierarchical* each record is written section by
+        section (see :py:meth:`_generate_sections_async`).
 
         See Also
         --------
+        _worker_async : Pulls work items and records per-worker statistics.
         _generate_one_async : Handles the life-cycle of a single record.
         """
-        semaphore = asyncio.Semaphore(concurrency)
-        tasks: list[asyncio.Task[None]] = []
-        for i in range(1, count + 1):
-            # Coroutine to be executed by the task
-            coro = self._generate_one_async(
-                index=i,
-                out_dir=out_dir,
-                output_format=output_format,
-                semaphore=semaphore,
+        if output_formats:
+            formats = self._check_output_formats(output_formats)
+            output_format = "json"
+        else:
+            formats = [output_format]
+        run_format = ",".join(formats)
+        ctx = self._run_context(
+            out_dir=out_dir,
+            output_format=output_format,
+            concurrency=concurrency,
+            max_concurrency=max_concurrency,
+            timeout_seconds=timeout_seconds,
+            deadline_seconds=deadline_seconds,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            retry_policy=retry_policy,
+            routing=routing,
+            records_per_call=records_per_call,
+            structured_outputs=structured_outputs,
+            max_completion_tokens=max_completion_tokens,
+            process_workers=process_workers,
+            hierarchical=hierarchical,
+            max_sections=max_sections,
+        )
+        manifest = RunManifest(out_dir)
+        first_index, remaining = 1, count
+        state = ManifestState()
+        if resume:
+            state = manifest.load()
+            self._check_resumable(state, run_format)
+            first_index = state.last_index + 1
+            remaining = max(count - len(state.completed), 0)
+            for entry in state.completed.values():
+                if entry.usage:
+                    ctx.budget.record(
+                        entry.usage.get("completion_tokens", 0),
+                        entry.usage.get("reasoning_tokens", 0),
+                    )
+            self.logger.info(
+                "Resuming run in %s: %s of %s records already generated, "
+                "%s to go.",
+                out_dir,
+                count - remaining,
+                count,
+                remaining,
             )
-            # Wrap with asyncio.wait_for if a timeout is specified
-            if timeout_seconds is not None:
-                task_coro = asyncio.wait_for(coro, timeout=timeout_seconds)
-            else:
-                task_coro = coro
 
-            tasks.append(asyncio.create_task(task_coro))
+        work, remaining = self._work_items(
+            out_dir=out_dir,
+            output_format=output_format,
+            state=state,
+            resume=resume,
+            first_index=first_index,
+            remaining=remaining,
+        )
+        stats = self._worker_stats(ctx, remaining)
+        ctx.writers = {
+            fmt: SinkWriter(
+                create_sink(
+                    sink,
+                    out_dir / fmt if len(formats) > 1 else out_dir,
+                    tool_name=self.tool.toolName,
+                    output_format=fmt,
+                    records_per_shard=records_per_shard,
+                    compression=compression,
+                )
+            )
+            for fmt in formats
+        }
+        manifest.open(scenario=self.tool.name, output_format=run_format, count=count)
+        ctx.manifest = manifest
+        for writer in ctx.writers.values():
+            writer.start()
+        if ctx.processor is not None:
+            ctx.processor.start()
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(
+                *(
+                    self._worker_async(stats=worker_stats, work=work, ctx=ctx)
+                    for worker_stats in stats
+                )
+            )
+        finally:
+            for writer in ctx.writers.values():
+                await writer.close()
+            if ctx.processor is not None:
+                await ctx.processor.close()
+            manifest.close()
+        elapsed = time.perf_counter() - started
+        self._log_run_summary(ctx, stats, elapsed)
+        if report:
+            self._write_report(
+                ctx,
+                out_dir / REPORT_NAME,
+                elapsed=elapsed,
+                settings={
+                    "count": count,
+                    "concurrency": concurrency,
+                    "max_concurrency": max_concurrency,
+                    "records_per_call": records_per_call,
+                    "structured_outputs": structured_outputs,
+                    "max_completion_tokens": max_completion_tokens,
+                    "sink": sink,
+                    "resume": resume,
+                    "process_workers": process_workers,
+                    "hierarchical": hierarchical,
+                    "max_sections": max_sections,
+                },
+            )
 
-        failures = 0
-        for t in asyncio.as_completed(tasks):
+    async def stream(  # noqa: PLR0913
+        self,
+        *,
+        count: int,
+        output_format: str = "json",
+        concurrency: int = 8,
+        max_concurrency: int | None = None,
+        timeout_seconds: float | None = 300.0,
+        deadline_seconds: float | None = None,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        retry_policy: RetryPolicy | None = None,
+        routing: str = "least-outstanding",
+        records_per_call: int = 1,
+        structured_outputs: bool = False,
+        max_completion_tokens: int | None = None,
+        max_pending: int | None = None,
+        process_workers: int | None = None,
+        hierarchical: bool = False,
+        max_sections: int | None = None,
+    ) -> AsyncIterator[GeneratedRecord]:
+        """
+        Generate *count* records and yield each one as soon as it is ready.
+
+        The records go through the same worker pool, retries, validation and
+        response cache as :py:meth:`run` but are handed to the caller instead
+        of a sink, in completion order, as :class:`GeneratedRecord` items;
+        nothing is written to disk and no manifest is kept. Records that fail
+        are logged and left out, so fewer than *count* may be yielded.
+
+        Completed records wait in a queue of *max_pending* items (by default
+        the worker-pool size). When the consumer falls behind and the queue
+        is full, workers wait before taking new work, so no more than the
+        pool plus the queue is ever generated ahead of the consumer. Leaving
+        the ``async for`` loop early cancels the requests still in flight.
+
+        The other parameters are those of :py:meth:`run`; in replay mode the
+        cached completions of the scenario and format are yielded.
+
+        Examples
+        --------
+        >>> async for record in generator.stream(count=100):  # doctest: +SKIP
+        ...     await index.upload(record.unique_id, record.data)
+        """
+        ctx = self._run_context(
+            out_dir=None,
+            output_format=output_format,
+            concurrency=concurrency,
+            max_concurrency=max_concurrency,
+            timeout_seconds=timeout_seconds,
+            deadline_seconds=deadline_seconds,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            retry_policy=retry_policy,
+            routing=routing,
+            records_per_call=records_per_call,
+            structured_outputs=structured_outputs,
+            max_completion_tokens=max_completion_tokens,
+            process_workers=process_workers,
+            hierarchical=hierarchical,
+            max_sections=max_sections,
+        )
+        if max_pending is not None and max_pending < 1:
+            raise ValueError("max_pending must be at least 1.")
+        queue: asyncio.Queue[GeneratedRecord | None] = asyncio.Queue(
+            max_pending or ctx.limiter.maximum
+        )
+        ctx.stream = queue
+        work, remaining = self._work_items(
+            out_dir=None,
+            output_format=output_format,
+            state=ManifestState(),
+            resume=False,
+            first_index=1,
+            remaining=count,
+        )
+        stats = self._worker_stats(ctx, remaining)
+
+        async def _produce() -> None:
+            # End-of-stream marker; not sent when cancelled (consumer gone)
             try:
-                await t
-            except asyncio.TimeoutError:
-                self.logger.error(
-                    "Generation task timed out after %s seconds.", timeout_seconds
+                await asyncio.gather(
+                    *(
+                        self._worker_async(stats=worker_stats, work=work, ctx=ctx)
+                        for worker_stats in stats
+                    )
+                )
+            except Exception:
+                await queue.put(None)
+                raise
+            await queue.put(None)
+
+        if ctx.processor is not None:
+            ctx.processor.start()
+        started = time.perf_counter()
+        producer = asyncio.create_task(_produce())
+        try:
+            while (record := await queue.get()) is not None:
+                yield record
+            await producer                 # surface errors outside the workers
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await producer
+            if ctx.processor is not None:
+                await ctx.processor.close()
+            self._log_run_summary(ctx, stats, time.perf_counter() - started)
+
+    # --------------------------------------------------------------------- #
+    # Run set-up and reporting                                              #
+    # --------------------------------------------------------------------- #
+    def _run_context(  # noqa: PLR0913
+        self,
+        *,
+        out_dir: Path | None,
+        output_format: str,
+        concurrency: int,
+        max_concurrency: int | None,
+        timeout_seconds: float | None,
+        deadline_seconds: float | None,
+        requests_per_minute: int | None,
+        tokens_per_minute: int | None,
+        retry_policy: RetryPolicy | None,
+        routing: str,
+        records_per_call: int,
+        structured_outputs: bool,
+        max_completion_tokens: int | None,
+        process_workers: int | None = None,
+        hierarchical: bool = False,
+        max_sections: int | None = None,
+    ) -> _RunContext:
+        """
+        Validate the settings shared by :py:meth:`run` and :py:meth:`stream`
+        and build the run's limiter, deployment pool, rate limiter, completion
+        budget and (not yet started) record processor.
+
+        A matching route (see :py:meth:`_select_route`) restricts the pool to
+        its deployments, caps the concurrency and tightens the quota.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        if records_per_call < 1:
+            raise ValueError("records_per_call must be at least 1.")
+        if max_completion_tokens is not None and max_completion_tokens < 1:
+            raise ValueError("max_completion_tokens must be at least 1.")
+        if process_workers is not None and process_workers < 1:
+            raise ValueError("process_workers must be at least 1.")
+        if max_sections is not None and max_sections < 1:
+            raise ValueError("max_sections must be at least 1.")
+        if records_per_call > 1 and output_format != "json":
+            raise ValueError(
+                "Several records per call need JSON output; use output_formats "
+                "to store other formats."
+            )
+        if structured_outputs and output_format != "json":
+            raise ValueError(
+                "Structured outputs need JSON output; use output_formats to "
+                "store other formats."
+            )
+        if hierarchical and output_format != "json":
+            raise ValueError(
+                "Hierarchical generation needs JSON output; use output_formats "
+                "to store other formats."
+            )
+        if hierarchical and records_per_call > 1:
+            raise ValueError(
+                "Hierarchical generation writes one record at a time; it cannot "
+                "be combined with several records per call."
+            )
+        if hierarchical and not self.tool.section_fields:
+            raise ValueError(
+                f"Tool '{self.tool.name}' has no sections to generate "
+                "separately with its current settings."
+            )
+        if structured_outputs and self.tool.response_model is None:
+            raise ValueError(
+                f"Tool '{self.tool.name}' publishes no record model for "
+                "structured outputs."
+            )
+        pool_size = max(concurrency, max_concurrency or concurrency)
+        route = self._select_route(output_format)
+        targets = list(zip(self.service_ids, self.deployments, strict=True))
+        if route is not None:
+            targets = self._route_targets(route)
+            if route.concurrency is not None:
+                pool_size = min(pool_size, route.concurrency)
+                concurrency = min(concurrency, pool_size)
+            requests_per_minute = _tighter(
+                requests_per_minute, route.requests_per_minute
+            )
+            tokens_per_minute = _tighter(tokens_per_minute, route.tokens_per_minute)
+            self.logger.info(
+                "Route %s: %s, reasoning effort %s, concurrency %s.",
+                route.label,
+                ", ".join(deployment.label for _, deployment in targets),
+                route.reasoning_effort or "default",
+                pool_size,
+            )
+
+        ctx = _RunContext(
+            out_dir=out_dir,
+            output_format=output_format,
+            timeout_seconds=timeout_seconds,
+            limiter=AdaptiveConcurrencyLimiter(
+                initial=concurrency,
+                maximum=pool_size,
+                logger=self.logger,
+            ),
+            pool=DeploymentPool(targets, routing=routing, logger=self.logger),
+            route=route,
+            rate_limiter=(
+                RateLimiter(
+                    requests_per_minute=requests_per_minute,
+                    tokens_per_minute=tokens_per_minute,
+                )
+                if requests_per_minute or tokens_per_minute
+                else None
+            ),
+            retry_policy=retry_policy or RetryPolicy(),
+            records_per_call=records_per_call,
+            hierarchical=hierarchical,
+            max_sections=max_sections or pool_size,
+            response_model=self.tool.response_model if structured_outputs else None,
+            processor=(
+                RecordProcessor(self.tool, workers=process_workers)
+                if process_workers
+                else None
+            ),
+            budget=self._completion_budget(
+                # Outlines and sections are not the size of whole records
+                f"{output_format}:sections" if hierarchical else output_format,
+                override=max_completion_tokens or self.tool.max_completion_tokens,
+            ),
+            deadline=(
+                time.monotonic() + deadline_seconds
+                if deadline_seconds is not None
+                else None
+            ),
+            telemetry=RunTelemetry(
+                {"scenario": self.tool.name, "output_format": output_format},
+                meter_provider=self.meter_provider,
+            ),
+        )
+        self.telemetry = ctx.telemetry
+        return ctx
+
+    def _work_items(  # noqa: PLR0913
+        self,
+        *,
+        out_dir: Path | None,
+        output_format: str,
+        state: ManifestState,
+        resume: bool,
+        first_index: int,
+        remaining: int,
+    ) -> tuple[Iterator[tuple[int, CachedResponse | None]], int]:
+        """
+        Return the shared work iterator of ``(index, cached completion)``
+        items (cached work first, see :py:meth:`_cached_work`) and the number
+        of items it holds; in replay mode only cached work is handed out.
+        """
+        replay = self._cached_work(
+            out_dir=out_dir,
+            output_format=output_format,
+            state=state,
+            resume=resume,
+            limit=remaining,
+        )
+        # Tools that hand out ids from a fixed list (pooled products) skip the
+        # records already in out_dir and those about to be replayed
+        generated = (
+            state if resume or out_dir is None else RunManifest(out_dir).load()
+        ).completed
+        self.tool.exclude_unique_ids(
+            itertools.chain(generated, (c.unique_id for c in replay if c.unique_id))
+        )
+        if self.cache is not None and self.cache.replay:
+            if len(replay) < remaining:
+                self.logger.warning(
+                    "Replay: only %s of %s records have a cached completion.",
+                    len(replay),
+                    remaining,
                 )
-                failures += 1
-            except Exception:  # pylint: disable=broad-exception-caught
-                self.logger.exception("Generation task failed")
-                failures += 1
+            remaining = len(replay)
+        work: Iterator[tuple[int, CachedResponse | None]] = itertools.chain(
+            zip(itertools.count(first_index), replay),
+            (
+                (index, None)
+                for index in range(first_index + len(replay), first_index + remaining)
+            ),
+        )
+        return work, remaining
+
+    @staticmethod
+    def _worker_stats(ctx: _RunContext, remaining: int) -> list[_WorkerStats]:
+        """One statistics record per worker; no more workers than work items."""
+        return [
+            _WorkerStats(worker_id=i)
+            for i in range(1, min(ctx.limiter.maximum, max(remaining, 1)) + 1)
+        ]
 
+    def _log_run_summary(
+        self, ctx: _RunContext, stats: list[_WorkerStats], elapsed: float
+    ) -> None:
+        """Log the outcome, token usage and controller state of a run."""
         self.logger.info(
-            "Generation finished. Success: %s, Failed: %s",
-            count - failures,
-            failures
+            "Generation finished. Success: %s, Failed: %s, Skipped: %s, "
+            "Retries: %s",
+            sum(s.records for s in stats),
+            sum(s.failures for s in stats),
+            ctx.skipped,
+            ctx.retries.total(),
+        )
+        if ctx.usage.total_tokens:
+            self.logger.info(
+                "Token usage: %s prompt (%s from the prompt cache, %.0f%% hit "
+                "ratio), %s completion.",
+                ctx.usage.prompt_tokens,
+                ctx.usage.cached_tokens,
+                100 * ctx.usage.cache_hit_ratio,
+                ctx.usage.completion_tokens,
+            )
+        if ctx.telemetry.duration.count:
+            self.logger.info(
+                "Request latency: p50 %.2fs, p99 %.2fs; queue wait p50 %.2fs, "
+                "p99 %.2fs.",
+                ctx.telemetry.duration.quantile(0.5),
+                ctx.telemetry.duration.quantile(0.99),
+                ctx.telemetry.queue_wait.quantile(0.5),
+                ctx.telemetry.queue_wait.quantile(0.99),
+            )
+        if ctx.retries:
+            self.logger.info(
+                "Retries by cause: %s.",
+                ", ".join(
+                    f"{error_class.value}={n}"
+                    for error_class, n in ctx.retries.most_common()
+                ),
+            )
+        if ctx.limiter.adaptive:
+            self.logger.info(
+                "Adaptive concurrency: final limit %s, peak %s (bounds %s-%s).",
+                ctx.limiter.limit,
+                ctx.limiter.peak,
+                ctx.limiter.minimum,
+                ctx.limiter.maximum,
+            )
+        if ctx.rate_limiter is not None:
+            self.logger.info(
+                "Rate limiter: waited %.1fs in total to stay within quota.",
+                ctx.rate_limiter.waited_seconds,
+            )
+        if self.cache is not None:
+            self.logger.info(
+                "Response cache: %s hits, %s misses, %s completions replayed.",
+                self.cache.hits,
+                self.cache.misses,
+                ctx.replayed,
+            )
+        if ctx.budget.samples:
+            self.logger.info(
+                "Completion budget: %s tokens per record (p%.0f of %s records: "
+                "%s), %s reasoning tokens, %s replies cut off.",
+                ctx.budget.limit(),
+                100 * ctx.budget.percentile,
+                ctx.budget.samples,
+                ctx.budget.observed(),
+                ctx.budget.reasoning_tokens,
+                ctx.budget.truncated,
+            )
+        if ctx.batches:
+            self.logger.info(
+                "Records per call: %s batched calls, %s records regenerated "
+                "one at a time.",
+                ctx.batches,
+                ctx.batch_fallbacks,
+            )
+        if ctx.sections:
+            self.logger.info(
+                "Hierarchical generation: %s section calls after the outlines.",
+                ctx.sections,
+            )
+        if ctx.processor is not None and ctx.processor.jobs:
+            self.logger.info(
+                "Record processing: %s jobs in %s batches on %s worker "
+                "processes.",
+                ctx.processor.jobs,
+                ctx.processor.batches,
+                ctx.processor.workers,
+            )
+        if ctx.pool.multiple:
+            ctx.pool.log_summary(elapsed)
+        self._log_worker_stats(stats, elapsed)
+
+    def _write_report(
+        self,
+        ctx: _RunContext,
+        path: Path,
+        *,
+        elapsed: float,
+        settings: dict[str, Any],
+    ) -> None:
+        """Write the JSON run report of *ctx* to *path*."""
+        report = ctx.telemetry.report(
+            elapsed_seconds=round(elapsed, 3),
+            settings=settings,
+            deployments=[state.deployment.label for state in ctx.pool.states],
+            route=ctx.route.label if ctx.route is not None else None,
+            concurrency={
+                "final_limit": ctx.limiter.limit,
+                "peak": ctx.limiter.peak,
+            },
+            completion_budget={
+                "limit": ctx.budget.limit(),
+                "observed": ctx.budget.observed(),
+                "samples": ctx.budget.samples,
+                "truncated": ctx.budget.truncated,
+            },
+            cache=(
+                {"hits": self.cache.hits, "misses": self.cache.misses}
+                if self.cache is not None
+                else None
+            ),
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        self.logger.info("Run report written to %s.", path)
+
+    async def _worker_async(
+        self,
+        *,
+        stats: _WorkerStats,
+        work: Iterator[tuple[int, CachedResponse | None]],
+        ctx: _RunContext,
+    ) -> None:
+        """
+        Pull record ordinals (and cached completions to replay) from *work*
+        until it is exhausted.
+
+        The iterator is shared by every worker in the pool; because the event
+        loop is single-threaded, ``next()`` never hands the same ordinal to two
+        workers. When the run deadline no longer leaves room for a typical
+        request, the worker drains the iterator so the whole pool stops.
+        """
+        for index, cached in work:
+            if not ctx.can_start():
+                skipped = 1 + sum(1 for _ in work)
+                ctx.skipped += skipped
+                ctx.telemetry.record_records("skipped", skipped)
+                self.logger.warning(
+                    "Run deadline reached; %s records were not started.",
+                    ctx.skipped,
+                )
+                return
+            started = time.perf_counter()
+            if cached is None and ctx.records_per_call > 1:
+                # Cached work comes first, so the rest of the batch is fresh
+                indices = [
+                    index,
+                    *(i for i, _ in itertools.islice(work, ctx.records_per_call - 1)),
+                ]
+                errors = await self._generate_batch_async(indices=indices, ctx=ctx)
+                for batch_index, error in zip(indices, errors, strict=True):
+                    if error is None:
+                        stats.records += 1
+                    else:
+                        self._log_failure(batch_index, error)
+                        stats.failures += 1
+                stats.busy_seconds += time.perf_counter() - started
+                continue
+            try:
+                await self._generate_one_async(index=index, ctx=ctx, cached=cached)
+                stats.records += 1
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._log_failure(index, exc)
+                stats.failures += 1
+            finally:
+                stats.busy_seconds += time.perf_counter() - started
+
+    def _log_failure(self, index: int, exc: Exception) -> None:
+        """Log why record *index* could not be generated."""
+        if isinstance(exc, asyncio.TimeoutError):
+            self.logger.error("Request for record %s timed out.", index)
+        else:
+            self.logger.error("Generation task failed", exc_info=exc)
+
+    def _cached_work(
+        self,
+        *,
+        out_dir: Path | None,
+        output_format: str,
+        state: ManifestState,
+        resume: bool,
+        limit: int,
+    ) -> list[CachedResponse]:
+        """
+        Return cached completions to persist without calling the model.
+
+        In replay mode these are the cached completions of the scenario and
+        format, from any output directory. When resuming, they are the
+        completions generated for *out_dir* whose record never made it into
+        the manifest, e.g. because the run crashed or ``post_process`` failed.
+        """
+        if self.cache is None or not (resume or self.cache.replay):
+            return []
+        return self.cache.entries(
+            scenario=self.tool.name,
+            output_format=output_format,
+            origin=(
+                str(out_dir.resolve())
+                if out_dir is not None and not self.cache.replay
+                else None
+            ),
+            exclude_ids=state.completed.keys(),
+            limit=limit,
         )
 
+    def _check_output_formats(self, output_formats: Sequence[str]) -> list[str]:
+        """
+        Validate the formats of a generate-once, render-many run: the tool
+        must produce JSON and every format must be renderable from it.
+        """
+        if "json" not in self.tool.supported_output_formats():
+            raise ValueError(
+                f"Scenario '{self.tool.name}' does not produce JSON, so other "
+                "formats cannot be rendered from it."
+            )
+        formats = list(dict.fromkeys(fmt.lower() for fmt in output_formats))
+        unknown = [fmt for fmt in formats if fmt not in _RENDERED_FORMATS]
+        if unknown:
+            raise ValueError(
+                f"Cannot render output format(s) {', '.join(unknown)}; "
+                f"choose from {', '.join(_RENDERED_FORMATS)}."
+            )
+        return formats
+
+    def _check_resumable(self, state: ManifestState, output_format: str) -> None:
+        """Refuse to resume a run written by another scenario or format."""
+        if not state.runs:
+            return
+        previous = state.runs[-1]
+        if (previous.get("scenario"), previous.get("output_format")) != (
+            self.tool.name,
+            output_format,
+        ):
+            raise ValueError(
+                "Cannot resume: the existing manifest was written for scenario "
+                f"'{previous.get('scenario')}' "
+                f"({previous.get('output_format')}), not '{self.tool.name}' "
+                f"({output_format})."
+            )
+
+    def _log_worker_stats(self, stats: list[_WorkerStats], elapsed: float) -> None:
+        """Log pool-wide utilisation at INFO and per-worker detail at DEBUG."""
+        if not stats or elapsed <= 0:
+            return
+        utilisation = [s.busy_seconds / elapsed for s in stats]
+        self.logger.info(
+            "Worker pool: %s workers, utilisation mean %.0f%% (min %.0f%%, "
+            "max %.0f%%) over %.1fs.",
+            len(stats),
+            100 * sum(utilisation) / len(utilisation),
+            100 * min(utilisation),
+            100 * max(utilisation),
+            elapsed,
+        )
+        for worker_stats, busy in zip(stats, utilisation, strict=True):
+            self.logger.debug(
+                "Worker %s: %s records, %s failed, %.0f%% utilisation.",
+                worker_stats.worker_id,
+                worker_stats.records,
+                worker_stats.failures,
+                100 * busy,
+            )
+
+    def _get_prompt_function(
+        self,
+        output_format: str,
+        *,
+        response_model: type[BaseModel] | None = None,
+        reasoning_effort: str | None = None,
+    ) -> KernelFunction:
+        """
+        Return the compiled generation function for *output_format*.
+
+        The function is registered on the kernel once per (tool, format,
+        *response_model*, *reasoning_effort*) and reused for every record;
+        the per-record prompt produced by
+        :py:meth:`DataGeneratorTool.build_prompt` travels as the ``prompt``
+        kernel argument instead of being compiled into a new template. A
+        *response_model* is requested through structured outputs.
+        """
+        key = (self.tool.toolName, output_format, response_model, reasoning_effort)
+        prompt_fn = self._prompt_functions.get(key)
+        if prompt_fn is None:
+            function_name = "generate_" + re.sub(r"[^0-9A-Za-z_]", "_", output_format)
+            if response_model is not None:
+                function_name += f"_{response_model.__name__}"
+            if reasoning_effort is not None:
+                function_name += f"_{reasoning_effort}_effort"
+            prompt_fn = self._register_prompt_function(
+                template=_GENERATE_TEMPLATE,
+                function_name=function_name,
+                plugin_name=self.tool.toolName,
+                prompt_description=(
+                    f"{self.tool.toolName} generator ({output_format})"
+                ),
+                input_variables=[
+                    {"name": "prompt", "description": "fully rendered prompt"},
+                    {"name": "index", "description": "record ordinal"},
+                    {"name": "unique_id", "description": "record identifier"},
+                ],
+                max_tokens=_DEFAULT_MAX_TOKENS,
+                response_format=(
+                    json_schema_format(response_model, name=self.tool.toolName)
+                    if response_model is not None
+                    else None
+                ),
+                reasoning_effort=reasoning_effort,
+            )
+            self._prompt_functions[key] = prompt_fn
+        return prompt_fn
+
     async def _generate_one_async(
         self,
         *,
         index: int,
-        out_dir: Path,
-        output_format: str,
-        semaphore: asyncio.Semaphore,
+        ctx: _RunContext,
+        cached: CachedResponse | None = None,
+        unique_id: str | None = None,
     ) -> None:
         """
         Generate, post-process, and persist a single record.
 
+        The outcome is appended to ``ctx.manifest`` once the record is
+        settled, so an interrupted run can be resumed.
+
         Parameters
         ----------
         index :
             Ordinal number of the record being produced (1-based).
-        out_dir :
-            Target directory for the output file.
-        output_format :
-            File format - currently ``json``, ``yaml``, or plain text.
-        semaphore :
-            Synchronisation primitive controlling overall concurrency.
-        """
-        async with semaphore:
-            unique_id = self.tool.get_unique_id()       # use tool-provided id
-            prompt = self.tool.build_prompt(
-                output_format,
-                unique_id=unique_id,                    # pass to prompt builder
-            )
-            prompt_fn = self.create_prompt_function(
-                template=prompt,
-                function_name="generate",
-                plugin_name=self.tool.toolName,
-                prompt_description=f"{self.tool.toolName} generator",
-                input_variables=[{"name": "index", "description": "record ordinal"}],
-                # Reasoning models like gpt-5-mini use reasoning_tokens which count
-                # against the limit, so we need a much higher limit
-                max_tokens=16000,
-            )
-            # Call the async function directly (no longer wrapped in sync runner)
-            raw_output: str = await prompt_fn(index=index)  # type: ignore[misc]
-            processed = self.tool.post_process(raw_output, output_format)
-
-            await asyncio.to_thread(
-                self._persist,
-                unique_id=unique_id,
-                data=processed,
-                out_dir=out_dir,
-                output_format=output_format,
+        ctx :
+            Run settings (output directory and format, timeouts) and the
+            shared state used for deadline-aware scheduling.
+        cached :
+            Cached completion to persist instead of calling the model; the
+            record keeps the id it was generated with.
+        unique_id :
+            Id assigned earlier, e.g. to a record a batched call did not
+            deliver; by default the tool provides a fresh one.
+        """
+        output_format = ctx.output_format
+        if cached is not None:
+            unique_id = cached.unique_id or self.tool.get_unique_id()
+        elif unique_id is None:
+            unique_id = self.tool.get_unique_id()   # use tool-provided id
+
+        try:
+            if cached is not None:
+                processed, usage = await self._replay(cached, ctx), cached.usage
+            elif ctx.hierarchical:
+                processed, usage = await self._generate_sections_async(
+                    index=index, unique_id=unique_id, ctx=ctx
+                )
+            else:
+                prompt = self.tool.build_prompt(
+                    output_format,
+                    unique_id=unique_id,            # pass to prompt builder
+                )
+                processed, usage = await self._generate_with_retries(
+                    self._get_prompt_function(
+                        output_format,
+                        response_model=ctx.response_model,
+                        reasoning_effort=ctx.reasoning_effort,
+                    ),
+                    prompt=prompt,
+                    index=index,
+                    unique_id=unique_id,
+                    ctx=ctx,
+                )
+        except Exception as exc:
+            self._record_failure(index=index, unique_id=unique_id, exc=exc, ctx=ctx)
+            raise
+        await self._store_async(
+            index=index, unique_id=unique_id, processed=processed, usage=usage, ctx=ctx
+        )
+
+    async def _generate_batch_async(
+        self, *, indices: list[int], ctx: _RunContext
+    ) -> list[Exception | None]:
+        """
+        Generate the records *indices* with one model call and persist them.
+
+        Records the reply does not deliver, or that fail ``post_process``, are
+        regenerated one at a time with the ids they were assigned; if the
+        batched call fails altogether, every record is. The usage of the call
+        is shared out among the records it delivered.
+
+        Returns
+        -------
+        list[Exception | None]
+            Per record, the error it failed with or None once it is stored.
+        """
+        unique_ids = [self.tool.get_unique_id() for _ in indices]
+        records: dict[str, Any] = {}
+        usage: TokenUsage | None = None
+        try:
+            records, usage = await self._generate_with_retries(
+                self._get_prompt_function(
+                    ctx.output_format,
+                    response_model=(
+                        batch_model(ctx.response_model)
+                        if ctx.response_model is not None
+                        else None
+                    ),
+                    reasoning_effort=ctx.reasoning_effort,
+                ),
+                prompt=self.tool.build_batch_prompt(unique_ids),
+                index=indices[0],
+                unique_id=unique_ids[0],
+                ctx=ctx,
+                batch_ids=unique_ids,
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.logger.warning(
+                "Batched call for records %s-%s failed (%s: %s); generating "
+                "them one at a time.",
+                indices[0],
+                indices[-1],
+                type(exc).__name__,
+                exc,
+            )
+        ctx.batches += 1
+        shares = iter(usage.split(len(records)) if usage and records else [])
+
+        errors: list[Exception | None] = []
+        for index, unique_id in zip(indices, unique_ids, strict=True):
+            try:
+                if unique_id in records:
+                    await self._store_async(
+                        index=index,
+                        unique_id=unique_id,
+                        processed=records[unique_id],
+                        usage=next(shares, None),
+                        ctx=ctx,
+                    )
+                else:
+                    ctx.batch_fallbacks += 1
+                    await self._generate_one_async(
+                        index=index, ctx=ctx, unique_id=unique_id
+                    )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                errors.append(exc)
+            else:
+                errors.append(None)
+        return errors
+
+    async def _generate_sections_async(
+        self, *, index: int, unique_id: str, ctx: _RunContext
+    ) -> tuple[dict[str, Any], TokenUsage | None]:
+        """
+        Write one record as an outline plus one call per section item.
+
+        The outline (:py:meth:`DataGeneratorTool.build_outline_prompt`) lists
+        a heading per item of each section list, cut to the run's
+        *max_sections* headings; the items are then asked for at once, each
+        call taking its own concurrency slot and no more in flight than the
+        current concurrency limit, and put back in outline order by
+        :py:meth:`DataGeneratorTool.assemble_sections`.
+        Every call is retried on its own; if one still fails, the other
+        section calls are cancelled and the record fails.
+
+        Returns the assembled record and the usage summed over all calls.
+        """
+        structured = ctx.response_model is not None
+        outline, usage = await self._generate_with_retries(
+            self._get_prompt_function(
+                ctx.output_format,
+                response_model=self.tool.outline_model() if structured else None,
+                reasoning_effort=ctx.reasoning_effort,
+            ),
+            prompt=self.tool.build_outline_prompt(unique_id=unique_id),
+            index=index,
+            unique_id=unique_id,
+            ctx=ctx,
+            parse=(parse_outline, ()),
+        )
+        headings = sum(len(outline[name]) for name in self.tool.section_fields)
+        if headings > ctx.max_sections:
+            self.logger.warning(
+                "Record %s: the outline lists %s sections; writing the first %s.",
+                unique_id,
+                headings,
+                ctx.max_sections,
+            )
+            outline = _cap_outline(
+                outline, self.tool.section_fields, ctx.max_sections
             )
+        parts = [
+            (name, position)
+            for name in self.tool.section_fields
+            for position in range(1, len(outline[name]) + 1)
+        ]
+        ctx.sections += len(parts)
+        gate = asyncio.BoundedSemaphore(max(min(len(parts), ctx.limiter.limit), 1))
+
+        async def _section(name: str, position: int) -> tuple[Any, TokenUsage | None]:
+            async with gate:
+                return await self._generate_with_retries(
+                    self._get_prompt_function(
+                        ctx.output_format,
+                        response_model=(
+                            self.tool.section_model(name) if structured else None
+                        ),
+                        reasoning_effort=ctx.reasoning_effort,
+                    ),
+                    prompt=self.tool.build_section_prompt(outline, name, position),
+                    index=index,
+                    unique_id=unique_id,
+                    ctx=ctx,
+                    parse=(parse_section, (name,)),
+                )
+
+        tasks = [
+            asyncio.ensure_future(_section(name, position))
+            for name, position in parts
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        sections: dict[str, list[Any]] = {name: [] for name in self.tool.section_fields}
+        for (name, _), (item, item_usage) in zip(parts, results, strict=True):
+            sections[name].append(item)
+            if item_usage is not None:
+                usage = item_usage if usage is None else usage + item_usage
+        if ctx.processor is not None:
+            record = await ctx.processor.submit(assemble_record, outline, sections)
+        else:
+            record = assemble_record(self.tool, outline, sections)
+        return record, usage
+
+    async def _store_async(
+        self,
+        *,
+        index: int,
+        unique_id: str,
+        processed: Any,  # noqa: ANN401
+        usage: TokenUsage | None,
+        ctx: _RunContext,
+    ) -> None:
+        """
+        Write *processed* to every output sink (rendering the extra formats)
+        and record the outcome in the manifest, or hand it to the consumer
+        of :py:meth:`stream` (waiting while its queue is full). With a record
+        processor the records are serialised in its worker processes.
+        """
+        if ctx.stream is not None:
+            await ctx.stream.put(
+                GeneratedRecord(
+                    index=index, unique_id=unique_id, data=processed, usage=usage
+                )
+            )
+            ctx.telemetry.record_records("success")
             self.logger.debug("Record %s generated.", index)
+            return
+        try:
+            if not ctx.writers:
+                raise RuntimeError("No output sink configured for this run.")
+            if ctx.processor is not None:
+                encoded = await ctx.processor.encode(
+                    processed,
+                    ctx.output_format,
+                    [(type(writer.sink), fmt) for fmt, writer in ctx.writers.items()],
+                )
+                records = dict(zip(ctx.writers, encoded, strict=True))
+            else:
+                records = {
+                    fmt: processed
+                    if fmt == ctx.output_format
+                    else self.tool.render(processed, fmt)
+                    for fmt in ctx.writers
+                }
+            output, *_ = await asyncio.gather(
+                *(
+                    writer.write(unique_id, records[fmt])
+                    for fmt, writer in ctx.writers.items()
+                )
+            )
+        except Exception as exc:
+            self._record_failure(index=index, unique_id=unique_id, exc=exc, ctx=ctx)
+            raise
+        if ctx.manifest is not None:
+            ctx.manifest.record_success(
+                index=index, unique_id=unique_id, output=output, usage=usage
+            )
+        ctx.telemetry.record_records("success")
+        self.logger.debug("Record %s generated.", index)
 
-    # --------------------------------------------------------------------- #
-    # Helper utilities                                                      #
-    # --------------------------------------------------------------------- #
-    def _persist(
+    @staticmethod
+    def _record_failure(
+        *, index: int, unique_id: str, exc: Exception, ctx: _RunContext
+    ) -> None:
+        """Count a failed record and append it to the manifest, if any."""
+        ctx.telemetry.record_records("failed")
+        if ctx.manifest is not None:
+            ctx.manifest.record_failure(
+                index=index,
+                unique_id=unique_id,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+
+    async def _generate_with_retries(
         self,
+        prompt_fn: KernelFunction,
         *,
-        data: Any,
-        out_dir: Path,
-        output_format: str,
-        unique_id: str | None = None,
-        index: int | None = None,
+        prompt: str,
+        index: int,
+        unique_id: str,
+        ctx: _RunContext,
+        batch_ids: Sequence[str] | None = None,
+        parse: tuple[Callable[..., Any], tuple[Any, ...]] | None = None,
+    ) -> tuple[Any, TokenUsage | None]:
+        """
+        Call :py:meth:`_attempt_async` until it succeeds or must give up.
+
+        Transient failures (see :func:`data_generator.retry.classify_error`)
+        are retried within the per-class budgets of ``ctx.retry_policy``. The
+        backoff sleep happens outside the concurrency slot, and a retry whose
+        delay would overrun the run deadline is not attempted. A throttled
+        request is retried at once while another deployment is in rotation.
+        """
+        attempts: Counter[ErrorClass] = Counter()
+        while True:
+            try:
+                return await self._attempt_async(
+                    prompt_fn,
+                    prompt=prompt,
+                    index=index,
+                    unique_id=unique_id,
+                    ctx=ctx,
+                    batch_ids=batch_ids,
+                    parse=parse,
+                )
+            except Exception as exc:
+                error_class = classify_error(exc)
+                if error_class is None:
+                    raise
+                attempt = attempts[error_class]
+                if attempt >= ctx.retry_policy.budget(error_class):
+                    raise
+                delay = ctx.retry_policy.delay(attempt, exc)
+                if error_class is ErrorClass.THROTTLED and ctx.pool.has_alternative():
+                    # The throttled deployment is cooling down; another one
+                    # can take the request now
+                    delay = 0.0
+                remaining = ctx.remaining()
+                if remaining is not None and delay >= remaining:
+                    raise
+                attempts[error_class] += 1
+                ctx.retries[error_class] += 1
+                ctx.telemetry.record_retry(error_class.value)
+                self.logger.warning(
+                    "Record %s: %s (%s), retry %s/%s in %.1fs.",
+                    index,
+                    error_class.value,
+                    type(exc).__name__,
+                    attempt + 1,
+                    ctx.retry_policy.budget(error_class),
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def _attempt_async(
+        self,
+        prompt_fn: KernelFunction,
+        *,
+        prompt: str,
+        index: int,
+        unique_id: str,
+        ctx: _RunContext,
+        batch_ids: Sequence[str] | None = None,
+        parse: tuple[Callable[..., Any], tuple[Any, ...]] | None = None,
+    ) -> tuple[Any, TokenUsage | None]:
+        """
+        Make one model call for a record and return the post-processed output
+        together with the reported token usage.
+
+        Raises :class:`OutputParseError` when a ``json`` / ``yaml`` reply does
+        not parse, so that the caller can retry it. A cached completion skips
+        the concurrency slot and the rate limiter; a fresh one is cached
+        before it is post-processed. For a batched call (*batch_ids*) the
+        output is the ``{unique_id: record}`` mapping of
+        :py:meth:`DataGeneratorTool.split_batch`. For part of a record,
+        *parse* is the ``(step, args)`` of :mod:`data_generator.processing`
+        that reads the reply in place of ``post_process``.
+        """
+        completion = self._cache_lookup(
+            prompt_fn, prompt, [state.deployment for state in ctx.pool.states]
+        )
+        if completion is None:
+            records = len(batch_ids) if batch_ids else 1
+            max_tokens = ctx.budget.limit(records)
+            queued = time.perf_counter()
+            async with ctx.limiter.slot():
+                # Reserve quota for the prompt plus the completion budget
+                reserved = estimate_tokens(prompt) + max_tokens
+                if ctx.rate_limiter is not None:
+                    await ctx.rate_limiter.acquire(reserved)
+
+                target = await ctx.pool.acquire(reserved)
+                try:
+                    completion, latency = await self._call_deployment(
+                        prompt_fn,
+                        target,
+                        prompt=prompt,
+                        index=index,
+                        unique_id=unique_id,
+                        max_tokens=max_tokens,
+                        queued=queued,
+                        ctx=ctx,
+                    )
+                finally:
+                    ctx.pool.release(target)
+                ctx.latencies.append(latency)
+                ctx.limiter.record_success(latency)
+                ctx.pool.record_success(target, completion.usage, reserved)
+                if completion.usage is not None:
+                    ctx.usage += completion.usage
+                    self.logger.debug(
+                        "Record %s: %s prompt tokens (%s cached), %s completion.",
+                        index,
+                        completion.usage.prompt_tokens,
+                        completion.usage.cached_tokens,
+                        completion.usage.completion_tokens,
+                    )
+                    if ctx.rate_limiter is not None:
+                        ctx.rate_limiter.reconcile(
+                            reserved, completion.usage.total_tokens
+                        )
+            self._check_budget(completion, max_tokens, records, ctx)
+            self._cache_store(
+                prompt_fn,
+                prompt,
+                completion,
+                deployment=target.deployment.deployment,
+                unique_id=None if batch_ids or parse else unique_id,
+                ctx=ctx,
+                batch=batch_ids is not None or parse is not None,
+            )
+
+        if batch_ids is not None:
+            return await self._split_batch(completion, batch_ids, ctx), completion.usage
+        return await self._post_process(completion, ctx, parse=parse), completion.usage
+
+    def _completion_budget(
+        self, output_format: str, *, override: int | None
+    ) -> CompletionBudget:
+        """
+        Return the completion budget of this tool and *output_format*, which
+        keeps what earlier runs of this generator observed.
+        """
+        key = (self.tool.toolName, output_format)
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = CompletionBudget(ceiling=_DEFAULT_MAX_TOKENS, override=override)
+            self._budgets[key] = budget
+        budget.override = override
+        return budget
+
+    @staticmethod
+    def _check_budget(
+        completion: _Completion, max_tokens: int, records: int, ctx: _RunContext
     ) -> None:
         """
-        Persist **data** to disk using the requested *output_format*.
+        Feed the completion size of a fresh call into ``ctx.budget``.
 
-        Parameters
-        ----------
-        index:
-            1-based ordinal used when naming the output file.
-        data:
-            Already post-processed object (dict / str / etc.).
-        out_dir:
-            Target directory. Created on-the-fly if it does not exist.
-        output_format:
-            ``json``, ``yaml``, ``txt`` or anything else supported by the
-            default branch which falls back to ``str(data)``.
-        """
-        out_dir.mkdir(parents=True, exist_ok=True)
-        if unique_id:
-            filename = f"{self.tool.toolName}_{unique_id}.{output_format}"
-        elif index is not None:
-            filename = f"{index:04d}.{output_format}"
+        A reply cut off below the ceiling is incomplete because of the adapted
+        limit: the budget grows and :class:`OutputParseError` asks for a retry
+        (the reply is not cached).
+        """
+        if completion.truncated and max_tokens < ctx.budget.ceiling:
+            ctx.budget.record_truncated(max_tokens, records)
+            raise OutputParseError(
+                f"Model output was cut off at {max_tokens} completion tokens."
+            )
+        if completion.usage is not None:
+            for share in completion.usage.split(records):
+                ctx.budget.record(share.completion_tokens, share.reasoning_tokens)
+
+    async def _replay(self, cached: CachedResponse, ctx: _RunContext) -> Any:  # noqa: ANN401
+        """Post-process a cached completion instead of calling the model."""
+        ctx.replayed += 1
+        return await self._post_process(
+            _Completion(text=cached.text, usage=cached.usage, cache_key=cached.key),
+            ctx,
+        )
+
+    async def _post_process(
+        self,
+        completion: _Completion,
+        ctx: _RunContext,
+        *,
+        parse: tuple[Callable[..., Any], tuple[Any, ...]] | None = None,
+    ) -> Any:  # noqa: ANN401
+        """
+        Run the tool's ``post_process`` on *completion* and check the result
+        (see :func:`data_generator.processing.parse_record`), or the *parse*
+        step given as ``(step, args)``, in the record processor's worker
+        processes when the run has them.
+
+        JSON records must also match the tool's record model. A completion
+        that does not parse or validate is dropped from the cache, so that a
+        retry asks the model again instead of replaying the same reply.
+        """
+        step, args = parse or (parse_record, (ctx.output_format,))
+        try:
+            if ctx.processor is not None:
+                return await ctx.processor.submit(step, completion.text, *args)
+            return step(self.tool, completion.text, *args)
+        except OutputParseError:
+            if self.cache is not None and completion.cache_key is not None:
+                self.cache.discard(completion.cache_key)
+            raise
+
+    async def _split_batch(
+        self, completion: _Completion, unique_ids: Sequence[str], ctx: _RunContext
+    ) -> dict[str, Any]:
+        """
+        Split a batched completion into records; a reply without a single
+        usable record is treated like unparseable output. Records that do not
+        match the tool's record model are left out (and regenerated singly).
+        """
+        if ctx.processor is not None:
+            records, dropped = await ctx.processor.split(completion.text, unique_ids)
         else:
-            raise ValueError("Either unique_id or index must be provided.")
-        file_path = out_dir / filename
-
-        match output_format:
-            case "json":
-                with file_path.open("w", encoding="utf-8") as fp:
-                    json.dump(data, fp, indent=2)
-            case "yaml":
-                with file_path.open("w", encoding="utf-8") as fp:
-                    yaml.safe_dump(data, fp, sort_keys=False)
-            case "txt":
-                with file_path.open("w", encoding="utf-8") as fp:
-                    fp.write(str(data))
-            case _:
-                with file_path.open("w", encoding="utf-8") as fp:
-                    fp.write(str(data))
+            records, dropped = split_records(self.tool, completion.text, unique_ids)
+        for unique_id, reason in dropped.items():
+            self.logger.debug("Batch record %s dropped: %s", unique_id, reason)
+        if not records:
+            if self.cache is not None and completion.cache_key is not None:
+                self.cache.discard(completion.cache_key)
+            raise OutputParseError("Model output holds no record of the batch.")
+        return records
+
+    async def _call_deployment(  # noqa: PLR0913
+        self,
+        prompt_fn: KernelFunction,
+        target: DeploymentState,
+        *,
+        prompt: str,
+        index: int,
+        unique_id: str,
+        max_tokens: int,
+        queued: float,
+        ctx: _RunContext,
+    ) -> tuple[_Completion, float]:
+        """
+        Send one request to *target* and return the completion and latency.
+
+        Throttling takes the deployment out of rotation; it only counts as
+        congestion for the concurrency controller when no other deployment
+        is left to absorb the load. Every request, failed or not, is added
+        to ``ctx.telemetry`` with the time it waited since *queued*.
+        """
+        # The request timeout covers the model call only, never queue time
+        timeout = ctx.request_timeout()
+        usage: TokenUsage | None = None
+        outcome = "ok"
+        with time_request() as timing:
+            try:
+                completion = await asyncio.wait_for(
+                    self._invoke_function(
+                        prompt_fn,
+                        service_id=target.service_id,
+                        max_tokens=max_tokens,
+                        prompt=prompt,
+                        index=index,
+                        unique_id=unique_id,
+                    ),
+                    timeout=timeout,
+                )
+                usage = completion.usage
+            except asyncio.TimeoutError:
+                outcome = ErrorClass.TIMEOUT.value
+                ctx.pool.record_failure(target)
+                ctx.limiter.record_congestion("request timed out")
+                raise
+            except Exception as exc:
+                error_class = classify_error(exc)
+                outcome = error_class.value if error_class else "error"
+                if error_class is ErrorClass.THROTTLED:
+                    ctx.pool.record_throttled(target, retry_after_seconds(exc))
+                    if not ctx.pool.has_alternative():
+                        ctx.limiter.record_congestion("HTTP 429 throttling")
+                else:
+                    ctx.pool.record_failure(target)
+                raise
+            finally:
+                finished = time.perf_counter()
+                ctx.telemetry.record_request(
+                    deployment=target.deployment.deployment,
+                    queue_wait=timing.sent - queued,
+                    timing=timing,
+                    finished=finished,
+                    usage=usage,
+                    outcome=outcome,
+                )
+        return completion, finished - timing.sent
 
     # --------------------------------------------------------------------- #
     # Backwards-compat / simple sync loop (non-async)                       #
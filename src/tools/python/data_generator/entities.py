@@ -0,0 +1,387 @@
+"""
+Shared pools of fictional entities.
+
+Scenarios that mention customers, products or employees let the model invent
+them afresh for every record, so the same kind of boilerplate is generated
+(and paid for) over and over, and datasets of different scenarios never refer
+to the same people or items. An :class:`EntityPool` keeps one pool per kind
+in a directory, as JSON Lines:
+
+``customers.jsonl``
+    :class:`Customer` records (``CUST-00001`` ...).
+``products.jsonl``
+    :class:`Product` records, whose ids double as SKUs (``SKU-00001`` ...).
+``employees.jsonl``
+    :class:`Employee` records (``EMP-00001`` ...) and their managers.
+
+A pool file that does not exist yet is generated locally in one go, from a
+generator seeded by the kind, and written next to the others; later runs,
+of any scenario, read it back. The files can also be replaced by hand, e.g.
+with products exported from a ``retail-product`` run, as long as every line
+matches the kind's model.
+
+Tools that list the kinds in :attr:`DataGeneratorTool.entity_kinds` sample
+entities with :meth:`EntityPool.sample`, keyed by the record id, so the
+prompt and ``post_process`` (in whatever process it runs) agree on them
+without storing anything per record.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import random
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Final, Literal
+
+from pydantic import ValidationError
+
+from .schema import RecordModel
+
+__all__: list[str] = [
+    "ENTITY_KINDS",
+    "Customer",
+    "Employee",
+    "EntityPool",
+    "Product",
+]
+
+_logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------- #
+# Entity schema                                                          #
+# ---------------------------------------------------------------------- #
+class Customer(RecordModel):
+    """A customer shop and support scenarios refer to."""
+
+    customer_id: str
+    name: str
+    email: str
+    plan_tier: Literal["basic", "premium", "enterprise"]
+    customer_since: str
+
+
+class Product(RecordModel):
+    """A catalogue item; ``product_id`` is also its SKU."""
+
+    product_id: str
+    name: str
+    category: str
+    price: float
+    currency: str
+
+
+class Employee(RecordModel):
+    """A member of staff; ``manager_id`` is empty at the top of the tree."""
+
+    employee_id: str
+    name: str
+    email: str
+    department: str
+    title: str
+    manager_id: str | None = None
+    hired_on: str
+
+
+# ---------------------------------------------------------------------- #
+# Local generation                                                       #
+# ---------------------------------------------------------------------- #
+_FIRST_NAMES: Final[tuple[str, ...]] = (
+    "Ava", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Isla",
+    "Jonas", "Kemi", "Liam", "Maya", "Nico", "Olga", "Priya", "Quinn", "Rosa",
+    "Sam", "Tariq", "Uma", "Victor", "Wen", "Yara", "Zoe",
+)
+_SURNAME_STEMS: Final[tuple[str, ...]] = (
+    "Ash", "Birch", "Clay", "Dale", "Elm", "Fern", "Glen", "Hazel", "Iver",
+    "Lark", "Moss", "North", "Oak", "Pine", "Reed", "Stone", "Thorn", "West",
+)
+_SURNAME_ENDINGS: Final[tuple[str, ...]] = (
+    "by", "field", "ford", "ham", "ley", "more", "ton", "well", "wood",
+)
+
+# Category -> (median price, item nouns)
+_CATALOGUE: Final[dict[str, tuple[float, tuple[str, ...]]]] = {
+    "Electronics": (
+        80.0,
+        ("Headphones", "Speaker", "Charger", "Keyboard", "Webcam", "Smartwatch"),
+    ),
+    "Home & Kitchen": (
+        40.0,
+        ("Kettle", "Knife Set", "Cutting Board", "Blender", "Desk Lamp", "Blanket"),
+    ),
+    "Apparel": (
+        45.0,
+        ("T-Shirt", "Hoodie", "Rain Jacket", "Sneakers", "Scarf", "Jeans"),
+    ),
+    "Sports & Outdoors": (
+        35.0,
+        ("Yoga Mat", "Water Bottle", "Tent", "Backpack", "Dumbbells"),
+    ),
+    "Beauty": (
+        20.0,
+        ("Face Cream", "Shampoo", "Lip Balm", "Serum", "Body Lotion"),
+    ),
+    "Toys & Games": (
+        25.0,
+        ("Puzzle", "Board Game", "Building Set", "Plush Bear"),
+    ),
+}
+_ADJECTIVES: Final[tuple[str, ...]] = (
+    "Compact", "Classic", "Premium", "Everyday", "Ultra", "Eco", "Pro",
+    "Lightweight", "Deluxe", "Smart",
+)
+
+# Department -> share of the staff
+_DEPARTMENTS: Final[dict[str, int]] = {
+    "Engineering": 5, "Sales": 4, "Support": 3, "Operations": 3, "Marketing": 2,
+    "Finance": 2, "HR": 1, "Legal": 1,
+}
+# Title by level and the share of staff below the director at each level; a
+# level-n employee reports to someone of level n + 1
+_TITLES: Final[tuple[str, ...]] = ("Associate", "Specialist", "Manager", "Director")
+_LEVEL_WEIGHTS: Final[tuple[int, ...]] = (4, 3, 1)
+
+
+def _name(rng: random.Random) -> str:
+    """A fictional full name."""
+    surname = rng.choice(_SURNAME_STEMS) + rng.choice(_SURNAME_ENDINGS)
+    return f"{rng.choice(_FIRST_NAMES)} {surname}"
+
+
+def _email(name: str, number: int) -> str:
+    """An address on the reserved example.com domain."""
+    return f"{name.lower().replace(' ', '.')}.{number:05d}@example.com"
+
+
+def _customers(rng: random.Random, size: int) -> list[dict[str, Any]]:
+    """*size* customers, mostly on the basic plan, joined over five years."""
+    today = date.today()
+    customers = []
+    for number in range(1, size + 1):
+        name = _name(rng)
+        since = today - timedelta(days=rng.randint(30, 5 * 365))
+        customers.append(
+            {
+                "customer_id": f"CUST-{number:05d}",
+                "name": name,
+                "email": _email(name, number),
+                "plan_tier": rng.choices(
+                    ("basic", "premium", "enterprise"), weights=(6, 3, 1)
+                )[0],
+                "customer_since": since.isoformat(),
+            }
+        )
+    return customers
+
+
+def _products(rng: random.Random, size: int) -> list[dict[str, Any]]:
+    """*size* products with log-normal prices around their category's median."""
+    products = []
+    for number in range(1, size + 1):
+        category = rng.choice(tuple(_CATALOGUE))
+        median, nouns = _CATALOGUE[category]
+        cents = max(round(rng.lognormvariate(math.log(median * 100), 0.5)), 99)
+        products.append(
+            {
+                "product_id": f"SKU-{number:05d}",
+                "name": f"{rng.choice(_ADJECTIVES)} {rng.choice(nouns)}",
+                "category": category,
+                "price": cents / 100,
+                "currency": "USD",
+            }
+        )
+    return products
+
+
+def _employees(rng: random.Random, size: int) -> list[dict[str, Any]]:
+    """
+    *size* employees in a reporting tree per department: the first employee
+    of a department is its director, and everybody else reports to a random
+    colleague one level up (moving up a level while there is none).
+    """
+    today = date.today()
+    director = len(_TITLES) - 1
+    levels: dict[tuple[str, int], list[str]] = {}
+    employees = []
+    for number in range(1, size + 1):
+        department = rng.choices(
+            tuple(_DEPARTMENTS), weights=tuple(_DEPARTMENTS.values())
+        )[0]
+        if (department, director) in levels:
+            level = rng.choices(range(director), weights=_LEVEL_WEIGHTS)[0]
+            while (department, level + 1) not in levels:
+                level += 1
+        else:
+            level = director
+        managers = levels.get((department, level + 1), [])
+        name = _name(rng)
+        employee_id = f"EMP-{number:05d}"
+        levels.setdefault((department, level), []).append(employee_id)
+        employees.append(
+            {
+                "employee_id": employee_id,
+                "name": name,
+                "email": _email(name, number),
+                "department": department,
+                "title": f"{department} {_TITLES[level]}",
+                "manager_id": rng.choice(managers) if managers else None,
+                "hired_on": (today - timedelta(days=rng.randint(30, 15 * 365)))
+                .isoformat(),
+            }
+        )
+    return employees
+
+
+_KINDS: Final[
+    dict[str, tuple[type[RecordModel], Callable[[random.Random, int], list[Any]], int]]
+] = {
+    "customers": (Customer, _customers, 1000),
+    "products": (Product, _products, 500),
+    "employees": (Employee, _employees, 200),
+}
+ENTITY_KINDS: Final[tuple[str, ...]] = tuple(_KINDS)
+
+
+# ---------------------------------------------------------------------- #
+# Pool                                                                   #
+# ---------------------------------------------------------------------- #
+class EntityPool:
+    """
+    Directory of entity pools, loaded on demand and indexed by id.
+
+    Parameters
+    ----------
+    directory:
+        Where the ``<kind>.jsonl`` files live; created when a pool is
+        generated.
+    size:
+        Number of entities per newly generated pool; defaults to 1000
+        customers, 500 products and 200 employees. Existing files are used as
+        they are.
+    """
+
+    def __init__(self, directory: Path, *, size: int | None = None) -> None:
+        if size is not None and size < 1:
+            raise ValueError(f"Entity pool size must be positive, got {size}.")
+        self.directory = Path(directory)
+        self.size = size
+        self._entities: dict[str, list[dict[str, Any]]] = {}
+        self._index: dict[str, dict[str, dict[str, Any]]] = {}
+
+    def load(self, *kinds: str) -> None:
+        """
+        Read the pools of *kinds*, generating and writing those that do not
+        exist yet. Raises *ValueError* for unknown kinds and for files whose
+        lines do not match the kind's model or repeat an id.
+        """
+        for kind in kinds:
+            if kind in self._entities:
+                continue
+            model, _generate, _size = self._kind(kind)
+            path = self.directory / f"{kind}.jsonl"
+            if path.exists():
+                entities = self._read(path, model)
+                _logger.info("Entity pool: %s %s from %s.", len(entities), kind, path)
+            else:
+                entities = self._generate(kind, path)
+            id_field = next(iter(model.model_fields))
+            index = {str(entity[id_field]): entity for entity in entities}
+            if len(index) != len(entities):
+                raise ValueError(f"{path}: {id_field} values are not unique.")
+            self._entities[kind] = entities
+            self._index[kind] = index
+
+    # ------------------------------------------------------------------ #
+    # Access                                                             #
+    # ------------------------------------------------------------------ #
+    def get(self, kind: str, entity_id: str) -> dict[str, Any] | None:
+        """The entity of *kind* with *entity_id*, or ``None``."""
+        entity = self._pool(kind)[1].get(entity_id)
+        return dict(entity) if entity is not None else None
+
+    def entities(self, kind: str, **match: str) -> list[dict[str, Any]]:
+        """
+        All entities of *kind* in pool order, or those whose fields equal the
+        *match* values (ignoring case).
+        """
+        wanted = {field: value.casefold() for field, value in match.items()}
+        return [
+            dict(entity)
+            for entity in self._pool(kind)[0]
+            if all(
+                str(entity.get(field, "")).casefold() == value
+                for field, value in wanted.items()
+            )
+        ]
+
+    def sample(
+        self, kind: str, key: str, k: int = 1, **match: str
+    ) -> list[dict[str, Any]]:
+        """
+        *k* distinct entities of *kind* (fewer if the pool is smaller), chosen
+        by a generator seeded with *key*: the same key always draws the same
+        entities. *match* narrows the choice as in :meth:`entities`; raises
+        *ValueError* if nothing is left to choose from.
+        """
+        candidates = self.entities(kind, **match)
+        if not candidates:
+            raise ValueError(f"No {kind} in the entity pool match {match}.")
+        rng = random.Random(f"{kind}:{key}")
+        return rng.sample(candidates, min(k, len(candidates)))
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _kind(
+        kind: str,
+    ) -> tuple[type[RecordModel], Callable[[random.Random, int], list[Any]], int]:
+        """Model, generator and default size of *kind*."""
+        try:
+            return _KINDS[kind]
+        except KeyError:
+            raise ValueError(
+                f"Unknown entity kind '{kind}'; expected one of "
+                f"{', '.join(ENTITY_KINDS)}."
+            ) from None
+
+    def _pool(
+        self, kind: str
+    ) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+        """Entities and id index of *kind*, loading it on first use."""
+        self.load(kind)
+        return self._entities[kind], self._index[kind]
+
+    @staticmethod
+    def _read(path: Path, model: type[RecordModel]) -> list[dict[str, Any]]:
+        """Entities of a pool file, validated against *model*."""
+        entities = []
+        with path.open(encoding="utf-8") as handle:
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entity = model.model_validate_json(line)
+                except ValidationError as exc:
+                    raise ValueError(f"{path}:{number}: {exc}") from None
+                entities.append(entity.model_dump())
+        return entities
+
+    def _generate(self, kind: str, path: Path) -> list[dict[str, Any]]:
+        """Generate the pool of *kind* and write it to *path* atomically."""
+        _model, generate, default_size = self._kind(kind)
+        entities = generate(random.Random(kind), self.size or default_size)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with partial.open("w", encoding="utf-8") as handle:
+            for entity in entities:
+                handle.write(json.dumps(entity, ensure_ascii=False) + "\n")
+        # Runs sharing the directory may race here; the last complete pool wins
+        os.replace(partial, path)
+        _logger.info("Entity pool: generated %s %s in %s.", len(entities), kind, path)
+        return entities
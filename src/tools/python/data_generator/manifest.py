@@ -0,0 +1,193 @@
+"""
+Checkpoint manifest for resumable generation runs.
+
+This module provides :class:`RunManifest`, an append-only JSON Lines file kept
+in the output directory. Every run appends a ``run`` header; every record
+appends one line with its id, status, output path and token usage. Because a
+line is flushed as soon as the record is settled, a crashed or interrupted
+run can be resumed with ``--resume``: only the records still missing from the
+manifest are generated. A record whose output file is not in place yet (a
+shard still being written, see :mod:`data_generator.sinks`) is appended once
+the file appears, so the manifest never lists a record that a crash lost.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Final
+
+from data_generator.usage import TokenUsage
+
+__all__: list[str] = ["MANIFEST_NAME", "ManifestEntry", "ManifestState", "RunManifest"]
+
+_logger = logging.getLogger(__name__)
+
+MANIFEST_NAME: Final[str] = "manifest.jsonl"
+
+
+def _now() -> str:
+    """Current UTC time as an ISO-8601 string."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+@dataclass
+class ManifestEntry:
+    """Outcome of a single record as written to the manifest."""
+
+    index: int
+    id: str
+    status: str                              # "ok" or "failed"
+    output: str | None = None                # path relative to the out dir
+    usage: dict[str, int] | None = None
+    error: str | None = None
+    at: str = field(default_factory=_now)
+
+
+@dataclass
+class ManifestState:
+    """What earlier runs left behind, as read back from the manifest."""
+
+    completed: dict[str, ManifestEntry] = field(default_factory=dict)
+    failed: int = 0
+    last_index: int = 0
+    runs: list[dict[str, Any]] = field(default_factory=list)
+
+
+class RunManifest:
+    """
+    Append-only record of the records produced in an output directory.
+
+    Parameters
+    ----------
+    out_dir:
+        Output directory of the run; the manifest lives at
+        ``out_dir / MANIFEST_NAME``.
+    """
+
+    def __init__(self, out_dir: Path) -> None:
+        self.out_dir = out_dir
+        self.path = out_dir / MANIFEST_NAME
+        self._fp: IO[str] | None = None
+        # Successes waiting for their output file, by path
+        self._unpublished: dict[Path, list[dict[str, Any]]] = {}
+
+    # ------------------------------------------------------------------ #
+    # Reading                                                            #
+    # ------------------------------------------------------------------ #
+    def load(self) -> ManifestState:
+        """
+        Read the manifest back.
+
+        A record counts as completed only if its output file still exists (it
+        was only appended once the file was in place). A truncated final line
+        (left by a hard crash) is ignored.
+        """
+        state = ManifestState()
+        if not self.path.exists():
+            return state
+        with self.path.open(encoding="utf-8") as fp:
+            for line_no, line in enumerate(fp, start=1):
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    _logger.warning(
+                        "Ignoring malformed line %s in %s.", line_no, self.path
+                    )
+                    continue
+                if data.get("event") == "run":
+                    state.runs.append(data)
+                    continue
+                entry = ManifestEntry(**data)
+                state.last_index = max(state.last_index, entry.index)
+                if entry.status != "ok":
+                    state.failed += 1
+                elif entry.output and (self.out_dir / entry.output).exists():
+                    state.completed[entry.id] = entry
+        return state
+
+    # ------------------------------------------------------------------ #
+    # Writing                                                            #
+    # ------------------------------------------------------------------ #
+    def open(self, *, scenario: str, output_format: str, count: int) -> None:
+        """Open the manifest for appending and write this run's header."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._fp = self.path.open("a", encoding="utf-8")
+        self._write(
+            {
+                "event": "run",
+                "scenario": scenario,
+                "output_format": output_format,
+                "count": count,
+                "at": _now(),
+            }
+        )
+
+    def record_success(
+        self,
+        *,
+        index: int,
+        unique_id: str,
+        output: Path,
+        usage: TokenUsage | None,
+    ) -> None:
+        """
+        Append a completed record, or hold it back until *output* exists
+        (records of other files that appeared meanwhile are appended too).
+        """
+        self._unpublished.setdefault(output, []).append(
+            asdict(
+                ManifestEntry(
+                    index=index,
+                    id=unique_id,
+                    status="ok",
+                    output=output.relative_to(self.out_dir).as_posix(),
+                    usage=asdict(usage) if usage is not None else None,
+                )
+            )
+        )
+        self._publish()
+
+    def record_failure(self, *, index: int, unique_id: str, error: str) -> None:
+        """Append a record that failed for good (retries exhausted)."""
+        self._write(
+            asdict(
+                ManifestEntry(index=index, id=unique_id, status="failed", error=error)
+            )
+        )
+
+    def close(self) -> None:
+        """
+        Append the held-back records whose output now exists and close the
+        manifest file; call it after the sinks are closed.
+        """
+        if self._fp is None:
+            return
+        self._publish()
+        lost = sum(len(entries) for entries in self._unpublished.values())
+        if lost:
+            _logger.warning(
+                "%s records never reached their output file and are left out "
+                "of %s.",
+                lost,
+                self.path,
+            )
+        self._unpublished.clear()
+        self._fp.close()
+        self._fp = None
+
+    def _publish(self) -> None:
+        """Append the held-back records whose output file exists by now."""
+        for output in [path for path in self._unpublished if path.exists()]:
+            for data in self._unpublished.pop(output):
+                self._write(data)
+
+    def _write(self, data: dict[str, Any]) -> None:
+        """Append one JSON line and flush it so it survives a crash."""
+        if self._fp is None:
+            raise RuntimeError("Manifest is not open.")
+        self._fp.write(json.dumps(data) + "\n")
+        self._fp.flush()
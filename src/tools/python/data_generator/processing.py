@@ -0,0 +1,414 @@
+"""
+Post-processing of model output, inline or in worker processes.
+
+Turning a reply into a stored record is CPU-bound Python: the tool's
+``post_process`` (``json.loads`` / ``yaml.safe_load``), validation against
+its record model, local rendering of extra formats and the serialisation a
+sink writes (``json.dumps(indent=2)`` / ``yaml.safe_dump``). Large YAML
+records take milliseconds each, all of it holding the GIL, so at high
+request concurrency the event loop ends up waiting for YAML, not the network.
+
+The steps are the module functions :func:`parse_record`, :func:`split_records`
+and :func:`encode_record` (plus :func:`parse_outline`, :func:`parse_section`
+and :func:`assemble_record` for hierarchical generation), which the engine
+calls inline by default.
+:class:`RecordProcessor` runs them in a ``ProcessPoolExecutor`` instead: the
+tool is sent to each worker process once, and the jobs that queue up while
+every worker is busy travel together, so the IPC cost is paid per batch
+rather than per record.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import pickle
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Final, cast
+
+from data_generator.retry import OutputParseError
+from data_generator.sinks import EncodedRecord, OutputSink
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from data_generator.tool import DataGeneratorTool
+
+__all__: list[str] = [
+    "RecordProcessor",
+    "assemble_record",
+    "encode_record",
+    "parse_outline",
+    "parse_record",
+    "parse_section",
+    "split_records",
+]
+
+# Largest number of jobs sent to a worker process in one task.
+_MAX_BATCH: Final[int] = 64
+
+# Tool of the current worker process, set once by _init_worker.
+_worker_tool: DataGeneratorTool | None = None
+
+
+# ------------------------------------------------------------------------- #
+# Processing steps                                                          #
+# ------------------------------------------------------------------------- #
+def parse_record(tool: DataGeneratorTool, text: str, output_format: str) -> Any:  # noqa: ANN401
+    """
+    Run the tool's ``post_process`` on a reply and check the result.
+
+    Raises
+    ------
+    OutputParseError
+        If a ``json`` / ``yaml`` reply does not parse, or a JSON record does
+        not match :attr:`DataGeneratorTool.record_model`.
+    """
+    processed = tool.post_process(text, output_format)
+    _check_parsed(tool, processed, output_format)
+    if output_format.lower() == "json":
+        _check_schema(tool, processed)
+    return processed
+
+
+def split_records(
+    tool: DataGeneratorTool, text: str, unique_ids: Sequence[str]
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """
+    Split a batched reply with :py:meth:`DataGeneratorTool.split_batch`.
+
+    Returns the ``{unique_id: record}`` mapping of the records that match the
+    record model and, separately, why each of the others was dropped.
+    """
+    records = tool.split_batch(text, unique_ids)
+    dropped: dict[str, str] = {}
+    for unique_id, record in list(records.items()):
+        try:
+            _check_schema(tool, record)
+        except OutputParseError as exc:
+            dropped[unique_id] = str(exc)
+            del records[unique_id]
+    return records, dropped
+
+
+def encode_record(
+    tool: DataGeneratorTool,
+    record: Any,  # noqa: ANN401
+    output_format: str,
+    targets: Sequence[tuple[type[OutputSink], str]],
+) -> list[EncodedRecord]:
+    """
+    Serialise *record* (post-processed as *output_format*) for each
+    ``(sink class, format)`` target, rendering the other formats with
+    :py:meth:`DataGeneratorTool.render` first.
+    """
+    return [
+        EncodedRecord(
+            sink_cls.encode(
+                record if fmt == output_format else tool.render(record, fmt), fmt
+            )
+        )
+        for sink_cls, fmt in targets
+    ]
+
+
+def parse_outline(tool: DataGeneratorTool, text: str) -> dict[str, Any]:
+    """
+    Parse the reply to :py:meth:`DataGeneratorTool.build_outline_prompt`.
+
+    Raises
+    ------
+    OutputParseError
+        If the reply is not a JSON object matching the tool's outline model,
+        or lists no heading for a section.
+    """
+    outline = _load_object(text)
+    model = tool.outline_model()
+    if model is not None:
+        _validate(model, outline, "outline")
+    for name in tool.section_fields:
+        headings = outline.get(name)
+        if not isinstance(headings, list) or not headings:
+            raise OutputParseError(f'Model output lists no "{name}" headings.')
+    return outline
+
+
+def parse_section(tool: DataGeneratorTool, text: str, name: str) -> Any:  # noqa: ANN401
+    """
+    Parse the reply to :py:meth:`DataGeneratorTool.build_section_prompt`:
+    one item of the section list *name*. A reply that wraps the item in a list or
+    under the field name is unwrapped.
+
+    Raises
+    ------
+    OutputParseError
+        If the reply is not JSON or the item does not match the item model.
+    """
+    try:
+        item = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise OutputParseError("Model output is not valid json.") from exc
+    if isinstance(item, dict) and list(item) == [name]:
+        item = item[name]
+    if isinstance(item, list) and len(item) == 1:
+        item = item[0]
+    model = tool.section_model(name)
+    if model is not None:
+        _validate(model, item, "section schema")
+    return item
+
+
+def assemble_record(
+    tool: DataGeneratorTool,
+    outline: dict[str, Any],
+    sections: dict[str, list[Any]],
+) -> dict[str, Any]:
+    """
+    Put a record together with :py:meth:`DataGeneratorTool.assemble_sections`
+    and check it against the record model.
+    """
+    record = tool.assemble_sections(outline, sections)
+    _check_schema(tool, record)
+    return record
+
+
+def _load_object(text: str) -> dict[str, Any]:
+    """Parse *text* as a JSON object or raise :class:`OutputParseError`."""
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise OutputParseError("Model output is not valid json.") from exc
+    if not isinstance(value, dict):
+        raise OutputParseError("Model output is not a JSON object.")
+    return value
+
+
+def _validate(model: type[BaseModel], value: Any, what: str) -> None:  # noqa: ANN401
+    """Raise :class:`OutputParseError` if *value* does not match *model*."""
+    try:
+        model.model_validate(value)
+    except ValueError as exc:
+        raise OutputParseError(
+            f"Model output does not match the {what}: {_summary(exc)}"
+        ) from exc
+
+
+def _check_parsed(tool: DataGeneratorTool, processed: Any, output_format: str) -> None:  # noqa: ANN401
+    """
+    Raise :class:`OutputParseError` if *processed* is unparseable text.
+
+    ``post_process`` falls back to the raw string when parsing fails, and
+    some tools return the validated string on purpose, so a string result
+    for a structured format is parsed once more to tell the two apart.
+    """
+    parsers = tool._FORMAT_PARSERS  # noqa: SLF001
+    parser = parsers.get(output_format.lower())
+    if parser is None or not isinstance(processed, str):
+        return
+    try:
+        parser(processed)
+    except Exception as exc:
+        raise OutputParseError(f"Model output is not valid {output_format}.") from exc
+
+
+def _check_schema(tool: DataGeneratorTool, record: Any) -> None:  # noqa: ANN401
+    """
+    Raise :class:`OutputParseError` if the JSON *record* does not match
+    :attr:`DataGeneratorTool.record_model` (tools without one accept any
+    record).
+    """
+    if isinstance(record, str):
+        record = json.loads(record)     # _check_parsed made sure it parses
+    try:
+        tool.validate_record(record)
+    except ValueError as exc:
+        raise OutputParseError(
+            f"Model output does not match the record schema: {_summary(exc)}"
+        ) from exc
+
+
+def _summary(exc: ValueError) -> str:
+    """First lines of a validation error, on one line."""
+    return " ".join(line.strip() for line in str(exc).splitlines()[:3])
+
+
+# ------------------------------------------------------------------------- #
+# Worker process side                                                       #
+# ------------------------------------------------------------------------- #
+def _init_worker(tool: DataGeneratorTool) -> None:
+    """Pool initializer: keep the tool for every job of this process."""
+    global _worker_tool  # noqa: PLW0603
+    _worker_tool = tool
+
+
+def _run_batch(
+    jobs: list[tuple[Callable[..., Any], tuple[Any, ...]]],
+) -> list[tuple[bool, Any]]:
+    """
+    Run ``step(tool, *args)`` for every job; per job, ``(True, result)`` or
+    ``(False, exception)`` so that one bad record does not fail the batch.
+    """
+    results: list[tuple[bool, Any]] = []
+    for step, args in jobs:
+        try:
+            results.append((True, step(_worker_tool, *args)))
+        except Exception as exc:  # noqa: BLE001 (reported to the caller)
+            results.append((False, _picklable(exc)))
+    return results
+
+
+def _picklable(exc: Exception) -> Exception:
+    """*exc*, or a RuntimeError describing it if it cannot be sent back."""
+    try:
+        pickle.dumps(exc)
+    except Exception:  # noqa: BLE001
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+    return exc
+
+
+# ------------------------------------------------------------------------- #
+# Event loop side                                                           #
+# ------------------------------------------------------------------------- #
+@dataclass
+class _Job:
+    """A processing step waiting to be sent to a worker process."""
+
+    step: Callable[..., Any]
+    args: tuple[Any, ...]
+    done: asyncio.Future[Any] = field(repr=False)
+
+
+class RecordProcessor:
+    """
+    Process pool that parses, validates and serialises records.
+
+    A dispatcher task takes the queued jobs, up to *max_batch* at a time,
+    once a worker process is free, so batches grow exactly when the pool is
+    the bottleneck and a lone record is not held back waiting for company.
+    The pool is sized independently of request concurrency: one process per
+    spare core is plenty for hundreds of requests in flight.
+
+    Parameters
+    ----------
+    tool:
+        Tool whose ``post_process``, record model and rendering are used;
+        pickled once per worker process.
+    workers:
+        Number of worker processes.
+    max_batch:
+        Largest number of jobs sent to a worker in one task.
+    """
+
+    def __init__(
+        self, tool: DataGeneratorTool, *, workers: int, max_batch: int = _MAX_BATCH
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1.")
+        self.tool = tool
+        self.workers = workers
+        self.max_batch = max_batch
+        self.jobs = 0
+        self.batches = 0
+        self._queue: asyncio.Queue[_Job | None] = asyncio.Queue()
+        self._free = asyncio.Semaphore(workers)
+        self._executor: ProcessPoolExecutor | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the worker processes and the dispatcher task."""
+        self._executor = ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.tool,)
+        )
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Finish the queued jobs, then shut the worker processes down."""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown)
+            self._executor = None
+
+    async def parse(self, text: str, output_format: str) -> Any:  # noqa: ANN401
+        """:func:`parse_record` in a worker process."""
+        return await self.submit(parse_record, text, output_format)
+
+    async def split(
+        self, text: str, unique_ids: Sequence[str]
+    ) -> tuple[dict[str, Any], dict[str, str]]:
+        """:func:`split_records` in a worker process."""
+        result = await self.submit(split_records, text, list(unique_ids))
+        return cast("tuple[dict[str, Any], dict[str, str]]", result)
+
+    async def encode(
+        self,
+        record: Any,  # noqa: ANN401
+        output_format: str,
+        targets: Sequence[tuple[type[OutputSink], str]],
+    ) -> list[EncodedRecord]:
+        """:func:`encode_record` in a worker process."""
+        encoded = await self.submit(
+            encode_record, record, output_format, list(targets)
+        )
+        return cast("list[EncodedRecord]", encoded)
+
+    async def submit(self, step: Callable[..., Any], *args: Any) -> Any:  # noqa: ANN401
+        """
+        Queue ``step(tool, *args)`` and wait for its result; *step* must be
+        a module-level function (it is pickled by reference).
+        """
+        if self._task is None or self._task.done():
+            raise RuntimeError("RecordProcessor is not running.")
+        job = _Job(step, args, asyncio.get_running_loop().create_future())
+        await self._queue.put(job)
+        return await job.done
+
+    async def _run(self) -> None:
+        """Dispatcher loop: batch queued jobs until the close sentinel."""
+        in_flight: set[asyncio.Task[None]] = set()
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            # Jobs keep queuing while every worker is busy
+            await self._free.acquire()
+            batch: list[_Job] = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.max_batch or self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+            closing = item is None
+            if not batch:
+                self._free.release()
+                continue
+            task = asyncio.create_task(self._dispatch(batch))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        await asyncio.gather(*in_flight)
+
+    async def _dispatch(self, batch: list[_Job]) -> None:
+        """Run *batch* in a worker process and resolve each job's future."""
+        self.jobs += len(batch)
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor, _run_batch, [(job.step, job.args) for job in batch]
+            )
+        except Exception as exc:  # noqa: BLE001 (broken pool, unpicklable job)
+            results = [(False, exc)] * len(batch)
+        finally:
+            self._free.release()
+        for job, (ok, value) in zip(batch, results, strict=True):
+            if job.done.done():
+                continue
+            if ok:
+                job.done.set_result(value)
+            else:
+                job.done.set_exception(value)
@@ -0,0 +1,138 @@
+"""
+Client-side rate limiting for Azure OpenAI deployments.
+
+This module provides :class:`TokenBucket` and :class:`RateLimiter`, which keep
+a generator process inside its share of a deployment's requests-per-minute
+(RPM) and tokens-per-minute (TPM) quota instead of discovering the limit
+through HTTP 429 responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Final
+
+__all__: list[str] = ["RateLimiter", "TokenBucket", "estimate_tokens"]
+
+# Azure OpenAI enforces quota over short windows (roughly 10 seconds), so a
+# bucket never holds more than this fraction of the per-minute allowance.
+_BURST_FRACTION: Final[float] = 1 / 6
+# Rough characters-per-token ratio for English prose and JSON/YAML skeletons.
+_CHARS_PER_TOKEN: Final[int] = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap prompt-token estimate (about four characters per token)."""
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket.
+
+    Parameters
+    ----------
+    per_minute:
+        Sustained allowance per minute.
+    burst_fraction:
+        Bucket capacity as a fraction of *per_minute*.
+    """
+
+    def __init__(self, per_minute: float, *, burst_fraction: float = _BURST_FRACTION):
+        if per_minute <= 0:
+            raise ValueError("Rate-limit quotas must be positive.")
+        self.per_minute = per_minute
+        self.capacity = max(1.0, per_minute * burst_fraction)
+        self._rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def available(self) -> float:
+        """Tokens currently in the bucket (negative while in debt)."""
+        self._refill()
+        return self._tokens
+
+    def delay_for(self, amount: float) -> float:
+        """
+        Seconds to wait until *amount* can be taken.
+
+        Requests larger than the bucket only wait for a full bucket; the excess
+        is recorded as debt that delays the following callers.
+        """
+        self._refill()
+        needed = min(amount, self.capacity) - self._tokens
+        return max(0.0, needed / self._rate)
+
+    def consume(self, amount: float) -> None:
+        """Take *amount* from the bucket; the balance may go negative."""
+        self._refill()
+        self._tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        """Return *amount* (negative to charge more) without exceeding capacity."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    Combined RPM / TPM limiter shared by every worker of a run.
+
+    Each call reserves one request and an estimated token count (prompt
+    estimate plus the requested ``max_completion_tokens``) before it is sent.
+    Once the response arrives, :py:meth:`reconcile` corrects the TPM bucket
+    with the tokens actually reported in the ``usage`` block. Callers are
+    admitted in FIFO order.
+
+    Parameters
+    ----------
+    requests_per_minute / tokens_per_minute:
+        This process's share of the deployment quota. Either may be None to
+        leave that dimension unlimited.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+    ) -> None:
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and *tokens* tokens fit, then reserve them."""
+        async with self._lock:
+            while True:
+                delay = max(
+                    self.requests.delay_for(1) if self.requests else 0.0,
+                    self.tokens.delay_for(tokens) if self.tokens else 0.0,
+                )
+                if delay <= 0:
+                    break
+                self.waited_seconds += delay
+                await asyncio.sleep(delay)
+            if self.requests:
+                self.requests.consume(1)
+            if self.tokens:
+                self.tokens.consume(tokens)
+
+    def reconcile(self, reserved: int, actual: int) -> None:
+        """Correct the TPM bucket once the real token usage is known."""
+        if self.tokens:
+            self.tokens.refund(reserved - actual)
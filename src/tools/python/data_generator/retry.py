@@ -0,0 +1,163 @@
+"""
+Error classification and retry policy for the generation engine.
+
+This module decides which failures of a single record are worth retrying,
+how many times, and how long to wait in between: jittered exponential
+backoff that defers to the service's ``Retry-After`` / ``retry-after-ms``
+headers whenever they are present.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from time import time
+
+import openai
+from semantic_kernel.exceptions import ServiceContentFilterException
+
+__all__: list[str] = [
+    "ContentFilteredError",
+    "ErrorClass",
+    "OutputParseError",
+    "RetryPolicy",
+    "classify_error",
+    "retry_after_seconds",
+]
+
+
+class OutputParseError(ValueError):
+    """The model reply could not be parsed into the requested format."""
+
+
+class ContentFilteredError(RuntimeError):
+    """The model reply was cut short by the Azure content filter."""
+
+
+class ErrorClass(str, Enum):
+    """Retryable failure categories, each with its own retry budget."""
+
+    THROTTLED = "throttled"
+    SERVER_ERROR = "server_error"
+    TIMEOUT = "timeout"
+    PARSE_ERROR = "parse_error"
+    CONTENT_FILTER = "content_filter"
+
+
+_DEFAULT_BUDGETS: dict[ErrorClass, int] = {
+    ErrorClass.THROTTLED: 6,
+    ErrorClass.SERVER_ERROR: 3,
+    ErrorClass.TIMEOUT: 2,
+    ErrorClass.PARSE_ERROR: 2,
+    ErrorClass.CONTENT_FILTER: 1,
+}
+
+
+def _cause_chain(exc: BaseException) -> list[BaseException]:
+    """
+    Return *exc* followed by its ``__cause__`` chain.
+
+    Semantic Kernel wraps SDK errors (``KernelInvokeException`` ->
+    ``ServiceResponseException`` -> ``openai.RateLimitError``), so the
+    original status code is only visible further down the chain.
+    """
+    chain: list[BaseException] = []
+    current: BaseException | None = exc
+    while current is not None and current not in chain:
+        chain.append(current)
+        current = current.__cause__
+    return chain
+
+
+def classify_error(exc: BaseException) -> ErrorClass | None:
+    """Map *exc* to an :class:`ErrorClass`, or None if it is not retryable."""
+    for err in _cause_chain(exc):
+        if isinstance(err, OutputParseError):
+            return ErrorClass.PARSE_ERROR
+        if isinstance(err, ContentFilteredError | ServiceContentFilterException):
+            return ErrorClass.CONTENT_FILTER
+        if isinstance(err, asyncio.TimeoutError | openai.APITimeoutError):
+            return ErrorClass.TIMEOUT
+        status = getattr(err, "status_code", None)
+        if isinstance(err, openai.RateLimitError) or status == 429:
+            return ErrorClass.THROTTLED
+        if isinstance(status, int) and status >= 500:
+            return ErrorClass.SERVER_ERROR
+        if isinstance(err, openai.APIConnectionError):
+            return ErrorClass.SERVER_ERROR
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """
+    Return the delay requested by the service, if any.
+
+    ``retry-after-ms`` (Azure OpenAI) takes precedence over the standard
+    ``Retry-After`` header, which may hold either seconds or an HTTP date.
+    """
+    for err in _cause_chain(exc):
+        headers: Mapping[str, str] | None = getattr(
+            getattr(err, "response", None), "headers", None
+        )
+        if not headers:
+            continue
+        if (value := headers.get("retry-after-ms")) is not None:
+            try:
+                return max(0.0, float(value) / 1000)
+            except ValueError:
+                pass
+        if (value := headers.get("retry-after")) is not None:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+                except (TypeError, ValueError):
+                    pass
+    return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Per-class retry budgets and backoff settings.
+
+    Parameters
+    ----------
+    budgets:
+        Maximum retries per :class:`ErrorClass` for one record. Classes not
+        listed fall back to the defaults; a budget of 0 disables retries.
+    base_delay / max_delay:
+        Bounds of the "full jitter" exponential backoff, in seconds: attempt
+        *n* sleeps for ``uniform(0, min(max_delay, base_delay * 2**n))``.
+    """
+
+    budgets: dict[ErrorClass, int] = field(
+        default_factory=lambda: dict(_DEFAULT_BUDGETS)
+    )
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def budget(self, error_class: ErrorClass) -> int:
+        """Return the retry budget for *error_class*."""
+        return self.budgets.get(error_class, _DEFAULT_BUDGETS[error_class])
+
+    def delay(self, attempt: int, exc: BaseException) -> float:
+        """
+        Seconds to wait before retry number *attempt* (0-based).
+
+        A ``Retry-After`` hint from the service wins over the computed backoff.
+        """
+        hinted = retry_after_seconds(exc)
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    @classmethod
+    def disabled(cls) -> RetryPolicy:
+        """Return a policy that never retries."""
+        return cls(budgets=dict.fromkeys(ErrorClass, 0))
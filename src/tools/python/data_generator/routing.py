@@ -0,0 +1,155 @@
+"""
+Model routing per scenario, complexity tier and output format.
+
+This module provides :class:`Route`, one row of a routing table that sends
+the records of matching runs to a subset of the configured deployments with
+their own reasoning effort, concurrency and rate limits, :func:`load_routes`
+to read a table from a YAML or JSON file, and :func:`select_route`, which
+picks the first row matching a run. Simple records can so go to a small,
+fast model while complex documents keep the large reasoning model.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Final
+
+import yaml
+
+__all__: list[str] = ["REASONING_EFFORTS", "Route", "load_routes", "select_route"]
+
+# Values of the ``reasoning_effort`` request parameter of reasoning models.
+REASONING_EFFORTS: Final[tuple[str, ...]] = ("low", "medium", "high")
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    One row of a routing table.
+
+    Parameters
+    ----------
+    deployments:
+        Labels (see :py:attr:`data_generator.deployments.Deployment.label`)
+        or deployment names of the deployments serving matching runs.
+    scenarios / complexities / output_formats:
+        Scenario names, complexity tiers (the tool's ``complexity``) and
+        output formats the route applies to; empty matches any value.
+    reasoning_effort:
+        One of :data:`REASONING_EFFORTS`, or None for the model default.
+    concurrency:
+        Most requests in flight for a run on this route.
+    requests_per_minute / tokens_per_minute:
+        Client-side quota of a run on this route, on top of the run's own.
+    name:
+        Label used in logs and reports (defaults to the deployments).
+    """
+
+    deployments: tuple[str, ...]
+    scenarios: tuple[str, ...] = ()
+    complexities: tuple[str, ...] = ()
+    output_formats: tuple[str, ...] = ()
+    reasoning_effort: str | None = None
+    concurrency: int | None = None
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    name: str | None = None
+
+    def __post_init__(self) -> None:
+        if not self.deployments:
+            raise ValueError("A route needs at least one deployment.")
+        if (
+            self.reasoning_effort is not None
+            and self.reasoning_effort not in REASONING_EFFORTS
+        ):
+            raise ValueError(
+                f"Unknown reasoning effort '{self.reasoning_effort}'. "
+                f"Available: {', '.join(REASONING_EFFORTS)}."
+            )
+        for value in (
+            self.concurrency,
+            self.requests_per_minute,
+            self.tokens_per_minute,
+        ):
+            if value is not None and value < 1:
+                raise ValueError("Route concurrency and quotas must be positive.")
+
+    @property
+    def label(self) -> str:
+        """Human-readable identifier for logs and reports."""
+        return self.name or "+".join(self.deployments)
+
+    def matches(
+        self, *, scenario: str, complexity: str | None, output_format: str
+    ) -> bool:
+        """True if a run of *scenario* at *complexity* in *output_format* fits."""
+        return (
+            (not self.scenarios or scenario in self.scenarios)
+            and (not self.complexities or complexity in self.complexities)
+            and (not self.output_formats or output_format in self.output_formats)
+        )
+
+
+def select_route(
+    routes: Sequence[Route],
+    *,
+    scenario: str,
+    complexity: str | None,
+    output_format: str,
+) -> Route | None:
+    """Return the first of *routes* matching the run, or None."""
+    for route in routes:
+        if route.matches(
+            scenario=scenario, complexity=complexity, output_format=output_format
+        ):
+            return route
+    return None
+
+
+def _names(value: Any) -> tuple[str, ...]:  # noqa: ANN401
+    """A single name or a list of names as a tuple of strings."""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise TypeError(f"expected a name or a list of names, got {value!r}")
+    return tuple(value)
+
+
+def load_routes(path: Path) -> list[Route]:
+    """
+    Read a routing table from a YAML or JSON file.
+
+    The file holds a list of mappings, tried in order, with ``deployments``
+    (a name or a list of names) plus the optional keys ``scenario``,
+    ``complexity`` and ``output_format`` (each a value or a list of values
+    to match), ``reasoning_effort``, ``concurrency``, ``rpm``, ``tpm`` and
+    ``name``.
+    """
+    with path.open(encoding="utf-8") as fp:
+        entries = yaml.safe_load(fp)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must contain a non-empty list of routes.")
+
+    routes = []
+    for number, entry in enumerate(entries, start=1):
+        try:
+            routes.append(
+                Route(
+                    deployments=_names(entry["deployments"]),
+                    scenarios=_names(entry.get("scenario")),
+                    complexities=_names(entry.get("complexity")),
+                    output_formats=_names(entry.get("output_format")),
+                    reasoning_effort=entry.get("reasoning_effort"),
+                    concurrency=entry.get("concurrency"),
+                    requests_per_minute=entry.get("rpm"),
+                    tokens_per_minute=entry.get("tpm"),
+                    name=entry.get("name"),
+                )
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid route #{number} in {path}: {exc}") from exc
+    return routes
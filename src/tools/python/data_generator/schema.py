@@ -0,0 +1,137 @@
+"""
+JSON schemas for structured outputs.
+
+This module turns the pydantic model a tool publishes for one record
+(:attr:`data_generator.tool.DataGeneratorTool.record_model`) into the
+``response_format`` of an Azure OpenAI chat completion, so that the model is
+constrained to replies that parse and validate:
+
+* :func:`json_schema_format` builds the ``json_schema`` payload; the schema is
+  made *strict* (every object closed, every property required, optional
+  fields nullable) unless the model holds a free-form mapping, which strict
+  mode cannot express.
+* :class:`RecordModel` is the base class of the record models; it accepts
+  numbers where the schema asks for strings (ids echoed without quotes).
+* :func:`batch_model` wraps a record model in the ``{"records": [...]}``
+  envelope used when several records are asked for in one call.
+* :func:`outline_model` and :func:`section_model` describe the outline and
+  the single list items a record is written as in hierarchical generation.
+"""
+
+from __future__ import annotations
+
+import functools
+import typing
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, create_model
+
+__all__: list[str] = [
+    "RecordModel",
+    "batch_model",
+    "json_schema_format",
+    "outline_model",
+    "section_model",
+]
+
+
+class RecordModel(BaseModel):
+    """Base class of the pydantic models tools publish for their records."""
+
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
+def json_schema_format(model: type[BaseModel], *, name: str) -> dict[str, Any]:
+    """
+    Return the ``response_format`` that asks for a JSON object matching
+    *model*; *name* labels the schema in the request (``[A-Za-z0-9_-]``).
+    """
+    schema = model.model_json_schema()
+    strict = _tighten(schema)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": strict, "schema": schema},
+    }
+
+
+@functools.cache
+def batch_model(model: type[BaseModel]) -> type[BaseModel]:
+    """Model of a reply holding several *model* records under ``records``."""
+    # *model* is only known at run time, which a static type cannot express
+    records: Any = list[model]  # type: ignore[valid-type]
+    return create_model(f"{model.__name__}Batch", records=(records, ...))
+
+
+@functools.cache
+def outline_model(
+    model: type[BaseModel],
+    sections: tuple[str, ...],
+    derived: tuple[str, ...] = (),
+) -> type[BaseModel]:
+    """
+    Model of the outline of a *model* record: the list fields *sections*
+    hold one heading per item and the *derived* fields are left out.
+    """
+    fields: dict[str, Any] = {
+        name: (list[str], ...) if name in sections else (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name not in derived
+    }
+    return create_model(
+        f"{model.__name__}Outline", __config__=model.model_config, **fields
+    )
+
+
+def section_model(model: type[BaseModel], field: str) -> type[BaseModel]:
+    """
+    Model of one item of the list field *field* of *model*.
+
+    Raises
+    ------
+    ValueError
+        If *field* is not a list of pydantic models.
+    """
+    info = model.model_fields.get(field)
+    args = typing.get_args(info.annotation) if info is not None else ()
+    if (
+        info is None
+        or typing.get_origin(info.annotation) is not list
+        or not isinstance(args[0], type)
+        or not issubclass(args[0], BaseModel)
+    ):
+        raise ValueError(f"{model.__name__}.{field} is not a list of records.")
+    return args[0]
+
+
+def _tighten(node: Any) -> bool:  # noqa: ANN401
+    """
+    Apply the strict-mode rules to the schema *node* in place and return
+    whether the whole schema qualifies for strict mode.
+
+    Defaults are dropped (strict mode rejects them; optional fields stay
+    nullable), objects with declared properties are closed and list every
+    property as required. An object with ``additionalProperties`` of its own
+    is a free-form mapping and disqualifies the schema.
+    """
+    if not isinstance(node, dict):
+        return True
+    strict = True
+    node.pop("default", None)
+    if node.get("type") == "object":
+        if "properties" in node and node.get("additionalProperties") in (
+            None,
+            False,
+        ):
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        else:
+            strict = False
+    for key in ("properties", "$defs"):
+        for child in node.get(key, {}).values():
+            strict = _tighten(child) and strict
+    for key in ("items", "additionalProperties"):
+        strict = _tighten(node.get(key)) and strict
+    for key in ("anyOf", "allOf"):
+        for child in node.get(key, []):
+            strict = _tighten(child) and strict
+    return strict
@@ -0,0 +1,464 @@
+"""
+Output sinks for generated records.
+
+This module provides the :class:`OutputSink` hierarchy and :class:`SinkWriter`,
+the single background task that feeds a sink in batches.
+
+* :class:`FileSink` – one file per record (the historic layout, good for
+  samples and inspection).
+* :class:`JsonlSink` – rotating JSON Lines shards, optionally
+  zstd-compressed (``pip install zstandard``).
+* :class:`ParquetSink` – rotating Parquet shards (``pip install pyarrow``).
+
+Shards are written under a ``.partial`` suffix and renamed once complete, so
+a shard that exists under its final name is always readable. The manifest
+only lists a record once the file holding it exists under its final name
+(see :py:meth:`data_generator.manifest.RunManifest.record_success`), so
+every record it points at is really on disk.
+
+Records can be serialised ahead of time, e.g. in a worker process (see
+:mod:`data_generator.processing`): :py:meth:`OutputSink.encode` returns the
+text a sink would store for a record, and every sink accepts it back wrapped
+in an :class:`EncodedRecord`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Final
+
+import yaml
+
+__all__: list[str] = [
+    "SINKS",
+    "EncodedRecord",
+    "FileSink",
+    "JsonlSink",
+    "OutputSink",
+    "ParquetSink",
+    "SinkWriter",
+    "create_sink",
+]
+
+_logger = logging.getLogger(__name__)
+
+_PARTIAL_SUFFIX: Final[str] = ".partial"
+# Largest number of queued records handed to the sink in one thread hop.
+_MAX_BATCH: Final[int] = 256
+
+
+@dataclass(frozen=True)
+class EncodedRecord:
+    """A record already serialised by :py:meth:`OutputSink.encode`."""
+
+    text: str
+
+
+class OutputSink(ABC):
+    """
+    Destination for post-processed records.
+
+    Sinks are driven by a single :class:`SinkWriter` task, so implementations
+    never see concurrent calls and need no locking.
+
+    Parameters
+    ----------
+    out_dir:
+        Target directory. Created on-the-fly if it does not exist.
+    tool_name:
+        ``DataGeneratorTool.toolName``, used to name files and shards.
+    output_format:
+        Format the records were requested in (``json``, ``yaml``, ``txt``).
+    """
+
+    def __init__(self, out_dir: Path, *, tool_name: str, output_format: str) -> None:
+        self.out_dir = out_dir
+        self.tool_name = tool_name
+        self.output_format = output_format
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    @abstractmethod
+    def write(self, unique_id: str, data: Any) -> Path:  # noqa: ANN401
+        """
+        Store one record (or its :class:`EncodedRecord`) and return the path
+        of the file that holds it; a shard only appears there once complete.
+        """
+
+    @classmethod
+    def encode(cls, data: Any, output_format: str) -> str:  # noqa: ANN401, ARG003
+        """
+        Serialise *data* the way this sink stores it. A pure function of its
+        arguments, so that it can run in another process.
+        """
+        return json.dumps(data)
+
+    def close(self) -> None:  # noqa: B027 (optional hook)
+        """Flush buffered records and release resources."""
+
+
+class FileSink(OutputSink):
+    """One file per record, named ``<toolName>_<id>.<format>``."""
+
+    def write(self, unique_id: str, data: Any) -> Path:  # noqa: ANN401
+        """Serialise *data* according to the output format."""
+        file_path = self.out_dir / f"{self.tool_name}_{unique_id}.{self.output_format}"
+        if not isinstance(data, EncodedRecord):
+            data = EncodedRecord(self.encode(data, self.output_format))
+        with file_path.open("w", encoding="utf-8") as fp:
+            fp.write(data.text)
+        return file_path
+
+    @classmethod
+    def encode(cls, data: Any, output_format: str) -> str:  # noqa: ANN401
+        """Pretty-printed JSON, block-style YAML, or the text itself."""
+        match output_format:
+            case "json":
+                return json.dumps(data, indent=2)
+            case "yaml":
+                return yaml.safe_dump(data, sort_keys=False)
+            case _:
+                return str(data)
+
+
+class _ShardedSink(OutputSink):
+    """
+    Base class for sinks that pack many records into rotating shards.
+
+    Shards are named ``<toolName>-<nnnnn><extension>``; numbering continues
+    after the highest shard already in *out_dir*, so resumed runs never
+    overwrite earlier output. Stale ``.partial`` shards left by a crash are
+    removed (their records are not in the manifest and will be regenerated).
+    """
+
+    extension: str
+
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        tool_name: str,
+        output_format: str,
+        records_per_shard: int = 1000,
+    ) -> None:
+        super().__init__(out_dir, tool_name=tool_name, output_format=output_format)
+        if records_per_shard < 1:
+            raise ValueError("records_per_shard must be at least 1.")
+        self.records_per_shard = records_per_shard
+        self._shard_no = self._next_shard_number()
+        self._records_in_shard = 0
+
+    def _next_shard_number(self) -> int:
+        """Clean up stale partial shards and return the first free number."""
+        pattern = re.compile(
+            rf"^{re.escape(self.tool_name)}-(\d+){re.escape(self.extension)}"
+            rf"({re.escape(_PARTIAL_SUFFIX)})?$"
+        )
+        highest = 0
+        for path in self.out_dir.iterdir():
+            match = pattern.match(path.name)
+            if match is None:
+                continue
+            if match.group(2):
+                _logger.warning("Removing incomplete shard %s.", path)
+                path.unlink()
+                continue
+            highest = max(highest, int(match.group(1)))
+        return highest + 1
+
+    @property
+    def shard_path(self) -> Path:
+        """Final path of the shard currently being filled."""
+        return self.out_dir / f"{self.tool_name}-{self._shard_no:05d}{self.extension}"
+
+    @property
+    def _partial_path(self) -> Path:
+        """Path the current shard is written to until it is complete."""
+        return self.shard_path.with_name(self.shard_path.name + _PARTIAL_SUFFIX)
+
+    def write(self, unique_id: str, data: Any) -> Path:  # noqa: ANN401
+        """Append one record to the current shard, rotating when it is full."""
+        if self._records_in_shard >= self.records_per_shard:
+            self._finish_shard()
+        self._append(unique_id, data)
+        self._records_in_shard += 1
+        return self.shard_path
+
+    def close(self) -> None:
+        """Complete the last shard."""
+        if self._records_in_shard:
+            self._finish_shard()
+
+    def _finish_shard(self) -> None:
+        """Write out the current shard, publish it and start the next one."""
+        self._flush_shard(self._partial_path)
+        self._partial_path.replace(self.shard_path)
+        _logger.debug(
+            "Shard %s complete (%s records).", self.shard_path, self._records_in_shard
+        )
+        self._shard_no += 1
+        self._records_in_shard = 0
+
+    def _row(self, unique_id: str, data: Any) -> dict[str, Any]:  # noqa: ANN401
+        """Shard row layout shared by all sharded sinks."""
+        return {"id": unique_id, "format": self.output_format, "record": data}
+
+    def _record_json(self, data: Any) -> str:  # noqa: ANN401
+        """The ``record`` value as JSON text, encoding it unless done already."""
+        if isinstance(data, EncodedRecord):
+            return data.text
+        return self.encode(data, self.output_format)
+
+    @abstractmethod
+    def _append(self, unique_id: str, data: Any) -> None:  # noqa: ANN401
+        """Add one record to the current (partial) shard."""
+
+    @abstractmethod
+    def _flush_shard(self, path: Path) -> None:
+        """Make the current shard complete on disk at *path*."""
+
+
+class JsonlSink(_ShardedSink):
+    """
+    JSON Lines shards: one ``{"id", "format", "record"}`` object per line.
+
+    Parameters
+    ----------
+    compression:
+        ``None`` or ``"zstd"`` (requires the ``zstandard`` package).
+    """
+
+    extension = ".jsonl"
+
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        tool_name: str,
+        output_format: str,
+        records_per_shard: int = 1000,
+        compression: str | None = None,
+    ) -> None:
+        if compression not in (None, "zstd"):
+            raise ValueError(f"Unsupported compression '{compression}'.")
+        self.compression = compression
+        if compression == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError as exc:
+                raise ImportError(
+                    "zstd compression requires the 'zstandard' package "
+                    "(pip install zstandard)."
+                ) from exc
+            self.extension = ".jsonl.zst"
+        super().__init__(
+            out_dir,
+            tool_name=tool_name,
+            output_format=output_format,
+            records_per_shard=records_per_shard,
+        )
+        self._fp: IO[str] | None = None
+
+    def _append(self, unique_id: str, data: Any) -> None:  # noqa: ANN401
+        if self._fp is None:
+            self._fp = self._open(self._partial_path)
+        # Same text as json.dumps(self._row(...)) without re-encoding the record
+        head = json.dumps({"id": unique_id, "format": self.output_format})
+        self._fp.write(f'{head[:-1]}, "record": {self._record_json(data)}}}\n')
+
+    def _open(self, path: Path) -> IO[str]:
+        """Open *path* for text output, through zstd when requested."""
+        if self.compression == "zstd":
+            import zstandard
+
+            raw = zstandard.ZstdCompressor().stream_writer(path.open("wb"))
+            return io.TextIOWrapper(raw, encoding="utf-8")
+        return path.open("w", encoding="utf-8")
+
+    def _flush_shard(self, path: Path) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+
+class ParquetSink(_ShardedSink):
+    """
+    Parquet shards with ``id``, ``format`` and ``record`` columns.
+
+    ``record`` holds the record as JSON text: model output does not follow a
+    fixed schema, so a per-field layout would fail on the first variation.
+    Requires the ``pyarrow`` package.
+    """
+
+    extension = ".parquet"
+
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        tool_name: str,
+        output_format: str,
+        records_per_shard: int = 1000,
+    ) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "The parquet sink requires the 'pyarrow' package "
+                "(pip install pyarrow)."
+            ) from exc
+        super().__init__(
+            out_dir,
+            tool_name=tool_name,
+            output_format=output_format,
+            records_per_shard=records_per_shard,
+        )
+        self._rows: list[dict[str, Any]] = []
+
+    def _append(self, unique_id: str, data: Any) -> None:  # noqa: ANN401
+        row = self._row(unique_id, self._record_json(data))
+        self._rows.append(row)
+
+    def _flush_shard(self, path: Path) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pylist(self._rows), path)
+        self._rows = []
+
+
+SINKS: dict[str, type[OutputSink]] = {
+    "files": FileSink,
+    "jsonl": JsonlSink,
+    "parquet": ParquetSink,
+}
+
+
+def create_sink(
+    kind: str,
+    out_dir: Path,
+    *,
+    tool_name: str,
+    output_format: str,
+    records_per_shard: int = 1000,
+    compression: str | None = None,
+) -> OutputSink:
+    """
+    Instantiate the sink registered under *kind* in :data:`SINKS`.
+
+    Raises
+    ------
+    ValueError
+        If *kind* is unknown, or compression is requested for a sink that
+        does not support it.
+    """
+    try:
+        sink_cls = SINKS[kind]
+    except KeyError as exc:
+        raise ValueError(
+            f"Unknown sink '{kind}'. Available: {', '.join(sorted(SINKS))}."
+        ) from exc
+
+    kwargs: dict[str, Any] = {}
+    if issubclass(sink_cls, _ShardedSink):
+        kwargs["records_per_shard"] = records_per_shard
+    if compression:
+        if not issubclass(sink_cls, JsonlSink):
+            raise ValueError(f"The '{kind}' sink does not support compression.")
+        kwargs["compression"] = compression
+    return sink_cls(out_dir, tool_name=tool_name, output_format=output_format, **kwargs)
+
+
+@dataclass
+class _Pending:
+    """A record waiting for the writer task."""
+
+    unique_id: str
+    data: Any
+    done: asyncio.Future[Path] = field(repr=False)
+
+
+class SinkWriter:
+    """
+    Single background task that feeds an :class:`OutputSink`.
+
+    Workers hand records over with :py:meth:`write`; the writer drains
+    whatever has queued up and passes it to the sink in one worker-thread
+    hop, so file I/O never blocks the event loop and the sink is only ever
+    touched by one thread. The queue is bounded to apply back-pressure when
+    the disk falls behind.
+
+    Parameters
+    ----------
+    sink:
+        Destination for the records.
+    max_pending:
+        Maximum number of records queued before :py:meth:`write` waits.
+    """
+
+    def __init__(self, sink: OutputSink, *, max_pending: int = 1024) -> None:
+        self.sink = sink
+        self._queue: asyncio.Queue[_Pending | None] = asyncio.Queue(max_pending)
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def write(self, unique_id: str, data: Any) -> Path:  # noqa: ANN401
+        """Queue one record and wait until the sink has stored it."""
+        if self._task is None or self._task.done():
+            raise RuntimeError("SinkWriter is not running.")
+        pending = _Pending(unique_id, data, asyncio.get_running_loop().create_future())
+        await self._queue.put(pending)
+        return await pending.done
+
+    async def close(self) -> None:
+        """Write everything still queued, then close the sink."""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        await asyncio.to_thread(self.sink.close)
+
+    async def _run(self) -> None:
+        """Writer loop: batch queued records until the close sentinel."""
+        closing = False
+        while not closing:
+            batch: list[_Pending] = []
+            item = await self._queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= _MAX_BATCH or self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+            closing = item is None
+            if batch:
+                await self._write_batch(batch)
+
+    async def _write_batch(self, batch: list[_Pending]) -> None:
+        """Store *batch* in a worker thread and resolve each record's future."""
+        results = await asyncio.to_thread(self._store, batch)
+        for pending, result in zip(batch, results, strict=True):
+            if pending.done.done():
+                continue
+            if isinstance(result, BaseException):
+                pending.done.set_exception(result)
+            else:
+                pending.done.set_result(result)
+
+    def _store(self, batch: list[_Pending]) -> list[Path | Exception]:
+        """Write each record, capturing per-record failures."""
+        results: list[Path | Exception] = []
+        for pending in batch:
+            try:
+                results.append(self.sink.write(pending.unique_id, pending.data))
+            except Exception as exc:  # noqa: BLE001 (reported to the caller)
+                results.append(exc)
+        return results
@@ -0,0 +1,275 @@
+"""
+Per-request telemetry for generation runs.
+
+This module provides :class:`RunTelemetry`, which measures every model call
+of a run (queue wait, time to first byte, total latency, token counts,
+outcome) plus retries and record outcomes. The measurements are:
+
+* exported as OpenTelemetry metrics through the global ``MeterProvider`` (or
+  the one passed in); without a configured SDK the API is a no-op, and
+* aggregated locally in :class:`Histogram` objects for the JSON run report
+  (:py:meth:`RunTelemetry.report`).
+
+Time to first byte is taken by an ``httpx`` response hook
+(:func:`mark_first_byte`) that finds the request being timed through a
+context variable set by :func:`time_request`.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
+
+from opentelemetry import metrics
+
+if TYPE_CHECKING:
+    import httpx
+
+    from data_generator.usage import TokenUsage
+
+__all__: list[str] = [
+    "METER_NAME",
+    "Histogram",
+    "RequestTiming",
+    "RunTelemetry",
+    "mark_first_byte",
+    "time_request",
+]
+
+METER_NAME: Final[str] = "data_generator"
+
+# Bucket boundaries grow by this factor: quantiles within ~4.4% of the truth
+_GROWTH: Final[float] = 2 ** (1 / 16)
+_QUANTILES: Final[tuple[float, ...]] = (0.5, 0.9, 0.99)
+_TOKEN_TYPES: Final[tuple[str, ...]] = ("prompt", "completion", "reasoning", "cached")
+
+
+class Histogram:
+    """
+    Distribution of non-negative values in logarithmic buckets.
+
+    Memory is bounded by the dynamic range of the values, not their count,
+    so a run of millions of requests keeps a few hundred buckets per metric.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._zeros = 0
+        self._buckets: Counter[int] = Counter()
+
+    def record(self, value: float) -> None:
+        """Add one observation (negative values count as zero)."""
+        value = max(value, 0.0)
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value == 0:
+            self._zeros += 1
+        else:
+            self._buckets[math.floor(math.log(value, _GROWTH))] += 1
+
+    def quantile(self, q: float) -> float:
+        """Approximate *q*-quantile (upper bound of its bucket), 0 if empty."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(q * self.count), 1)
+        seen = self._zeros
+        if seen >= rank:
+            return 0.0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(max(_GROWTH ** (bucket + 1), self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """Count, mean, min, p50 / p90 / p99 and max, for the run report."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            **{f"p{round(q * 100)}": self.quantile(q) for q in _QUANTILES},
+            "max": self.max,
+        }
+
+
+@dataclass
+class RequestTiming:
+    """Clock readings (``time.perf_counter()``) of one model request."""
+
+    sent: float
+    first_byte: float | None = None
+
+
+_CURRENT_REQUEST: ContextVar[RequestTiming | None] = ContextVar(
+    "data_generator_request", default=None
+)
+
+
+@contextmanager
+def time_request() -> Iterator[RequestTiming]:
+    """
+    Time the model request made inside the ``with`` block; tasks started
+    within it (``asyncio.wait_for``) see the same :class:`RequestTiming`.
+    """
+    timing = RequestTiming(sent=time.perf_counter())
+    token = _CURRENT_REQUEST.set(timing)
+    try:
+        yield timing
+    finally:
+        _CURRENT_REQUEST.reset(token)
+
+
+async def mark_first_byte(_response: httpx.Response) -> None:
+    """``httpx`` response hook: the headers of the timed request arrived."""
+    timing = _CURRENT_REQUEST.get()
+    if timing is not None and timing.first_byte is None:
+        timing.first_byte = time.perf_counter()
+
+
+class RunTelemetry:
+    """
+    Metrics of one generation run.
+
+    Parameters
+    ----------
+    attributes:
+        Attached to every exported data point (scenario, output format).
+    meter_provider:
+        OpenTelemetry ``MeterProvider``; the global one by default.
+    """
+
+    def __init__(
+        self,
+        attributes: Mapping[str, str] | None = None,
+        *,
+        meter_provider: metrics.MeterProvider | None = None,
+    ) -> None:
+        self.attributes = dict(attributes or {})
+        self.queue_wait = Histogram()
+        self.time_to_first_byte = Histogram()
+        self.duration = Histogram()
+        self.tokens = {token_type: Histogram() for token_type in _TOKEN_TYPES}
+        self.requests: Counter[str] = Counter()     # by outcome
+        self.retries: Counter[str] = Counter()      # by error class
+        self.records: Counter[str] = Counter()      # by outcome
+
+        meter = metrics.get_meter(METER_NAME, meter_provider=meter_provider)
+        self._queue_wait = meter.create_histogram(
+            "data_generator.request.queue_wait",
+            unit="s",
+            description="Time a request waited for a concurrency slot, quota "
+            "and a deployment.",
+        )
+        self._time_to_first_byte = meter.create_histogram(
+            "data_generator.request.time_to_first_byte",
+            unit="s",
+            description="Time from sending a request to its response headers.",
+        )
+        self._duration = meter.create_histogram(
+            "data_generator.request.duration",
+            unit="s",
+            description="Time from sending a request to its complete response.",
+        )
+        self._tokens = meter.create_histogram(
+            "data_generator.request.tokens",
+            unit="{token}",
+            description="Tokens reported per request, by token type.",
+        )
+        self._retries = meter.create_counter(
+            "data_generator.retries",
+            unit="{retry}",
+            description="Retried model calls, by error class.",
+        )
+        self._records = meter.create_counter(
+            "data_generator.records",
+            unit="{record}",
+            description="Settled records, by outcome.",
+        )
+
+    def record_request(  # noqa: PLR0913
+        self,
+        *,
+        deployment: str,
+        queue_wait: float,
+        timing: RequestTiming,
+        finished: float,
+        usage: TokenUsage | None,
+        outcome: str = "ok",
+    ) -> None:
+        """Add one model request that ended (at *finished*) with *outcome*."""
+        attributes = {**self.attributes, "deployment": deployment, "outcome": outcome}
+        self.requests[outcome] += 1
+        queue_wait = max(queue_wait, 0.0)
+        self.queue_wait.record(queue_wait)
+        self._queue_wait.record(queue_wait, attributes)
+        duration = max(finished - timing.sent, 0.0)
+        self.duration.record(duration)
+        self._duration.record(duration, attributes)
+        if timing.first_byte is not None:
+            first_byte = max(timing.first_byte - timing.sent, 0.0)
+            self.time_to_first_byte.record(first_byte)
+            self._time_to_first_byte.record(first_byte, attributes)
+        if usage is None:
+            return
+        for token_type, value in zip(
+            _TOKEN_TYPES,
+            (
+                usage.prompt_tokens,
+                usage.completion_tokens,
+                usage.reasoning_tokens,
+                usage.cached_tokens,
+            ),
+            strict=True,
+        ):
+            self.tokens[token_type].record(value)
+            self._tokens.record(value, {**attributes, "token_type": token_type})
+
+    def record_retry(self, error_class: str) -> None:
+        """Count one retry caused by *error_class*."""
+        self.retries[error_class] += 1
+        self._retries.add(1, {**self.attributes, "error_class": error_class})
+
+    def record_records(self, outcome: str, count: int = 1) -> None:
+        """Count *count* records settled as ``success``, ``failed`` or ``skipped``."""
+        if count:
+            self.records[outcome] += count
+            self._records.add(count, {**self.attributes, "outcome": outcome})
+
+    def report(self, **extra: Any) -> dict[str, Any]:  # noqa: ANN401
+        """
+        JSON-serialisable summary of the run: record and request outcomes,
+        retries, latency distributions (seconds) and token totals and
+        per-request distributions; *extra* keys are added at the top level.
+        """
+        return {
+            **self.attributes,
+            **extra,
+            "records": dict(self.records),
+            "requests": dict(self.requests),
+            "retries": dict(self.retries),
+            "latency_seconds": {
+                "queue_wait": self.queue_wait.summary(),
+                "time_to_first_byte": self.time_to_first_byte.summary(),
+                "total": self.duration.summary(),
+            },
+            "tokens": {
+                token_type: {
+                    "total": round(histogram.total),
+                    "per_request": histogram.summary(),
+                }
+                for token_type, histogram in self.tokens.items()
+            },
+        }
@@ -10,13 +10,19 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import os
 import uuid
 from abc import ABC, abstractmethod
-from collections.abc import Callable
-from typing import Any, ClassVar
+from collections.abc import Callable, Iterable, Sequence
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import yaml
 
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from .entities import EntityPool
+
 _logger = logging.getLogger(__name__)
 
 
@@ -58,7 +64,12 @@ class DataGeneratorTool(ABC):
 
     @abstractmethod
     def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
-        """Return the full prompt string for the given output format."""
+        """
+        Return the full prompt string for the given output format.
+
+        Build it with :py:meth:`compose_prompt` so that everything shared by
+        all records comes before the per-record values.
+        """
 
     @abstractmethod
     def cli_arguments(self) -> list[dict[str, Any]]:
@@ -84,10 +95,72 @@ class DataGeneratorTool(ABC):
     # ------------------------------------------------------------------ #
     # Optional / overridable                                             #
     # ------------------------------------------------------------------ #
+    # Fixed max_completion_tokens per record; None lets the engine derive it
+    # from the completion sizes it observes (see data_generator.budget).
+    max_completion_tokens: ClassVar[int | None] = None
+    # Difficulty tier of the records (set by tools with a --complexity
+    # option); routing tables can match it (see data_generator.routing).
+    complexity: str | None = None
+
     def get_unique_id(self) -> str:
         """Return a unique identifier for the item. Override to use custom IDs."""
         return str(uuid.uuid4())
 
+    def exclude_unique_ids(self, unique_ids: Iterable[str]) -> None:  # noqa: B027
+        """
+        Called before a run with the ids already generated in its output
+        directory. Tools whose :py:meth:`get_unique_id` hands out ids from a
+        fixed list skip these; the default ignores them.
+        """
+
+    # ------------------------------------------------------------------ #
+    # Prompt layout                                                      #
+    # ------------------------------------------------------------------ #
+    _RECORD_DETAILS_HEADING: ClassVar[str] = (
+        "## RECORD DETAILS\n\n"
+        'Use these values wherever the structure above says "(echo above)".\n\n'
+    )
+
+    def compose_prompt(self, instructions: str, record_details: str) -> str:
+        """
+        Join the static *instructions* (role, guidelines, output skeleton) and
+        the *record_details* (id, timestamps, sampled attributes).
+
+        The provider's prompt cache matches the longest prefix shared with
+        recent requests, so the part that is identical for every record goes
+        first and the per-record values last.
+        """
+        return (
+            f"{instructions.rstrip()}\n\n"
+            f"{self._RECORD_DETAILS_HEADING}"
+            f"{record_details.strip()}\n"
+        )
+
+    # ------------------------------------------------------------------ #
+    # Record schema                                                      #
+    # ------------------------------------------------------------------ #
+    # Pydantic model of one JSON record. When set, every JSON record is
+    # validated against it and the engine can ask the model for it through
+    # structured outputs (see data_generator.schema).
+    record_model: ClassVar[type[BaseModel] | None] = None
+
+    @property
+    def response_model(self) -> type[BaseModel] | None:
+        """
+        Model of the reply requested through structured outputs: the
+        :attr:`record_model`, unless the tool fills part of the record in
+        locally and ``post_process`` merges the model's share into it.
+        """
+        return self.record_model
+
+    def validate_record(self, record: Any) -> None:  # noqa: ANN401
+        """
+        Raise *ValueError* (a pydantic ``ValidationError``) if the parsed
+        JSON *record* does not match :attr:`record_model`.
+        """
+        if self.record_model is not None:
+            self.record_model.model_validate(record)
+
     # ------------------------------------------------------------------ #
     # Format helpers                                                     #
     # ------------------------------------------------------------------ #
@@ -133,6 +206,329 @@ class DataGeneratorTool(ABC):
             )
             return raw
 
+    # ------------------------------------------------------------------ #
+    # Local rendering                                                    #
+    # ------------------------------------------------------------------ #
+    # Words rendered in upper case when a key becomes a text label
+    _TEXT_ACRONYMS: ClassVar[frozenset[str]] = frozenset(
+        {"id", "ip", "sku", "sop", "url", "uom", "sla", "kpi", "api", "hr"}
+    )
+
+    def render(self, record: Any, output_format: str) -> Any:  # noqa: ANN401
+        """
+        Render a canonical JSON *record* as *output_format* without a model call.
+
+        ``json`` and ``yaml`` return the structure itself (the output sink
+        serialises it); ``txt`` / ``text`` return :py:meth:`render_text`.
+        A JSON string (as returned by tools whose ``post_process`` only
+        validates) is parsed first.
+
+        Raises
+        ------
+        ValueError
+            If *record* is not valid JSON or *output_format* is unknown.
+        """
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except json.JSONDecodeError as exc:
+                raise ValueError("Only JSON records can be rendered.") from exc
+        fmt = output_format.lower()
+        if fmt in self._FORMAT_PARSERS:
+            return record
+        if fmt in ("txt", "text"):
+            return self.render_text(record)
+        raise ValueError(f"Cannot render unknown output format '{output_format}'.")
+
+    def render_text(self, record: Any) -> str:  # noqa: ANN401
+        """
+        Plain-text form of a record, in the ``Label: value`` layout of the
+        tools' text skeletons: nested mappings are indented, lists of scalars
+        are comma-separated and other lists become ``-`` items (see
+        :py:meth:`_text_list_item`). Override for a bespoke layout.
+        """
+        if not isinstance(record, dict):
+            return json.dumps(record, indent=2, ensure_ascii=False) + "\n"
+        return "\n".join(self._text_lines(record, indent="")) + "\n"
+
+    def _text_lines(self, mapping: dict[str, Any], *, indent: str) -> list[str]:
+        """``Label: value`` lines of *mapping* (see :py:meth:`render_text`)."""
+        lines = []
+        for key, value in mapping.items():
+            label = f"{indent}{self._text_label(key)}:"
+            if isinstance(value, dict):
+                lines.append(label)
+                lines.extend(self._text_lines(value, indent=indent + "  "))
+            elif isinstance(value, list) and any(
+                isinstance(item, dict | list) for item in value
+            ):
+                lines.append(label)
+                for item in value:
+                    lines.extend(
+                        self._text_list_item(key, item, indent=indent + "  ")
+                    )
+            elif isinstance(value, list):
+                items = ", ".join(self._text_scalar(item) for item in value)
+                lines.append(f"{label} {items}")
+            else:
+                lines.append(f"{label} {self._text_scalar(value)}")
+        return lines
+
+    def _text_list_item(
+        self,
+        key: str,
+        item: Any,  # noqa: ANN401
+        *,
+        indent: str,
+    ) -> list[str]:
+        """
+        Lines of one ``-`` item of the list stored under *key*. A mapping
+        becomes an indented ``Label: value`` block; tools override this for
+        list-specific layouts such as conversation turns.
+        """
+        if isinstance(item, dict) and item:
+            block = self._text_lines(item, indent=indent + "  ")
+            block[0] = f"{indent}- {block[0].lstrip()}"
+            return block
+        if isinstance(item, list):
+            return [f"{indent}- {', '.join(self._text_scalar(v) for v in item)}"]
+        return [f"{indent}- {self._text_scalar(item)}"]
+
+    def _text_label(self, key: str) -> str:
+        """Turn a ``snake_case`` key into a ``Title Case`` label."""
+        return " ".join(
+            word.upper() if word.lower() in self._TEXT_ACRONYMS else word.capitalize()
+            for word in str(key).replace("-", "_").split("_")
+            if word
+        )
+
+    @staticmethod
+    def _text_scalar(value: Any) -> str:  # noqa: ANN401
+        """Text form of a leaf value (JSON spelling for booleans and null)."""
+        if isinstance(value, bool) or value is None:
+            return json.dumps(value)
+        if isinstance(value, dict | list):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+
+    # ------------------------------------------------------------------ #
+    # Several records per call                                           #
+    # ------------------------------------------------------------------ #
+    def build_batch_prompt(self, unique_ids: Sequence[str]) -> str:
+        """
+        Return one prompt asking for a JSON array with a record per id.
+
+        The JSON prompt of every record is built with :py:meth:`build_prompt`;
+        the lines all of them share (the instructions and the schema) are kept
+        once and only the lines that differ (id, timestamps, randomised
+        attributes) are listed per record. Override for a bespoke layout.
+        """
+        prompts = [self.build_prompt("json", unique_id=uid) for uid in unique_ids]
+        if len(prompts) == 1:
+            return prompts[0]
+        head = os.path.commonprefix(prompts)
+        head = head[: head.rfind("\n") + 1]
+        tails = [prompt[len(head) :][::-1] for prompt in prompts]
+        tail = os.path.commonprefix(tails)[::-1]
+        tail = tail[tail.find("\n") + 1 :] if "\n" in tail else ""
+        count = len(unique_ids)
+        records = "".join(
+            f"Record {number} (id {uid}):\n"
+            f"{prompt[len(head) : len(prompt) - len(tail)].strip()}\n\n"
+            for number, (uid, prompt) in enumerate(
+                zip(unique_ids, prompts, strict=True), start=1
+            )
+        )
+        return (
+            f"{head}"
+            f"Generate {count} DISTINCT records, one for each block below, and "
+            f"return them as a single JSON array of exactly {count} objects in "
+            "the same order. Wherever the structure says to echo a value, use "
+            "the value from that record's own block.\n\n"
+            f"{records}"
+            f"{tail}\n"
+            f"Wrap the {count} objects in one JSON array: [{{...}}, {{...}}].\n"
+        )
+
+    def split_batch(self, raw: str, unique_ids: Sequence[str]) -> dict[str, Any]:
+        """
+        Split the reply to :py:meth:`build_batch_prompt` into records.
+
+        Every array element is run through :py:meth:`post_process` on its own
+        and assigned to the batch id it echoes, or else to the id at its
+        position. Elements that are not objects, fail ``post_process`` or
+        repeat an id are dropped; the caller regenerates ids that are missing
+        from the returned ``{unique_id: record}`` mapping.
+        """
+        try:
+            elements = json.loads(raw)
+        except json.JSONDecodeError:
+            return {}
+        if isinstance(elements, dict):
+            wrapped = list(elements.values())
+            # Models like to wrap the array ({"records": [...]}); a bare
+            # object answers a batch of one
+            if len(wrapped) == 1 and isinstance(wrapped[0], list):
+                elements = wrapped[0]
+            else:
+                elements = [elements]
+        if not isinstance(elements, list):
+            return {}
+
+        assigned: dict[str, dict[str, Any]] = {}
+        unnamed: list[tuple[int, dict[str, Any]]] = []
+        for position, element in enumerate(elements):
+            if not isinstance(element, dict):
+                continue
+            values = {v for v in element.values() if isinstance(v, str)}
+            named = [uid for uid in unique_ids if uid in values]
+            if not named:
+                unnamed.append((position, element))
+            elif named[0] not in assigned:
+                assigned[named[0]] = element
+        for position, element in unnamed:
+            if position < len(unique_ids) and unique_ids[position] not in assigned:
+                assigned[unique_ids[position]] = element
+
+        records = {}
+        for uid in unique_ids:
+            if uid not in assigned:
+                continue
+            try:
+                records[uid] = self.post_process(json.dumps(assigned[uid]), "json")
+            except Exception:  # noqa: BLE001 (drop the element, keep the batch)
+                _logger.debug(
+                    "Batch element %s failed post_process.", uid, exc_info=True
+                )
+        return records
+
+    # ------------------------------------------------------------------ #
+    # Outline, then sections                                             #
+    # ------------------------------------------------------------------ #
+    # Fields of the record model that assemble_sections() computes from the
+    # rest of the record; the outline leaves them out.
+    derived_fields: ClassVar[tuple[str, ...]] = ()
+
+    _OUTLINE_HEADING: ClassVar[str] = "## OUTLINE ONLY\n\n"
+    _SECTION_HEADING: ClassVar[str] = "## ONE SECTION ONLY\n\n"
+
+    @property
+    def section_fields(self) -> tuple[str, ...]:
+        """
+        List fields of :attr:`record_model` that hierarchical generation
+        writes one item per model call, after a call for the outline (see
+        ``DataGenerator.run(hierarchical=True)``). Empty, the default, when
+        the tool's records are short enough to be written in one go.
+        """
+        return ()
+
+    def outline_model(self) -> type[BaseModel] | None:
+        """
+        Model of the outline: the record with one heading per item of each
+        of the :attr:`section_fields` and without the :attr:`derived_fields`.
+        """
+        if self.record_model is None:
+            return None
+        from .schema import outline_model
+
+        return outline_model(
+            self.record_model, self.section_fields, self.derived_fields
+        )
+
+    def section_model(self, field: str) -> type[BaseModel] | None:
+        """Model of one item of the section list *field*."""
+        if self.record_model is None:
+            return None
+        from .schema import section_model
+
+        return section_model(self.record_model, field)
+
+    def build_outline_prompt(self, *, unique_id: str | None = None) -> str:
+        """
+        Return the JSON prompt of :py:meth:`build_prompt`, asking for the
+        outline only: the :attr:`section_fields` as lists of headings.
+        """
+        instructions, _, details = self.build_prompt(
+            "json", unique_id=unique_id
+        ).partition(self._RECORD_DETAILS_HEADING)
+        fields = ", ".join(f'"{name}"' for name in self.section_fields)
+        derived = "".join(
+            f'Leave out "{name}"; it is assembled from the rest of the record. '
+            for name in self.derived_fields
+        )
+        return self.compose_prompt(
+            f"{instructions.rstrip()}\n\n"
+            f"{self._OUTLINE_HEADING}"
+            "Write the outline of this record, not the whole record: fill in "
+            f"every field of the structure above, except that {fields} must "
+            "each be a JSON array of short, distinct one-line headings, one "
+            "per item and in order, instead of the items themselves. The "
+            "items are written separately from their headings, so together "
+            f"the headings must cover everything the record needs. {derived}",
+            details,
+        )
+
+    def build_section_prompt(
+        self, outline: dict[str, Any], field: str, position: int
+    ) -> str:
+        """
+        Return the prompt for item *position* (1-based) of the section list
+        *field* of the record described by *outline*.
+
+        The instructions and the outline come first, so the calls for the
+        sections of one record share everything but the last lines.
+        """
+        instructions, _, _ = self.build_prompt("json").partition(
+            self._RECORD_DETAILS_HEADING
+        )
+        headings = outline[field]
+        return self.compose_prompt(
+            f"{instructions.rstrip()}\n\n"
+            f"{self._SECTION_HEADING}"
+            "Write ONE item of a list of the structure above, for the record "
+            "outlined below, not the whole record. Return only that item as a "
+            "single JSON object with the fields the structure gives for an "
+            "item of that list, written out in full for its heading. Stay "
+            "consistent with the outline and do not repeat what the other "
+            "items cover.",
+            "Outline:\n"
+            f"{json.dumps(outline, indent=2, ensure_ascii=False)}\n\n"
+            f'Item: {position} of {len(headings)} in "{field}"\n'
+            f"Heading: {headings[position - 1]}\n",
+        )
+
+    def assemble_sections(
+        self, outline: dict[str, Any], sections: dict[str, list[Any]]
+    ) -> dict[str, Any]:
+        """
+        Return the record made of *outline* with the headings of each section
+        list replaced by its generated items. Tools with
+        :attr:`derived_fields` override this to fill them in.
+        """
+        return {key: sections.get(key, value) for key, value in outline.items()}
+
+    # ------------------------------------------------------------------ #
+    # Shared entities                                                    #
+    # ------------------------------------------------------------------ #
+    # Kinds of data_generator.entities the records refer to (customers,
+    # products, employees); such tools sample them from entity_pool, once
+    # one is attached, instead of having the model invent them.
+    entity_kinds: ClassVar[tuple[str, ...]] = ()
+    entity_pool: EntityPool | None = None
+
+    def use_entity_pool(self, pool: EntityPool) -> None:
+        """
+        Attach *pool*, loading (or first generating) the pools of the
+        :attr:`entity_kinds` so worker processes get them with the tool.
+        Raises *ValueError* if the tool refers to no shared entities.
+        """
+        if not self.entity_kinds:
+            raise ValueError(
+                f"Scenario '{self.name}' does not use shared entities."
+            )
+        pool.load(*self.entity_kinds)
+        self.entity_pool = pool
+
     # ------------------------------------------------------------------ #
     # Helper: factory                                                    #
     # ------------------------------------------------------------------ #
@@ -140,6 +536,10 @@ class DataGeneratorTool(ABC):
     def from_name(cls, name: str) -> DataGeneratorTool:
         """Factory helper that returns a new instance of the requested tool.
 
+        A scenario that is not registered yet is loaded on demand from the
+        :mod:`data_generator.tools` manifest or entry points, so only the
+        module of the requested tool is imported.
+
         Parameters
         ----------
         name: str
@@ -155,6 +555,10 @@ class DataGeneratorTool(ABC):
         KeyError
             If no tool with the supplied `name` has been registered.
         """
+        if name not in cls._REGISTRY:
+            from .tools import load_tool
+
+            load_tool(name)
         try:
             tool_cls = cls._REGISTRY[name]
         except KeyError as exc:
@@ -162,3 +566,13 @@ class DataGeneratorTool(ABC):
                 f"No DataGeneratorTool registered with name '{name}'."
             ) from exc
         return tool_cls()
+
+    @classmethod
+    def available_names(cls) -> list[str]:
+        """Sorted names of the registered and the loadable scenarios."""
+        from importlib.metadata import entry_points
+
+        from .tools import ENTRY_POINT_GROUP, TOOL_MODULES
+
+        plugins = {ep.name for ep in entry_points(group=ENTRY_POINT_GROUP)}
+        return sorted({*cls._REGISTRY, *TOOL_MODULES, *plugins})
@@ -4,36 +4,96 @@ Data Generator Tools Package.
 This package contains various specialized data generation tools for creating
 synthetic data for different domains including financial, healthcare, retail,
 and support interactions.
+
+Tool modules are imported on demand: :data:`TOOL_MODULES` maps every bundled
+scenario name to the module defining it, so looking up one scenario (see
+:py:meth:`data_generator.tool.DataGeneratorTool.from_name`) imports only that
+module. Tools shipped by other distributions register a ``module:Class``
+entry point in the :data:`ENTRY_POINT_GROUP` group under their scenario name.
+The tool classes can still be imported from this package by class name.
 """
 
-from .customer_support_chat_log import CustomerSupportChatLogTool
-from .ecommerce_order_history import EcommerceOrderHistoryTool
-from .financial_transaction import FinancialTransactionTool
-from .healthcare_clinical_policy import HealthcareClinicalPolicyTool
-from .healthcare_record import HealthcareRecordTool
-from .hr_employee_record import HREmployeeRecordTool
-from .insurance_claim import InsuranceClaimTool
-from .it_service_desk_ticket import ITServiceDeskTicketTool
-from .legal_contract import LegalContractTool  # noqa: F401
-from .manufacturing_maintenance_log import ManufacturingMaintenanceLogTool
-from .retail_product import RetailProductTool
-from .tech_support import TechSupportTool
-from .tech_support_sop import TechSupportSOPTool
-from .travel_booking import TravelBookingTool
-
-__all__ = [
-    "HealthcareClinicalPolicyTool",
-    "CustomerSupportChatLogTool",
-    "EcommerceOrderHistoryTool",
-    "TechSupportTool",
-    "TechSupportSOPTool",
-    "RetailProductTool",
-    "HealthcareRecordTool",
-    "HREmployeeRecordTool",
-    "FinancialTransactionTool",
-    "InsuranceClaimTool",
-    "ITServiceDeskTicketTool",
-    "LegalContractTool",
-    "ManufacturingMaintenanceLogTool",
-    "TravelBookingTool",
-]
+from __future__ import annotations
+
+import importlib
+import logging
+from typing import Any, Final
+
+_logger = logging.getLogger(__name__)
+
+# Scenario name -> module (relative to this package) defining its tool
+TOOL_MODULES: Final[dict[str, str]] = {
+    "customer-support-chat-log": "customer_support_chat_log",
+    "ecommerce-order-history": "ecommerce_order_history",
+    "financial-transaction": "financial_transaction",
+    "healthcare-clinical-policy": "healthcare_clinical_policy",
+    "healthcare-record": "healthcare_record",
+    "hr-employee-record": "hr_employee_record",
+    "insurance-claim": "insurance_claim",
+    "it-service-desk-ticket": "it_service_desk_ticket",
+    "legal-contract": "legal_contract",
+    "manufacturing-maintenance-log": "manufacturing_maintenance_log",
+    "retail-product": "retail_product",
+    "tech-support": "tech_support",
+    "tech-support-sop": "tech_support_sop",
+    "travel-booking": "travel_booking",
+}
+
+# Entry-point group third-party tools register under (name = scenario)
+ENTRY_POINT_GROUP: Final[str] = "data_generator.tools"
+
+# Class name -> module, for ``from data_generator.tools import XTool``
+_TOOL_CLASSES: Final[dict[str, str]] = {
+    "HealthcareClinicalPolicyTool": "healthcare_clinical_policy",
+    "CustomerSupportChatLogTool": "customer_support_chat_log",
+    "EcommerceOrderHistoryTool": "ecommerce_order_history",
+    "TechSupportTool": "tech_support",
+    "TechSupportSOPTool": "tech_support_sop",
+    "RetailProductTool": "retail_product",
+    "HealthcareRecordTool": "healthcare_record",
+    "HREmployeeRecordTool": "hr_employee_record",
+    "FinancialTransactionTool": "financial_transaction",
+    "InsuranceClaimTool": "insurance_claim",
+    "ITServiceDeskTicketTool": "it_service_desk_ticket",
+    "LegalContractTool": "legal_contract",
+    "ManufacturingMaintenanceLogTool": "manufacturing_maintenance_log",
+    "TravelBookingTool": "travel_booking",
+}
+
+__all__ = list(_TOOL_CLASSES)
+
+
+def load_tool(name: str) -> bool:
+    """
+    Import the module that registers the scenario *name*.
+
+    Bundled scenarios are found through :data:`TOOL_MODULES`, others through
+    the :data:`ENTRY_POINT_GROUP` entry points. Returns False if neither
+    knows the name; importing the module registers the tool as a side
+    effect of defining its class.
+    """
+    module = TOOL_MODULES.get(name)
+    if module is not None:
+        importlib.import_module(f"{__name__}.{module}")
+        return True
+    from importlib.metadata import entry_points  # only for third-party tools
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP, name=name):
+        _logger.debug("Loading DataGeneratorTool '%s' from %s", name, entry_point)
+        entry_point.load()
+        return True
+    return False
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import a bundled tool class on first access (PEP 562)."""
+    module = _TOOL_CLASSES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    tool_cls = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = tool_cls
+    return tool_cls
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_TOOL_CLASSES})
@@ -5,6 +5,9 @@ Customer Support Chat Log Prompt Builder
 Scenario-specific implementation of :class:`data_generator.tool.DataGeneratorTool`
 that creates realistic (but fully fictional) customer support chat logs with
 multi-turn conversations between customers and support agents.
+
+With an entity pool (``--entity-pool``) the customer is a pooled one, drawn
+by the conversation id, and ``customer_profile`` carries its ``customer_id``.
 """
 
 from __future__ import annotations
@@ -15,15 +18,52 @@ import logging
 import random
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class CustomerProfile(RecordModel):
+    """Fictional customer of a chat log; pooled customers have an id."""
+
+    name: str
+    email: str
+    plan_tier: Literal["basic", "premium", "enterprise"]
+    customer_id: str | None = None
+
+
+class ChatMessage(RecordModel):
+    """One turn of the conversation."""
+
+    role: Literal["customer", "agent"]
+    message: str
+    timestamp: str
+    channel: Literal["email", "chat", "phone"]
+    sentiment: Literal["positive", "neutral", "negative"]
+
+
+class ChatLog(RecordModel):
+    """JSON record produced by :class:`CustomerSupportChatLogTool`."""
+
+    conversation_id: str
+    created_at: str
+    industry: str
+    language: str
+    issue_summary: str
+    customer_profile: CustomerProfile
+    messages: list[ChatMessage]
+    resolution_status: Literal["open", "in_progress", "resolved", "escalated"]
+    resolution_summary: str | None = None
+
+
 class CustomerSupportChatLogTool(DataGeneratorTool):
     """Generate synthetic customer support chat logs in YAML, JSON or plain-text."""
 
@@ -32,6 +72,8 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "customer-support-chat-log"
     toolName: str = "CustomerSupportChatLog"
+    record_model = ChatLog
+    entity_kinds = ("customers",)
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -146,17 +188,38 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
         lang_list = [lang.strip() for lang in self.languages.split(",")]
         return random.choice(lang_list)
 
+    def _customer_profile(self, conversation_id: str) -> dict[str, Any] | None:
+        """
+        ``customer_profile`` of the pooled customer of *conversation_id*;
+        ``None`` without an entity pool.
+        """
+        if self.entity_pool is None:
+            return None
+        customer = self.entity_pool.sample("customers", conversation_id)[0]
+        return {
+            key: customer[key]
+            for key in ("name", "email", "plan_tier", "customer_id")
+        }
+
     def _prompt_common(self, *, unique_id: str | None = None) -> str:
         """Return the invariant part of the prompt shared across formats."""
         conversation_id = unique_id or str(uuid.uuid4())
         created_at = datetime.now(timezone.utc).isoformat()
         language = self._select_language()
+        profile = self._customer_profile(conversation_id)
+        customer = (
+            f"Customer (immutable): {profile['name']} <{profile['email']}>, "
+            f"{profile['plan_tier']} plan\n"
+            if profile is not None
+            else ""
+        )
 
         return (
             f"Conversation ID (immutable): {conversation_id}\n"
             f"Created At: {created_at}\n"
             f"Industry: {self.industry}\n"
             f"Language: {language}\n"
+            f"{customer}"
             f"Average Turns Hint: {self.avg_turns}\n"
             "Use ISO-8601 timestamps and do NOT invent real PII.\n\n"
         )
@@ -169,11 +232,10 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
         All variable data (conversation_id, timestamps, etc.) are pre-baked so
         the kernel only receives the final prompt.
         """
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a helpful assistant generating REALISTIC BUT ENTIRELY "
             "FICTIONAL multi-turn customer support chat logs for demonstrations.\n\n"
-            "## CONVERSATION DETAILS\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "## CONVERSATION GUIDELINES\n\n"
             "Generate a realistic customer support conversation with occasional "
             "ambiguity, realistic product or service references, timestamps per "
@@ -186,11 +248,11 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
         )
 
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # Plain text is the default
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -267,6 +329,22 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
             "Resolution Summary: optional text summary (if resolved)\n"
         )
 
+    def _text_list_item(
+        self,
+        key: str,
+        item: Any,  # noqa: ANN401
+        *,
+        indent: str,
+    ) -> list[str]:
+        """Messages render as ``- timestamp [role/channel] message (sentiment)``."""
+        if key == "messages" and isinstance(item, dict):
+            return [
+                f"{indent}- {item.get('timestamp', '')} "
+                f"[{item.get('role', '')}/{item.get('channel', '')}] "
+                f"{item.get('message', '')} ({item.get('sentiment', '')})"
+            ]
+        return super()._text_list_item(key, item, indent=indent)
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
@@ -278,10 +356,7 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
             try:
                 parsed_data = json.loads(raw)
                 if isinstance(parsed_data, dict):
-                    # Optional enrichment: ensure basic fields exist
-                    parsed_data.setdefault(
-                        "resolution_status", self._random_resolution_status()
-                    )
+                    self._enrich(parsed_data)
                 return parsed_data
             except json.JSONDecodeError:
                 _logger.debug(
@@ -293,10 +368,7 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
             try:
                 parsed_data = yaml.safe_load(raw)
                 if isinstance(parsed_data, dict):
-                    # Optional enrichment: ensure basic fields exist
-                    parsed_data.setdefault(
-                        "resolution_status", self._random_resolution_status()
-                    )
+                    self._enrich(parsed_data)
                 return parsed_data
             except yaml.YAMLError:
                 _logger.debug(
@@ -314,6 +386,14 @@ class CustomerSupportChatLogTool(DataGeneratorTool):
         )
         return raw
 
+    def _enrich(self, chat_log: dict[str, Any]) -> None:
+        """Ensure basic fields exist and put in the pooled customer."""
+        chat_log.setdefault("resolution_status", self._random_resolution_status())
+        if chat_log.get("conversation_id"):
+            profile = self._customer_profile(str(chat_log["conversation_id"]))
+            if profile is not None:
+                chat_log["customer_profile"] = profile
+
     # ------------------------------------------------------------------ #
     # Misc.                                                              #
     # ------------------------------------------------------------------ #
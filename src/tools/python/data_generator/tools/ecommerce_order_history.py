@@ -5,6 +5,22 @@ E-commerce Order History Prompt Builder
 Concrete :class:`data_generator.tool.DataGeneratorTool` implementation that
 creates realistic e-commerce customer order histories with orders, returns,
 reviews, and support interactions.
+
+With ``--local-numbers`` the structured part of the history (orders, lines,
+prices, totals, returns at ``--returns-percent``, review ratings and every
+date) is drawn locally from a generator seeded by the record id and
+anchored at the record's ``created_at``. The model only writes the text:
+product names, return reasons, reviews and support notes. ``post_process``
+rebuilds the orders from the echoed record id, customer id, timestamp,
+industry, order minimum and returns percentage alone (not from the current
+settings) and merges the text in, so totals always add up and match the
+prompt.
+
+With an entity pool (``--entity-pool``) each history belongs to a pooled
+customer, drawn by the record id, and its orders are made of a shortlist of
+pooled products drawn by the customer id; names and prices of pooled
+products are taken from the pool. Local numbers are still seeded by the
+record id, so histories of the same pooled customer differ.
 """
 
 from __future__ import annotations
@@ -12,16 +28,138 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import math
+import random
 import uuid
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Final, Literal
 
 import yaml
+from pydantic import BaseModel
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
+if TYPE_CHECKING:
+    from ..entities import EntityPool
+
 _logger = logging.getLogger(__name__)
 
+# Share of delivered orders that get a review, and of the orders without a
+# return that lead to a support contact
+_REVIEW_RATE: Final[float] = 0.4
+_CONTACT_RATE: Final[float] = 0.1
+# Pooled products a customer orders from
+_SHORTLIST: Final[int] = 8
+
+
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class OrderItem(RecordModel):
+    """One line of an order."""
+
+    sku: str
+    name: str
+    qty: int
+    price: float
+    currency: str
+
+
+class Order(RecordModel):
+    """One order of the customer."""
+
+    order_id: str
+    order_date: str
+    items: list[OrderItem]
+    total: float
+    status: Literal["placed", "shipped", "delivered", "returned"]
+
+
+class OrderReturn(RecordModel):
+    """Return of an order listed above."""
+
+    order_id: str
+    return_date: str
+    reason: str
+    status: Literal["approved", "rejected", "pending"]
+
+
+class ProductReview(RecordModel):
+    """Review of an ordered item."""
+
+    order_id: str
+    sku: str
+    rating: int
+    title: str
+    review: str
+
+
+class SupportInteraction(RecordModel):
+    """Contact with customer support."""
+
+    timestamp: str
+    channel: Literal["email", "chat", "phone"]
+    subject: str
+    outcome: str
+
+
+class OrderHistory(RecordModel):
+    """JSON record produced by :class:`EcommerceOrderHistoryTool`."""
+
+    customer_id: str
+    created_at: str
+    industry: str
+    orders: list[Order]
+    returns: list[OrderReturn] = []
+    reviews: list[ProductReview] = []
+    interactions: list[SupportInteraction] = []
+
+
+class ReviewText(RecordModel):
+    """Text of a review whose order, item and rating are given."""
+
+    title: str
+    review: str
+
+
+class InteractionText(RecordModel):
+    """Text of a support contact whose time and channel are given."""
+
+    subject: str
+    outcome: str
+
+
+class OrderHistoryNarrative(RecordModel):
+    """What the model writes for locally built orders."""
+
+    history_id: str
+    customer_id: str
+    created_at: str
+    industry: str
+    orders_min: int
+    returns_percent: int
+    product_names: list[str]
+    return_reasons: list[str]
+    reviews: list[ReviewText]
+    interactions: list[InteractionText]
+
+
+def _anchor(value: Any) -> datetime:  # noqa: ANN401
+    """
+    The echoed ``created_at`` as an aware datetime (YAML may already have
+    parsed it); raises *ValueError* if it is not an ISO timestamp.
+    """
+    anchor = (
+        value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    )
+    return anchor if anchor.tzinfo else anchor.replace(tzinfo=timezone.utc)
+
+
+def _timestamp(moment: datetime) -> str:
+    """ISO 8601 timestamp to the second."""
+    return moment.isoformat(timespec="seconds")
+
 
 class EcommerceOrderHistoryTool(DataGeneratorTool):
     """Generate synthetic e-commerce customer order histories."""
@@ -31,6 +169,8 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "ecommerce-order-history"
     toolName: str = "EcommerceOrderHistory"
+    record_model = OrderHistory
+    entity_kinds = ("customers", "products")
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -47,6 +187,7 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
         self.industry = industry or "general retail"
         self.orders_min = orders_min or 3
         self.returns_percent = returns_percent or 10
+        self.local_numbers = False
 
     def cli_arguments(self) -> list[dict[str, Any]]:
         """Argparse specification consumed by the top-level CLI wrapper."""
@@ -89,6 +230,16 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
                     ),
                 },
             },
+            {
+                "flags": ["--local-numbers"],
+                "kwargs": {
+                    "action": "store_true",
+                    "help": (
+                        "Build orders, prices, totals, returns and dates "
+                        "locally; the model only writes names, reviews and notes."
+                    ),
+                },
+            },
         ]
 
     def validate_args(self, ns: argparse.Namespace) -> None:
@@ -119,6 +270,7 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
                 returns_percent = 10
         # Clamp to valid range [0, 100]
         self.returns_percent = max(0, min(100, returns_percent))
+        self.local_numbers = bool(getattr(ns, "local_numbers", False))
 
     def examples(self) -> list[str]:
         """Representative usage snippets for `--help` output."""
@@ -129,9 +281,19 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
             "--industry electronics "
             "--orders-min 5 "
             "--returns-percent 15 "
-            "--output-format yaml"
+            "--output-format yaml",
+            "python -m generate_data "
+            "--scenario ecommerce-order-history "
+            "--count 1000 "
+            "--orders-min 8 "
+            "--local-numbers"
         ]
 
+    @property
+    def response_model(self) -> type[BaseModel] | None:
+        """The text alone when the numbers are built locally."""
+        return OrderHistoryNarrative if self.local_numbers else self.record_model
+
     # ------------------------------------------------------------------ #
     # Output formats                                                     #
     # ------------------------------------------------------------------ #
@@ -142,24 +304,63 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     # Prompt construction                                                #
     # ------------------------------------------------------------------ #
+    def _customer(self, unique_id: str) -> dict[str, Any] | None:
+        """The pooled customer of record *unique_id*; ``None`` without a pool."""
+        if self.entity_pool is None:
+            return None
+        return self.entity_pool.sample("customers", unique_id)[0]
+
+    def _shortlist(self, customer_id: str) -> list[dict[str, Any]]:
+        """The pooled products *customer_id* orders from; empty without a pool."""
+        if self.entity_pool is None:
+            return []
+        return self.entity_pool.sample("products", customer_id, k=_SHORTLIST)
+
+    @staticmethod
+    def _customer_details(customer: dict[str, Any] | None) -> str:
+        """Prompt line describing a pooled *customer*."""
+        if customer is None:
+            return ""
+        return (
+            f"Customer: {customer['name']} <{customer['email']}>, "
+            f"{customer['plan_tier']} plan since {customer['customer_since']}\n"
+        )
+
     def _prompt_common(self, *, unique_id: str | None = None) -> str:
         """Shared prompt header including an optional caller-supplied id."""
         customer_id = unique_id or str(uuid.uuid4())
+        customer = self._customer(customer_id)
+        if customer is not None:
+            customer_id = customer["customer_id"]
         created_at = datetime.now(timezone.utc).isoformat()
+        catalogue = "".join(
+            f"  - {product['product_id']} | {product['name']} | "
+            f"{product['price']:.2f} {product['currency']}\n"
+            for product in self._shortlist(customer_id)
+        )
         return (
             f"Customer ID (immutable): {customer_id}\n"
+            f"{self._customer_details(customer)}"
             f"Created At: {created_at}\n"
             f"Industry: {self.industry}\n"
             f"Orders Min: {self.orders_min}\n"
-            f"Returns Percent: {self.returns_percent}\n\n"
+            f"Returns Percent: {self.returns_percent}\n"
+            + (
+                "Products (order only these; sku | name | price):\n" + catalogue
+                if catalogue
+                else ""
+            )
+            + "\n"
         )
 
     def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
         """Return the full prompt for the requested *output_format*."""
+        if self.local_numbers:
+            return self._narrative_prompt(output_format, unique_id=unique_id)
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are an e-commerce data specialist producing REALISTIC BUT "
             "ENTIRELY FICTIONAL per-customer order history snapshots.\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "Generate a comprehensive customer order history including orders, "
             "returns, product reviews, and (optionally) support interactions. "
             "All data must be fictional with no real PII. Use ISO timestamps "
@@ -169,11 +370,11 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
         )
 
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # TEXT
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -306,12 +507,310 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
             "  Outcome: resolution description\n"
         )
 
+    # ------------------------------------------------------------------ #
+    # Local numbers                                                      #
+    # ------------------------------------------------------------------ #
+    def build_orders(
+        self,
+        history_id: str,
+        customer_id: str,
+        created_at: Any,  # noqa: ANN401
+        *,
+        industry: str,
+        orders_min: int,
+        returns_percent: int,
+    ) -> dict[str, Any]:
+        """
+        Draw the *industry* history *history_id* of *customer_id* as of
+        *created_at*, text left empty.
+
+        The generator is seeded by the history id (the record id; unlike the
+        customer id it is unique even with an entity pool) and every date
+        counts back from *created_at*, so the same arguments always yield the
+        same history:
+        *orders_min* to *orders_min* + 2 orders over the preceding year, with
+        log-normal prices in whole cents and totals that are the exact sum of
+        their lines. Orders older than three days are returned with
+        *returns_percent* chance; some delivered orders get a rated review,
+        and every return plus a few other orders a support contact. With an
+        entity pool the lines are the customer's shortlisted products, at
+        their pool prices and with their names.
+
+        Raises *ValueError* if *orders_min* or *returns_percent* lie outside
+        the ranges the CLI accepts.
+        """
+        if not 1 <= orders_min <= 50 or not 0 <= returns_percent <= 100:
+            raise ValueError(
+                f"Cannot draw {orders_min} orders at {returns_percent}% returns."
+            )
+        shortlist = self._shortlist(customer_id)
+        rng = random.Random(f"{self.name}:{history_id}")
+        anchor = _anchor(created_at)
+        ages = sorted(
+            (rng.uniform(0, 365) for _ in range(orders_min + rng.randint(0, 2))),
+            reverse=True,
+        )
+        orders: list[dict[str, Any]] = []
+        returns: list[dict[str, Any]] = []
+        reviews: list[dict[str, Any]] = []
+        contacts: list[tuple[datetime, str]] = []
+        for age in ages:
+            placed = anchor - timedelta(days=age)
+            items = []
+            total = 0
+            for _ in range(rng.choices((1, 2, 3, 4), weights=(5, 3, 2, 1))[0]):
+                if shortlist:
+                    product = rng.choice(shortlist)
+                    sku, name = product["product_id"], product["name"]
+                    cents = round(product["price"] * 100)
+                else:
+                    cents = max(round(rng.lognormvariate(math.log(4000), 0.8)), 99)
+                    sku, name = f"SKU-{rng.randint(10000, 99999)}", ""
+                qty = rng.choices((1, 2, 3), weights=(6, 2, 1))[0]
+                total += qty * cents
+                items.append(
+                    {
+                        "sku": sku,
+                        "name": name,
+                        "qty": qty,
+                        "price": cents / 100,
+                        "currency": "USD",
+                    }
+                )
+            order_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            returned = rng.random() < returns_percent / 100 and age >= 3
+            if returned:
+                status = "returned"
+                returned_at = placed + timedelta(days=rng.uniform(2, min(age, 30)))
+                returns.append(
+                    {
+                        "order_id": order_id,
+                        "return_date": _timestamp(returned_at),
+                        "reason": "",
+                        "status": rng.choices(
+                            ("approved", "rejected", "pending"), weights=(7, 1, 2)
+                        )[0],
+                    }
+                )
+                contacted = returned_at - timedelta(hours=rng.uniform(1, 24))
+                contacts.append((contacted, order_id))
+            else:
+                status = (
+                    "delivered" if age >= 7 else "shipped" if age >= 2 else "placed"
+                )
+                if status == "delivered" and rng.random() < _REVIEW_RATE:
+                    reviews.append(
+                        {
+                            "order_id": order_id,
+                            "sku": rng.choice(items)["sku"],
+                            "rating": rng.choices(
+                                range(1, 6), weights=(1, 1, 2, 4, 6)
+                            )[0],
+                            "title": "",
+                            "review": "",
+                        }
+                    )
+                if rng.random() < _CONTACT_RATE:
+                    contacts.append(
+                        (placed + timedelta(days=rng.uniform(0, min(age, 5))), order_id)
+                    )
+            orders.append(
+                {
+                    "order_id": order_id,
+                    "order_date": _timestamp(placed),
+                    "items": items,
+                    "total": total / 100,
+                    "status": status,
+                }
+            )
+        return {
+            "customer_id": customer_id,
+            "created_at": anchor.isoformat(),
+            "industry": industry,
+            "orders": orders,
+            "returns": returns,
+            "reviews": reviews,
+            "interactions": [
+                {
+                    "timestamp": _timestamp(moment),
+                    "channel": rng.choice(("email", "chat", "phone")),
+                    "subject": "",
+                    "outcome": "",
+                    # Context for the prompt; dropped by _merge_narrative
+                    "order_id": order_id,
+                }
+                for moment, order_id in sorted(contacts)
+            ],
+        }
+
+    def _narrative_prompt(self, output_format: str, *, unique_id: str | None) -> str:
+        """Prompt asking for the text of locally built orders."""
+        created_at = datetime.now(timezone.utc).isoformat()
+        history_id = unique_id or str(uuid.uuid4())
+        customer = self._customer(history_id)
+        customer_id = history_id if customer is None else customer["customer_id"]
+        history = self.build_orders(
+            history_id,
+            customer_id,
+            created_at,
+            industry=self.industry,
+            orders_min=self.orders_min,
+            returns_percent=self.returns_percent,
+        )
+        returned = {entry["order_id"] for entry in history["returns"]}
+        lines = []
+        for number, order in enumerate(history["orders"], start=1):
+            lines.append(
+                f"Order {number} ({order['order_id']}) | {order['order_date']} | "
+                f"{order['status']} | total {order['total']:.2f} USD"
+            )
+            lines.extend(
+                f"  item | {item['sku']} | {item['name'] or '(name it)'} | "
+                f"qty {item['qty']} | {item['price']:.2f} USD"
+                for item in order["items"]
+            )
+        for number, entry in enumerate(history["returns"], start=1):
+            lines.append(
+                f"Return {number} | order {entry['order_id']} | "
+                f"{entry['return_date']} | {entry['status']}"
+            )
+        for number, review in enumerate(history["reviews"], start=1):
+            lines.append(
+                f"Review {number} | order {review['order_id']} | {review['sku']} | "
+                f"{review['rating']}/5"
+            )
+        for number, contact in enumerate(history["interactions"], start=1):
+            about = "return of" if contact["order_id"] in returned else "order"
+            lines.append(
+                f"Contact {number} | {contact['timestamp']} | {contact['channel']} | "
+                f"{about} {contact['order_id']}"
+            )
+        details = (
+            f"History ID (immutable): {history_id}\n"
+            f"Customer ID (immutable): {history['customer_id']}\n"
+            f"{self._customer_details(customer)}"
+            f"Created At: {created_at}\n"
+            f"Industry: {self.industry}\n"
+            f"Orders Min: {self.orders_min}\n"
+            f"Returns Percent: {self.returns_percent}\n\n"
+            + "\n".join(lines)
+            + "\n"
+        )
+        base = (
+            "You are an e-commerce data specialist writing the text of REALISTIC "
+            "BUT ENTIRELY FICTIONAL customer order histories. No real PII.\n\n"
+            "The orders, returns, reviews and contacts under RECORD DETAILS are "
+            "final. Write, in the order they are listed: a product name for "
+            "every item line marked (name it) that fits the industry and its "
+            "price, a reason for "
+            "every return, a title and text for every review that match its "
+            "rating, and a subject and outcome for every support contact. Do "
+            "not repeat ids, dates, quantities or prices.\n\n"
+        )
+        # Text histories are rendered locally from the same JSON narrative
+        if output_format == "yaml":
+            skeleton = (
+                "Return valid YAML ONLY.\n\n"
+                "history_id: (echo above)\n"
+                "customer_id: (echo above)\n"
+                "created_at: (echo above)\n"
+                "industry: (echo above)\n"
+                "orders_min: (echo above)\n"
+                "returns_percent: (echo above)\n"
+                "product_names:\n"
+                "  - one per item line to name, in order\n"
+                "return_reasons:\n"
+                "  - one per return, in order\n"
+                "reviews:\n"
+                "  - title: review title\n"
+                "    review: review text\n"
+                "interactions:\n"
+                "  - subject: contact subject\n"
+                "    outcome: resolution description\n"
+            )
+        else:
+            skeleton = (
+                "Return valid JSON ONLY.\n\n"
+                "{\n"
+                '  "history_id": "(echo above)",\n'
+                '  "customer_id": "(echo above)",\n'
+                '  "created_at": "(echo above)",\n'
+                '  "industry": "(echo above)",\n'
+                '  "orders_min": (echo above, a number),\n'
+                '  "returns_percent": (echo above, a number),\n'
+                '  "product_names": ["one per item line to name, in order"],\n'
+                '  "return_reasons": ["one per return, in order"],\n'
+                '  "reviews": [{"title": "review title", "review": "review text"}],\n'
+                '  "interactions": [\n'
+                '    {"subject": "contact subject",\n'
+                '     "outcome": "resolution description"}\n'
+                "  ]\n"
+                "}\n"
+            )
+        return self.compose_prompt(base + skeleton, details)
+
+    def _merge_narrative(self, narrative: dict[str, Any]) -> dict[str, Any]:
+        """
+        Rebuild the orders of the echoed history id, customer id, timestamp,
+        industry, order minimum and returns percentage and fill in the
+        model's text; entries it left out get a generic text. Raises
+        *KeyError*, *TypeError* or *ValueError* when the echoes are missing
+        or invalid.
+        """
+        history = self.build_orders(
+            str(narrative["history_id"]),
+            str(narrative["customer_id"]),
+            narrative["created_at"],
+            industry=str(narrative["industry"]),
+            orders_min=int(narrative["orders_min"]),
+            returns_percent=int(narrative["returns_percent"]),
+        )
+
+        def _texts(key: str) -> list[Any]:
+            value = narrative.get(key)
+            return value if isinstance(value, list) else []
+
+        def _text(item: Any, key: str | None, fallback: str) -> str:  # noqa: ANN401
+            if key is not None:
+                item = item.get(key) if isinstance(item, dict) else None
+            return str(item).strip() if item else fallback
+
+        names = iter(_texts("product_names"))
+        for order in history["orders"]:
+            for item in order["items"]:
+                if not item["name"]:
+                    fallback = f"Product {item['sku']}"
+                    item["name"] = _text(next(names, None), None, fallback)
+        reasons = iter(_texts("return_reasons"))
+        for entry in history["returns"]:
+            entry["reason"] = _text(next(reasons, None), None, "Item not as described")
+        reviews = iter(_texts("reviews"))
+        for review in history["reviews"]:
+            text = next(reviews, None)
+            review["title"] = _text(text, "title", f"{review['rating']} out of 5")
+            review["review"] = _text(text, "review", "No comment.")
+        contacts = iter(_texts("interactions"))
+        for contact in history["interactions"]:
+            text = next(contacts, None)
+            del contact["order_id"]
+            contact["subject"] = _text(text, "subject", "Order enquiry")
+            contact["outcome"] = _text(text, "outcome", "Resolved")
+        return history
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
     def post_process(self, raw: str, output_format: str) -> Any:  # noqa: ANN401
-        """Deserialize based on output_format and enrich if applicable."""
+        """
+        Deserialize based on output_format and enrich if applicable.
+
+        With local numbers the reply is the narrative (JSON, or YAML for
+        ``yaml``), merged into the rebuilt orders; text histories are then
+        rendered locally.
+        """
         fmt = output_format.lower()
+        if self.local_numbers:
+            return self._post_process_narrative(raw, fmt)
         parsed_data: Any
 
         if fmt == "json":
@@ -340,8 +839,50 @@ class EcommerceOrderHistoryTool(DataGeneratorTool):
             )
             return raw
 
+        if isinstance(parsed_data, dict) and self.entity_pool is not None:
+            self._apply_pool(parsed_data, self.entity_pool)
         return parsed_data
 
+    @staticmethod
+    def _apply_pool(history: dict[str, Any], pool: EntityPool) -> None:
+        """Give pooled products their pool name and price, and fix the totals."""
+        for order in history.get("orders") or []:
+            if not isinstance(order, dict):
+                continue
+            items = [i for i in order.get("items") or [] if isinstance(i, dict)]
+            pooled = False
+            for item in items:
+                product = pool.get("products", str(item.get("sku")))
+                if product is not None:
+                    item["name"] = product["name"]
+                    item["price"] = product["price"]
+                    item["currency"] = product["currency"]
+                    pooled = True
+            if pooled:
+                try:
+                    cents = sum(
+                        round(float(i["price"]) * 100) * int(i["qty"]) for i in items
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+                order["total"] = cents / 100
+
+    def _post_process_narrative(self, raw: str, fmt: str) -> Any:  # noqa: ANN401
+        """Merge a narrative reply into its orders, or return *raw* unusable."""
+        try:
+            narrative = yaml.safe_load(raw) if fmt == "yaml" else json.loads(raw)
+        except (yaml.YAMLError, json.JSONDecodeError):
+            return raw
+        if not isinstance(narrative, dict) or not narrative.get("customer_id"):
+            return raw
+        try:
+            history = self._merge_narrative(narrative)
+        except (KeyError, TypeError, ValueError):   # echoes missing or mangled
+            return raw
+        if fmt in ("txt", "text"):
+            return self.render_text(history)
+        return history
+
     # ------------------------------------------------------------------ #
     # Misc.                                                              #
     # ------------------------------------------------------------------ #
@@ -4,21 +4,118 @@ Financial Transaction Data Generator.
 This module provides a tool to generate synthetic financial transaction data
 for testing and development purposes. Supports various output formats including
 JSON, YAML, and text.
+
+With ``--local-ledger`` the numbers are not left to the model: the ledger
+(dates, amounts, categories, running balances and the optional fraudulent
+duplicate) is drawn locally with NumPy from a generator seeded by the
+statement id, and the model only writes a description per line plus a
+summary. The reply echoes the statement id, account type, period, line
+count and duplicate flag, and ``post_process`` rebuilds the ledger from those
+echoes alone (not from today's date or the current settings) before merging
+the narrative into it, so the record always balances and matches the
+prompt, in whatever process and however late (response cache, resumed run)
+the reply is processed.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import random
 import uuid
 from datetime import date, timedelta
-from typing import Any
+from types import ModuleType
+from typing import Any, Final
 
 import yaml
+from pydantic import BaseModel
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
+# Debit categories of the local ledger: name -> (share of lines, median
+# amount in USD, sigma of the log-normal amount)
+_DEBIT_CATEGORIES: Final[dict[str, tuple[float, float, float]]] = {
+    "groceries": (0.45, 55.0, 0.5),
+    "utilities": (0.15, 95.0, 0.4),
+    "other": (0.40, 30.0, 0.9),
+}
+# Description used when the model leaves a ledger line without one
+_FALLBACK_DESCRIPTIONS: Final[dict[str, str]] = {
+    "groceries": "Grocery purchase",
+    "salary": "Salary deposit",
+    "utilities": "Utility bill payment",
+    "other": "Card purchase",
+}
+# Most lines a local ledger may have; longer echoes are rejected
+_MAX_LEDGER_LINES: Final[int] = 1000
+
+
+def _flag(value: Any) -> bool:  # noqa: ANN401
+    """An echoed yes/no value: a boolean, or its JSON/YAML spelling."""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "yes"):
+        return True
+    if text in ("false", "no"):
+        return False
+    raise ValueError(f"not a yes/no value: {value!r}")
+
+
+def _numpy() -> ModuleType:
+    """Import NumPy, which only the local ledger needs."""
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImportError(
+            "The local ledger requires the 'numpy' package (pip install numpy)."
+        ) from exc
+    return numpy
+
+
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class Transaction(RecordModel):
+    """One statement line."""
+
+    tx_id: str
+    date: str
+    description: str
+    amount: float
+    balance_after: float
+    category: str
+
+
+class AccountStatement(RecordModel):
+    """JSON record produced by :class:`FinancialTransactionTool`."""
+
+    statement_id: str
+    account_id: str
+    account_type: str
+    start_date: str
+    end_date: str
+    opening_balance: float
+    closing_balance: float
+    currency: str
+    summary: str | None = None
+    transactions: list[Transaction]
+
+
+class StatementNarrative(RecordModel):
+    """What the model writes for a locally built ledger."""
+
+    statement_id: str
+    account_type: str
+    start_date: str
+    end_date: str
+    line_count: int
+    duplicate_charge: bool
+    summary: str
+    descriptions: list[str]
+
 
 class FinancialTransactionTool(DataGeneratorTool):
     """Generate synthetic bank-account statements with ≥50 transactions."""
@@ -28,6 +125,7 @@ class FinancialTransactionTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "financial-transaction"
     toolName: str = "FinancialTransaction"
+    record_model = AccountStatement
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -38,6 +136,7 @@ class FinancialTransactionTool(DataGeneratorTool):
         self.account_type = account_type or "checking"
         self.transactions_max = 50
         self.fraud_percent = 0
+        self.local_ledger = False
 
     def cli_arguments(self) -> list[dict[str, Any]]:
         """Define scenario-specific CLI flags."""
@@ -73,6 +172,16 @@ class FinancialTransactionTool(DataGeneratorTool):
                     ),
                 },
             },
+            {
+                "flags": ["--local-ledger"],
+                "kwargs": {
+                    "action": "store_true",
+                    "help": (
+                        "Build dates, amounts and balances locally (requires "
+                        "numpy); the model only writes descriptions and a summary."
+                    ),
+                },
+            },
         ]
 
     def validate_args(self, ns: argparse.Namespace) -> None:
@@ -80,6 +189,14 @@ class FinancialTransactionTool(DataGeneratorTool):
         self.account_type = ns.account_type or self.account_type
         self.transactions_max = ns.transactions_max
         self.fraud_percent = max(0, min(100, ns.fraud_percent))
+        self.local_ledger = ns.local_ledger
+        if self.local_ledger:
+            _numpy()                        # fail before the first request
+            if self.transactions_max >= _MAX_LEDGER_LINES:
+                raise ValueError(
+                    f"--transactions-max must be below {_MAX_LEDGER_LINES} "
+                    "with --local-ledger."
+                )
 
     def examples(self) -> list[str]:
         """Usage examples for help text."""
@@ -90,9 +207,20 @@ class FinancialTransactionTool(DataGeneratorTool):
             "--account-type savings "
             "--transactions-max 75 "
             "--output-format json "
-            "--out-dir ./data/financial"
+            "--out-dir ./data/financial",
+            "python -m data_generator "
+            "--scenario financial-transaction "
+            "--count 100 "
+            "--local-ledger "
+            "--fraud-percent 10 "
+            "--out-dir ./data/financial",
         ]
 
+    @property
+    def response_model(self) -> type[BaseModel] | None:
+        """The narrative alone when the ledger is built locally."""
+        return StatementNarrative if self.local_ledger else self.record_model
+
     # ------------------------------------------------------------------ #
     # Output formats                                                     #
     # ------------------------------------------------------------------ #
@@ -126,13 +254,19 @@ class FinancialTransactionTool(DataGeneratorTool):
 
     def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
         """Assemble the full prompt for the desired format."""
+        if self.local_ledger:
+            return self._narrative_prompt(output_format, unique_id=unique_id)
         hdr = self._prompt_common(unique_id=unique_id)
+        details = (
+            f"Statement ID: {hdr['statement_id']}\n"
+            f"Account ID: {hdr['account_id']}\n"
+            f"Account Type: {hdr['account_type']}\n"
+            f"Start Date: {hdr['start_date']}\n"
+            f"End Date: {hdr['end_date']}\n"
+        )
         base = (
             "You are a banking data specialist creating realistic but entirely "
             "fictional account statements. No real PII.\n\n"
-            f"Statement ID: {hdr['statement_id']}\n"
-            f"Account ID: {hdr['account_id']} ({hdr['account_type']})\n"
-            f"Period: {hdr['start_date']} - {hdr['end_date']}\n\n"
             f"Generate at least {self.transactions_max} transactions: dates, "
             f"descriptions, amounts, "
             "running balances; use ISO-8601 dates and two-decimal USD amounts.\n\n"
@@ -144,26 +278,27 @@ class FinancialTransactionTool(DataGeneratorTool):
                 + "or slight amount mismatch).\n\n"
             )
         if output_format == "yaml":
-            return base + self._yaml_skeleton(hdr)
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton(hdr)
-        return base + self._text_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
     # ------------------------------------------------------------------ #
-    def _yaml_skeleton(self, hdr: dict[str, str]) -> str:
+    def _yaml_skeleton(self) -> str:
         """YAML schema instructions including echo fields."""
         return (
             "Return valid YAML only (no fences).\n\n"
-            f"statement_id: {hdr['statement_id']}\n"
-            f"account_id: {hdr['account_id']}\n"
-            f"account_type: {hdr['account_type']}\n"
-            f"start_date: {hdr['start_date']}\n"
-            f"end_date: {hdr['end_date']}\n"
+            "statement_id: (echo above)\n"
+            "account_id: (echo above)\n"
+            "account_type: (echo above)\n"
+            "start_date: (echo above)\n"
+            "end_date: (echo above)\n"
             "opening_balance: decimal number\n"
             "closing_balance: decimal number\n"
             "currency: USD\n"
+            "summary: two sentences on the month's activity\n"
             "transactions:\n"
             "  - tx_id: uuid\n"
             "    date: ISO 8601\n"
@@ -174,19 +309,20 @@ class FinancialTransactionTool(DataGeneratorTool):
             f"# repeat for ≥{self.transactions_max} transactions\n"
         )
 
-    def _json_skeleton(self, hdr: dict[str, str]) -> str:
+    def _json_skeleton(self) -> str:
         """JSON schema instructions including echo fields."""
         return (
             "Return valid JSON only (no fences).\n\n"
             "{\n"
-            f'  "statement_id": "{hdr["statement_id"]}",\n'
-            f'  "account_id": "{hdr["account_id"]}",\n'
-            f'  "account_type": "{hdr["account_type"]}",\n'
-            f'  "start_date": "{hdr["start_date"]}",\n'
-            f'  "end_date": "{hdr["end_date"]}",\n'
+            '  "statement_id": "(echo above)",\n'
+            '  "account_id": "(echo above)",\n'
+            '  "account_type": "(echo above)",\n'
+            '  "start_date": "(echo above)",\n'
+            '  "end_date": "(echo above)",\n'
             '  "opening_balance": 1234.56,\n'
             '  "closing_balance": 2345.67,\n'
             '  "currency": "USD",\n'
+            '  "summary": "two sentences on the month\'s activity",\n'
             '  "transactions": [\n'
             "    { \"tx_id\": \"uuid\", \"date\": \"ISO\", \"description\": \"text\", "
             "\"amount\": -12.34, \"balance_after\": 1222.22, "
@@ -208,12 +344,279 @@ class FinancialTransactionTool(DataGeneratorTool):
             f"# ... ≥{self.transactions_max} rows ...\n"
         )
 
+    # ------------------------------------------------------------------ #
+    # Local ledger                                                       #
+    # ------------------------------------------------------------------ #
+    def _ledger_header(self, statement_id: str) -> dict[str, Any]:
+        """
+        Account type, period, line count and duplicate flag of a new
+        statement: the last full month, two salary credits plus
+        *transactions_max* - 2 debits, and with *fraud_percent* chance
+        (seeded by the id) one debit charged twice. The reply echoes these,
+        so later runs need not agree.
+        """
+        start, end = self._statement_period()
+        debits = max(self.transactions_max - 2, 0)
+        duplicate = (
+            debits > 0
+            and random.Random(f"{self.name}:{statement_id}").random()
+            < self.fraud_percent / 100
+        )
+        return {
+            "account_type": self.account_type,
+            "start_date": start,
+            "end_date": end,
+            "lines": 2 + debits + duplicate,
+            "duplicate": duplicate,
+        }
+
+    def build_ledger(
+        self,
+        statement_id: str,
+        start_date: Any,  # noqa: ANN401
+        end_date: Any,  # noqa: ANN401
+        *,
+        account_type: str,
+        lines: int,
+        duplicate: bool = False,
+    ) -> tuple[dict[str, Any], dict[int, int]]:
+        """
+        Draw the *account_type* statement *statement_id* with empty
+        descriptions.
+
+        The statement covers *start_date* to *end_date* (ISO dates, or dates
+        as YAML reads them) in *lines* lines; with *duplicate* one debit is
+        charged twice. Everything is vectorised over the lines and seeded by
+        the statement id, so the same arguments always yield the same
+        ledger. Amounts are whole cents and each running balance is the
+        cumulative sum, so the closing balance is exactly the opening balance
+        plus the amounts. Two salary credits (mid-month and period end) fund
+        log-normal debits.
+
+        Raises
+        ------
+        ValueError
+            If the period or line count cannot hold such a statement, or
+            the line count exceeds the ledger limit.
+
+        Returns
+        -------
+        tuple[dict[str, Any], dict[int, int]]
+            The statement in :class:`AccountStatement` layout, and the
+            fraudulent duplicate (0-based line -> line it copies), if any.
+        """
+        if lines > _MAX_LEDGER_LINES:
+            raise ValueError(
+                f"{lines} lines exceed the ledger limit of {_MAX_LEDGER_LINES}."
+            )
+        np = _numpy()
+        seed = int.from_bytes(
+            hashlib.sha256(statement_id.encode()).digest()[:8], "big"
+        )
+        rng = np.random.default_rng(seed)
+        first = date.fromisoformat(str(start_date))
+        last = date.fromisoformat(str(end_date))
+        days = (last - first).days + 1
+        if days < 1:
+            raise ValueError(f"Statement period {first} to {last} is empty.")
+        start, end = first.isoformat(), last.isoformat()
+
+        pay_days = np.array([min(14, days - 1), days - 1])
+        salary = rng.integers(150_000, 450_000)
+        debits = lines - len(pay_days) - duplicate
+        if debits < duplicate:
+            raise ValueError(
+                f"{lines} lines cannot hold the salary credits"
+                + (" and a duplicate charge." if duplicate else ".")
+            )
+        names = list(_DEBIT_CATEGORIES)
+        shares, medians, sigmas = (
+            np.array(column) for column in zip(*_DEBIT_CATEGORIES.values(), strict=True)
+        )
+        kinds = rng.choice(len(names), size=debits, p=shares / shares.sum())
+        debit_cents = np.maximum(
+            np.rint(rng.lognormal(np.log(medians[kinds] * 100), sigmas[kinds])), 1
+        ).astype(np.int64)
+
+        day = np.concatenate([pay_days, rng.integers(0, days, size=debits)])
+        cents = np.concatenate([np.full(len(pay_days), salary), -debit_cents])
+        category = np.concatenate(
+            [np.full(len(pay_days), "salary"), np.array(names)[kinds]]
+        )
+        order = np.argsort(day, kind="stable")
+        day, cents, category = day[order], cents[order], category[order]
+
+        duplicates: dict[int, int] = {}
+        if duplicate:
+            original = int(rng.choice(np.flatnonzero(cents < 0)))
+            day = np.insert(day, original + 1, day[original])
+            cents = np.insert(cents, original + 1, cents[original])
+            category = np.insert(category, original + 1, category[original])
+            duplicates[original + 1] = original
+
+        opening = int(rng.integers(100_000, 1_000_000))
+        balance = opening + np.cumsum(cents)
+        raw_ids = rng.bytes(16 * len(cents))
+        tx_ids = [
+            str(uuid.UUID(bytes=raw_ids[i : i + 16], version=4))
+            for i in range(0, len(raw_ids), 16)
+        ]
+        dates = (np.datetime64(start) + day).astype(str)
+        return (
+            {
+                "statement_id": statement_id,
+                "account_id": str(rng.integers(10**9, 10**10)),
+                "account_type": account_type,
+                "start_date": start,
+                "end_date": end,
+                "opening_balance": opening / 100,
+                "closing_balance": int(balance[-1]) / 100,
+                "currency": "USD",
+                "summary": None,
+                "transactions": [
+                    {
+                        "tx_id": tx_id,
+                        "date": tx_date,
+                        "description": "",
+                        "amount": amount,
+                        "balance_after": balance_after,
+                        "category": tx_category,
+                    }
+                    for tx_id, tx_date, amount, balance_after, tx_category in zip(
+                        tx_ids,
+                        dates.tolist(),
+                        (cents / 100).tolist(),
+                        (balance / 100).tolist(),
+                        category.tolist(),
+                        strict=True,
+                    )
+                ],
+            },
+            duplicates,
+        )
+
+    def _narrative_prompt(self, output_format: str, *, unique_id: str | None) -> str:
+        """Prompt asking for the descriptions and summary of a local ledger."""
+        statement_id = unique_id or str(uuid.uuid4())
+        header = self._ledger_header(statement_id)
+        statement, duplicates = self.build_ledger(
+            statement_id,
+            header["start_date"],
+            header["end_date"],
+            account_type=header["account_type"],
+            lines=header["lines"],
+            duplicate=header["duplicate"],
+        )
+        lines = "".join(
+            f"{number} | {tx['date']} | {tx['amount']:.2f} | {tx['category']}"
+            + (
+                f" | same merchant as line {duplicates[number - 1] + 1}"
+                if number - 1 in duplicates
+                else ""
+            )
+            + "\n"
+            for number, tx in enumerate(statement["transactions"], start=1)
+        )
+        details = (
+            f"Statement ID: {statement['statement_id']}\n"
+            f"Account Type: {statement['account_type']}\n"
+            f"Start Date: {statement['start_date']}\n"
+            f"End Date: {statement['end_date']}\n"
+            f"Line Count: {header['lines']}\n"
+            f"Duplicate Charge: {'true' if header['duplicate'] else 'false'}\n"
+            f"Opening Balance: {statement['opening_balance']:.2f} USD\n"
+            f"Closing Balance: {statement['closing_balance']:.2f} USD\n\n"
+            "Ledger (line | date | amount | category):\n"
+            f"{lines}"
+        )
+        base = (
+            "You are a banking data specialist writing realistic but entirely "
+            "fictional account statements. No real PII.\n\n"
+            "The ledger under RECORD DETAILS is final. Write a short "
+            "merchant-style description for every ledger line, in line order, "
+            "that fits its category and amount (e.g. 'Greenway Market #214', "
+            "'Northwind Corp payroll'), and a two-sentence summary of the "
+            "month's activity. Do not repeat dates, amounts or balances.\n\n"
+        )
+        if self.fraud_percent > 0:
+            base += (
+                "A line marked 'same merchant as line N' must reuse the "
+                "description of line N word for word.\n\n"
+            )
+        # Text statements are rendered locally from the same JSON narrative
+        if output_format == "yaml":
+            skeleton = (
+                "Return valid YAML only (no fences).\n\n"
+                "statement_id: (echo above)\n"
+                "account_type: (echo above)\n"
+                "start_date: (echo above)\n"
+                "end_date: (echo above)\n"
+                "line_count: (echo above)\n"
+                "duplicate_charge: (echo above)\n"
+                "summary: two sentences\n"
+                "descriptions:\n"
+                "  - one per ledger line, in order\n"
+            )
+        else:
+            skeleton = (
+                "Return valid JSON only (no fences).\n\n"
+                "{\n"
+                '  "statement_id": "(echo above)",\n'
+                '  "account_type": "(echo above)",\n'
+                '  "start_date": "(echo above)",\n'
+                '  "end_date": "(echo above)",\n'
+                '  "line_count": (echo above, a number),\n'
+                '  "duplicate_charge": (echo above, true or false),\n'
+                '  "summary": "two sentences",\n'
+                '  "descriptions": ["one per ledger line, in order"]\n'
+                "}\n"
+            )
+        return self.compose_prompt(base + skeleton, details)
+
+    def _merge_narrative(self, narrative: dict[str, Any]) -> dict[str, Any]:
+        """
+        Rebuild the ledger from the echoed statement id, account type,
+        period, line count and duplicate flag and fill in the model's
+        descriptions and summary; lines it left out get a generic
+        description. Raises *KeyError*, *TypeError* or *ValueError* when the
+        echoes are missing or invalid.
+        """
+        statement, _duplicates = self.build_ledger(
+            str(narrative["statement_id"]),
+            narrative["start_date"],
+            narrative["end_date"],
+            account_type=str(narrative["account_type"]),
+            lines=int(narrative["line_count"]),
+            duplicate=_flag(narrative["duplicate_charge"]),
+        )
+        descriptions = narrative.get("descriptions")
+        if not isinstance(descriptions, list):
+            descriptions = []
+        for number, tx in enumerate(statement["transactions"]):
+            description = descriptions[number] if number < len(descriptions) else None
+            tx["description"] = (
+                str(description).strip()
+                if description
+                else _FALLBACK_DESCRIPTIONS[tx["category"]]
+            )
+        summary = narrative.get("summary")
+        statement["summary"] = str(summary).strip() if summary else None
+        return statement
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
     def post_process(self, raw: str, output_format: str) -> Any:
-        """Deserialize based on output_format; fallback to raw text on failure."""
+        """
+        Deserialize based on output_format; fallback to raw text on failure.
+
+        With the local ledger the reply is the narrative (JSON, or YAML for
+        ``yaml``), merged into the rebuilt ledger; text statements are then
+        rendered locally.
+        """
         fmt = output_format.lower()
+        if self.local_ledger:
+            return self._post_process_narrative(raw, fmt)
         if fmt == "json":
             try:
                 return json.loads(raw)
@@ -227,6 +630,22 @@ class FinancialTransactionTool(DataGeneratorTool):
         # text or other formats
         return raw
 
+    def _post_process_narrative(self, raw: str, fmt: str) -> Any:
+        """Merge a narrative reply into its ledger, or return *raw* unusable."""
+        try:
+            narrative = yaml.safe_load(raw) if fmt == "yaml" else json.loads(raw)
+        except (yaml.YAMLError, json.JSONDecodeError):
+            return raw
+        if not isinstance(narrative, dict) or not narrative.get("statement_id"):
+            return raw
+        try:
+            statement = self._merge_narrative(narrative)
+        except (KeyError, TypeError, ValueError):
+            return raw
+        if fmt in ("txt", "text"):
+            return self.render_text(statement)
+        return statement
+
     # ------------------------------------------------------------------ #
     # Misc.                                                              #
     # ------------------------------------------------------------------ #
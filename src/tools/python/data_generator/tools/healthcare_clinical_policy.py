@@ -13,13 +13,248 @@ import json
 import random
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class Author(RecordModel):
+    """Fictional clinician who wrote the policy."""
+
+    name: str
+    title: str
+    department: str
+    email: str
+
+
+class PolicyApprover(RecordModel):
+    """Fictional clinician who approved the policy."""
+
+    name: str
+    title: str
+    department: str
+    approved_at: str
+
+
+class Scope(RecordModel):
+    """Who and where the policy applies to."""
+
+    patient_populations: list[str]
+    clinical_settings: list[str]
+    exclusion_criteria: list[str]
+
+
+class Background(RecordModel):
+    """Clinical rationale and evidence."""
+
+    clinical_rationale: str
+    epidemiology: str
+    current_evidence_summary: str
+
+
+class DecisionPoint(RecordModel):
+    """Branch of a care pathway phase."""
+
+    criteria: str
+    action_if_met: str
+    action_if_not_met: str
+
+
+class ClinicalIntervention(RecordModel):
+    """Intervention carried out in a care pathway phase."""
+
+    intervention: str
+    indication: str
+    procedure: str
+    responsible_role: str
+
+
+class PathwayPhase(RecordModel):
+    """One phase of the care pathway."""
+
+    phase_number: int
+    phase_name: str
+    description: str
+    timeframe: str
+    decision_points: list[DecisionPoint]
+    clinical_interventions: list[ClinicalIntervention]
+
+
+class CarePathway(RecordModel):
+    """Ordered phases of care."""
+
+    phases: list[PathwayPhase]
+
+
+class ProcedureStep(RecordModel):
+    """One numbered step of a clinical procedure."""
+
+    step_number: int
+    action: str
+    details: str
+    safety_considerations: str | None = None
+
+
+class ClinicalProcedure(RecordModel):
+    """Procedure with its indication and steps."""
+
+    procedure_name: str
+    indication: str
+    contraindications: list[str]
+    steps: list[ProcedureStep]
+
+
+class InitialAssessment(RecordModel):
+    """Assessment made when the patient enters the pathway."""
+
+    assessment_area: str
+    criteria: str
+    tools: str
+
+
+class MonitoringParameter(RecordModel):
+    """Parameter monitored during care."""
+
+    parameter: str
+    frequency: str
+    abnormal_value_action: str
+
+
+class PatientAssessment(RecordModel):
+    """Initial assessment and ongoing monitoring."""
+
+    initial_assessment: list[InitialAssessment]
+    ongoing_monitoring: list[MonitoringParameter]
+
+
+class RiskLevel(RecordModel):
+    """Management approach for one risk level."""
+
+    risk_level: Literal["low", "moderate", "high", "critical"]
+    criteria: str
+    management_approach: str
+    escalation_triggers: str
+
+
+class TreatmentOption(RecordModel):
+    """Treatment with indications and monitoring."""
+
+    option_name: str
+    indication: str
+    contraindications: list[str]
+    dosing_regimen: str | None = None
+    monitoring_requirements: str
+    expected_outcomes: str
+
+
+class QualityIndicator(RecordModel):
+    """Outcome measure of the policy."""
+
+    indicator_name: str
+    measurement_method: str
+    target_value: str
+
+
+class TeamRole(RecordModel):
+    """Role in the multidisciplinary team."""
+
+    role: str
+    responsibilities: list[str]
+
+
+class PatientCommunication(RecordModel):
+    """Information and consent requirements."""
+
+    information_to_provide: list[str]
+    consent_requirements: str
+    shared_decision_making: str
+
+
+class DocumentationRequirement(RecordModel):
+    """Document to be kept and when."""
+
+    document_type: str
+    required_elements: list[str]
+    timing: str
+
+
+class Reference(RecordModel):
+    """Cited guideline or evidence source."""
+
+    citation: str
+    evidence_level: str
+    url: str | None = None
+
+
+class RelatedPolicy(RecordModel):
+    """Link to another policy."""
+
+    policy_title: str
+    policy_id: str
+    relationship: str
+
+
+class Appendix(RecordModel):
+    """Supporting material."""
+
+    title: str
+    content: str
+
+
+class VersionEntry(RecordModel):
+    """One entry of the version history."""
+
+    version: str
+    date: str
+    author: str
+    changes: str
+
+
+class ClinicalPolicy(RecordModel):
+    """JSON record produced by :class:`HealthcareClinicalPolicyTool`."""
+
+    policy_id: str
+    version: str
+    created_at: str
+    last_updated: str
+    title: str
+    specialty: str
+    policy_type: str
+    complexity: Literal["simple", "medium", "complex"]
+    approval_status: Literal[
+        "draft", "under_review", "approved", "active", "superseded", "archived"
+    ]
+    evidence_level: str
+    review_frequency: str
+    effective_date: str
+    next_review_date: str
+    author: Author
+    approvers: list[PolicyApprover]
+    purpose: str
+    scope: Scope
+    background: Background
+    care_pathway: CarePathway
+    clinical_procedures: list[ClinicalProcedure]
+    patient_assessment: PatientAssessment
+    risk_stratification: list[RiskLevel]
+    treatment_options: list[TreatmentOption]
+    quality_indicators: list[QualityIndicator]
+    multidisciplinary_team: list[TeamRole]
+    patient_communication: PatientCommunication
+    documentation_requirements: list[DocumentationRequirement]
+    references: list[Reference]
+    related_policies: list[RelatedPolicy]
+    appendices: list[Appendix]
+    version_history: list[VersionEntry]
+    tags: list[str]
+
+
 class HealthcareClinicalPolicyTool(DataGeneratorTool):
     """Generate synthetic clinical healthcare policy documents."""
 
@@ -28,6 +263,7 @@ class HealthcareClinicalPolicyTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "healthcare-clinical-policy"
     toolName: str = "HealthcareClinicalPolicy"
+    record_model = ClinicalPolicy
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -189,6 +425,7 @@ class HealthcareClinicalPolicyTool(DataGeneratorTool):
         if fmt == "text":
             fmt = "txt"
 
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a clinical healthcare policy specialist generating REALISTIC "
             "but ENTIRELY FICTIONAL clinical policy documents based on real-world "
@@ -197,7 +434,6 @@ class HealthcareClinicalPolicyTool(DataGeneratorTool):
             f"Specialty: {self.specialty}\n"
             f"Policy Type: {self.policy_type}\n"
             f"Complexity Level: {self.complexity}\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "## ON POLICY CONTENT\n\n"
             "Clinical policies should include:\n"
             "- Clear policy title and purpose statement\n"
@@ -222,11 +458,11 @@ class HealthcareClinicalPolicyTool(DataGeneratorTool):
         )
 
         if fmt == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if fmt == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # Plain text is the default
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -634,6 +870,23 @@ class HealthcareClinicalPolicyTool(DataGeneratorTool):
             "TAGS: tag1, tag2, tag3\n"
         )
 
+    # ------------------------------------------------------------------ #
+    # Hierarchical generation                                            #
+    # ------------------------------------------------------------------ #
+    _SECTION_FIELDS: tuple[str, ...] = (
+        "clinical_procedures",
+        "treatment_options",
+        "appendices",
+    )
+
+    @property
+    def section_fields(self) -> tuple[str, ...]:
+        """
+        Procedures, treatment options and appendices, one per call, for
+        ``complex`` policies; shorter policies are written in one go.
+        """
+        return self._SECTION_FIELDS if self.complexity == "complex" else ()
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
@@ -16,9 +16,55 @@ from typing import Any
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class PatientDetails(RecordModel):
+    """Fictional patient the document is about."""
+
+    fictional_name: str
+    age: int
+    gender: str
+    fictional_patient_id: str
+
+
+class DocumentSection(RecordModel):
+    """One headed section of the document."""
+
+    heading: str
+    content: str
+
+
+class DocumentContent(RecordModel):
+    """Title and body of the document."""
+
+    title: str
+    sections: list[DocumentSection]
+
+
+class AuthorDetails(RecordModel):
+    """Fictional clinician who wrote the document."""
+
+    fictional_doctor_name: str
+    fictional_clinic_name: str
+
+
+class HealthcareDocument(RecordModel):
+    """JSON record produced by :class:`HealthcareRecordTool`."""
+
+    record_id: str
+    document_type: str
+    specialty: str
+    created_at: str
+    patient_details: PatientDetails
+    document_content: DocumentContent
+    author_details: AuthorDetails
+
+
 class HealthcareRecordTool(DataGeneratorTool):
     """Generate synthetic healthcare records in YAML, JSON or plain-text."""
 
@@ -27,6 +73,7 @@ class HealthcareRecordTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "healthcare-record"
     toolName: str = "HealthcareRecord"
+    record_model = HealthcareDocument
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -105,16 +152,16 @@ class HealthcareRecordTool(DataGeneratorTool):
 
     def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
         """Assemble the full LLM prompt for the desired format."""
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are an AI assistant generating realistic but entirely FICTIONAL "
             "and ANONYMIZED healthcare documents. No real PII.\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
         )
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
-        return base + self._text_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -4,6 +4,10 @@ HR Employee Record Data Generator.
 This module provides a tool to generate synthetic HR employee record data
 for testing and development purposes. Supports various output formats including
 JSON, YAML, and text.
+
+With an entity pool (``--entity-pool``) each record is about a pooled
+employee, drawn by the record id from ``--department`` (or from all staff if
+the pool has no such department); ``employee_profile`` comes from the pool.
 """
 
 from __future__ import annotations
@@ -16,9 +20,64 @@ from typing import Any
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class EmployeeProfile(RecordModel):
+    """Fictional employee the record is about."""
+
+    fictional_employee_id: str
+    name: str
+    email: str
+    manager: str
+
+
+class DocumentSection(RecordModel):
+    """One headed section of the document."""
+
+    heading: str
+    content: str
+
+
+class HRDocument(RecordModel):
+    """Title and body of the HR document."""
+
+    title: str
+    sections: list[DocumentSection]
+
+
+class EffectiveDates(RecordModel):
+    """Period the document applies to."""
+
+    start: str
+    end: str | None = None
+
+
+class Approval(RecordModel):
+    """Sign-off on the document."""
+
+    approver: str
+    status: str
+    timestamp: str
+
+
+class EmployeeRecord(RecordModel):
+    """JSON record produced by :class:`HREmployeeRecordTool`."""
+
+    record_id: str
+    created_at: str
+    record_type: str
+    department: str
+    employee_profile: EmployeeProfile
+    document: HRDocument
+    effective_dates: EffectiveDates
+    approvals: list[Approval]
+
+
 class HREmployeeRecordTool(DataGeneratorTool):
     """Generate synthetic HR employee records in YAML, JSON or plain-text."""
 
@@ -27,6 +86,8 @@ class HREmployeeRecordTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "hr-employee-record"
     toolName: str = "HREmployeeRecord"
+    record_model = EmployeeRecord
+    entity_kinds = ("employees",)
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -101,30 +162,63 @@ class HREmployeeRecordTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     # Prompt construction                                                #
     # ------------------------------------------------------------------ #
+    def _employee(self, record_id: str) -> dict[str, Any] | None:
+        """The pooled employee of *record_id*; ``None`` without an entity pool."""
+        pool = self.entity_pool
+        if pool is None:
+            return None
+        if pool.entities("employees", department=self.department):
+            return pool.sample("employees", record_id, department=self.department)[0]
+        # Departments missing from the pool draw from all staff
+        return pool.sample("employees", record_id)[0]
+
+    def _employee_profile(self, employee: dict[str, Any]) -> dict[str, str]:
+        """``employee_profile`` of a pooled *employee*."""
+        manager = None
+        if self.entity_pool is not None and employee["manager_id"]:
+            manager = self.entity_pool.get("employees", employee["manager_id"])
+        return {
+            "fictional_employee_id": employee["employee_id"],
+            "name": employee["name"],
+            "email": employee["email"],
+            "manager": manager["name"] if manager else "Executive team",
+        }
+
     def _prompt_common(self, *, unique_id: str | None = None) -> str:
         """Common header with record ID and timestamp."""
         record_id = unique_id or str(uuid.uuid4())
         created_at = datetime.now(timezone.utc).isoformat()
+        employee = self._employee(record_id)
+        pooled = ""
+        if employee is not None:
+            profile = self._employee_profile(employee)
+            pooled = (
+                f"Employee (immutable): {employee['employee_id']}, "
+                f"{employee['name']} <{employee['email']}>, {employee['title']}, "
+                f"hired {employee['hired_on']}\n"
+                f"Manager (immutable): {profile['manager']}\n"
+            )
         return (
             f"Record ID: {record_id}\n"
             f"Created At: {created_at}\n"
             f"Record Type: {self.record_type}\n"
-            f"Department: {self.department}\n\n"
+            f"Department: {self.department}\n"
+            f"{pooled}\n"
         )
 
     def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
         """Assemble the full LLM prompt for the desired format."""
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are an AI assistant generating realistic but entirely FICTIONAL "
             "and ANONYMIZED HR employee records. Strictly no real PII. "
             "Use clearly fake names, emails, and IDs.\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
         )
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
-        return base + self._text_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -219,17 +313,25 @@ class HREmployeeRecordTool(DataGeneratorTool):
         fmt = output_format.lower()
         if fmt == "json":
             try:
-                return json.loads(raw)
+                return self._apply_pool(json.loads(raw))
             except json.JSONDecodeError:
                 return raw
         if fmt == "yaml":
             try:
-                return yaml.safe_load(raw)
+                return self._apply_pool(yaml.safe_load(raw))
             except yaml.YAMLError:
                 return raw
         # plain-text or unrecognized format ('txt'/'text' -> return raw)
         return raw
 
+    def _apply_pool(self, record: Any) -> Any:  # noqa: ANN401
+        """Put the pooled employee into a parsed *record*."""
+        if isinstance(record, dict) and record.get("record_id"):
+            employee = self._employee(str(record["record_id"]))
+            if employee is not None:
+                record["employee_profile"] = self._employee_profile(employee)
+        return record
+
     # ------------------------------------------------------------------ #
     # Misc.                                                              #
     # ------------------------------------------------------------------ #
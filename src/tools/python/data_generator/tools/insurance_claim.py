@@ -118,30 +118,28 @@ class InsuranceClaimTool(DataGeneratorTool):
         status = random.choice(self._STATUS)
         fraudulent = random.random() < (self.fraud_percent / 100.0)
 
-        base = (
-            "You are an insurance adjuster generating REALISTIC BUT ENTIRELY "
-            "FICTIONAL insurance claim records for demonstrations.\n\n"
-            "## CLAIM OVERVIEW\n\n"
+        details = (
             f"Claim ID: {claim_id}\n"
             f"Policy Type: {self.policy_type}\n"
             f"Incident: {self._random_incident()}\n"
             f"Date of Loss: {date_of_loss.isoformat()}\n"
             f"Status: {status}\n"
         )
-
         if fraudulent:
-            base += "This claim MAY BE FRAUDULENT - add subtle anomalies.\n"
+            details += "This claim MAY BE FRAUDULENT - add subtle anomalies.\n"
 
         # The kernel will substitute {{index}} with an incremental int.
-        base += (
-            "\n## REQUIRED OUTPUT\n\n"
+        base = (
+            "You are an insurance adjuster generating REALISTIC BUT ENTIRELY "
+            "FICTIONAL insurance claim records for demonstrations.\n\n"
+            "## REQUIRED OUTPUT\n\n"
             "Provide a single claim document with realistic data fields.\n"
             f"Respond in {output_format.upper()} only - no commentary.\n"
             "Do NOT invent real PII. Use synthetic names and addresses.\n"
             "Use ISO-8601 dates.\n"
             "Index placeholder: {{index}}\n"
         )
-        return base
+        return self.compose_prompt(base, details)
 
     # ------------------------------------------------------------------ #
     # Post-processing & helpers                                          #
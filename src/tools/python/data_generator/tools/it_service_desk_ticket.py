@@ -14,15 +14,61 @@ import logging
 import random
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class Requester(RecordModel):
+    """Fictional person who raised the ticket."""
+
+    name: str
+    email: str
+
+
+class WorkNote(RecordModel):
+    """Timestamped note on the ticket."""
+
+    timestamp: str
+    author: str
+    note: str
+
+
+class Resolution(RecordModel):
+    """How and when the ticket was resolved."""
+
+    resolved_at: str | None = None
+    summary: str | None = None
+
+
+class ServiceDeskTicket(RecordModel):
+    """JSON record produced by :class:`ITServiceDeskTicketTool`."""
+
+    ticket_id: str
+    created_at: str
+    ticket_type: Literal["incident", "request", "change"]
+    service: str
+    requester: Requester
+    priority: Literal["P1", "P2", "P3", "P4"]
+    impact: Literal["high", "medium", "low"]
+    urgency: Literal["high", "medium", "low"]
+    status: Literal["new", "assigned", "in_progress", "resolved", "closed"]
+    assignment_group: str
+    assignee: str | None = None
+    description: str
+    work_notes: list[WorkNote]
+    resolution: Resolution | None = None
+    sla_hours: int
+
+
 class ITServiceDeskTicketTool(DataGeneratorTool):
     """Generate synthetic IT service desk tickets in YAML, JSON or plain-text."""
 
@@ -31,6 +77,7 @@ class ITServiceDeskTicketTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "it-service-desk-ticket"
     toolName: str = "ITServiceDeskTicket"
+    record_model = ServiceDeskTicket
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -156,13 +203,13 @@ class ITServiceDeskTicketTool(DataGeneratorTool):
         if fmt == "text":
             fmt = "txt"
 
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a helpful IT service desk agent generating REALISTIC BUT ENTIRELY "
             "FICTIONAL IT service desk tickets for demonstrations.\n\n"
             "## ON THE TICKET\n\n"
             f"The service area being simulated: {self.service}\n"
             f"Ticket type: {self.ticket_type}\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "## ON TICKET LIFECYCLE\n\n"
             "Tickets should include appropriate fields for the ticket lifecycle "
             "including requester information, work notes with realistic "
@@ -171,11 +218,11 @@ class ITServiceDeskTicketTool(DataGeneratorTool):
         )
 
         if fmt == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if fmt == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # Plain text is the default
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -270,6 +317,21 @@ class ITServiceDeskTicketTool(DataGeneratorTool):
             "SLA Hours: (echo above)\n"
         )
 
+    def _text_list_item(
+        self,
+        key: str,
+        item: Any,  # noqa: ANN401
+        *,
+        indent: str,
+    ) -> list[str]:
+        """Work notes render as ``- [timestamp] author: note``."""
+        if key == "work_notes" and isinstance(item, dict):
+            return [
+                f"{indent}- [{item.get('timestamp', '')}] {item.get('author', '')}: "
+                f"{item.get('note', '')}"
+            ]
+        return super()._text_list_item(key, item, indent=indent)
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
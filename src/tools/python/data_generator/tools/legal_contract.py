@@ -15,11 +15,36 @@ from typing import Any
 
 import yaml  # needed for YAML post-processing
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class Clause(RecordModel):
+    """One clause of the contract."""
+
+    clause_title: str
+    clause_text: str
+
+
+class Contract(RecordModel):
+    """JSON record produced by :class:`LegalContractTool`."""
+
+    contract_id: str
+    contract_type: str
+    title: str
+    parties: list[str]
+    effective_date: str
+    termination_date: str | None = None
+    governing_law: str
+    clauses: list[Clause]
+    full_text: str
+
+
 class LegalContractTool(DataGeneratorTool):
     """Generate synthetic legal contracts."""
 
@@ -28,6 +53,7 @@ class LegalContractTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "legal-contract"
     toolName: str = "LegalContract"
+    record_model = Contract
 
     # ------------------------------------------------------------------ #
     # Contract-specific settings                                         #
@@ -137,19 +163,19 @@ class LegalContractTool(DataGeneratorTool):
         unique_id: str | None = None,
     ) -> str:
         """Construct the full system-prompt string (YAML/JSON/TXT)."""
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a helpful legal assistant creating REALISTIC BUT ENTIRELY "
             "FICTIONAL contracts for demonstrations.\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
         )
 
         fmt = output_format.lower()
         if fmt == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if fmt == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # Plain text is the default
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -214,6 +240,32 @@ class LegalContractTool(DataGeneratorTool):
             "Full Text: concatenated text\n"
         )
 
+    # ------------------------------------------------------------------ #
+    # Hierarchical generation                                            #
+    # ------------------------------------------------------------------ #
+    derived_fields = ("full_text",)
+
+    @property
+    def section_fields(self) -> tuple[str, ...]:
+        """Clauses, one per call."""
+        return ("clauses",)
+
+    def assemble_sections(
+        self, outline: dict[str, Any], sections: dict[str, list[Any]]
+    ) -> dict[str, Any]:
+        """Put the clauses in place and join them into ``full_text``."""
+        record = super().assemble_sections(outline, sections)
+        record["full_text"] = "\n\n".join(
+            [
+                record["title"],
+                *(
+                    f"{clause['clause_title']}\n{clause['clause_text']}"
+                    for clause in record["clauses"]
+                ),
+            ]
+        )
+        return record
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
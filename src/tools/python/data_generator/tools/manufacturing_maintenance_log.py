@@ -4,6 +4,14 @@ Manufacturing Maintenance Log Prompt Builder
 
 Concrete :class:`data_generator.tool.DataGeneratorTool` implementation that
 creates realistic manufacturing maintenance log entries.
+
+With ``--local-numbers`` the equipment tag, maintenance type, status, start
+and end times, duration and parts are drawn locally from a generator seeded
+by the log id and anchored at the record's ``created_at``; the model only
+writes the technician, the issue, the actions and the follow-up tasks.
+``post_process`` rebuilds the job from the echoed id, timestamp, plant, line
+and equipment type alone (not from the current settings) and merges the text
+in, so durations always match the timestamps.
 """
 
 from __future__ import annotations
@@ -11,16 +19,84 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import math
+import random
 import uuid
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Final, Literal
 
 import yaml
+from pydantic import BaseModel
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
+# Median duration in minutes and the largest number of distinct parts used,
+# per maintenance type
+_JOB_SHAPES: Final[dict[str, tuple[float, int]]] = {
+    "inspection": (45.0, 1),
+    "preventive": (120.0, 3),
+    "corrective": (180.0, 5),
+}
+
+
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class PartUsage(RecordModel):
+    """Spare part consumed by the job."""
+
+    part_number: str
+    quantity: int
+
+
+class MaintenanceLog(RecordModel):
+    """JSON record produced by :class:`ManufacturingMaintenanceLogTool`."""
+
+    log_id: str
+    created_at: str
+    plant: str
+    line: str
+    equipment_type: str
+    equipment_id: str
+    maintenance_type: Literal["preventive", "corrective", "inspection"]
+    status: Literal["open", "in_progress", "completed", "deferred"]
+    start_time: str
+    end_time: str | None = None
+    duration_minutes: int
+    technician: str
+    issue_description: str
+    actions_taken: list[str]
+    parts_used: list[PartUsage]
+    follow_up_tasks: list[str] = []
+
+
+class MaintenanceNarrative(RecordModel):
+    """What the model writes for a locally built job."""
+
+    log_id: str
+    created_at: str
+    plant: str
+    line: str
+    equipment_type: str
+    technician: str
+    issue_description: str
+    actions_taken: list[str]
+    follow_up_tasks: list[str] = []
+
+
+def _anchor(value: Any) -> datetime:  # noqa: ANN401
+    """
+    The echoed ``created_at`` as an aware datetime (YAML may already have
+    parsed it); raises *ValueError* if it is not an ISO timestamp.
+    """
+    anchor = (
+        value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    )
+    return anchor if anchor.tzinfo else anchor.replace(tzinfo=timezone.utc)
+
 
 class ManufacturingMaintenanceLogTool(DataGeneratorTool):
     """Generate synthetic manufacturing maintenance log entries."""
@@ -30,6 +106,7 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "manufacturing-maintenance-log"
     toolName: str = "ManufacturingMaintenanceLog"
+    record_model = MaintenanceLog
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -46,6 +123,7 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
         self.plant = plant or "Plant A"
         self.line = line or "Line 1"
         self.equipment_type = equipment_type or "General"
+        self.local_numbers = False
 
     def cli_arguments(self) -> list[dict[str, Any]]:
         """Argparse specification consumed by the top-level CLI wrapper."""
@@ -79,6 +157,16 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
                     ),
                 },
             },
+            {
+                "flags": ["--local-numbers"],
+                "kwargs": {
+                    "action": "store_true",
+                    "help": (
+                        "Build times, durations and parts locally; the model "
+                        "only writes the technician's notes."
+                    ),
+                },
+            },
         ]
 
     def validate_args(self, ns: argparse.Namespace) -> None:
@@ -86,6 +174,7 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
         self.plant = ns.plant or "Plant A"
         self.line = ns.line or "Line 1"
         self.equipment_type = ns.equipment_type or "General"
+        self.local_numbers = bool(getattr(ns, "local_numbers", False))
 
     def examples(self) -> list[str]:
         """Representative usage snippets for `--help` output."""
@@ -96,9 +185,19 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
             '--plant "Plant B" '
             '--line "Line 3" '
             "--equipment-type CNC "
-            "--output-format yaml"
+            "--output-format yaml",
+            "python -m generate_data "
+            "--scenario manufacturing-maintenance-log "
+            "--count 1000 "
+            "--equipment-type Press "
+            "--local-numbers"
         ]
 
+    @property
+    def response_model(self) -> type[BaseModel] | None:
+        """The technician's notes alone when the numbers are built locally."""
+        return MaintenanceNarrative if self.local_numbers else self.record_model
+
     # ------------------------------------------------------------------ #
     # Output formats                                                     #
     # ------------------------------------------------------------------ #
@@ -123,11 +222,13 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
 
     def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
         """Return the full prompt for the requested *output_format*."""
+        if self.local_numbers:
+            return self._narrative_prompt(output_format, unique_id=unique_id)
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are an experienced maintenance technician creating REALISTIC BUT "
             "ENTIRELY FICTIONAL maintenance log entries for manufacturing "
             "equipment.\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "Generate maintenance logs with realistic equipment details, parts used, "
             "durations, and technician notes. Use clearly fake asset tags and "
             "technician names. Ensure all timestamps are in ISO 8601 format.\n\n"
@@ -136,11 +237,11 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
         )
 
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # TEXT
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -229,12 +330,184 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
             "  - task description (optional)\n"
         )
 
+    # ------------------------------------------------------------------ #
+    # Local numbers                                                      #
+    # ------------------------------------------------------------------ #
+    def build_job(
+        self,
+        log_id: str,
+        created_at: Any,  # noqa: ANN401
+        *,
+        plant: str,
+        line: str,
+        equipment_type: str,
+    ) -> dict[str, Any]:
+        """
+        Draw the job logged as *log_id* at *created_at* for *equipment_type*
+        on *plant*/*line*, text left empty.
+
+        The generator is seeded by the log id and the times count back from
+        *created_at*, so the same arguments always yield the same job. Durations
+        are log-normal around a median per maintenance type; completed jobs
+        end before the log was written and their duration is exactly
+        ``end_time - start_time``, other jobs have no end time yet.
+        """
+        rng = random.Random(f"{self.name}:{log_id}")
+        anchor = _anchor(created_at)
+        maintenance_type = rng.choices(tuple(_JOB_SHAPES), weights=(3, 5, 4))[0]
+        median, max_parts = _JOB_SHAPES[maintenance_type]
+        status = rng.choices(
+            ("open", "in_progress", "completed", "deferred"), weights=(1, 2, 6, 1)
+        )[0]
+        duration = max(round(rng.lognormvariate(math.log(median), 0.5)), 5)
+        if status == "completed":
+            end = anchor - timedelta(minutes=rng.uniform(5, 240))
+            start = end - timedelta(minutes=duration)
+        else:
+            start = anchor - timedelta(minutes=rng.uniform(5, 24 * 60))
+            end = None
+        numbers = rng.sample(range(1, 1000), rng.randint(0, max_parts))
+        return {
+            "log_id": log_id,
+            "created_at": anchor.isoformat(),
+            "plant": plant,
+            "line": line,
+            "equipment_type": equipment_type,
+            "equipment_id": f"EQ-FAKE-{rng.randint(100, 999)}",
+            "maintenance_type": maintenance_type,
+            "status": status,
+            "start_time": start.isoformat(timespec="seconds"),
+            "end_time": end.isoformat(timespec="seconds") if end else None,
+            "duration_minutes": duration,
+            "technician": "",
+            "issue_description": "",
+            "actions_taken": [],
+            "parts_used": [
+                {
+                    "part_number": f"PART-FAKE-{number:03d}",
+                    "quantity": rng.choices((1, 2, 3, 4), weights=(6, 3, 1, 1))[0],
+                }
+                for number in sorted(numbers)
+            ],
+            "follow_up_tasks": [],
+        }
+
+    def _narrative_prompt(self, output_format: str, *, unique_id: str | None) -> str:
+        """Prompt asking for the technician's notes on a locally built job."""
+        created_at = datetime.now(timezone.utc).isoformat()
+        job = self.build_job(
+            unique_id or str(uuid.uuid4()),
+            created_at,
+            plant=self.plant,
+            line=self.line,
+            equipment_type=self.equipment_type,
+        )
+        parts = "".join(
+            f"  - {part['part_number']} (quantity: {part['quantity']})\n"
+            for part in job["parts_used"]
+        ) or "  - none\n"
+        details = (
+            f"Log ID (immutable): {job['log_id']}\n"
+            f"Created At: {created_at}\n"
+            f"Plant: {self.plant}\n"
+            f"Line: {self.line}\n"
+            f"Equipment Type: {self.equipment_type}\n"
+            f"Equipment ID: {job['equipment_id']}\n"
+            f"Maintenance Type: {job['maintenance_type']}\n"
+            f"Status: {job['status']}\n"
+            f"Start Time: {job['start_time']}\n"
+            f"End Time: {job['end_time'] or 'not finished'}\n"
+            f"Duration (minutes): {job['duration_minutes']}\n"
+            f"Parts Used:\n{parts}"
+        )
+        base = (
+            "You are an experienced maintenance technician writing the notes of "
+            "REALISTIC BUT ENTIRELY FICTIONAL maintenance log entries for "
+            "manufacturing equipment.\n\n"
+            "The job under RECORD DETAILS is final. Write a clearly fake "
+            "technician name, the issue or purpose of the job, the actions "
+            "taken (consistent with its type, status, duration and parts) and "
+            "any follow-up tasks. Do not repeat ids, times or part numbers.\n\n"
+        )
+        # Text logs are rendered locally from the same JSON narrative
+        if output_format == "yaml":
+            skeleton = (
+                "Return valid YAML ONLY.\n\n"
+                "log_id: (echo above)\n"
+                "created_at: (echo above)\n"
+                "plant: (echo above)\n"
+                "line: (echo above)\n"
+                "equipment_type: (echo above)\n"
+                "technician: fictional name\n"
+                "issue_description: detailed text description\n"
+                "actions_taken:\n"
+                "  - action description\n"
+                "follow_up_tasks:\n"
+                "  - task description (optional)\n"
+            )
+        else:
+            skeleton = (
+                "Return valid JSON ONLY.\n\n"
+                "{\n"
+                '  "log_id": "(echo above)",\n'
+                '  "created_at": "(echo above)",\n'
+                '  "plant": "(echo above)",\n'
+                '  "line": "(echo above)",\n'
+                '  "equipment_type": "(echo above)",\n'
+                '  "technician": "John Fake-Smith",\n'
+                '  "issue_description": "Detailed description of issue",\n'
+                '  "actions_taken": ["action 1", "action 2"],\n'
+                '  "follow_up_tasks": ["task description (optional)"]\n'
+                "}\n"
+            )
+        return self.compose_prompt(base + skeleton, details)
+
+    def _merge_narrative(self, narrative: dict[str, Any]) -> dict[str, Any]:
+        """
+        Rebuild the job of the echoed log id, timestamp, plant, line and
+        equipment type and fill in the model's notes; missing notes get a
+        generic text.
+        """
+        job = self.build_job(
+            str(narrative["log_id"]),
+            narrative["created_at"],
+            plant=str(narrative["plant"]),
+            line=str(narrative["line"]),
+            equipment_type=str(narrative["equipment_type"]),
+        )
+
+        def _lines(key: str) -> list[str]:
+            value = narrative.get(key)
+            if not isinstance(value, list):
+                return []
+            return [str(line).strip() for line in value if line]
+
+        job["technician"] = str(narrative.get("technician") or "Unassigned").strip()
+        job["issue_description"] = str(
+            narrative.get("issue_description")
+            or f"{job['maintenance_type'].capitalize()} maintenance of "
+            f"{job['equipment_id']}"
+        ).strip()
+        job["actions_taken"] = _lines("actions_taken") or [
+            f"Performed {job['maintenance_type']} maintenance"
+        ]
+        job["follow_up_tasks"] = _lines("follow_up_tasks")
+        return job
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
     def post_process(self, raw: str, output_format: str) -> Any:  # noqa: ANN401
-        """Deserialize based on output_format and validate structure."""
+        """
+        Deserialize based on output_format and validate structure.
+
+        With local numbers the reply is the narrative (JSON, or YAML for
+        ``yaml``), merged into the rebuilt job; text logs are then rendered
+        locally.
+        """
         fmt = output_format.lower()
+        if self.local_numbers:
+            return self._post_process_narrative(raw, fmt)
         parsed_data: Any
 
         if fmt == "json":
@@ -274,6 +547,22 @@ class ManufacturingMaintenanceLogTool(DataGeneratorTool):
 
         return parsed_data
 
+    def _post_process_narrative(self, raw: str, fmt: str) -> Any:  # noqa: ANN401
+        """Merge a narrative reply into its job, or return *raw* unusable."""
+        try:
+            narrative = yaml.safe_load(raw) if fmt == "yaml" else json.loads(raw)
+        except (yaml.YAMLError, json.JSONDecodeError):
+            return raw
+        if not isinstance(narrative, dict) or not narrative.get("log_id"):
+            return raw
+        try:
+            job = self._merge_narrative(narrative)
+        except (KeyError, ValueError):      # echoes missing or mangled
+            return raw
+        if fmt in ("txt", "text"):
+            return self.render_text(job)
+        return job
+
     # ------------------------------------------------------------------ #
     # Misc.                                                              #
     # ------------------------------------------------------------------ #
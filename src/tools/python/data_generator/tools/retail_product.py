@@ -4,6 +4,14 @@ Retail-Product Prompt Builder
 
 Concrete :class:`data_generator.tool.DataGeneratorTool` implementation that
 creates realistic retail-product catalogue entries.
+
+With an entity pool (``--entity-pool``) the records describe the pooled
+products in pool order (those of ``--industry`` if it names a pool category):
+the record id is the product id, name, category and price come from the pool
+and the model writes the rest of the catalogue entry. Products already
+generated in the output directory are skipped, so a resumed or repeated run
+continues with the next ones; once the pool is used up, records get fresh
+ids.
 """
 
 from __future__ import annotations
@@ -13,16 +21,42 @@ import json
 import logging
 import random
 import uuid
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
 from typing import Any
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class Product(RecordModel):
+    """
+    JSON record produced by :class:`RetailProductTool`.
+
+    ``attributes`` is a free-form mapping, so the schema is sent without
+    strict mode (see :func:`data_generator.schema.json_schema_format`).
+    """
+
+    product_id: str
+    created_at: str
+    category: str
+    name: str
+    description: str
+    price: float
+    currency: str
+    tags: list[str]
+    attributes: dict[str, str | float | bool]
+    stock_quantity: int
+    rating: float | None = None
+
+
 class RetailProductTool(DataGeneratorTool):
     """Generate synthetic retail-product catalogue items."""
 
@@ -31,6 +65,8 @@ class RetailProductTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "retail-product"
     toolName: str = "RetailProduct"
+    record_model = Product
+    entity_kinds = ("products",)
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -39,6 +75,8 @@ class RetailProductTool(DataGeneratorTool):
         """Create a new tool instance with an optional *industry* override."""
         super().__init__()
         self.industry = industry or "general"
+        self._pooled: Iterator[dict[str, Any]] | None = None
+        self._excluded: set[str] = set()
 
     def cli_arguments(self) -> list[dict[str, Any]]:
         """Argparse specification consumed by the top-level CLI wrapper."""
@@ -70,6 +108,26 @@ class RetailProductTool(DataGeneratorTool):
             "--output-format json"
         ]
 
+    def get_unique_id(self) -> str:
+        """
+        The next pooled product's id not generated yet while there is one,
+        then a fresh id (see the module docstring).
+        """
+        if self.entity_pool is not None:
+            if self._pooled is None:
+                pool = self.entity_pool
+                products = pool.entities("products", category=self.industry)
+                self._pooled = iter(products or pool.entities("products"))
+            for product in self._pooled:
+                if str(product["product_id"]) not in self._excluded:
+                    return str(product["product_id"])
+        return super().get_unique_id()
+
+    def exclude_unique_ids(self, unique_ids: Iterable[str]) -> None:
+        """Skip the pooled products already generated, from the pool start."""
+        self._excluded = set(unique_ids)
+        self._pooled = None
+
     # ------------------------------------------------------------------ #
     # Output formats                                                     #
     # ------------------------------------------------------------------ #
@@ -92,32 +150,47 @@ class RetailProductTool(DataGeneratorTool):
         """Return a random realistic stock quantity."""
         return random.randint(0, 500)
 
+    def _pooled_product(self, product_id: str) -> dict[str, Any] | None:
+        """The pooled product *product_id*, if there is a pool and it has one."""
+        if self.entity_pool is None:
+            return None
+        return self.entity_pool.get("products", product_id)
+
     def _prompt_common(self, *, unique_id: str | None = None) -> str:
         """Shared prompt header including an optional caller-supplied id."""
         product_id = unique_id or str(uuid.uuid4())
         created_at = datetime.now(timezone.utc).isoformat()
+        product = self._pooled_product(product_id)
+        pooled = (
+            f"Name (immutable): {product['name']}\n"
+            f"Category (immutable): {product['category']}\n"
+            f"Price (immutable): {product['price']:.2f} {product['currency']}\n"
+            if product is not None
+            else ""
+        )
         return (
             f"Product ID (immutable): {product_id}\n"
             f"Created At: {created_at}\n"
-            f"Industry Theme: {self.industry}\n\n"
+            f"Industry Theme: {self.industry}\n"
+            f"{pooled}\n"
         )
 
     def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
         """Return the full prompt for the requested *output_format*."""
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a seasoned e-commerce copy-writer producing REALISTIC BUT "
             "ENTIRELY FICTIONAL retail-product catalogue entries.\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "Always output ONLY the requested data structure – no markdown fences, "
             "no commentary.\n\n"
         )
 
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # TEXT
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -218,6 +291,10 @@ class RetailProductTool(DataGeneratorTool):
             parsed_data.setdefault("stock_quantity", self._random_stock())
             if "rating" not in parsed_data and random.choice([True, False]):
                 parsed_data["rating"] = round(random.uniform(1.0, 5.0), 1)
+            product = self._pooled_product(str(parsed_data.get("product_id")))
+            if product is not None:
+                for key in ("name", "category", "price", "currency"):
+                    parsed_data[key] = product[key]
 
         return parsed_data
 
@@ -14,15 +14,47 @@ import logging
 import random
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class ConversationTurn(RecordModel):
+    """One message of the case conversation."""
+
+    role: str
+    message: str
+    timestamp: str
+
+
+class SupportCase(RecordModel):
+    """JSON record produced by :class:`TechSupportTool`."""
+
+    case_id: str
+    created_at: str
+    system_description: str
+    issue_summary: str
+    severity: Literal["critical", "high", "medium", "low"]
+    priority: Literal["P1", "P2", "P3", "P4"]
+    status: Literal["open", "investigating", "resolved", "closed"]
+    customer_name: str
+    contact_email: str
+    conversation_history: list[ConversationTurn]
+    resolved_at: str | None = None
+    resolution: str | None = None
+    area: Literal["frontend", "backend", "database", "network", "other"] | None = None
+    is_bug: bool | None = None
+    root_cause: str | None = None
+
+
 class TechSupportTool(DataGeneratorTool):
     """Generate synthetic tech-support cases in YAML, JSON or plain-text."""
 
@@ -31,6 +63,7 @@ class TechSupportTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "tech-support"
     toolName: str = "TechSupport"
+    record_model = SupportCase
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -120,12 +153,12 @@ class TechSupportTool(DataGeneratorTool):
         All variable data (status, ids, etc.) are pre-baked so the kernel only
         receives the `index` placeholder supplied by the engine.
         """
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a helpful support agent generating REALISTIC BUT ENTIRELY "
             "FICTIONAL technical support cases for demonstrations.\n\n"
             "## ON THE CASE\n\n"
             f"The system being simulated:\n- {self.system_description}\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "## ON CONVERSATION HISTORY\n\n"
             "User messages should be realistic, sometimes unclear, contain realistic "
             "error messages and information. The agent's replies should be helpful "
@@ -133,11 +166,11 @@ class TechSupportTool(DataGeneratorTool):
         )
 
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # Plain text is the default
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -216,6 +249,21 @@ class TechSupportTool(DataGeneratorTool):
             "Root Cause: text (optional)\n"
         )
 
+    def _text_list_item(
+        self,
+        key: str,
+        item: Any,  # noqa: ANN401
+        *,
+        indent: str,
+    ) -> list[str]:
+        """Conversation turns render as ``- timestamp [role] message``."""
+        if key == "conversation_history" and isinstance(item, dict):
+            return [
+                f"{indent}- {item.get('timestamp', '')} [{item.get('role', '')}] "
+                f"{item.get('message', '')}"
+            ]
+        return super()._text_list_item(key, item, indent=indent)
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
@@ -15,15 +15,110 @@ import logging
 import random
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class Contact(RecordModel):
+    """Author of the SOP."""
+
+    name: str
+    email: str
+
+
+class Approver(RecordModel):
+    """Sign-off on the SOP, once approved."""
+
+    name: str | None = None
+    email: str | None = None
+    approved_at: str | None = None
+
+
+class ResolutionStep(RecordModel):
+    """One numbered step of the procedure."""
+
+    step_number: int
+    action: str
+    details: str
+    warnings: str | None = None
+
+
+class VerificationStep(RecordModel):
+    """Check that the issue is resolved."""
+
+    step: str
+
+
+class TroubleshootingTip(RecordModel):
+    """Common issue and its fix."""
+
+    issue: str
+    solution: str
+
+
+class Escalation(RecordModel):
+    """When and where to escalate."""
+
+    condition: str
+    contact: str
+    escalation_path: str
+
+
+class RelatedDocument(RecordModel):
+    """Link to related documentation."""
+
+    title: str
+    url: str
+
+
+class VersionEntry(RecordModel):
+    """One entry of the version history."""
+
+    version: str
+    date: str
+    author: str
+    changes: str
+
+
+class SOPDocument(RecordModel):
+    """JSON record produced by :class:`TechSupportSOPTool`."""
+
+    sop_id: str
+    version: str
+    created_at: str
+    last_updated: str
+    title: str
+    problem_category: str
+    complexity: Literal["simple", "medium", "complex"]
+    system_context: str
+    severity: Literal["critical", "high", "medium", "low"]
+    status: Literal["draft", "review", "approved", "published", "archived"]
+    approval_level: Literal["team_lead", "manager", "director", "cto"]
+    author: Contact
+    approver: Approver | None = None
+    problem_description: str
+    symptoms: list[str]
+    prerequisites: list[str]
+    required_tools: list[str]
+    estimated_resolution_time: str
+    resolution_steps: list[ResolutionStep]
+    verification_steps: list[VerificationStep]
+    troubleshooting: list[TroubleshootingTip]
+    escalation: Escalation
+    related_documentation: list[RelatedDocument]
+    tags: list[str]
+    version_history: list[VersionEntry]
+
+
 class TechSupportSOPTool(DataGeneratorTool):
     """
     Generate synthetic tech support standard operating procedure documents.
@@ -36,6 +131,7 @@ class TechSupportSOPTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "tech-support-sop"
     toolName: str = "TechSupportSOP"
+    record_model = SOPDocument
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -168,6 +264,7 @@ class TechSupportSOPTool(DataGeneratorTool):
         if fmt == "text":
             fmt = "txt"
 
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a helpful technical documentation specialist "
             "generating REALISTIC BUT ENTIRELY FICTIONAL standard operating "
@@ -176,7 +273,6 @@ class TechSupportSOPTool(DataGeneratorTool):
             f"Problem category: {self.problem_category}\n"
             f"Complexity level: {self.complexity}\n"
             f"System context: {self.system_context}\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "## ON SOP CONTENT\n\n"
             "SOPs should include:\n"
             "- Clear problem description and symptoms\n"
@@ -191,11 +287,11 @@ class TechSupportSOPTool(DataGeneratorTool):
         )
 
         if fmt == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if fmt == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # Plain text is the default
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
@@ -375,6 +471,14 @@ class TechSupportSOPTool(DataGeneratorTool):
             "Version: text | Date: ISO 8601 | Author: text | Changes: text\n"
         )
 
+    # ------------------------------------------------------------------ #
+    # Hierarchical generation                                            #
+    # ------------------------------------------------------------------ #
+    @property
+    def section_fields(self) -> tuple[str, ...]:
+        """Resolution steps and troubleshooting tips, one per call."""
+        return ("resolution_steps", "troubleshooting")
+
     # ------------------------------------------------------------------ #
     # Post-processing                                                    #
     # ------------------------------------------------------------------ #
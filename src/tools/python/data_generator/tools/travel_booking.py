@@ -14,15 +14,84 @@ import logging
 import random
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
 import yaml
+from pydantic import Field
 
+from ..schema import RecordModel
 from ..tool import DataGeneratorTool
 
 _logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------- #
+# Record schema                                                          #
+# ---------------------------------------------------------------------- #
+class Money(RecordModel):
+    """Amount with its currency."""
+
+    amount: float
+    currency: str
+
+
+class Traveler(RecordModel):
+    """Fictional traveler."""
+
+    name: str
+    email: str
+
+
+class Flight(RecordModel):
+    """One flight segment."""
+
+    from_: str = Field(alias="from")
+    to: str
+    depart: str
+    arrive: str
+    airline: str
+    flight_number: str
+    fare: Money
+
+
+class HotelStay(RecordModel):
+    """One hotel stay."""
+
+    name: str
+    check_in: str
+    check_out: str
+    city: str
+    nightly_rate: Money
+
+
+class Itinerary(RecordModel):
+    """Flights and hotels of the trip."""
+
+    flights: list[Flight] = []
+    hotels: list[HotelStay] = []
+
+
+class CustomerFeedback(RecordModel):
+    """Rating left after the trip."""
+
+    rating: int
+    comments: str | None = None
+
+
+class Booking(RecordModel):
+    """JSON record produced by :class:`TravelBookingTool`."""
+
+    booking_id: str
+    created_at: str
+    trip_type: Literal["flight", "hotel", "flight+hotel"]
+    region: str
+    traveler: Traveler
+    itinerary: Itinerary
+    total_cost: Money
+    status: Literal["confirmed", "pending", "canceled"]
+    customer_feedback: CustomerFeedback | None = None
+
+
 class TravelBookingTool(DataGeneratorTool):
     """Generate synthetic travel booking records in YAML, JSON or plain-text."""
 
@@ -31,6 +100,7 @@ class TravelBookingTool(DataGeneratorTool):
     # ------------------------------------------------------------------ #
     name: str = "travel-booking"
     toolName: str = "TravelBooking"
+    record_model = Booking
 
     # ------------------------------------------------------------------ #
     # CLI contract                                                       #
@@ -147,11 +217,10 @@ class TravelBookingTool(DataGeneratorTool):
         All variable data (booking_id, timestamps, etc.) are pre-baked so the 
         kernel only receives the `index` placeholder supplied by the engine.
         """
+        details = self._prompt_common(unique_id=unique_id)
         base = (
             "You are a helpful travel booking system generating REALISTIC BUT ENTIRELY "
             "FICTIONAL travel booking records for demonstrations.\n\n"
-            "## BOOKING REQUIREMENTS\n\n"
-            f"{self._prompt_common(unique_id=unique_id)}"
             "## INSTRUCTIONS\n\n"
             "Generate realistic booking data with plausible airport codes "
             "(IATA format), hotel chains, flight numbers, times, and prices. "
@@ -161,11 +230,11 @@ class TravelBookingTool(DataGeneratorTool):
         )
 
         if output_format == "yaml":
-            return base + self._yaml_skeleton()
+            return self.compose_prompt(base + self._yaml_skeleton(), details)
         if output_format == "json":
-            return base + self._json_skeleton()
+            return self.compose_prompt(base + self._json_skeleton(), details)
         # Plain text is the default (handle both "text" and "txt")
-        return base + self._text_skeleton()
+        return self.compose_prompt(base + self._text_skeleton(), details)
 
     # ------------------------------------------------------------------ #
     # Static prompt fragments                                            #
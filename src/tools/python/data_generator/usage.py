@@ -0,0 +1,100 @@
+"""
+Token-usage bookkeeping shared by the engine components.
+
+This module provides :class:`TokenUsage`, a small value object describing the
+tokens consumed by a single Azure OpenAI chat completion.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+__all__: list[str] = ["TokenUsage"]
+
+
+@dataclass(frozen=True)
+class TokenUsage:
+    """Tokens reported in the ``usage`` block of a chat-completion response."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    reasoning_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus completion tokens (reasoning is part of completion)."""
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        """Share of prompt tokens served from the provider's prompt cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def __add__(self, other: TokenUsage) -> TokenUsage:
+        """Return the element-wise sum of two usage records."""
+        return TokenUsage(
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            reasoning_tokens=self.reasoning_tokens + other.reasoning_tokens,
+            cached_tokens=self.cached_tokens + other.cached_tokens,
+        )
+
+    def split(self, parts: int) -> list[TokenUsage]:
+        """
+        Divide the usage of one call among *parts* records; the shares add
+        up to the original counts (the first ones absorb the remainders).
+        """
+        if parts < 1:
+            raise ValueError("parts must be at least 1.")
+
+        def _shares(total: int) -> list[int]:
+            quotient, remainder = divmod(total, parts)
+            return [quotient + (i < remainder) for i in range(parts)]
+
+        return [
+            TokenUsage(
+                prompt_tokens=prompt,
+                completion_tokens=completion,
+                reasoning_tokens=reasoning,
+                cached_tokens=cached,
+            )
+            for prompt, completion, reasoning, cached in zip(
+                _shares(self.prompt_tokens),
+                _shares(self.completion_tokens),
+                _shares(self.reasoning_tokens),
+                _shares(self.cached_tokens),
+                strict=True,
+            )
+        ]
+
+    @classmethod
+    def from_message(cls, message: Any) -> TokenUsage | None:  # noqa: ANN401
+        """
+        Extract usage from a Semantic-Kernel ``ChatMessageContent``.
+
+        The raw OpenAI response (``inner_content``) is preferred because it
+        carries the reasoning and cached token details that SK's own
+        ``CompletionUsage`` drops. Returns None when no usage was reported.
+        """
+        raw_usage = getattr(getattr(message, "inner_content", None), "usage", None)
+        if raw_usage is not None:
+            completion_details = getattr(raw_usage, "completion_tokens_details", None)
+            prompt_details = getattr(raw_usage, "prompt_tokens_details", None)
+            return cls(
+                prompt_tokens=raw_usage.prompt_tokens or 0,
+                completion_tokens=raw_usage.completion_tokens or 0,
+                reasoning_tokens=getattr(completion_details, "reasoning_tokens", 0)
+                or 0,
+                cached_tokens=getattr(prompt_details, "cached_tokens", 0) or 0,
+            )
+
+        metadata = getattr(message, "metadata", None) or {}
+        sk_usage = metadata.get("usage")
+        if sk_usage is None:
+            return None
+        return cls(
+            prompt_tokens=sk_usage.prompt_tokens or 0,
+            completion_tokens=sk_usage.completion_tokens or 0,
+        )
@@ -0,0 +1,3 @@
+"""Benchmarks for data_generator (run as scripts, not collected by pytest)."""
+
+# Empty init file to mark this directory as a Python package
@@ -0,0 +1,133 @@
+"""
+Per-record CPU overhead of the ``DataGenerator`` engine with the model stubbed.
+
+The Azure OpenAI chat-completion call is replaced by an instant fake, so the
+numbers below are pure engine cost: prompt rendering, Semantic-Kernel
+invocation, post-processing and persistence.
+
+Usage (from the repo root)::
+
+    python tests/tools/python/data_generator/benchmarks/bench_engine_overhead.py \\
+        --scenario retail-product --count 2000 --concurrency 100
+
+Reported figures (CPU microseconds per record):
+
+``uncached``
+    Compile and register a new prompt function for every record, as the
+    engine did before compiled functions were cached.
+``cached``
+    Reuse the engine's cached prompt function and pass the rendered prompt
+    as a kernel argument.
+``engine``
+    A full ``DataGenerator.run()`` including post-processing and file output.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+repo_root = Path(__file__).parents[5]
+sys.path.append(str(repo_root / "src" / "tools" / "python"))
+
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion  # noqa: E402
+from semantic_kernel.contents import ChatMessageContent  # noqa: E402
+from semantic_kernel.contents.utils.author_role import AuthorRole  # noqa: E402
+
+from data_generator import DataGenerator, DataGeneratorTool  # noqa: E402
+from data_generator.tools import *  # noqa: E402,F403  (register all tools)
+
+
+async def _instant_completion(
+    _self: Any, chat_history: Any, settings: Any, **_kwargs: Any
+) -> list[ChatMessageContent]:
+    """Return a tiny canned JSON document without touching the network."""
+    return [ChatMessageContent(role=AuthorRole.ASSISTANT, content=json.dumps({}))]
+
+
+def _cpu_per_record(count: int, body: Callable[[], Awaitable[None] | None]) -> float:
+    """Run *body* once and return the CPU microseconds spent per record."""
+    started = time.process_time()
+    result = body()
+    if result is not None:
+        asyncio.run(result)  # type: ignore[arg-type]
+    return (time.process_time() - started) * 1_000_000 / count
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse arguments, run the three measurements and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", default="retail-product")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--output-format", default="json")
+    args = parser.parse_args(argv)
+
+    tool = DataGeneratorTool.from_name(args.scenario)
+    fmt = args.output_format
+
+    with patch.object(
+        AzureChatCompletion, "get_chat_message_contents", _instant_completion
+    ), tempfile.TemporaryDirectory() as tmp:
+        gen = DataGenerator(
+            tool,
+            log_level="WARNING",
+            azure_openai_endpoint="https://benchmark.openai.azure.com",
+            azure_openai_deployment="benchmark",
+            azure_openai_api_key="benchmark",
+        )
+
+        async def _uncached() -> None:
+            for i in range(1, args.count + 1):
+                prompt_fn = gen.create_prompt_function(
+                    template=tool.build_prompt(fmt, unique_id=tool.get_unique_id()),
+                    function_name="generate",
+                    plugin_name=tool.toolName,
+                    prompt_description=f"{tool.toolName} generator",
+                    input_variables=[{"name": "index"}],
+                    max_tokens=16000,
+                )
+                await prompt_fn(index=i)
+
+        async def _cached() -> None:
+            for i in range(1, args.count + 1):
+                unique_id = tool.get_unique_id()
+                await gen._invoke_function(
+                    gen._get_prompt_function(fmt),
+                    prompt=tool.build_prompt(fmt, unique_id=unique_id),
+                    index=i,
+                    unique_id=unique_id,
+                )
+
+        results = {
+            "uncached": _cpu_per_record(args.count, _uncached),
+            "cached": _cpu_per_record(args.count, _cached),
+            "engine": _cpu_per_record(
+                args.count,
+                lambda: gen.run(
+                    count=args.count,
+                    out_dir=Path(tmp),
+                    output_format=fmt,
+                    concurrency=args.concurrency,
+                ),
+            ),
+        }
+
+    print(
+        f"scenario={args.scenario} format={fmt} count={args.count} "
+        f"concurrency={args.concurrency}"
+    )
+    for name, micros in results.items():
+        print(f"  {name:<9} {micros:9.1f} us CPU/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+End-to-end engine throughput against the offline Azure OpenAI mock.
+
+``DataGenerator`` runs through the real ``AzureChatCompletion`` connector and
+OpenAI SDK against :class:`mock_aoai.MockAzureOpenAI`, once per concurrency
+level, and reports:
+
+``rec/s``
+    Records persisted per wall-clock second.
+``lag p50 / p99 / max``
+    Event-loop lag in milliseconds: how late a 10 ms ticker running on the
+    generator's loop wakes up. High lag means engine CPU work (rendering,
+    parsing, serialisation) is starving the network I/O.
+``heap MB``
+    Peak Python heap during the level (tracemalloc, only with ``--memory``;
+    tracing slows the run, so throughput is measured in a separate pass).
+``rss MB``
+    Process high-water RSS after the level (monotonic across levels).
+
+Usage (from the repo root)::
+
+    python tests/tools/python/data_generator/benchmarks/bench_engine_throughput.py \\
+        --scenario retail-product --count 2000 --levels 8,32,128 \\
+        --latency lognormal:0.2,0.5 --samples sample-data/retail-products/json
+
+By default the mock runs on a background thread of this process. For cleaner
+CPU numbers start ``mock_aoai.py`` separately and pass ``--endpoint``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable
+from pathlib import Path
+from typing import Any
+
+repo_root = Path(__file__).parents[5]
+sys.path.append(str(repo_root / "src" / "tools" / "python"))
+sys.path.append(str(Path(__file__).parent))
+
+from mock_aoai import MockAzureOpenAI, MockConfig  # noqa: E402
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion  # noqa: E402
+
+from data_generator import DataGenerator, DataGeneratorTool  # noqa: E402
+from data_generator.tools import *  # noqa: E402,F403  (register all tools)
+
+_TICK = 0.01
+
+
+async def _measure_lag(samples: list[float], stop: asyncio.Event) -> None:
+    """Record how late a fixed-interval ticker wakes up on the running loop."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(_TICK)
+        samples.append(max(0.0, time.perf_counter() - started - _TICK))
+
+
+async def _run_level(
+    gen: DataGenerator, run: Awaitable[None]
+) -> tuple[float, list[float]]:
+    """Await *run* next to the lag ticker; return (seconds, lag samples)."""
+    lag: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_lag(lag, stop))
+    started = time.perf_counter()
+    await run
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    # Close pooled connections while their event loop is still running
+    await gen.kernel.get_service(type=AzureChatCompletion).client.close()
+    return elapsed, lag
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, round(percent / 100 * len(ordered)) - 1)]
+
+
+def _bench(
+    args: argparse.Namespace, server: MockAzureOpenAI
+) -> list[dict[str, Any]]:
+    """
+    Run every concurrency level and collect one result row per level.
+
+    Each pass gets a fresh generator because the OpenAI client's connection
+    pool is bound to the event loop it was first used on.
+    """
+    tool = DataGeneratorTool.from_name(args.scenario)
+    rows = []
+    for level in args.levels:
+        passes = [False, True] if args.memory else [False]
+        row: dict[str, Any] = {"concurrency": level}
+        for trace in passes:
+            gen = DataGenerator(
+                tool,
+                log_level="WARNING",
+                azure_openai_endpoint="https://mock.openai.azure.com",
+                azure_openai_deployment="mock",
+                azure_openai_api_key="mock",
+            )
+            server.attach(gen, args.endpoint)
+            with tempfile.TemporaryDirectory() as tmp:
+                if trace:
+                    tracemalloc.start()
+                run = gen._run_async(
+                    count=args.count,
+                    out_dir=Path(tmp),
+                    output_format=args.output_format,
+                    concurrency=level,
+                    timeout_seconds=None,
+                    sink=args.sink,
+                )
+                elapsed, lag = asyncio.run(_run_level(gen, run))
+                if trace:
+                    row["heap_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+                    tracemalloc.stop()
+                    continue
+                row["records_per_s"] = args.count / elapsed
+                row["lag_p50_ms"] = 1000 * statistics.median(lag) if lag else 0.0
+                row["lag_p99_ms"] = 1000 * _percentile(lag, 99)
+                row["lag_max_ms"] = 1000 * max(lag, default=0.0)
+        row["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        rows.append(row)
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse arguments, run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", default="retail-product")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument(
+        "--levels",
+        type=lambda s: [int(v) for v in s.split(",")],
+        default=[8, 32, 128],
+        help="Comma-separated concurrency levels.",
+    )
+    parser.add_argument("--output-format", default="json")
+    parser.add_argument("--sink", default="files")
+    parser.add_argument("--latency", default="lognormal:0.2,0.5")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--samples", type=Path, default=None)
+    parser.add_argument("--endpoint", default=None, help="Use a running mock.")
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = MockAzureOpenAI(
+        MockConfig(
+            latency=args.latency,
+            throttle_rate=args.throttle_rate,
+            samples=args.samples,
+            seed=0,
+        )
+    )
+    stop_server = server.serve_in_thread() if args.endpoint is None else None
+    try:
+        rows = _bench(args, server)
+    finally:
+        if stop_server is not None:
+            stop_server()
+
+    print(
+        f"scenario={args.scenario} format={args.output_format} sink={args.sink} "
+        f"count={args.count} latency={args.latency}"
+    )
+    print(
+        f"  {'conc':>5} {'rec/s':>9} {'lag p50':>8} {'p99':>8} {'max':>8}"
+        f" {'heap MB':>8} {'rss MB':>8}"
+    )
+    for row in rows:
+        heap = f"{row['heap_mb']:8.1f}" if "heap_mb" in row else f"{'-':>8}"
+        print(
+            f"  {row['concurrency']:>5} {row['records_per_s']:9.1f}"
+            f" {row['lag_p50_ms']:8.2f} {row['lag_p99_ms']:8.2f}"
+            f" {row['lag_max_ms']:8.2f} {heap} {row['rss_mb']:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
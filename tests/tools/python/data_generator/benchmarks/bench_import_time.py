@@ -0,0 +1,114 @@
+"""
+Start-up cost of the ``generate-data`` CLI, measured with ``-X importtime``.
+
+Each case runs in a fresh interpreter (the OS file cache is warmed by a
+first, discarded run) and reports the total import time, the number of
+modules imported and the slowest packages (cumulative time of the outermost
+import of each top-level package):
+
+``cli``
+    ``import data_generator.cli``, what every invocation pays, including
+    ``--help`` and argument errors.
+``lookup``
+    ``cli`` plus ``DataGeneratorTool.from_name(<scenario>)``: the requested
+    tool module only.
+``engine``
+    ``lookup`` plus ``import data_generator.engine``: Semantic-Kernel, the
+    OpenAI SDK and Azure identity, paid only once a generator is built.
+``all-tools``
+    ``cli`` plus every bundled tool module, the cost of the former eager
+    registration.
+
+Usage (from the repo root)::
+
+    python tests/tools/python/data_generator/benchmarks/bench_import_time.py \\
+        --scenario retail-product --repeat 5 --top 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).parents[5]
+package_root = repo_root / "src" / "tools" / "python"
+
+# "import time:      self [us] |  cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+_CASES: dict[str, str] = {
+    "cli": "import data_generator.cli",
+    "lookup": (
+        "import data_generator.cli\n"
+        "from data_generator import DataGeneratorTool\n"
+        "DataGeneratorTool.from_name({scenario!r})"
+    ),
+    "engine": (
+        "import data_generator.cli\n"
+        "from data_generator import DataGeneratorTool\n"
+        "DataGeneratorTool.from_name({scenario!r})\n"
+        "import data_generator.engine"
+    ),
+    "all-tools": (
+        "import data_generator.cli\n"
+        "from data_generator.tools import TOOL_MODULES, load_tool\n"
+        "for name in TOOL_MODULES: load_tool(name)"
+    ),
+}
+
+
+def _import_times(code: str) -> list[tuple[str, int, int]]:
+    """Run *code* under ``-X importtime``; return (module, cumulative us, depth)."""
+    env = {**os.environ, "PYTHONPATH": str(package_root)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            _self, cumulative, indent, module = match.groups()
+            rows.append((module, int(cumulative), len(indent) // 2))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse arguments, time every case and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", default="retail-product")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports shown.")
+    args = parser.parse_args(argv)
+
+    print(f"python {sys.version.split()[0]}  scenario={args.scenario}")
+    for case, template in _CASES.items():
+        code = template.format(scenario=args.scenario)
+        _import_times(code)  # warm the file cache
+        totals, rows = [], []
+        for _ in range(args.repeat):
+            rows = _import_times(code)
+            totals.append(sum(us for _m, us, depth in rows if depth == 0))
+        print(
+            f"  {case:<10} {statistics.median(totals) / 1000:8.1f} ms "
+            f"(median of {args.repeat}), {len(rows)} modules"
+        )
+        packages: dict[str, int] = {}
+        for module, us, _depth in rows:
+            root = module.split(".")[0]
+            packages[root] = max(packages.get(root, 0), us)
+        slowest = sorted(packages.items(), key=lambda item: -item[1])
+        for package, us in slowest[: args.top]:
+            print(f"      {us / 1000:8.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
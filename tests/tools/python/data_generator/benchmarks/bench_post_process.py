@@ -0,0 +1,155 @@
+"""
+Event-loop cost of parsing and serialising large records, inline versus in a
+``RecordProcessor`` process pool.
+
+The chat-completion call is replaced by a fake that answers every prompt with
+the same large document (a statement of ``--transactions`` transactions),
+after ``--latency`` seconds, so the run is bound by post-processing rather
+than by the network. Each case runs the full engine into a temporary
+directory and reports:
+
+``wall``
+    Wall-clock time of the run.
+``loop lag``
+    How late a 10 ms ticker on the event loop woke up (p50 / max): the time
+    the loop was blocked by ``yaml.safe_load`` / ``yaml.safe_dump`` and could
+    not send requests or take responses.
+
+Usage (from the repo root)::
+
+    python tests/tools/python/data_generator/benchmarks/bench_post_process.py \\
+        --count 400 --concurrency 64 --transactions 60 --workers 0 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import yaml
+
+repo_root = Path(__file__).parents[5]
+sys.path.append(str(repo_root / "src" / "tools" / "python"))
+
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion  # noqa: E402
+from semantic_kernel.contents import ChatMessageContent  # noqa: E402
+from semantic_kernel.contents.utils.author_role import AuthorRole  # noqa: E402
+
+from data_generator import DataGenerator, DataGeneratorTool  # noqa: E402
+
+_TICK: float = 0.01
+
+
+def _statement(transactions: int) -> dict[str, Any]:
+    """A financial statement with *transactions* line items."""
+    return {
+        "account_id": "ACC-0001",
+        "period": {"start": "2024-01-01", "end": "2024-01-31"},
+        "transactions": [
+            {
+                "transaction_id": f"TX-{n:05d}",
+                "date": f"2024-01-{n % 28 + 1:02d}",
+                "description": f"Card payment at merchant {n}",
+                "amount": round(12.5 * n, 2),
+                "currency": "USD",
+                "category": ["groceries", "travel", "utilities"][n % 3],
+                "tags": ["card", "domestic"],
+            }
+            for n in range(transactions)
+        ],
+    }
+
+
+async def _lag_monitor(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how late each ``_TICK`` sleep returns."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(_TICK)
+        lags.append(time.perf_counter() - started - _TICK)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse arguments, run one case per worker count and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", default="financial-transaction")
+    parser.add_argument("--count", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--transactions", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--output-format", default="yaml")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[0, 2, 4],
+        help="Process pool sizes to compare; 0 processes inline.",
+    )
+    args = parser.parse_args(argv)
+
+    document = _statement(args.transactions)
+    reply = (
+        yaml.safe_dump(document, sort_keys=False)
+        if args.output_format == "yaml"
+        else json.dumps(document)
+    )
+
+    async def _completion(
+        _self: Any, chat_history: Any, settings: Any, **_kwargs: Any
+    ) -> list[ChatMessageContent]:
+        await asyncio.sleep(args.latency)
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content=reply)]
+
+    gen = DataGenerator(
+        DataGeneratorTool.from_name(args.scenario),
+        log_level="WARNING",
+        azure_openai_endpoint="https://benchmark.openai.azure.com",
+        azure_openai_deployment="benchmark",
+        azure_openai_api_key="benchmark",
+    )
+
+    print(
+        f"scenario={args.scenario} format={args.output_format} "
+        f"count={args.count} concurrency={args.concurrency} "
+        f"record={len(reply) / 1024:.0f} KiB"
+    )
+    with patch.object(AzureChatCompletion, "get_chat_message_contents", _completion):
+        for workers in args.workers:
+
+            async def _case(out_dir: Path, workers: int = workers) -> list[float]:
+                lags: list[float] = []
+                stop = asyncio.Event()
+                monitor = asyncio.create_task(_lag_monitor(lags, stop))
+                await gen._run_async(  # noqa: SLF001
+                    count=args.count,
+                    out_dir=out_dir,
+                    output_format=args.output_format,
+                    concurrency=args.concurrency,
+                    timeout_seconds=None,
+                    process_workers=workers or None,
+                )
+                stop.set()
+                await monitor
+                return lags
+
+            with tempfile.TemporaryDirectory() as tmp:
+                started = time.perf_counter()
+                lags = asyncio.run(_case(Path(tmp)))
+                wall = time.perf_counter() - started
+            label = f"{workers} workers" if workers else "inline"
+            print(
+                f"  {label:<12} wall {wall:6.2f}s  loop lag p50 "
+                f"{statistics.median(lags) * 1000:6.1f} ms, max "
+                f"{max(lags) * 1000:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Offline stand-in for the Azure OpenAI chat-completions endpoint.
+
+``MockAzureOpenAI`` is a small aiohttp server that answers
+``POST /openai/deployments/{deployment}/chat/completions`` the way Azure
+does, so ``DataGenerator`` talks to it through the real ``AzureChatCompletion``
+connector and OpenAI SDK, without paying for quota. Semantic Kernel only
+accepts ``https`` endpoints, so build the generator with any placeholder
+endpoint and call :py:meth:`MockAzureOpenAI.attach` to re-point its client.
+
+Replies are canned records (cycled from a directory such as
+``sample-data/retail-products/json``) or a filler JSON document. Latency,
+throttling and the ``usage`` block are configurable through
+:class:`MockConfig`:
+
+* ``latency`` – ``fixed:S``, ``uniform:LO,HI`` or ``lognormal:MEDIAN,SIGMA``
+  seconds, plus ``completion_tokens / tokens_per_second`` when set.
+* ``throttle_rate`` – fraction of requests answered with HTTP 429 and a
+  ``retry-after-ms`` header; ``max_in_flight`` additionally rejects requests
+  above a fixed capacity, which is what real deployments do.
+* ``error_rate`` – fraction of requests answered with HTTP 500.
+* ``prefix_cache`` – report ``cached_tokens`` the way Azure's automatic
+  prompt caching does: the longest prefix shared with a recent prompt, in
+  128-token steps, for prompts of at least 1024 tokens.
+
+Standalone usage (from the repo root), e.g. to keep the mock's CPU out of
+a benchmark process (see ``bench_engine_throughput.py --endpoint``)::
+
+    python tests/tools/python/data_generator/benchmarks/mock_aoai.py \\
+        --port 8080 --latency lognormal:0.8,0.5 --throttle-rate 0.02 \\
+        --samples sample-data/retail-products/json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+
+_ID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+# Azure prompt caching: prompts of 1024+ tokens, cache hits in 128-token steps
+_PREFIX_CACHE_MIN_TOKENS = 1024
+_PREFIX_CACHE_STEP = 128
+_PREFIX_CACHE_SIZE = 64
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Turn a latency spec (``fixed:S``, ``uniform:LO,HI``,
+    ``lognormal:MEDIAN,SIGMA``) into a sampler.
+    """
+    kind, _, raw = spec.partition(":")
+    values = [float(v) for v in raw.split(",")] if raw else []
+    match kind, values:
+        case "fixed", [seconds]:
+            return lambda rng: seconds
+        case "uniform", [low, high]:
+            return lambda rng: rng.uniform(low, high)
+        case "lognormal", [median, sigma]:
+            return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Invalid latency spec '{spec}'.")
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock endpoint."""
+
+    latency: str = "fixed:0"
+    tokens_per_second: float | None = None
+    throttle_rate: float = 0.0
+    max_in_flight: int | None = None
+    retry_after_ms: int = 100
+    error_rate: float = 0.0
+    samples: Path | None = None
+    filler_chars: int = 2000
+    reasoning_tokens: int = 0
+    cached_prompt_fraction: float = 0.0
+    prefix_cache: bool = False
+    seed: int | None = None
+
+
+@dataclass
+class MockStats:
+    """Counters for what the mock has served."""
+
+    requests: int = 0
+    completions: int = 0
+    throttled: int = 0
+    errors: int = 0
+    peak_in_flight: int = 0
+    prompts: list[str] = field(default_factory=list, repr=False)
+
+
+class MockAzureOpenAI:
+    """
+    aiohttp application emulating one Azure OpenAI deployment.
+
+    Use :py:meth:`serve_in_thread` from synchronous code (the generator owns
+    its own event loop), or ``async with`` inside an existing loop.
+    """
+
+    def __init__(self, config: MockConfig | None = None, *, port: int = 0) -> None:
+        self.config = config or MockConfig()
+        self.port = port
+        self.stats = MockStats()
+        self._rng = random.Random(self.config.seed)
+        self._latency = parse_latency(self.config.latency)
+        self._samples = self._load_samples(self.config.samples)
+        self._in_flight = 0
+        self._recent_prompts: deque[str] = deque(maxlen=_PREFIX_CACHE_SIZE)
+        self._runner: web.AppRunner | None = None
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+    @property
+    def endpoint(self) -> str:
+        """Base URL of the server (``http://127.0.0.1:<port>``)."""
+        return f"http://127.0.0.1:{self.port}"
+
+    def attach(
+        self,
+        generator: Any,  # noqa: ANN401
+        endpoint: str | None = None,
+        *,
+        service_id: str | None = None,
+    ) -> None:
+        """
+        Send *generator*'s Azure OpenAI traffic to this server (or to
+        *endpoint*, a mock running elsewhere). With several deployments,
+        *service_id* selects the one to re-point (default: the first).
+        """
+        service = generator.kernel.get_service(
+            service_id, type=AzureChatCompletion
+        )
+        service.client = service.client.with_options(
+            base_url=f"{endpoint or self.endpoint}/openai/"
+        )
+
+    async def start(self) -> None:
+        """Bind the server to 127.0.0.1 (an ephemeral port when ``port=0``)."""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post(
+            "/openai/deployments/{deployment}/chat/completions", self._handle
+        )
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Shut the server down."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> MockAzureOpenAI:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    def serve_in_thread(self) -> Callable[[], None]:
+        """
+        Run the server on its own event loop in a daemon thread.
+
+        Returns a callable that stops the server and joins the thread.
+        """
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        thread = threading.Thread(target=_run, name="mock-aoai", daemon=True)
+        thread.start()
+        started.wait()
+
+        def _stop() -> None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+        return _stop
+
+    # ------------------------------------------------------------------ #
+    # Request handling                                                   #
+    # ------------------------------------------------------------------ #
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer one chat-completions call."""
+        self.stats.requests += 1
+        body = await request.json()
+        prompt = "\n".join(
+            str(message.get("content", "")) for message in body.get("messages", [])
+        )
+        cfg = self.config
+
+        over_capacity = (
+            cfg.max_in_flight is not None and self._in_flight >= cfg.max_in_flight
+        )
+        if over_capacity or self._rng.random() < cfg.throttle_rate:
+            self.stats.throttled += 1
+            return web.json_response(
+                {
+                    "error": {
+                        "code": "429",
+                        "message": "Requests to the ChatCompletions_Create "
+                        "Operation have exceeded the rate limit.",
+                    }
+                },
+                status=429,
+                headers={
+                    "retry-after-ms": str(cfg.retry_after_ms),
+                    "retry-after": str(max(1, math.ceil(cfg.retry_after_ms / 1000))),
+                },
+            )
+
+        self._in_flight += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+        try:
+            content = self._reply(prompt)
+            prompt_tokens = math.ceil(len(prompt) / 4)
+            completion_tokens = math.ceil(len(content) / 4) + cfg.reasoning_tokens
+            delay = self._latency(self._rng)
+            if cfg.tokens_per_second:
+                delay += completion_tokens / cfg.tokens_per_second
+            await asyncio.sleep(max(0.0, delay))
+
+            if self._rng.random() < cfg.error_rate:
+                self.stats.errors += 1
+                return web.json_response(
+                    {"error": {"code": "InternalServerError", "message": "mock"}},
+                    status=500,
+                )
+            self.stats.completions += 1
+            self.stats.prompts.append(prompt)
+            return web.json_response(
+                self._completion(
+                    body,
+                    content,
+                    prompt_tokens,
+                    completion_tokens,
+                    cached_tokens=self._cached_tokens(prompt, prompt_tokens),
+                )
+            )
+        finally:
+            self._in_flight -= 1
+
+    def _completion(
+        self,
+        body: dict[str, Any],
+        content: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        *,
+        cached_tokens: int = 0,
+    ) -> dict[str, Any]:
+        """Build an Azure-shaped ``chat.completion`` payload."""
+        return {
+            "id": f"chatcmpl-mock-{self.stats.completions}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "mock",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                "completion_tokens_details": {
+                    "reasoning_tokens": self.config.reasoning_tokens
+                },
+            },
+        }
+
+    def _cached_tokens(self, prompt: str, prompt_tokens: int) -> int:
+        """Prompt tokens the emulated prompt cache would have served."""
+        if not self.config.prefix_cache:
+            return int(prompt_tokens * self.config.cached_prompt_fraction)
+        shared = max(
+            (len(os.path.commonprefix([prompt, seen])) for seen in self._recent_prompts),
+            default=0,
+        )
+        self._recent_prompts.append(prompt)
+        if prompt_tokens < _PREFIX_CACHE_MIN_TOKENS:
+            return 0
+        shared_tokens = shared // 4
+        if shared_tokens < _PREFIX_CACHE_MIN_TOKENS:
+            return 0
+        return shared_tokens // _PREFIX_CACHE_STEP * _PREFIX_CACHE_STEP
+
+    # ------------------------------------------------------------------ #
+    # Canned content                                                     #
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _load_samples(directory: Path | None) -> Iterator[str] | None:
+        """Cycle through the files of *directory*, if given."""
+        if directory is None:
+            return None
+        texts = [
+            path.read_text(encoding="utf-8")
+            for path in sorted(directory.iterdir())
+            if path.is_file()
+        ]
+        if not texts:
+            raise ValueError(f"No sample files in {directory}.")
+        return itertools.cycle(texts)
+
+    def _reply(self, prompt: str) -> str:
+        """Return a canned sample, or a JSON filler echoing the record id."""
+        if self._samples is not None:
+            return next(self._samples)
+        match = _ID_PATTERN.search(prompt)
+        return json.dumps(
+            {
+                "id": match.group(0) if match else None,
+                "text": "lorem ipsum " * (self.config.filler_chars // 12),
+            }
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the mock endpoint until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    parser.add_argument("--retry-after-ms", type=int, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--samples", type=Path, default=None)
+    parser.add_argument("--reasoning-tokens", type=int, default=0)
+    parser.add_argument(
+        "--prefix-cache",
+        action="store_true",
+        help="Emulate Azure's automatic prompt caching in cached_tokens.",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = MockAzureOpenAI(
+        MockConfig(
+            latency=args.latency,
+            tokens_per_second=args.tokens_per_second,
+            throttle_rate=args.throttle_rate,
+            max_in_flight=args.max_in_flight,
+            retry_after_ms=args.retry_after_ms,
+            error_rate=args.error_rate,
+            samples=args.samples,
+            reasoning_tokens=args.reasoning_tokens,
+            prefix_cache=args.prefix_cache,
+            seed=args.seed,
+        ),
+        port=args.port,
+    )
+
+    async def _serve() -> None:
+        async with server:
+            print(f"Mock Azure OpenAI listening on {server.endpoint}")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        print(f"\n{server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,167 @@
 Minimal pytest fixtures for data_generator tests.
 """
 
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Callable, Iterator
 from pathlib import Path
+from typing import Any
+from unittest.mock import patch
 
+import httpx
+import openai
 import pytest
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+
+# Make the data_generator package importable (mirrors tools/conftest.py)
+repo_root = Path(__file__).parents[4]
+sys.path.append(str(repo_root / "src" / "tools" / "python"))
+
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion  # noqa: E402
+from semantic_kernel.contents import ChatMessageContent  # noqa: E402
+from semantic_kernel.contents.utils.author_role import AuthorRole  # noqa: E402
+from semantic_kernel.contents.utils.finish_reason import FinishReason  # noqa: E402
+
+from data_generator.engine import DataGenerator  # noqa: E402
+from data_generator.tool import DataGeneratorTool  # noqa: E402
+
+
+class EchoTool(DataGeneratorTool):
+    """Tiny tool whose prompt embeds the record id so fakes can echo it back."""
+
+    name = "test-echo"
+    toolName = "TestEcho"
+
+    def build_prompt(self, output_format: str, *, unique_id: str | None = None) -> str:
+        return f"Echo record {unique_id} as {output_format}."
+
+    def cli_arguments(self) -> list[dict[str, Any]]:
+        return []
+
+    def validate_args(self, ns: argparse.Namespace) -> None:
+        return None
+
+    def examples(self) -> list[str]:
+        return []
+
+    def get_system_description(self) -> str:
+        return "Echo tool used by the engine tests."
+
+
+def make_api_error(
+    status: int, headers: dict[str, str] | None = None
+) -> openai.APIStatusError:
+    """Build the ``openai`` exception the SDK raises for an HTTP *status*."""
+    request = httpx.Request("POST", "https://example.openai.azure.com/chat")
+    response = httpx.Response(status, headers=headers, request=request)
+    error_cls = {
+        429: openai.RateLimitError,
+        500: openai.InternalServerError,
+    }.get(status, openai.APIStatusError)
+    return error_cls(f"HTTP {status}", response=response, body=None)
+
+
+class FakeCompletion:
+    """
+    Stand-in for ``AzureChatCompletion.get_chat_message_contents``.
+
+    Records every prompt it receives, the service id of the deployment it
+    was sent to and the execution settings, and tracks the peak number of requests in flight. ``responder`` maps the rendered prompt to the reply text and
+    ``usage`` maps (prompt, reply) to the reported ``CompletionUsage`` and
+    ``finish_reason`` maps the prompt to why the reply stopped.
+    """
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self.services: list[str] = []
+        self.settings: list[Any] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.delay = 0.0
+        self.responder: Callable[[str], str] = lambda prompt: json.dumps(
+            {"prompt": prompt}
+        )
+        self.finish_reason: Callable[[str], FinishReason] = (
+            lambda prompt: FinishReason.STOP
+        )
+        self.usage: Callable[[str, str], CompletionUsage] = (
+            lambda prompt, reply: CompletionUsage(
+                prompt_tokens=len(prompt) // 4,
+                completion_tokens=len(reply) // 4,
+                total_tokens=len(prompt) // 4 + len(reply) // 4,
+            )
+        )
+
+    async def __call__(
+        self, service: Any, chat_history: Any, settings: Any, **_kwargs: Any
+    ) -> list[ChatMessageContent]:
+        prompt = str(chat_history.messages[-1].content)
+        self.prompts.append(prompt)
+        self.services.append(service.service_id)
+        self.settings.append(settings)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            reply = self.responder(prompt)
+            finish_reason = self.finish_reason(prompt)
+            inner = ChatCompletion(
+                id="chatcmpl-fake",
+                created=0,
+                model="fake",
+                object="chat.completion",
+                choices=[
+                    Choice(
+                        index=0,
+                        finish_reason=finish_reason.value,
+                        message=ChatCompletionMessage(
+                            role="assistant", content=reply
+                        ),
+                    )
+                ],
+                usage=self.usage(prompt, reply),
+            )
+            return [
+                ChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    content=reply,
+                    inner_content=inner,
+                    finish_reason=finish_reason,
+                )
+            ]
+        finally:
+            self.in_flight -= 1
+
 
 @pytest.fixture()
 def temp_output_dir(tmp_path: Path) -> Path:
     """Return a temporary directory Path for test outputs."""
     return tmp_path / "output"
+
+
+@pytest.fixture()
+def fake_completion() -> Iterator[FakeCompletion]:
+    """Patch the Azure chat-completion service so no network call is made."""
+    fake = FakeCompletion()
+
+    async def _call(self: Any, *args: Any, **kwargs: Any) -> Any:
+        return await fake(self, *args, **kwargs)
+
+    with patch.object(AzureChatCompletion, "get_chat_message_contents", _call):
+        yield fake
+
+
+@pytest.fixture()
+def generator(fake_completion: FakeCompletion) -> DataGenerator:
+    """Return a ``DataGenerator`` wired to :class:`EchoTool` and the fake service."""
+    return DataGenerator(
+        EchoTool(),
+        azure_openai_endpoint="https://example.openai.azure.com",
+        azure_openai_deployment="test-deployment",
+        azure_openai_api_key="test-key",
+    )
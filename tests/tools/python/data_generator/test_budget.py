@@ -0,0 +1,66 @@
+"""
+Unit tests for the data_generator.budget module.
+"""
+
+import pytest
+
+from data_generator.budget import CompletionBudget
+
+
+def _budget(*sizes, **kwargs):
+    """Budget with a 16k ceiling that has observed *sizes*."""
+    budget = CompletionBudget(ceiling=16_000, min_samples=5, **kwargs)
+    for size in sizes:
+        budget.record(size)
+    return budget
+
+
+def test_ceiling_until_enough_samples():
+    """Too few observations keep the fixed ceiling."""
+    budget = _budget(100, 100, 100, 100)
+
+    assert not budget.adaptive
+    assert budget.limit() == 16_000
+
+
+def test_limit_follows_percentile_plus_headroom():
+    """p95 times headroom, rounded up to 64 tokens, scaled per record."""
+    budget = _budget(*range(100, 1100, 50))       # 20 samples, p95 = 1000
+
+    assert budget.observed() == 1000
+    assert budget.limit() == 1280                  # 1250 rounded up
+    assert budget.limit(records=4) == 5056
+    assert budget.limit(records=20) == 16_000      # capped at the ceiling
+
+
+def test_floor_applies_to_tiny_records():
+    """Very short records still get the minimum limit."""
+    assert _budget(10, 10, 10, 10, 10).limit() == 256
+
+
+def test_override_disables_adaptation():
+    """A manual limit is used as is, per record."""
+    budget = _budget(100, 100, 100, 100, 100, override=700)
+
+    assert not budget.adaptive
+    assert budget.limit() == 700
+    assert budget.limit(records=2) == 1400
+
+
+def test_truncated_reply_raises_the_floor():
+    """A cut-off reply doubles the room for the following calls."""
+    budget = _budget(200, 200, 200, 200, 200)
+    limit = budget.limit()
+
+    budget.record_truncated(limit)
+
+    assert budget.truncated == 1
+    assert budget.limit() == 2 * limit
+
+
+def test_invalid_settings():
+    """Non-positive overrides and percentiles are configuration errors."""
+    with pytest.raises(ValueError, match="at least 1"):
+        CompletionBudget(ceiling=100, override=0)
+    with pytest.raises(ValueError, match="percentile"):
+        CompletionBudget(ceiling=100, percentile=0)
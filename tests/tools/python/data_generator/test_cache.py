@@ -0,0 +1,109 @@
+"""
+Unit tests for the data_generator.cache module.
+"""
+
+import time
+
+import pytest
+
+from data_generator.cache import ResponseCache, cache_key
+from data_generator.usage import TokenUsage
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    """Return an unbounded cache that is closed after the test."""
+    with ResponseCache(tmp_path / "cache" / "responses.sqlite") as response_cache:
+        yield response_cache
+
+
+def test_key_covers_prompt_deployment_and_settings():
+    """Changing any of the three inputs changes the content address."""
+    base = cache_key("prompt", "gpt", {"max_completion_tokens": 10})
+
+    assert base == cache_key("prompt", "gpt", {"max_completion_tokens": 10})
+    assert base != cache_key("prompt!", "gpt", {"max_completion_tokens": 10})
+    assert base != cache_key("prompt", "gpt-mini", {"max_completion_tokens": 10})
+    assert base != cache_key("prompt", "gpt", {"max_completion_tokens": 11})
+
+
+def test_round_trip_and_hit_counters(cache):
+    """Stored completions come back with their usage and metadata."""
+    usage = TokenUsage(prompt_tokens=3, completion_tokens=4, cached_tokens=1)
+    cache.put("k", "text", usage=usage, scenario="s", unique_id="id-1")
+
+    hit = cache.get("missing", "k")
+
+    assert hit.text == "text"
+    assert hit.usage == usage
+    assert hit.unique_id == "id-1"
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """A new process sees the completions an earlier one paid for."""
+    path = tmp_path / "responses.sqlite"
+    with ResponseCache(path) as first:
+        first.put("k", "text")
+    with ResponseCache(path) as second:
+        assert second.get("k").text == "text"
+
+
+def test_entries_filter_by_run_and_skip_completed(cache):
+    """Replay candidates are selected by scenario, format, origin and id."""
+    for i, origin in enumerate(["/a", "/a", "/b"]):
+        cache.put(
+            f"k{i}",
+            f"t{i}",
+            scenario="s",
+            output_format="json",
+            unique_id=f"id-{i}",
+            origin=origin,
+        )
+    cache.put("other", "x", scenario="s", output_format="yaml", origin="/a")
+
+    assert [e.key for e in cache.entries(scenario="s", output_format="json")] == [
+        "k0",
+        "k1",
+        "k2",
+    ]
+    pending = cache.entries(
+        scenario="s", output_format="json", origin="/a", exclude_ids={"id-0"}
+    )
+    assert [e.key for e in pending] == ["k1"]
+    assert len(cache.entries(scenario="s", output_format="json", limit=2)) == 2
+
+
+def test_eviction_by_size_drops_least_recently_used(tmp_path):
+    """Over the size limit, the entries used longest ago go first."""
+    path = tmp_path / "responses.sqlite"
+    with ResponseCache(path) as cache:
+        for key in ("old", "mid", "new"):
+            cache.put(key, "x" * 100)
+            time.sleep(0.01)
+        cache.get("old")                    # refresh: now most recently used
+
+    with ResponseCache(path, max_bytes=250) as cache:
+        assert cache.get("mid") is None
+        assert cache.get("old") is not None
+        assert cache.get("new") is not None
+
+
+def test_eviction_by_age(tmp_path):
+    """Entries older than ``max_age_seconds`` are dropped."""
+    path = tmp_path / "responses.sqlite"
+    with ResponseCache(path) as cache:
+        cache.put("k", "text")
+    time.sleep(0.05)
+
+    with ResponseCache(path, max_age_seconds=0.01) as cache:
+        assert len(cache) == 0
+
+
+def test_discard(cache):
+    """A discarded entry is gone."""
+    cache.put("k", "text")
+    cache.discard("k")
+
+    assert cache.get("k") is None
@@ -569,11 +569,25 @@ class TestCliHelpAndErrors(unittest.TestCase):
         mock_args.azure_openai_endpoint = None
         mock_args.azure_openai_deployment = None
         mock_args.azure_openai_api_key = None
+        mock_args.deployments = None
+        mock_args.routes = None
+        mock_args.cache = None
+        mock_args.replay = False
+        mock_args.max_concurrency = None
+        mock_args.output_formats = None
+        mock_args.records_per_call = 1
+        mock_args.structured_outputs = False
+        mock_args.max_completion_tokens = None
+        mock_args.report = False
+        mock_args.process_workers = None
+        mock_args.hierarchical = False
+        mock_args.max_sections = None
+        mock_args.entity_pool = None
         mock_parser.parse_args.return_value = mock_args
         mock_parser_class.side_effect = [mock_phase1, mock_parser]
         # Patch DataGeneratorTool and DataGenerator
         with patch("data_generator.cli.DataGeneratorTool") as mock_tool_class, \
-             patch("data_generator.cli.DataGenerator") as mock_generator_class:
+             patch("data_generator.engine.DataGenerator") as mock_generator_class:
             mock_tool = MagicMock()
             mock_tool.examples.return_value = ["Example 1"]
             mock_tool.cli_arguments.return_value = []
@@ -588,6 +602,98 @@ class TestCliHelpAndErrors(unittest.TestCase):
             ])
             mock_generator.run.assert_called_once()
 
+    @patch('argparse.ArgumentParser')
+    def test_entity_pool_is_attached(self, mock_parser_class):
+        """--entity-pool attaches an EntityPool of that directory to the tool."""
+        import tempfile
+
+        from data_generator.entities import EntityPool
+
+        mock_phase1 = MagicMock()
+        mock_phase1_args = MagicMock()
+        mock_phase1_args.scenario = "test-scenario"
+        mock_phase1.parse_known_intermixed_args.return_value = (mock_phase1_args, [])
+        mock_parser = MagicMock()
+        mock_args = MagicMock()
+        mock_args.deployments = None
+        mock_args.routes = None
+        mock_args.cache = None
+        mock_args.replay = False
+        mock_args.max_concurrency = None
+        mock_args.entity_pool_size = 25
+        mock_parser.parse_args.return_value = mock_args
+        mock_parser_class.side_effect = [mock_phase1, mock_parser]
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch("data_generator.cli.DataGeneratorTool") as mock_tool_class, \
+             patch("data_generator.engine.DataGenerator"):
+            mock_args.entity_pool = Path(tmp)
+            mock_tool = MagicMock()
+            mock_tool.cli_arguments.return_value = []
+            mock_tool_class.from_name.return_value = mock_tool
+            from data_generator import cli
+            cli.main(["--scenario", "test-scenario", "--out-dir", "/tmp/output"])
+            (pool,), _ = mock_tool.use_entity_pool.call_args
+            self.assertIsInstance(pool, EntityPool)
+            self.assertEqual((pool.directory, pool.size), (Path(tmp), 25))
+
+    @patch('argparse.ArgumentParser')
+    def test_routes_are_passed_to_the_generator(self, mock_parser_class):
+        """--routes loads the routing table and hands it to DataGenerator."""
+        import tempfile
+
+        from data_generator.routing import Route
+
+        mock_phase1 = MagicMock()
+        mock_phase1_args = MagicMock()
+        mock_phase1_args.scenario = "test-scenario"
+        mock_phase1.parse_known_intermixed_args.return_value = (mock_phase1_args, [])
+        mock_parser = MagicMock()
+        mock_args = MagicMock()
+        mock_args.deployments = None
+        mock_args.cache = None
+        mock_args.replay = False
+        mock_args.max_concurrency = None
+        mock_args.entity_pool = None
+        mock_parser.parse_args.return_value = mock_args
+        mock_parser_class.side_effect = [mock_phase1, mock_parser]
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch("data_generator.cli.DataGeneratorTool") as mock_tool_class, \
+             patch("data_generator.engine.DataGenerator") as mock_generator_class:
+            mock_args.routes = Path(tmp) / "routes.yaml"
+            mock_args.routes.write_text("- {scenario: test-scenario, deployments: fast}\n")
+            mock_tool = MagicMock()
+            mock_tool.cli_arguments.return_value = []
+            mock_tool_class.from_name.return_value = mock_tool
+            from data_generator import cli
+            cli.main(["--scenario", "test-scenario", "--out-dir", "/tmp/output"])
+            _, kwargs = mock_generator_class.call_args
+            self.assertEqual(
+                kwargs["routes"],
+                [Route(deployments=("fast",), scenarios=("test-scenario",))],
+            )
+
+    def test_invalid_limits_are_reported_by_the_parser(self):
+        """Non-positive limits and a ceiling below --concurrency exit with usage."""
+        from data_generator import cli
+
+        for flags in (
+            ["--concurrency", "0"],
+            ["--records-per-call", "-1"],
+            ["--timeout-seconds", "0"],
+            ["--concurrency", "8", "--max-concurrency", "4"],
+        ):
+            with self.subTest(flags=flags), \
+                 patch("data_generator.cli.DataGeneratorTool") as mock_tool_class, \
+                 patch("data_generator.engine.DataGenerator") as mock_generator, \
+                 patch("sys.stderr"), \
+                 self.assertRaises(SystemExit) as raised:
+                mock_tool_class.from_name.return_value.cli_arguments.return_value = []
+                cli.main(
+                    ["--scenario", "test-scenario", "--out-dir", "/tmp/output", *flags]
+                )
+            self.assertEqual(raised.exception.code, 2)
+            mock_generator.assert_not_called()
+
     @patch('argparse.ArgumentParser')
     def test_help_text_prints(self, mock_parser_class):
         """Test that help text is printed when -h is passed."""
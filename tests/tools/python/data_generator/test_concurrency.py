@@ -0,0 +1,95 @@
+"""
+Unit tests for the data_generator.concurrency module.
+"""
+
+import asyncio
+
+import pytest
+
+from data_generator.concurrency import AdaptiveConcurrencyLimiter
+
+
+def _feed(limiter: AdaptiveConcurrencyLimiter, latency: float, n: int) -> None:
+    for _ in range(n):
+        limiter.record_success(latency)
+
+
+def test_fixed_limiter_never_moves():
+    """With equal bounds the limiter behaves like a semaphore."""
+    limiter = AdaptiveConcurrencyLimiter(initial=4)
+    _feed(limiter, 0.1, 100)
+    limiter.record_congestion("HTTP 429 throttling")
+
+    assert not limiter.adaptive
+    assert limiter.limit == 4
+
+
+def test_additive_increase_while_latency_is_stable():
+    """Each clean window raises the limit by one step, up to the maximum."""
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=4)
+    _feed(limiter, 0.1, 8)
+    assert limiter.limit == 3
+    _feed(limiter, 0.1, 100)
+    assert limiter.limit == 4
+    assert limiter.peak == 4
+
+
+def test_multiplicative_decrease_on_throttling():
+    """A 429 halves the limit but never goes below the minimum."""
+    limiter = AdaptiveConcurrencyLimiter(initial=16, maximum=32)
+    limiter.record_congestion("HTTP 429 throttling")
+    assert limiter.limit == 8
+
+
+def test_burst_of_throttles_only_cuts_once():
+    """Throttles within one typical latency of a cut are ignored."""
+    limiter = AdaptiveConcurrencyLimiter(initial=16, maximum=32)
+    _feed(limiter, 60.0, 3)  # establish a long typical latency
+    for _ in range(5):
+        limiter.record_congestion("HTTP 429 throttling")
+    assert limiter.limit == 8
+
+
+def test_latency_spike_triggers_decrease():
+    """A window whose p95 exceeds the baseline by the spike ratio is congestion."""
+    limiter = AdaptiveConcurrencyLimiter(initial=8, maximum=8 * 4)
+    _feed(limiter, 0.0, 8)           # baseline window (limit rises to 9)
+    _feed(limiter, 5.0, 9)           # spike
+    assert limiter.limit == 4
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"initial": 0},
+        {"initial": 4, "maximum": 2},
+        {"initial": 4, "minimum": 5, "maximum": 8},
+        {"initial": 4, "maximum": 8, "decrease_factor": 1.0},
+    ],
+)
+def test_invalid_bounds_rejected(kwargs):
+    """Inconsistent bounds raise ValueError."""
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(**kwargs)
+
+
+def test_slot_enforces_current_limit():
+    """No more than ``limit`` holders are inside ``slot()`` at once."""
+    limiter = AdaptiveConcurrencyLimiter(initial=3)
+    inside = 0
+    peak = 0
+
+    async def _hold():
+        nonlocal inside, peak
+        async with limiter.slot():
+            inside += 1
+            peak = max(peak, inside)
+            await asyncio.sleep(0.01)
+            inside -= 1
+
+    async def _main():
+        await asyncio.gather(*(_hold() for _ in range(12)))
+
+    asyncio.run(_main())
+    assert peak == 3
+    assert limiter.in_flight == 0
@@ -0,0 +1,195 @@
+"""
+Unit tests for the data_generator.deployments module.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from data_generator.deployments import (
+    Deployment,
+    DeploymentPool,
+    load_deployments,
+)
+from data_generator.usage import TokenUsage
+
+
+def _pool(*weights, routing="least-outstanding", **quota):
+    """Build a pool of deployments ``d1``, ``d2``, … with *weights*."""
+    return DeploymentPool(
+        [
+            (
+                f"svc{i}",
+                Deployment(
+                    endpoint=f"https://d{i}.openai.azure.com",
+                    deployment="gpt",
+                    weight=weight,
+                    **quota,
+                ),
+            )
+            for i, weight in enumerate(weights, start=1)
+        ],
+        routing=routing,
+    )
+
+
+def test_least_outstanding_respects_weights():
+    """In-flight requests are spread in proportion to the weights."""
+    pool = _pool(3.0, 1.0)
+
+    async def _main():
+        return [await pool.acquire(10) for _ in range(8)]
+
+    chosen = asyncio.run(_main())
+
+    assert [s.service_id for s in chosen].count("svc1") == 6
+    assert pool.states[0].in_flight == 6
+    assert pool.states[1].in_flight == 2
+
+
+def test_release_frees_capacity():
+    """A finished request makes its deployment preferable again."""
+    pool = _pool(1.0, 1.0)
+
+    async def _main():
+        first = await pool.acquire(10)
+        await pool.acquire(10)
+        pool.release(first)
+        return await pool.acquire(10)
+
+    assert asyncio.run(_main()).service_id == "svc1"
+
+
+def test_quota_routing_prefers_most_headroom():
+    """The ``quota`` policy sends work where the most TPM budget is left."""
+    pool = _pool(1.0, 1.0, routing="quota", tokens_per_minute=60_000)
+
+    async def _main():
+        first = await pool.acquire(5_000)
+        second = await pool.acquire(10)
+        return first, second
+
+    first, second = asyncio.run(_main())
+
+    assert first.service_id == "svc1"
+    assert second.service_id == "svc2"
+
+
+def test_throttled_deployment_leaves_rotation():
+    """A 429 takes the deployment out of rotation for the Retry-After time."""
+    pool = _pool(1.0, 1.0)
+    throttled = pool.states[0]
+
+    pool.record_throttled(throttled, retry_after=30.0)
+
+    async def _main():
+        return [await pool.acquire(10) for _ in range(3)]
+
+    assert {s.service_id for s in asyncio.run(_main())} == {"svc2"}
+    assert throttled.throttled == 1
+    assert pool.has_alternative()
+
+
+def test_pool_waits_when_every_deployment_cools_down():
+    """With no deployment in rotation, ``acquire`` waits for the first one."""
+    pool = _pool(1.0, 1.0)
+    pool.record_throttled(pool.states[0], retry_after=0.05)
+    pool.record_throttled(pool.states[1], retry_after=1.0)
+    assert not pool.has_alternative()
+
+    state = asyncio.run(pool.acquire(10))
+
+    assert state.service_id == "svc1"
+
+
+def test_single_deployment_never_cools_down():
+    """One deployment stays in rotation; throttling is only counted."""
+    pool = _pool(1.0)
+    pool.record_throttled(pool.states[0], retry_after=30.0)
+
+    assert asyncio.run(pool.acquire(10)).service_id == "svc1"
+    assert pool.states[0].throttled == 1
+    assert not pool.has_alternative()
+
+
+def test_record_success_tracks_usage_and_resets_backoff():
+    """Completed requests accumulate tokens and end a throttling streak."""
+    pool = _pool(1.0, 1.0)
+    state = pool.states[0]
+    pool.record_throttled(state, retry_after=None)
+    pool.record_throttled(state, retry_after=None)
+    assert state.consecutive_throttles == 2
+
+    pool.record_success(
+        state,
+        TokenUsage(prompt_tokens=10, completion_tokens=5),
+        reserved=100,
+    )
+
+    assert state.records == 1
+    assert state.usage.total_tokens == 15
+    assert state.consecutive_throttles == 0
+
+
+def test_pool_validation():
+    """Empty pools and unknown routing policies are configuration errors."""
+    with pytest.raises(ValueError, match="At least one"):
+        DeploymentPool([])
+    with pytest.raises(ValueError, match="Unknown routing policy"):
+        _pool(1.0, routing="random")
+
+
+def test_load_deployments_yaml(tmp_path, monkeypatch):
+    """YAML files map to deployments; keys may come from the environment."""
+    monkeypatch.setenv("EAST_KEY", "secret")
+    path = tmp_path / "deployments.yaml"
+    path.write_text(
+        "- endpoint: https://east.openai.azure.com\n"
+        "  deployment: gpt\n"
+        "  api_key_env: EAST_KEY\n"
+        "  weight: 2\n"
+        "  tpm: 90000\n"
+        "- endpoint: https://west.openai.azure.com\n"
+        "  deployment: gpt\n"
+        "  name: west\n",
+        encoding="utf-8",
+    )
+
+    east, west = load_deployments(path)
+
+    assert east.api_key == "secret"
+    assert east.weight == 2.0
+    assert east.tokens_per_minute == 90000
+    assert east.label == "east.openai.azure.com/gpt"
+    assert west.label == "west"
+
+
+def test_load_deployments_json(tmp_path):
+    """JSON is accepted as well (it is a subset of YAML)."""
+    path = tmp_path / "deployments.json"
+    path.write_text(
+        json.dumps([{"endpoint": "https://a.openai.azure.com", "deployment": "m"}]),
+        encoding="utf-8",
+    )
+
+    assert load_deployments(path) == [
+        Deployment(endpoint="https://a.openai.azure.com", deployment="m")
+    ]
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        ("{}", "non-empty list"),
+        ("- deployment: m\n", "Invalid deployment #1"),
+        ("- {endpoint: https://a, deployment: m, weight: 0}\n", "positive weight"),
+    ],
+)
+def test_load_deployments_rejects_bad_files(tmp_path, content, message):
+    """Malformed deployment files are reported with the offending entry."""
+    path = tmp_path / "deployments.yaml"
+    path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError, match=message):
+        load_deployments(path)
@@ -2,6 +2,28 @@
 Simple stub tests for the data_generator.engine module.
 """
 
+import asyncio
+import json
+import re
+from unittest.mock import patch
+
+import pytest
+import yaml
+from openai.types import CompletionUsage
+from semantic_kernel import Kernel
+from semantic_kernel.contents.utils.finish_reason import FinishReason
+
+from data_generator.cache import CacheMissError, ResponseCache
+from data_generator.deployments import Deployment
+from data_generator.engine import DataGenerator
+from data_generator.manifest import RunManifest
+from data_generator.ratelimit import RateLimiter
+from data_generator.retry import ErrorClass, RetryPolicy
+from data_generator.routing import Route
+from data_generator.schema import RecordModel
+
+from .conftest import EchoTool, make_api_error
+
 
 def test_environment_vars_stub() -> None:
     """Stub test for environment variable handling."""
@@ -19,3 +41,1413 @@ def test_data_generation_stub() -> None:
     """Stub test for data generation functionality."""
     # This is a stub test that always passes
     assert True
+
+
+# ---------------------------------------------------------------------- #
+# Worker-pool scheduling                                                 #
+# ---------------------------------------------------------------------- #
+def test_run_writes_one_file_per_record(generator, fake_completion, temp_output_dir):
+    """Every requested record is generated and persisted exactly once."""
+    generator.run(count=25, out_dir=temp_output_dir, concurrency=4)
+
+    assert len(fake_completion.prompts) == 25
+    assert len(list(temp_output_dir.glob("TestEcho_*.json"))) == 25
+
+
+def test_run_never_exceeds_pool_size(generator, fake_completion, temp_output_dir):
+    """The number of requests in flight is bounded by ``concurrency``."""
+    fake_completion.delay = 0.01
+    generator.run(count=30, out_dir=temp_output_dir, concurrency=3)
+
+    assert fake_completion.peak_in_flight == 3
+
+
+def test_run_creates_only_pool_size_coroutines(
+    generator, fake_completion, temp_output_dir, monkeypatch
+):
+    """Record coroutines are created lazily rather than all up front."""
+    created = 0
+    live = 0
+    peak_live = 0
+    original = generator._generate_one_async
+
+    async def _tracking(**kwargs):
+        nonlocal created, live, peak_live
+        created += 1
+        live += 1
+        peak_live = max(peak_live, live)
+        try:
+            await original(**kwargs)
+        finally:
+            live -= 1
+
+    monkeypatch.setattr(generator, "_generate_one_async", _tracking)
+    generator.run(count=40, out_dir=temp_output_dir, concurrency=2)
+
+    assert created == 40
+    assert peak_live == 2
+
+
+def test_run_counts_failures_without_stopping_the_pool(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """A failing record is logged and counted; the remaining work continues."""
+    calls = 0
+
+    def _flaky(prompt):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("boom")
+        return "{}"
+
+    fake_completion.responder = _flaky
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(count=5, out_dir=temp_output_dir, concurrency=1)
+
+    assert "Success: 4, Failed: 1" in caplog.text
+    assert "Worker pool: 1 workers" in caplog.text
+
+
+def test_run_rejects_empty_pool(generator, temp_output_dir):
+    """A pool without workers is a configuration error."""
+    with pytest.raises(ValueError, match="concurrency"):
+        generator.run(count=1, out_dir=temp_output_dir, concurrency=0)
+
+
+# ---------------------------------------------------------------------- #
+# Prompt-function cache                                                  #
+# ---------------------------------------------------------------------- #
+def test_prompt_function_registered_once_per_format(
+    generator, fake_completion, temp_output_dir
+):
+    """The kernel function is compiled once and reused for every record."""
+    with patch.object(
+        Kernel, "add_function", autospec=True, side_effect=Kernel.add_function
+    ) as add_function:
+        generator.run(count=10, out_dir=temp_output_dir, concurrency=3)
+        generator.run(count=5, out_dir=temp_output_dir, output_format="yaml")
+
+    assert add_function.call_count == 2
+    assert set(generator._prompt_functions) == {
+        ("TestEcho", "json", None, None),
+        ("TestEcho", "yaml", None, None),
+    }
+
+
+def test_rendered_prompt_reaches_model_verbatim(
+    generator, fake_completion, temp_output_dir, monkeypatch
+):
+    """Per-record prompts are passed as arguments, not re-parsed as templates."""
+    prompt = 'Return {"a": "<b> & c"} and keep {{$literal}} as-is.'
+    monkeypatch.setattr(
+        generator.tool, "build_prompt", lambda fmt, *, unique_id=None: prompt
+    )
+    generator.run(count=2, out_dir=temp_output_dir)
+
+    assert fake_completion.prompts == [prompt, prompt]
+
+
+# ---------------------------------------------------------------------- #
+# Request timeouts and run deadline                                      #
+# ---------------------------------------------------------------------- #
+def test_request_timeout_excludes_queue_wait(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Records waiting for a worker do not consume their request timeout."""
+    fake_completion.delay = 0.05
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=6, out_dir=temp_output_dir, concurrency=1, timeout_seconds=0.2
+        )
+
+    assert "Success: 6, Failed: 0, Skipped: 0" in caplog.text
+
+
+def test_request_timeout_still_bounds_slow_requests(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """A request slower than ``timeout_seconds`` is counted as a failure."""
+    fake_completion.delay = 0.5
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=2,
+            out_dir=temp_output_dir,
+            concurrency=2,
+            timeout_seconds=0.05,
+            retry_policy=RetryPolicy.disabled(),
+        )
+
+    assert "Success: 0, Failed: 2" in caplog.text
+    assert "timed out" in caplog.text
+
+
+def test_run_deadline_stops_starting_new_work(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Once the deadline is near, remaining records are skipped, not failed."""
+    fake_completion.delay = 0.05
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=1000,
+            out_dir=temp_output_dir,
+            concurrency=2,
+            deadline_seconds=0.3,
+        )
+
+    assert len(fake_completion.prompts) < 20
+    assert "Run deadline reached" in caplog.text
+    summary = next(
+        r.getMessage() for r in caplog.records if "Generation finished" in r.getMessage()
+    )
+    skipped = int(re.search(r"Skipped: (\d+)", summary).group(1))
+    assert skipped == 1000 - len(fake_completion.prompts)
+
+
+# ---------------------------------------------------------------------- #
+# Adaptive concurrency                                                   #
+# ---------------------------------------------------------------------- #
+def test_adaptive_concurrency_backs_off_on_throttling(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """An HTTP 429 from the service halves the in-flight limit."""
+    def _throttle_first(prompt):
+        if len(fake_completion.prompts) == 1:
+            raise make_api_error(429)
+        return "{}"
+
+    fake_completion.responder = _throttle_first
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=4,
+            out_dir=temp_output_dir,
+            concurrency=8,
+            max_concurrency=16,
+            retry_policy=RetryPolicy(base_delay=0.001),
+        )
+
+    assert "Concurrency limit 8 -> 4 (HTTP 429 throttling)" in caplog.text
+    assert "Adaptive concurrency: final limit 4" in caplog.text
+
+
+def test_adaptive_concurrency_grows_while_healthy(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Stable latency raises the limit towards ``max_concurrency``."""
+    fake_completion.delay = 0.001
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=200, out_dir=temp_output_dir, concurrency=2, max_concurrency=6
+        )
+
+    assert "Concurrency limit 2 -> 3" in caplog.text
+    assert fake_completion.peak_in_flight > 2
+    assert fake_completion.peak_in_flight <= 6
+
+
+def test_fixed_concurrency_ignores_throttling(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Without ``max_concurrency`` the limit stays where the caller put it."""
+    def _always_throttle(prompt):
+        raise make_api_error(429)
+
+    fake_completion.responder = _always_throttle
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=3,
+            out_dir=temp_output_dir,
+            concurrency=3,
+            retry_policy=RetryPolicy.disabled(),
+        )
+
+    assert "Concurrency limit" not in caplog.text
+
+
+# ---------------------------------------------------------------------- #
+# Rate limiting                                                          #
+# ---------------------------------------------------------------------- #
+def test_rate_limiter_reconciles_with_reported_usage(
+    generator, fake_completion, temp_output_dir, monkeypatch
+):
+    """Reservations are corrected with the usage block of each response."""
+    reconciled = []
+    monkeypatch.setattr(
+        RateLimiter,
+        "reconcile",
+        lambda self, reserved, actual: reconciled.append((reserved, actual)),
+    )
+    generator.run(
+        count=3,
+        out_dir=temp_output_dir,
+        requests_per_minute=600,
+        tokens_per_minute=1_000_000,
+    )
+
+    assert len(reconciled) == 3
+    for reserved, actual in reconciled:
+        assert reserved > 16_000          # prompt estimate + completion budget
+        assert 0 < actual < 1_000         # usage reported by the fake service
+
+
+# ---------------------------------------------------------------------- #
+# Retries                                                                #
+# ---------------------------------------------------------------------- #
+def test_sdk_retries_are_disabled(generator):
+    """The engine owns retries, so the OpenAI client must not retry itself."""
+    service = generator.kernel.get_service("azure_open_ai")
+    assert service.client.max_retries == 0
+
+
+def test_throttled_request_is_retried_after_hint(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """A 429 is retried after the ``retry-after-ms`` delay and then succeeds."""
+    def _throttle_once(prompt):
+        if len(fake_completion.prompts) == 1:
+            raise make_api_error(429, {"retry-after-ms": "10"})
+        return "{}"
+
+    fake_completion.responder = _throttle_once
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(count=1, out_dir=temp_output_dir, concurrency=1)
+
+    assert len(fake_completion.prompts) == 2
+    assert "Success: 1, Failed: 0, Skipped: 0, Retries: 1" in caplog.text
+    assert "Retries by cause: throttled=1." in caplog.text
+    assert "retry 1/6 in 0.0s" in caplog.text
+
+
+def test_unparseable_output_is_regenerated(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Malformed JSON counts as a parse error and the record is requested again."""
+    replies = iter(['{"truncated": ', '{"ok": true}'])
+    fake_completion.responder = lambda prompt: next(replies)
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=1,
+            out_dir=temp_output_dir,
+            retry_policy=RetryPolicy(base_delay=0.001),
+        )
+
+    assert "Retries by cause: parse_error=1." in caplog.text
+    (written,) = temp_output_dir.glob("*.json")
+    assert written.read_text(encoding="utf-8").strip() == '{\n  "ok": true\n}'
+
+
+def test_retry_budget_is_per_error_class(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Once a class exhausts its budget the record fails."""
+    def _always_failing(prompt):
+        raise make_api_error(500)
+
+    fake_completion.responder = _always_failing
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=1,
+            out_dir=temp_output_dir,
+            retry_policy=RetryPolicy(
+                budgets={ErrorClass.SERVER_ERROR: 2}, base_delay=0.001
+            ),
+        )
+
+    assert len(fake_completion.prompts) == 3
+    assert "Success: 0, Failed: 1, Skipped: 0, Retries: 2" in caplog.text
+
+
+def test_non_transient_errors_are_not_retried(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """A 400-class error is a bug in the request, so it fails immediately."""
+    def _bad_request(prompt):
+        raise make_api_error(400)
+
+    fake_completion.responder = _bad_request
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(count=1, out_dir=temp_output_dir)
+
+    assert len(fake_completion.prompts) == 1
+    assert "Failed: 1, Skipped: 0, Retries: 0" in caplog.text
+
+
+def test_retry_is_abandoned_when_it_would_overrun_the_deadline(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """A ``Retry-After`` longer than the remaining run time ends the record."""
+    def _throttle(prompt):
+        raise make_api_error(429, {"retry-after": "30"})
+
+    fake_completion.responder = _throttle
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(count=1, out_dir=temp_output_dir, deadline_seconds=5)
+
+    assert len(fake_completion.prompts) == 1
+    assert "Failed: 1, Skipped: 0, Retries: 0" in caplog.text
+
+
+# ---------------------------------------------------------------------- #
+# Checkpoint / resume                                                    #
+# ---------------------------------------------------------------------- #
+def test_run_records_every_record_in_manifest(
+    generator, fake_completion, temp_output_dir
+):
+    """Successes carry their output path and usage; failures their error."""
+    def _fail_third(prompt):
+        if len(fake_completion.prompts) == 3:
+            raise RuntimeError("boom")
+        return "{}"
+
+    fake_completion.responder = _fail_third
+    generator.run(count=4, out_dir=temp_output_dir, concurrency=1)
+
+    state = RunManifest(temp_output_dir).load()
+    assert len(state.completed) == 3
+    assert state.failed == 1
+    header = state.runs[-1]
+    assert (header["scenario"], header["output_format"], header["count"]) == (
+        "test-echo",
+        "json",
+        4,
+    )
+    entry = next(iter(state.completed.values()))
+    assert (temp_output_dir / entry.output).exists()
+    assert entry.usage["prompt_tokens"] > 0
+
+
+def test_resume_generates_only_missing_records(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """A resumed run tops the directory up to ``count`` with fresh indices."""
+    def _fail_odd(prompt):
+        if len(fake_completion.prompts) % 2:
+            raise RuntimeError("boom")
+        return "{}"
+
+    fake_completion.responder = _fail_odd
+    generator.run(count=6, out_dir=temp_output_dir, concurrency=1)
+    assert len(list(temp_output_dir.glob("*.json"))) == 3
+
+    fake_completion.responder = lambda prompt: "{}"
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(count=6, out_dir=temp_output_dir, resume=True)
+
+    assert "3 of 6 records already generated, 3 to go" in caplog.text
+    assert len(fake_completion.prompts) == 9
+    assert len(list(temp_output_dir.glob("*.json"))) == 6
+    state = RunManifest(temp_output_dir).load()
+    assert len(state.completed) == 6
+    assert state.last_index == 9
+
+
+def test_resume_of_finished_run_does_nothing(
+    generator, fake_completion, temp_output_dir
+):
+    """Nothing is generated when the manifest already holds ``count`` records."""
+    generator.run(count=3, out_dir=temp_output_dir)
+    generator.run(count=3, out_dir=temp_output_dir, resume=True)
+
+    assert len(fake_completion.prompts) == 3
+
+
+def test_resume_rejects_other_output_format(
+    generator, fake_completion, temp_output_dir
+):
+    """Mixing formats in one output directory is refused."""
+    generator.run(count=1, out_dir=temp_output_dir)
+    with pytest.raises(ValueError, match="Cannot resume"):
+        generator.run(
+            count=2, out_dir=temp_output_dir, output_format="yaml", resume=True
+        )
+
+
+# ---------------------------------------------------------------------- #
+# Output sinks                                                           #
+# ---------------------------------------------------------------------- #
+def test_run_writes_rotating_jsonl_shards(
+    generator, fake_completion, temp_output_dir
+):
+    """The jsonl sink packs records into shards instead of one file each."""
+    generator.run(
+        count=25, out_dir=temp_output_dir, sink="jsonl", records_per_shard=10
+    )
+
+    shards = sorted(p.name for p in temp_output_dir.glob("TestEcho-*"))
+    assert shards == [
+        "TestEcho-00001.jsonl",
+        "TestEcho-00002.jsonl",
+        "TestEcho-00003.jsonl",
+    ]
+    lines = [
+        line
+        for shard in shards
+        for line in (temp_output_dir / shard).read_text(encoding="utf-8").splitlines()
+    ]
+    assert len(lines) == 25
+    state = RunManifest(temp_output_dir).load()
+    assert {entry.output for entry in state.completed.values()} == set(shards)
+
+
+def test_resume_with_shards_appends_new_shards(
+    generator, fake_completion, temp_output_dir
+):
+    """A resumed sharded run adds shards after the existing ones."""
+    generator.run(count=3, out_dir=temp_output_dir, sink="jsonl")
+    generator.run(count=5, out_dir=temp_output_dir, sink="jsonl", resume=True)
+
+    assert len(fake_completion.prompts) == 5
+    assert sorted(p.name for p in temp_output_dir.glob("TestEcho-*")) == [
+        "TestEcho-00001.jsonl",
+        "TestEcho-00002.jsonl",
+    ]
+
+
+# ---------------------------------------------------------------------- #
+# Multiple deployments                                                   #
+# ---------------------------------------------------------------------- #
+def _multi_deployment_generator(*names, **kwargs):
+    """Return a generator spreading load over one deployment per *name*."""
+    return DataGenerator(
+        EchoTool(),
+        azure_openai_api_key="test-key",
+        deployments=[
+            Deployment(
+                endpoint=f"https://{name}.openai.azure.com",
+                deployment="gpt",
+                name=name,
+                **kwargs,
+            )
+            for name in names
+        ],
+    )
+
+
+def test_deployments_register_one_service_each(fake_completion, monkeypatch):
+    """Every deployment becomes a kernel service without SDK retries."""
+    monkeypatch.delenv("AZURE_OPENAI_ENDPOINT", raising=False)
+    monkeypatch.delenv("AZURE_OPENAI_DEPLOYMENT", raising=False)
+    gen = _multi_deployment_generator("east", "west")
+
+    assert gen.service_ids == ["azure_open_ai", "azure_open_ai_2"]
+    second = gen.kernel.get_service("azure_open_ai_2")
+    assert str(second.client.base_url).startswith("https://west.openai.azure.com")
+    assert second.client.max_retries == 0
+
+
+def test_requests_are_spread_over_deployments(
+    fake_completion, temp_output_dir, caplog
+):
+    """Concurrent requests go to every deployment; each is reported."""
+    fake_completion.delay = 0.005
+    gen = _multi_deployment_generator("east", "west")
+    with caplog.at_level("INFO", logger="data-generator"):
+        gen.run(count=20, out_dir=temp_output_dir, concurrency=4)
+
+    east = fake_completion.services.count("azure_open_ai")
+    west = fake_completion.services.count("azure_open_ai_2")
+    assert east + west == 20
+    assert min(east, west) >= 5
+    assert f"Deployment east: {east} records" in caplog.text
+    assert f"Deployment west: {west} records" in caplog.text
+
+
+def test_throttled_deployment_is_taken_out_of_rotation(
+    fake_completion, temp_output_dir, caplog
+):
+    """After a 429 the other deployment takes the traffic without backoff."""
+    def _east_is_throttled(prompt):
+        if fake_completion.services[-1] == "azure_open_ai":
+            raise make_api_error(429, {"retry-after-ms": "60000"})
+        return "{}"
+
+    fake_completion.responder = _east_is_throttled
+    gen = _multi_deployment_generator("east", "west")
+    with caplog.at_level("INFO", logger="data-generator"):
+        gen.run(count=10, out_dir=temp_output_dir, concurrency=2)
+
+    assert fake_completion.services.count("azure_open_ai") == 1
+    assert "Success: 10, Failed: 0, Skipped: 0, Retries: 1" in caplog.text
+    assert "retry 1/6 in 0.0s" in caplog.text
+    assert "Deployment east throttled; out of rotation for 60.0s." in caplog.text
+    assert "Deployment east: 0 records (0.00 rec/s), 1 throttled" in caplog.text
+
+
+# ---------------------------------------------------------------------- #
+# Model routing                                                          #
+# ---------------------------------------------------------------------- #
+def _routed_generator(*routes):
+    """Return a generator with a ``fast`` and a ``reasoning`` deployment."""
+    return DataGenerator(
+        EchoTool(),
+        azure_openai_api_key="test-key",
+        deployments=[
+            Deployment(endpoint=f"https://{name}.openai.azure.com", deployment=name)
+            for name in ("fast", "reasoning")
+        ],
+        routes=routes,
+    )
+
+
+def test_runs_follow_the_first_matching_route(
+    fake_completion, temp_output_dir, caplog
+):
+    """Complex records go to the reasoning deployment with its effort."""
+    gen = _routed_generator(
+        Route(
+            deployments=("reasoning",),
+            complexities=("complex",),
+            reasoning_effort="high",
+            concurrency=2,
+        ),
+        Route(deployments=("fast",), reasoning_effort="low"),
+    )
+    fake_completion.delay = 0.01
+    gen.run(count=4, out_dir=temp_output_dir / "simple", concurrency=8)
+
+    assert set(fake_completion.services) == {"azure_open_ai"}
+    assert {s.reasoning_effort for s in fake_completion.settings} == {"low"}
+
+    fake_completion.services.clear()
+    fake_completion.settings.clear()
+    fake_completion.peak_in_flight = 0
+    gen.tool.complexity = "complex"
+    with caplog.at_level("INFO", logger="data-generator"):
+        gen.run(count=6, out_dir=temp_output_dir / "complex", concurrency=8)
+
+    assert set(fake_completion.services) == {"azure_open_ai_2"}
+    assert {s.reasoning_effort for s in fake_completion.settings} == {"high"}
+    assert fake_completion.peak_in_flight == 2
+    assert (
+        "Route reasoning: reasoning.openai.azure.com/reasoning, reasoning effort "
+        "high, concurrency 2." in caplog.text
+    )
+
+
+def test_unmatched_runs_use_every_deployment(fake_completion, temp_output_dir):
+    """Without a matching route the load is spread as before."""
+    gen = _routed_generator(
+        Route(deployments=("reasoning",), output_formats=("yaml",))
+    )
+    fake_completion.delay = 0.005
+    gen.run(count=10, out_dir=temp_output_dir, concurrency=4)
+
+    assert set(fake_completion.services) == {"azure_open_ai", "azure_open_ai_2"}
+    assert {s.reasoning_effort for s in fake_completion.settings} == {None}
+
+
+def test_route_quota_tightens_the_run_quota(generator, temp_output_dir):
+    """A route's RPM / TPM apply on top of the run's own."""
+    generator.routes = [
+        Route(deployments=("test-deployment",), requests_per_minute=60)
+    ]
+    ctx = generator._run_context(
+        out_dir=temp_output_dir,
+        output_format="json",
+        concurrency=8,
+        max_concurrency=None,
+        timeout_seconds=None,
+        deadline_seconds=None,
+        requests_per_minute=600,
+        tokens_per_minute=90_000,
+        retry_policy=None,
+        routing="least-outstanding",
+        records_per_call=1,
+        structured_outputs=False,
+        max_completion_tokens=None,
+    )
+
+    assert ctx.rate_limiter.requests.per_minute == 60
+    assert ctx.rate_limiter.tokens.per_minute == 90_000
+
+
+def test_routes_must_name_known_deployments():
+    """A route naming no configured deployment is rejected up front."""
+    with pytest.raises(ValueError, match="unknown deployment 'large'"):
+        _routed_generator(Route(deployments=("large",)))
+
+
+# ---------------------------------------------------------------------- #
+# Response cache                                                         #
+# ---------------------------------------------------------------------- #
+@pytest.fixture()
+def cache_path(tmp_path):
+    """Location of the response cache shared by the generators of a test."""
+    return tmp_path / "cache.sqlite"
+
+
+def _cached_generator(cache_path, *, replay=False):
+    """Return a generator backed by the response cache at *cache_path*."""
+    return DataGenerator(
+        EchoTool(),
+        azure_openai_endpoint="https://example.openai.azure.com",
+        azure_openai_deployment="test-deployment",
+        azure_openai_api_key="test-key",
+        cache=ResponseCache(cache_path, replay=replay),
+    )
+
+
+def test_cached_prompt_is_not_sent_again(
+    fake_completion, temp_output_dir, cache_path, monkeypatch
+):
+    """An identical prompt, deployment and settings is served from the cache."""
+    gen = _cached_generator(cache_path)
+    monkeypatch.setattr(
+        gen.tool, "build_prompt", lambda fmt, *, unique_id=None: "fixed prompt"
+    )
+    gen.run(count=1, out_dir=temp_output_dir / "a")
+    gen.run(count=1, out_dir=temp_output_dir / "b")
+
+    assert len(fake_completion.prompts) == 1
+    assert (gen.cache.hits, gen.cache.misses) == (1, 1)
+
+
+def test_replay_serves_only_from_cache(
+    fake_completion, temp_output_dir, cache_path, caplog
+):
+    """``replay`` re-runs post-processing and output without model calls."""
+    _cached_generator(cache_path).run(count=3, out_dir=temp_output_dir / "a")
+    replay = _cached_generator(cache_path, replay=True)
+    with caplog.at_level("INFO", logger="data-generator"):
+        replay.run(count=5, out_dir=temp_output_dir / "b")
+
+    assert len(fake_completion.prompts) == 3
+    original = {p.name for p in (temp_output_dir / "a").glob("TestEcho_*.json")}
+    replayed = {p.name for p in (temp_output_dir / "b").glob("TestEcho_*.json")}
+    assert replayed == original
+    assert "Replay: only 3 of 5 records have a cached completion." in caplog.text
+    assert "0 misses, 3 completions replayed" in caplog.text
+
+
+def test_replay_miss_is_an_error(generator, fake_completion, cache_path):
+    """In replay mode a prompt without a cached completion is not sent."""
+    generator.cache = ResponseCache(cache_path, replay=True)
+    runner = generator.create_prompt_function(
+        template="Say {{$word}}",
+        function_name="say",
+        plugin_name="test",
+        prompt_description="test",
+        input_variables=[{"name": "word"}],
+        max_tokens=10,
+    )
+
+    with pytest.raises(CacheMissError):
+        asyncio.run(runner(word="hi"))
+    assert fake_completion.prompts == []
+
+
+def test_prompt_function_runner_uses_cache(generator, fake_completion, cache_path):
+    """Ad-hoc prompt functions are cached by their rendered prompt."""
+    generator.cache = ResponseCache(cache_path)
+    runner = generator.create_prompt_function(
+        template="Say {{$word}}",
+        function_name="say",
+        plugin_name="test",
+        prompt_description="test",
+        input_variables=[{"name": "word"}],
+        max_tokens=10,
+    )
+
+    async def _main():
+        return [await runner(word=w) for w in ("hi", "hi", "bye")]
+
+    first, second, _ = asyncio.run(_main())
+
+    assert first == second
+    assert fake_completion.prompts == ["Say hi", "Say bye"]
+
+
+def test_resume_persists_cached_completions_first(
+    fake_completion, temp_output_dir, cache_path, monkeypatch
+):
+    """Completions paid for before a failure are stored without new calls."""
+    gen = _cached_generator(cache_path)
+    original = gen.tool.post_process
+
+    def _broken(raw, fmt):
+        raise RuntimeError("bug in post_process")
+
+    monkeypatch.setattr(gen.tool, "post_process", _broken)
+    gen.run(count=3, out_dir=temp_output_dir)
+    assert not list(temp_output_dir.glob("TestEcho_*.json"))
+
+    monkeypatch.setattr(gen.tool, "post_process", original)
+    gen.run(count=4, out_dir=temp_output_dir, resume=True)
+
+    assert len(fake_completion.prompts) == 4
+    state = RunManifest(temp_output_dir).load()
+    assert len(state.completed) == 4
+    assert len(list(temp_output_dir.glob("TestEcho_*.json"))) == 4
+
+
+def test_unparseable_completion_is_dropped_from_cache(
+    fake_completion, temp_output_dir, cache_path
+):
+    """A reply that does not parse is regenerated, not replayed from cache."""
+    replies = iter(["not json {", "{}"])
+    fake_completion.responder = lambda prompt: next(replies)
+    gen = _cached_generator(cache_path)
+    gen.run(count=1, out_dir=temp_output_dir, retry_policy=RetryPolicy(base_delay=0))
+
+    assert len(fake_completion.prompts) == 2
+    entries = gen.cache.entries(scenario="test-echo", output_format="json")
+    assert [entry.text for entry in entries] == ["{}"]
+
+
+# ---------------------------------------------------------------------- #
+# Generate once, render many                                             #
+# ---------------------------------------------------------------------- #
+def test_output_formats_render_from_one_json_completion(
+    generator, fake_completion, temp_output_dir
+):
+    """Every record costs one JSON call and is stored in each format."""
+    fake_completion.responder = lambda prompt: '{"case_id": "c-1", "tags": ["a"]}'
+    generator.run(
+        count=3, out_dir=temp_output_dir, output_formats=["json", "yaml", "txt"]
+    )
+
+    assert len(fake_completion.prompts) == 3
+    assert all(prompt.endswith("as json.") for prompt in fake_completion.prompts)
+    for fmt in ("json", "yaml", "txt"):
+        assert len(list((temp_output_dir / fmt).glob(f"*.{fmt}"))) == 3
+    yaml_file = next((temp_output_dir / "yaml").glob("*.yaml"))
+    assert yaml.safe_load(yaml_file.read_text(encoding="utf-8")) == {
+        "case_id": "c-1",
+        "tags": ["a"],
+    }
+    txt_file = next((temp_output_dir / "txt").glob("*.txt"))
+    assert txt_file.read_text(encoding="utf-8") == "Case ID: c-1\nTags: a\n"
+
+    state = RunManifest(temp_output_dir).load()
+    assert state.runs[-1]["output_format"] == "json,yaml,txt"
+    assert all(e.output.startswith("json") for e in state.completed.values())
+
+
+def test_single_rendered_format_writes_into_out_dir(
+    generator, fake_completion, temp_output_dir
+):
+    """With one format there is no per-format subdirectory."""
+    fake_completion.responder = lambda prompt: '{"a": 1}'
+    generator.run(count=1, out_dir=temp_output_dir, output_formats=["txt"])
+
+    (txt_file,) = temp_output_dir.glob("*.txt")
+    assert txt_file.read_text(encoding="utf-8") == "A: 1\n"
+
+
+def test_output_formats_reject_unknown_format(generator, temp_output_dir):
+    """Formats that cannot be derived from JSON are a configuration error."""
+    with pytest.raises(ValueError, match="Cannot render"):
+        generator.run(count=1, out_dir=temp_output_dir, output_formats=["csv"])
+
+
+# ---------------------------------------------------------------------- #
+# Several records per call                                               #
+# ---------------------------------------------------------------------- #
+def _batch_ids(prompt):
+    """Ids of the records a (batch) prompt of the EchoTool asks for."""
+    return re.findall(r"Echo record (\S+) as json", prompt)
+
+
+def test_records_per_call_splits_one_reply_into_records(
+    generator, fake_completion, temp_output_dir
+):
+    """Seven records take three calls; every record keeps its assigned id."""
+    fake_completion.responder = lambda prompt: json.dumps(
+        [{"id": uid} for uid in _batch_ids(prompt)]
+    )
+    generator.run(count=7, out_dir=temp_output_dir, records_per_call=3)
+
+    assert len(fake_completion.prompts) == 3
+    state = RunManifest(temp_output_dir).load()
+    assert len(state.completed) == 7
+    for uid in state.completed:
+        stored = json.loads(
+            (temp_output_dir / f"TestEcho_{uid}.json").read_text(encoding="utf-8")
+        )
+        assert stored == {"id": uid}
+    total = sum(e.usage["completion_tokens"] for e in state.completed.values())
+    assert total == sum(
+        len(fake_completion.responder(prompt)) // 4
+        for prompt in fake_completion.prompts
+    )
+
+
+def test_records_missing_from_batch_are_regenerated_singly(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Elements the reply drops are requested one at a time, same id."""
+    def _drop_last(prompt):
+        ids = _batch_ids(prompt)
+        if len(ids) > 1:
+            return json.dumps([{"id": uid} for uid in ids[:-1]])
+        return json.dumps({"id": ids[0]})
+
+    fake_completion.responder = _drop_last
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(count=4, out_dir=temp_output_dir, records_per_call=4)
+
+    assert len(fake_completion.prompts) == 2
+    assert _batch_ids(fake_completion.prompts[1]) == [
+        _batch_ids(fake_completion.prompts[0])[-1]
+    ]
+    assert len(RunManifest(temp_output_dir).load().completed) == 4
+    assert "1 batched calls, 1 records regenerated" in caplog.text
+
+
+def test_records_per_call_needs_json(generator, temp_output_dir):
+    """Batches are JSON arrays, so other generation formats are refused."""
+    with pytest.raises(ValueError, match="need JSON output"):
+        generator.run(
+            count=2, out_dir=temp_output_dir, output_format="yaml", records_per_call=2
+        )
+
+
+# ---------------------------------------------------------------------- #
+# Structured outputs                                                     #
+# ---------------------------------------------------------------------- #
+class _EchoRecord(RecordModel):
+    """Record model of :class:`_SchemaEchoTool`."""
+
+    id: str
+    note: str | None = None
+
+
+class _SchemaEchoTool(EchoTool):
+    """EchoTool that publishes a record model."""
+
+    name = "test-schema-echo"
+    toolName = "TestSchemaEcho"
+    record_model = _EchoRecord
+
+
+@pytest.fixture()
+def schema_generator(fake_completion):
+    """``DataGenerator`` wired to :class:`_SchemaEchoTool`."""
+    return DataGenerator(
+        _SchemaEchoTool(),
+        azure_openai_endpoint="https://example.openai.azure.com",
+        azure_openai_deployment="test-deployment",
+        azure_openai_api_key="test-key",
+    )
+
+
+def test_structured_outputs_send_the_record_schema(
+    schema_generator, fake_completion, temp_output_dir
+):
+    """The record model travels as a strict ``json_schema`` response format."""
+    fake_completion.responder = lambda prompt: json.dumps(
+        {"id": _batch_ids(prompt)[0], "note": None}
+    )
+    schema_generator.run(count=2, out_dir=temp_output_dir, structured_outputs=True)
+
+    response_format = fake_completion.settings[0].response_format
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["name"] == "TestSchemaEcho"
+    assert response_format["json_schema"]["strict"] is True
+    assert response_format["json_schema"]["schema"]["required"] == ["id", "note"]
+    assert len(RunManifest(temp_output_dir).load().completed) == 2
+
+
+def test_record_failing_the_schema_is_retried_not_stored(
+    schema_generator, fake_completion, temp_output_dir
+):
+    """A reply that parses but does not validate is asked for again."""
+    replies = iter([json.dumps({"name": "no id"}), json.dumps({"id": "r-1"})])
+    fake_completion.responder = lambda prompt: next(replies)
+    schema_generator.run(
+        count=1, out_dir=temp_output_dir, retry_policy=RetryPolicy(base_delay=0)
+    )
+
+    assert len(fake_completion.prompts) == 2
+    assert fake_completion.settings[0].response_format is None
+    (stored,) = temp_output_dir.glob("TestSchemaEcho_*.json")
+    assert json.loads(stored.read_text(encoding="utf-8")) == {"id": "r-1"}
+
+
+def test_batch_records_failing_the_schema_are_regenerated(
+    schema_generator, fake_completion, temp_output_dir
+):
+    """Batched calls ask for a ``records`` array; invalid elements go singly."""
+    def _reply(prompt):
+        ids = _batch_ids(prompt)
+        if len(ids) > 1:
+            return json.dumps({"records": [{"id": ids[0]}, {"bad": ids[1]}]})
+        return json.dumps({"id": ids[0]})
+
+    fake_completion.responder = _reply
+    schema_generator.run(
+        count=2, out_dir=temp_output_dir, records_per_call=2, structured_outputs=True
+    )
+
+    batch_schema = fake_completion.settings[0].response_format["json_schema"]
+    assert batch_schema["schema"]["required"] == ["records"]
+    assert len(fake_completion.prompts) == 2
+    assert len(RunManifest(temp_output_dir).load().completed) == 2
+
+
+class _NoteModel(RecordModel):
+    """The part of an :class:`_EchoRecord` the model writes."""
+
+    id: str
+
+
+class _PartialEchoTool(_SchemaEchoTool):
+    """Tool that asks the model for part of the record only."""
+
+    name = "test-partial-echo"
+    toolName = "TestPartialEcho"
+    response_model = _NoteModel
+
+
+def test_structured_outputs_send_the_response_model(
+    fake_completion, temp_output_dir
+):
+    """Tools filling in part of the record locally get their reply schema."""
+    fake_completion.responder = lambda prompt: json.dumps(
+        {"id": _batch_ids(prompt)[0]}
+    )
+    generator = DataGenerator(
+        _PartialEchoTool(),
+        azure_openai_endpoint="https://example.openai.azure.com",
+        azure_openai_deployment="test-deployment",
+        azure_openai_api_key="test-key",
+    )
+    generator.run(count=1, out_dir=temp_output_dir, structured_outputs=True)
+
+    schema = fake_completion.settings[0].response_format["json_schema"]["schema"]
+    assert schema["required"] == ["id"]
+    assert len(RunManifest(temp_output_dir).load().completed) == 1
+
+
+def test_structured_outputs_need_a_record_model(generator, temp_output_dir):
+    """Tools without a record model cannot ask for structured outputs."""
+    with pytest.raises(ValueError, match="publishes no record model"):
+        generator.run(count=1, out_dir=temp_output_dir, structured_outputs=True)
+
+
+# ---------------------------------------------------------------------- #
+# Record processing in worker processes                                  #
+# ---------------------------------------------------------------------- #
+def test_process_workers_store_the_same_files(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """Parsing and serialising in worker processes changes no output byte."""
+    fake_completion.responder = lambda prompt: json.dumps(
+        {"id": _batch_ids(prompt)[0], "tags": ["a", "b"]}
+    )
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(
+            count=6,
+            out_dir=temp_output_dir,
+            output_formats=["json", "yaml", "txt"],
+            process_workers=2,
+        )
+
+    assert "on 2 worker processes" in caplog.text
+    assert len(RunManifest(temp_output_dir).load().completed) == 6
+    for stored in (temp_output_dir / "json").glob("*.json"):
+        record = json.loads(stored.read_text(encoding="utf-8"))
+        assert stored.read_text(encoding="utf-8") == json.dumps(record, indent=2)
+        yaml_file = temp_output_dir / "yaml" / stored.with_suffix(".yaml").name
+        assert yaml_file.read_text(encoding="utf-8") == yaml.safe_dump(
+            record, sort_keys=False
+        )
+
+
+def test_process_workers_retry_invalid_and_split_batches(
+    schema_generator, fake_completion, temp_output_dir
+):
+    """Schema failures raised in a worker are retried like inline ones."""
+    replies = iter(
+        [
+            json.dumps([{"bad": 1}, {"bad": 2}]),   # batch: nothing usable
+            json.dumps({"name": "no id"}),          # first single: invalid
+        ]
+    )
+    fake_completion.responder = lambda prompt: next(
+        replies, json.dumps({"id": _batch_ids(prompt)[0]})
+    )
+    schema_generator.run(
+        count=2,
+        out_dir=temp_output_dir,
+        records_per_call=2,
+        process_workers=1,
+        retry_policy=RetryPolicy(base_delay=0),
+    )
+
+    assert len(RunManifest(temp_output_dir).load().completed) == 2
+
+
+def test_process_workers_must_be_positive(generator, temp_output_dir):
+    """A pool of no processes is a configuration error."""
+    with pytest.raises(ValueError, match="process_workers"):
+        generator.run(count=1, out_dir=temp_output_dir, process_workers=0)
+
+
+# ---------------------------------------------------------------------- #
+# Outline, then sections                                                 #
+# ---------------------------------------------------------------------- #
+class _Part(RecordModel):
+    """One section of a :class:`_Document`."""
+
+    heading: str
+    body: str
+
+
+class _Document(RecordModel):
+    """Record model of :class:`_SectionEchoTool`."""
+
+    id: str
+    title: str
+    parts: list[_Part]
+
+
+class _SectionEchoTool(EchoTool):
+    """EchoTool whose records are written part by part."""
+
+    name = "test-section-echo"
+    toolName = "TestSectionEcho"
+    record_model = _Document
+
+    def build_prompt(self, output_format, *, unique_id=None):
+        return self.compose_prompt(
+            f"Write a document as {output_format}.", f"Document id: {unique_id}"
+        )
+
+    @property
+    def section_fields(self):
+        return ("parts",)
+
+
+def _document_reply(headings):
+    """Responder answering outline and section prompts of _SectionEchoTool."""
+
+    def _reply(prompt):
+        if "## OUTLINE ONLY" in prompt:
+            uid = re.search(r"Document id: (\S+)", prompt).group(1)
+            return json.dumps({"id": uid, "title": "Guide", "parts": headings})
+        heading = re.search(r"^Heading: (.+)$", prompt, flags=re.MULTILINE).group(1)
+        return json.dumps({"heading": heading, "body": f"All about {heading}."})
+
+    return _reply
+
+
+@pytest.fixture()
+def section_generator(fake_completion):
+    """``DataGenerator`` wired to :class:`_SectionEchoTool`."""
+    return DataGenerator(
+        _SectionEchoTool(),
+        azure_openai_endpoint="https://example.openai.azure.com",
+        azure_openai_deployment="test-deployment",
+        azure_openai_api_key="test-key",
+    )
+
+
+def test_hierarchical_run_writes_sections_concurrently(
+    section_generator, fake_completion, temp_output_dir, caplog
+):
+    """One outline call, then every section at once, assembled in order."""
+    fake_completion.delay = 0.05
+    fake_completion.responder = _document_reply(["Install", "Configure", "Verify"])
+    with caplog.at_level("INFO", logger="data-generator"):
+        section_generator.run(
+            count=1, out_dir=temp_output_dir, concurrency=8, hierarchical=True
+        )
+
+    assert len(fake_completion.prompts) == 4
+    assert "## OUTLINE ONLY" in fake_completion.prompts[0]
+    assert fake_completion.peak_in_flight == 3
+    assert "3 section calls" in caplog.text
+    (stored,) = temp_output_dir.glob("TestSectionEcho_*.json")
+    record = json.loads(stored.read_text(encoding="utf-8"))
+    assert [part["heading"] for part in record["parts"]] == [
+        "Install",
+        "Configure",
+        "Verify",
+    ]
+    (entry,) = RunManifest(temp_output_dir).load().completed.values()
+    assert entry.usage["completion_tokens"] == sum(
+        len(fake_completion.responder(prompt)) // 4
+        for prompt in fake_completion.prompts
+    )
+
+
+def test_hierarchical_sections_stay_within_concurrency(
+    section_generator, fake_completion, temp_output_dir
+):
+    """Sections take concurrency slots like any other request."""
+    fake_completion.delay = 0.02
+    fake_completion.responder = _document_reply([f"Part {n}" for n in range(6)])
+    section_generator.run(
+        count=2, out_dir=temp_output_dir, concurrency=2, hierarchical=True
+    )
+
+    assert fake_completion.peak_in_flight == 2
+    assert len(RunManifest(temp_output_dir).load().completed) == 2
+
+
+def test_hierarchical_oversized_outline_is_truncated(
+    section_generator, fake_completion, temp_output_dir, caplog
+):
+    """A verbose outline cannot fan out beyond the section cap."""
+    fake_completion.delay = 0.02
+    fake_completion.responder = _document_reply([f"Part {n}" for n in range(40)])
+    with caplog.at_level("WARNING", logger="data-generator"):
+        section_generator.run(
+            count=1,
+            out_dir=temp_output_dir,
+            concurrency=2,
+            max_concurrency=4,
+            hierarchical=True,
+        )
+
+    assert len(fake_completion.prompts) == 1 + 4
+    assert fake_completion.peak_in_flight <= 2
+    assert "the outline lists 40 sections; writing the first 4" in caplog.text
+    (stored,) = temp_output_dir.glob("TestSectionEcho_*.json")
+    record = json.loads(stored.read_text(encoding="utf-8"))
+    assert [part["heading"] for part in record["parts"]] == [
+        f"Part {n}" for n in range(4)
+    ]
+    assert any("Item: 4 of 4" in prompt for prompt in fake_completion.prompts)
+
+    fake_completion.prompts.clear()
+    section_generator.run(
+        count=1,
+        out_dir=temp_output_dir / "capped",
+        concurrency=8,
+        hierarchical=True,
+        max_sections=3,
+    )
+    assert len(fake_completion.prompts) == 1 + 3
+
+
+def test_hierarchical_section_failures_are_retried_alone(
+    section_generator, fake_completion, temp_output_dir
+):
+    """An invalid section is asked for again without redoing the rest."""
+    reply = _document_reply(["Install", "Verify"])
+    failed = []
+
+    def _flaky(prompt):
+        if "Heading: Verify" in prompt and not failed:
+            failed.append(prompt)
+            return json.dumps({"heading": "Verify"})
+        return reply(prompt)
+
+    fake_completion.responder = _flaky
+    section_generator.run(
+        count=1,
+        out_dir=temp_output_dir,
+        hierarchical=True,
+        retry_policy=RetryPolicy(base_delay=0),
+    )
+
+    assert len(fake_completion.prompts) == 4
+    assert sum("## OUTLINE ONLY" in p for p in fake_completion.prompts) == 1
+    assert len(RunManifest(temp_output_dir).load().completed) == 1
+
+
+def test_hierarchical_structured_outputs_use_outline_and_item_schemas(
+    section_generator, fake_completion, temp_output_dir
+):
+    """The outline asks for headings, a section for one item."""
+    fake_completion.responder = _document_reply(["Install"])
+    section_generator.run(
+        count=1, out_dir=temp_output_dir, hierarchical=True, structured_outputs=True
+    )
+
+    outline, section = (
+        settings.response_format["json_schema"]["schema"]
+        for settings in fake_completion.settings
+    )
+    assert outline["properties"]["parts"]["items"] == {"type": "string"}
+    assert section["required"] == ["heading", "body"]
+
+
+def test_hierarchical_run_validates_settings(
+    generator, section_generator, temp_output_dir
+):
+    """JSON, one record per call and a tool with sections are required."""
+    with pytest.raises(ValueError, match="has no sections"):
+        generator.run(count=1, out_dir=temp_output_dir, hierarchical=True)
+    with pytest.raises(ValueError, match="needs JSON output"):
+        section_generator.run(
+            count=1, out_dir=temp_output_dir, output_format="yaml", hierarchical=True
+        )
+    with pytest.raises(ValueError, match="one record at a time"):
+        section_generator.run(
+            count=2, out_dir=temp_output_dir, records_per_call=2, hierarchical=True
+        )
+    with pytest.raises(ValueError, match="max_sections"):
+        section_generator.run(
+            count=1, out_dir=temp_output_dir, hierarchical=True, max_sections=0
+        )
+
+
+# ---------------------------------------------------------------------- #
+# Completion budget                                                      #
+# ---------------------------------------------------------------------- #
+def _completion_usage(completion_tokens):
+    """``usage`` callback reporting *completion_tokens* for every reply."""
+    return lambda prompt, reply: CompletionUsage(
+        prompt_tokens=10,
+        completion_tokens=completion_tokens,
+        total_tokens=10 + completion_tokens,
+    )
+
+
+def test_completion_limit_adapts_to_observed_sizes(
+    generator, fake_completion, temp_output_dir, caplog
+):
+    """After 20 records the limit follows p95 plus headroom, not 16k."""
+    fake_completion.usage = _completion_usage(700)
+    with caplog.at_level("INFO", logger="data-generator"):
+        generator.run(count=25, out_dir=temp_output_dir, concurrency=1)
+
+    limits = [s.max_completion_tokens for s in fake_completion.settings]
+    assert limits[:20] == [16000] * 20
+    assert limits[20:] == [896] * 5                # 700 * 1.25 rounded up
+    assert "Completion budget: 896 tokens per record" in caplog.text
+
+
+def test_completion_limit_override(generator, fake_completion, temp_output_dir):
+    """A fixed limit is sent with every request."""
+    generator.run(count=3, out_dir=temp_output_dir, max_completion_tokens=500)
+
+    assert {s.max_completion_tokens for s in fake_completion.settings} == {500}
+
+
+def test_reply_cut_off_by_adapted_limit_is_retried_with_more_room(
+    generator, fake_completion, temp_output_dir
+):
+    """A truncated reply is not stored; the retry gets twice the limit."""
+    budget = generator._completion_budget("json", override=None)
+    for _ in range(20):
+        budget.record(100)
+    finish = iter([FinishReason.LENGTH, FinishReason.STOP])
+    fake_completion.finish_reason = lambda prompt: next(finish)
+
+    generator.run(
+        count=1, out_dir=temp_output_dir, retry_policy=RetryPolicy(base_delay=0)
+    )
+
+    limits = [s.max_completion_tokens for s in fake_completion.settings]
+    assert limits == [256, 512]
+    assert budget.truncated == 1
+    assert len(RunManifest(temp_output_dir).load().completed) == 1
+
+
+# ---------------------------------------------------------------------- #
+# Telemetry                                                              #
+# ---------------------------------------------------------------------- #
+def test_run_report_counts_outcomes(generator, fake_completion, temp_output_dir):
+    """Failed requests and records are in the report next to the outputs."""
+    calls = 0
+
+    def _flaky(prompt):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("boom")
+        return "{}"
+
+    fake_completion.responder = _flaky
+    generator.run(count=5, out_dir=temp_output_dir, concurrency=1, report=True)
+
+    report = json.loads((temp_output_dir / "run-report.json").read_text())
+    assert report["scenario"] == "test-echo"
+    assert report["records"] == {"success": 4, "failed": 1}
+    assert report["requests"] == {"ok": 4, "error": 1}
+    assert report["latency_seconds"]["total"]["count"] == 5
+    assert report["settings"]["concurrency"] == 1
+    assert generator.telemetry.records["success"] == 4
+
+
+def test_run_without_report_writes_none(generator, fake_completion, temp_output_dir):
+    """The report is opt-in."""
+    generator.run(count=1, out_dir=temp_output_dir)
+
+    assert not (temp_output_dir / "run-report.json").exists()
+    assert generator.telemetry.requests == {"ok": 1}
+
+
+# ---------------------------------------------------------------------- #
+# Streaming                                                              #
+# ---------------------------------------------------------------------- #
+def _collect(stream, *, take=None, pause=0.0):
+    """Consume *stream* (stopping after *take* records) and return the records."""
+
+    async def _main():
+        records = []
+        async for record in stream:
+            records.append(record)
+            await asyncio.sleep(pause)
+            if take is not None and len(records) == take:
+                break
+        await stream.aclose()
+        return records
+
+    return asyncio.run(_main())
+
+
+def test_stream_yields_validated_records_without_files(
+    generator, fake_completion, tmp_path, monkeypatch
+):
+    """Every record is yielded once, parsed, with its id and usage."""
+    monkeypatch.chdir(tmp_path)
+
+    records = _collect(generator.stream(count=12, concurrency=4))
+
+    assert sorted(r.index for r in records) == list(range(1, 13))
+    assert len({r.unique_id for r in records}) == 12
+    for record in records:
+        assert record.unique_id in record.data["prompt"]
+        assert record.usage.completion_tokens > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stream_applies_backpressure(generator, fake_completion):
+    """A stalled consumer stops the workers once the queue is full."""
+    records = _collect(
+        generator.stream(count=50, concurrency=4, max_pending=2), take=1, pause=0.05
+    )
+
+    assert len(records) == 1
+    # the consumed record, a full queue and one finished record per worker
+    assert len(fake_completion.prompts) <= 1 + 2 + 4
+
+
+def test_stream_leaves_out_failed_records(generator, fake_completion, caplog):
+    """A failing record is logged and skipped; the stream goes on."""
+    calls = 0
+
+    def _flaky(prompt):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("boom")
+        return "{}"
+
+    fake_completion.responder = _flaky
+    with caplog.at_level("INFO", logger="data-generator"):
+        records = _collect(generator.stream(count=5, concurrency=1))
+
+    assert len(records) == 4
+    assert "Success: 4, Failed: 1" in caplog.text
+
+
+def test_stream_with_process_workers(generator, fake_completion):
+    """Streamed records are parsed in the workers too."""
+    records = _collect(generator.stream(count=5, process_workers=1))
+
+    assert len(records) == 5
+    assert all(record.unique_id in record.data["prompt"] for record in records)
+
+
+def test_stream_validates_settings(generator):
+    """Invalid settings are reported when iteration starts."""
+    with pytest.raises(ValueError, match="max_pending"):
+        _collect(generator.stream(count=1, max_pending=0))
+    with pytest.raises(ValueError, match="JSON"):
+        _collect(generator.stream(count=2, output_format="yaml", records_per_call=2))
@@ -0,0 +1,90 @@
+"""
+Unit tests for the data_generator.entities module.
+"""
+
+import json
+
+import pytest
+
+from data_generator.entities import ENTITY_KINDS, EntityPool
+
+
+@pytest.fixture()
+def pool(tmp_path):
+    """Return a small pool in a temporary directory."""
+    return EntityPool(tmp_path / "pools", size=50)
+
+
+def test_pools_are_generated_once_and_read_back(pool):
+    """A missing pool file is generated; the next pool reads the same file."""
+    pool.load(*ENTITY_KINDS)
+
+    for kind in ENTITY_KINDS:
+        lines = (pool.directory / f"{kind}.jsonl").read_text().splitlines()
+        assert len(lines) == 50
+        assert [json.loads(line) for line in lines] == pool.entities(kind)
+    reread = EntityPool(pool.directory, size=10)
+    assert reread.entities("products") == pool.entities("products")
+    assert reread.get("customers", "CUST-00007") == pool.entities("customers")[6]
+    assert reread.get("customers", "CUST-99999") is None
+
+
+def test_sample_is_seeded_by_key(pool):
+    """The same key draws the same distinct entities, optionally matched."""
+    first = pool.sample("products", "record-1", k=5)
+
+    assert first == pool.sample("products", "record-1", k=5)
+    assert first != pool.sample("products", "record-2", k=5)
+    assert len({p["product_id"] for p in first}) == 5
+    assert len(pool.sample("products", "record-1", k=500)) == 50
+    sales = pool.sample("employees", "record-1", department="sales")[0]
+    assert sales["department"] == "Sales"
+    with pytest.raises(ValueError, match="No employees"):
+        pool.sample("employees", "record-1", department="Astronauts")
+
+
+def test_employees_report_one_level_up(pool):
+    """Every manager is in the same department; directors have none."""
+    employees = {e["employee_id"]: e for e in pool.entities("employees")}
+
+    for employee in employees.values():
+        manager_id = employee["manager_id"]
+        if employee["title"].endswith("Director"):
+            assert manager_id is None
+            continue
+        manager = employees[manager_id]
+        assert manager["department"] == employee["department"]
+        assert manager["title"] != employee["title"]
+
+
+def test_entities_are_copies(pool):
+    """Changing a returned entity leaves the pool alone."""
+    pool.entities("customers")[0]["name"] = "Changed"
+    pool.get("customers", "CUST-00001")["name"] = "Changed"
+
+    assert pool.get("customers", "CUST-00001")["name"] != "Changed"
+
+
+def test_invalid_pools_are_rejected(tmp_path):
+    """Unknown kinds, bad sizes, bad lines and repeated ids raise ValueError."""
+    pool = EntityPool(tmp_path)
+    (tmp_path / "products.jsonl").write_text('{"product_id": "SKU-1"}\n')
+    customer = {
+        "customer_id": "CUST-1",
+        "name": "Ava Ashby",
+        "email": "ava@example.com",
+        "plan_tier": "basic",
+        "customer_since": "2024-01-01",
+    }
+    (tmp_path / "customers.jsonl").write_text(
+        "\n".join(json.dumps(customer) for _ in range(2))
+    )
+
+    with pytest.raises(ValueError, match="Unknown entity kind 'agents'"):
+        pool.load("agents")
+    with pytest.raises(ValueError, match="products.jsonl:1"):
+        pool.load("products")
+    with pytest.raises(ValueError, match="not unique"):
+        pool.load("customers")
+    with pytest.raises(ValueError, match="size"):
+        EntityPool(tmp_path, size=0)
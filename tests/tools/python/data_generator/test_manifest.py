@@ -0,0 +1,125 @@
+"""
+Unit tests for the data_generator.manifest module.
+"""
+
+import json
+
+import pytest
+
+from data_generator.manifest import MANIFEST_NAME, RunManifest
+from data_generator.sinks import JsonlSink
+from data_generator.usage import TokenUsage
+
+
+def _write_record(manifest, out_dir, index, unique_id):
+    """Create an output file and record it as completed."""
+    output = out_dir / f"{unique_id}.json"
+    output.write_text("{}", encoding="utf-8")
+    manifest.record_success(
+        index=index,
+        unique_id=unique_id,
+        output=output,
+        usage=TokenUsage(prompt_tokens=10, completion_tokens=5),
+    )
+
+
+def test_manifest_round_trip(tmp_path):
+    """Headers, successes and failures are read back from disk."""
+    manifest = RunManifest(tmp_path)
+    manifest.open(scenario="test-echo", output_format="json", count=3)
+    _write_record(manifest, tmp_path, 1, "a")
+    manifest.record_failure(index=2, unique_id="b", error="RuntimeError: boom")
+    _write_record(manifest, tmp_path, 3, "c")
+    manifest.close()
+
+    state = RunManifest(tmp_path).load()
+    assert set(state.completed) == {"a", "c"}
+    assert state.failed == 1
+    assert state.last_index == 3
+    assert state.runs[0]["scenario"] == "test-echo"
+    assert state.completed["a"].output == "a.json"
+    assert state.completed["a"].usage["prompt_tokens"] == 10
+
+
+def test_manifest_lines_are_flushed_immediately(tmp_path):
+    """Each record is on disk before the manifest is closed."""
+    manifest = RunManifest(tmp_path)
+    manifest.open(scenario="test-echo", output_format="json", count=1)
+    _write_record(manifest, tmp_path, 1, "a")
+
+    lines = (tmp_path / MANIFEST_NAME).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line).get("status") for line in lines] == [None, "ok"]
+    manifest.close()
+
+
+def test_load_ignores_missing_outputs_and_torn_lines(tmp_path):
+    """Deleted outputs are regenerated; a half-written last line is skipped."""
+    manifest = RunManifest(tmp_path)
+    manifest.open(scenario="test-echo", output_format="json", count=2)
+    _write_record(manifest, tmp_path, 1, "a")
+    _write_record(manifest, tmp_path, 2, "b")
+    manifest.close()
+    (tmp_path / "a.json").unlink()
+    with (tmp_path / MANIFEST_NAME).open("a", encoding="utf-8") as fp:
+        fp.write('{"index": 3, "id": "c", "sta')
+
+    state = RunManifest(tmp_path).load()
+    assert set(state.completed) == {"b"}
+    assert state.last_index == 2
+
+
+def test_shard_records_wait_for_the_complete_shard(tmp_path, caplog):
+    """Records of a shard a crash loses never reach the manifest."""
+    manifest = RunManifest(tmp_path)
+    manifest.open(scenario="test-echo", output_format="json", count=3)
+    sink = JsonlSink(
+        tmp_path, tool_name="Tool", output_format="json", records_per_shard=2
+    )
+    for index in range(1, 4):
+        output = sink.write(str(index), {"n": index})
+        manifest.record_success(
+            index=index, unique_id=str(index), output=output, usage=None
+        )
+
+    assert set(RunManifest(tmp_path).load().completed) == {"1", "2"}
+    # A restarted run drops the unfinished shard and reuses its number
+    JsonlSink(tmp_path, tool_name="Tool", output_format="json")
+    assert not (tmp_path / "Tool-00002.jsonl.partial").exists()
+    with caplog.at_level("WARNING"):
+        manifest.close()
+
+    assert "1 records never reached their output file" in caplog.text
+    assert set(RunManifest(tmp_path).load().completed) == {"1", "2"}
+
+
+def test_shard_records_are_listed_when_the_sink_closes(tmp_path):
+    """Closing the sink before the manifest lists the last shard's records."""
+    manifest = RunManifest(tmp_path)
+    manifest.open(scenario="test-echo", output_format="json", count=3)
+    sink = JsonlSink(tmp_path, tool_name="Tool", output_format="json")
+    for index in range(1, 4):
+        output = sink.write(str(index), {"n": index})
+        manifest.record_success(
+            index=index, unique_id=str(index), output=output, usage=None
+        )
+    assert not RunManifest(tmp_path).load().completed
+
+    sink.close()
+    manifest.close()
+
+    state = RunManifest(tmp_path).load()
+    assert set(state.completed) == {"1", "2", "3"}
+    assert state.completed["3"].output == "Tool-00001.jsonl"
+
+
+def test_load_without_manifest_is_empty(tmp_path):
+    """A fresh output directory has nothing to resume."""
+    state = RunManifest(tmp_path / "missing").load()
+    assert not state.completed
+    assert state.last_index == 0
+
+
+def test_writing_requires_open(tmp_path):
+    """Records cannot be appended before the run header is written."""
+    with pytest.raises(RuntimeError, match="not open"):
+        RunManifest(tmp_path).record_failure(index=1, unique_id="a", error="x")
@@ -0,0 +1,183 @@
+"""
+End-to-end engine tests against the offline Azure OpenAI mock server.
+
+These go through the real ``AzureChatCompletion`` connector, OpenAI SDK and
+HTTP stack, which the ``fake_completion`` fixture bypasses.
+"""
+
+import json
+import random
+
+import pytest
+
+from data_generator.deployments import Deployment
+from data_generator.engine import DataGenerator
+
+from .benchmarks.mock_aoai import MockAzureOpenAI, MockConfig, parse_latency
+from .conftest import EchoTool
+
+
+@pytest.fixture()
+def mock_server():
+    """Start a mock endpoint factory; every server is stopped afterwards."""
+    stops = []
+
+    def _start(**config):
+        server = MockAzureOpenAI(MockConfig(seed=0, **config))
+        stops.append(server.serve_in_thread())
+        return server
+
+    yield _start
+    for stop in stops:
+        stop()
+
+
+class _LongPromptTool(EchoTool):
+    """EchoTool with a long static instruction block (about 2k tokens)."""
+
+    name = "test-long-prompt"
+    toolName = "TestLongPrompt"
+    details_first = False
+
+    def build_prompt(self, output_format, *, unique_id=None):
+        instructions = "Follow the house style for synthetic records.\n" * 180
+        details = f"Record ID: {unique_id}\n"
+        if self.details_first:
+            return details + instructions
+        return self.compose_prompt(instructions, details)
+
+
+def _generator(server: MockAzureOpenAI, tool=None) -> DataGenerator:
+    """Build a generator whose Azure OpenAI client talks to *server*."""
+    gen = DataGenerator(
+        tool or EchoTool(),
+        azure_openai_endpoint="https://mock.openai.azure.com",
+        azure_openai_deployment="mock",
+        azure_openai_api_key="mock",
+    )
+    server.attach(gen)
+    return gen
+
+
+def test_engine_round_trip_over_http(mock_server, temp_output_dir):
+    """Records and usage flow through the real SDK path."""
+    server = mock_server(reasoning_tokens=7)
+    _generator(server).run(count=5, out_dir=temp_output_dir, concurrency=3)
+
+    files = sorted(temp_output_dir.glob("TestEcho_*.json"))
+    assert len(files) == 5
+    record = json.loads(files[0].read_text(encoding="utf-8"))
+    assert files[0].name == f"TestEcho_{record['id']}.json"
+    assert server.stats.completions == 5
+    manifest = [
+        json.loads(line)
+        for line in (temp_output_dir / "manifest.jsonl").read_text().splitlines()
+    ]
+    assert all(entry["usage"]["reasoning_tokens"] == 7 for entry in manifest[1:])
+
+
+def test_engine_recovers_from_injected_throttling(
+    mock_server, temp_output_dir, caplog
+):
+    """429s with ``retry-after-ms`` are retried by the engine, not the SDK."""
+    server = mock_server(throttle_rate=0.3, retry_after_ms=5)
+    with caplog.at_level("INFO", logger="data-generator"):
+        _generator(server).run(count=20, out_dir=temp_output_dir, concurrency=4)
+
+    assert server.stats.throttled > 0
+    assert "Success: 20, Failed: 0" in caplog.text
+    assert f"throttled={server.stats.throttled}" in caplog.text
+
+
+def test_run_report_times_every_request(mock_server, temp_output_dir):
+    """Over HTTP the report has first-byte times and counts throttled calls."""
+    server = mock_server(throttle_rate=0.3, retry_after_ms=5, reasoning_tokens=7)
+    _generator(server).run(
+        count=10, out_dir=temp_output_dir, concurrency=2, report=True
+    )
+
+    report = json.loads((temp_output_dir / "run-report.json").read_text())
+    requests = sum(report["requests"].values())
+    assert requests == server.stats.completions + server.stats.throttled
+    assert report["requests"].get("throttled", 0) == server.stats.throttled
+    assert report["retries"].get("throttled", 0) == server.stats.throttled
+    assert report["latency_seconds"]["time_to_first_byte"]["count"] == requests
+    assert report["tokens"]["reasoning"]["total"] == 7 * 10
+    assert report["records"] == {"success": 10}
+
+
+def test_capacity_limit_returns_429(mock_server, temp_output_dir, caplog):
+    """``max_in_flight`` rejects requests above the deployment's capacity."""
+    server = mock_server(latency="fixed:0.05", max_in_flight=2, retry_after_ms=60)
+    with caplog.at_level("INFO", logger="data-generator"):
+        _generator(server).run(count=8, out_dir=temp_output_dir, concurrency=3)
+
+    assert server.stats.peak_in_flight <= 2
+    assert server.stats.throttled > 0
+    assert "Success: 8" in caplog.text
+
+
+def test_load_shifts_away_from_throttled_deployment(
+    mock_server, temp_output_dir, caplog
+):
+    """A deployment answering only 429s is bypassed; its peer serves all."""
+    saturated = mock_server(throttle_rate=1.0, retry_after_ms=30_000)
+    healthy = mock_server(latency="fixed:0.01")
+    gen = DataGenerator(
+        EchoTool(),
+        azure_openai_api_key="mock",
+        deployments=[
+            Deployment("https://east.openai.azure.com", "mock", name="east"),
+            Deployment("https://west.openai.azure.com", "mock", name="west"),
+        ],
+    )
+    saturated.attach(gen, service_id="azure_open_ai")
+    healthy.attach(gen, service_id="azure_open_ai_2")
+    with caplog.at_level("INFO", logger="data-generator"):
+        gen.run(count=12, out_dir=temp_output_dir, concurrency=4)
+
+    assert "Success: 12, Failed: 0" in caplog.text
+    assert saturated.stats.completions == 0
+    assert saturated.stats.throttled <= 4
+    assert healthy.stats.completions == 12
+    assert "Deployment west: 12 records" in caplog.text
+
+
+@pytest.mark.parametrize(("details_first", "cached"), [(True, False), (False, True)])
+def test_static_prefix_hits_the_prompt_cache(
+    mock_server, temp_output_dir, caplog, details_first, cached
+):
+    """Only a prompt whose per-record values come last is prefix-cached."""
+    server = mock_server(prefix_cache=True)
+    tool = _LongPromptTool()
+    tool.details_first = details_first
+    with caplog.at_level("INFO", logger="data-generator"):
+        _generator(server, tool).run(
+            count=4, out_dir=temp_output_dir, concurrency=1
+        )
+
+    manifest = [
+        json.loads(line)
+        for line in (temp_output_dir / "manifest.jsonl").read_text().splitlines()
+    ]
+    cached_tokens = [entry["usage"]["cached_tokens"] for entry in manifest[1:]]
+    assert cached_tokens[0] == 0
+    assert all(tokens > 0 for tokens in cached_tokens[1:]) is cached
+    assert "from the prompt cache" in caplog.text
+
+
+@pytest.mark.parametrize(
+    ("spec", "low", "high"),
+    [("fixed:0.5", 0.5, 0.5), ("uniform:1,2", 1, 2), ("lognormal:1,0.1", 0.5, 2)],
+)
+def test_parse_latency(spec, low, high):
+    """Latency specs produce samplers within the requested range."""
+    sampler = parse_latency(spec)
+    rng = random.Random(0)
+    assert all(low <= sampler(rng) <= high for _ in range(100))
+
+
+def test_parse_latency_rejects_garbage():
+    """Malformed specs are reported, not silently defaulted."""
+    with pytest.raises(ValueError, match="Invalid latency"):
+        parse_latency("gaussian:1")
@@ -0,0 +1,227 @@
+"""
+Unit tests for the data_generator.processing module.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+import yaml
+
+from data_generator.processing import (
+    RecordProcessor,
+    assemble_record,
+    encode_record,
+    parse_outline,
+    parse_record,
+    parse_section,
+    split_records,
+)
+from data_generator.retry import OutputParseError
+from data_generator.schema import RecordModel
+from data_generator.sinks import FileSink, JsonlSink
+
+from .conftest import EchoTool
+
+
+class _Record(RecordModel):
+    """Record model of :class:`_ModelTool`."""
+
+    id: str
+
+
+class _ModelTool(EchoTool):
+    """EchoTool that validates records against :class:`_Record`."""
+
+    name = "test-processing-echo"
+    toolName = "TestProcessingEcho"
+    record_model = _Record
+
+
+class _Step(RecordModel):
+    """One item of a :class:`_Procedure`."""
+
+    action: str
+
+
+class _Procedure(RecordModel):
+    """Record model of :class:`_SectionTool`."""
+
+    id: str
+    steps: list[_Step]
+
+
+class _SectionTool(EchoTool):
+    """EchoTool whose procedures are written step by step."""
+
+    name = "test-processing-sections"
+    toolName = "TestProcessingSections"
+    record_model = _Procedure
+
+    @property
+    def section_fields(self):
+        return ("steps",)
+
+
+def _worker_pid(tool, _text):
+    """Processing step reporting the process it ran in."""
+    return os.getpid()
+
+
+# ---------------------------------------------------------------------- #
+# Processing steps                                                       #
+# ---------------------------------------------------------------------- #
+def test_parse_record_checks_format_and_schema():
+    """Replies that do not parse or validate raise OutputParseError."""
+    tool = _ModelTool()
+
+    assert parse_record(tool, '{"id": "a"}', "json") == {"id": "a"}
+    assert parse_record(tool, "id: a\n", "yaml") == {"id": "a"}
+    assert parse_record(tool, "{not json", "txt") == "{not json"
+    with pytest.raises(OutputParseError, match="not valid json"):
+        parse_record(tool, "{not json", "json")
+    with pytest.raises(OutputParseError, match="record schema"):
+        parse_record(tool, '{"name": "no id"}', "json")
+
+
+def test_split_records_reports_dropped_elements():
+    """Elements failing the record model are left out with their reason."""
+    records, dropped = split_records(
+        _ModelTool(), json.dumps([{"id": "a"}, {"bad": "b"}]), ["a", "b"]
+    )
+
+    assert records == {"a": {"id": "a"}}
+    assert list(dropped) == ["b"]
+    assert "record schema" in dropped["b"]
+
+
+def test_encode_record_renders_each_target():
+    """Each target gets the sink's serialisation of its own format."""
+    record = {"case_id": "c-1", "tags": ["a"]}
+
+    encoded = encode_record(
+        EchoTool(),
+        record,
+        "json",
+        [(FileSink, "json"), (FileSink, "yaml"), (FileSink, "txt"), (JsonlSink, "json")],
+    )
+
+    assert [e.text for e in encoded] == [
+        json.dumps(record, indent=2),
+        yaml.safe_dump(record, sort_keys=False),
+        "Case ID: c-1\nTags: a\n",
+        json.dumps(record),
+    ]
+
+
+def test_parse_outline_needs_headings_for_every_section():
+    """Outlines validate against the outline model and list each section."""
+    tool = _SectionTool()
+
+    assert parse_outline(tool, '{"id": "a", "steps": ["Open"]}') == {
+        "id": "a",
+        "steps": ["Open"],
+    }
+    with pytest.raises(OutputParseError, match="no \"steps\" headings"):
+        parse_outline(tool, '{"id": "a", "steps": []}')
+    with pytest.raises(OutputParseError, match="outline"):
+        parse_outline(tool, '{"id": "a", "steps": [{"action": "Open"}]}')
+    with pytest.raises(OutputParseError, match="not a JSON object"):
+        parse_outline(tool, '["Open"]')
+
+
+def test_parse_section_unwraps_a_single_item():
+    """Items wrapped in a list or under the field name are accepted."""
+    tool = _SectionTool()
+
+    for text in (
+        '{"action": "Open"}',
+        '[{"action": "Open"}]',
+        '{"steps": [{"action": "Open"}]}',
+    ):
+        assert parse_section(tool, text, "steps") == {"action": "Open"}
+    with pytest.raises(OutputParseError, match="section schema"):
+        parse_section(tool, '{"step": "Open"}', "steps")
+    with pytest.raises(OutputParseError, match="not valid json"):
+        parse_section(tool, "Open", "steps")
+
+
+def test_assemble_record_checks_the_record_model():
+    """The sections replace the headings; the result must be a record."""
+    tool = _SectionTool()
+    outline = {"id": "a", "steps": ["Open", "Close"]}
+
+    record = assemble_record(
+        tool, outline, {"steps": [{"action": "Open"}, {"action": "Close"}]}
+    )
+
+    assert record == {"id": "a", "steps": [{"action": "Open"}, {"action": "Close"}]}
+    with pytest.raises(OutputParseError, match="record schema"):
+        assemble_record(tool, outline, {})
+
+
+# ---------------------------------------------------------------------- #
+# Process pool                                                           #
+# ---------------------------------------------------------------------- #
+def _run(processor, main):
+    """Run *main(processor)* between start() and close() of *processor*."""
+
+    async def _main():
+        processor.start()
+        try:
+            return await main(processor)
+        finally:
+            await processor.close()
+
+    return asyncio.run(_main())
+
+
+def test_processor_runs_steps_in_worker_processes():
+    """Results and errors come back from other processes, per job."""
+
+    async def _main(processor):
+        return await asyncio.gather(
+            processor.parse('{"id": "a"}', "json"),
+            processor.parse('{"name": "no id"}', "json"),
+            processor.split(json.dumps([{"id": "b"}]), ["b"]),
+            processor.encode({"id": "c"}, "json", [(FileSink, "yaml")]),
+            processor.submit(_worker_pid, ""),
+            return_exceptions=True,
+        )
+
+    parsed, invalid, split, encoded, pid = _run(
+        RecordProcessor(_ModelTool(), workers=2), _main
+    )
+
+    assert parsed == {"id": "a"}
+    assert isinstance(invalid, OutputParseError)
+    assert split == ({"b": {"id": "b"}}, {})
+    assert [e.text for e in encoded] == ["id: c\n"]
+    assert pid != os.getpid()
+
+
+def test_processor_batches_jobs_while_workers_are_busy():
+    """Jobs queued behind a busy worker travel together, up to max_batch."""
+    processor = RecordProcessor(EchoTool(), workers=1, max_batch=16)
+
+    async def _main(processor):
+        return await asyncio.gather(
+            *(processor.parse(json.dumps({"n": n}), "json") for n in range(100))
+        )
+
+    results = _run(processor, _main)
+
+    assert results == [{"n": n} for n in range(100)]
+    assert processor.jobs == 100
+    assert 100 / 16 <= processor.batches < 100
+
+
+def test_processor_validation():
+    """Pool sizes must be positive; jobs need a started processor."""
+    with pytest.raises(ValueError, match="workers"):
+        RecordProcessor(EchoTool(), workers=0)
+    with pytest.raises(ValueError, match="max_batch"):
+        RecordProcessor(EchoTool(), workers=1, max_batch=0)
+    with pytest.raises(RuntimeError, match="not running"):
+        asyncio.run(RecordProcessor(EchoTool(), workers=1).parse("{}", "json"))
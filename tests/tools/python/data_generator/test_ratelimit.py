@@ -0,0 +1,88 @@
+"""
+Unit tests for the data_generator.ratelimit module.
+"""
+
+import asyncio
+
+import pytest
+
+from data_generator.ratelimit import RateLimiter, TokenBucket, estimate_tokens
+
+
+def test_estimate_tokens_rounds_up():
+    """Roughly four characters per token, never zero for non-empty text."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("x" * 400) == 100
+
+
+def test_bucket_starts_full_with_ten_seconds_of_burst():
+    """Capacity is one sixth of the per-minute quota."""
+    bucket = TokenBucket(6000)
+    assert bucket.capacity == 1000
+    assert bucket.delay_for(1000) == 0
+
+
+def test_bucket_debt_delays_next_caller():
+    """Consuming more than available leaves a debt that must refill first."""
+    bucket = TokenBucket(6000)            # 100 tokens per second
+    bucket.consume(1500)
+    assert bucket.available < -499
+    assert bucket.delay_for(1) == pytest.approx(5.0, abs=0.1)
+
+
+def test_oversized_request_only_waits_for_a_full_bucket():
+    """A request larger than capacity is admitted once the bucket is full."""
+    bucket = TokenBucket(600)             # capacity 100
+    assert bucket.delay_for(10_000) == 0
+
+
+def test_refund_is_capped_at_capacity():
+    """Refunds never push the bucket over capacity."""
+    bucket = TokenBucket(600)
+    bucket.consume(50)
+    bucket.refund(500)
+    assert bucket.available == pytest.approx(bucket.capacity)
+
+
+def test_non_positive_quota_rejected():
+    """A zero quota cannot be honoured."""
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_rate_limiter_waits_once_burst_is_spent():
+    """Requests beyond the RPM burst are delayed until tokens refill."""
+    limiter = RateLimiter(requests_per_minute=6000)   # burst 1000, 100/s
+
+    async def _main():
+        for _ in range(1002):
+            await limiter.acquire(0)
+
+    asyncio.run(_main())
+    assert limiter.waited_seconds > 0
+
+
+def test_rate_limiter_reconcile_refunds_unused_reservation():
+    """Reserved-but-unused completion tokens go back into the TPM bucket."""
+    limiter = RateLimiter(tokens_per_minute=60_000)   # capacity 10_000
+
+    async def _main():
+        await limiter.acquire(8_000)
+
+    asyncio.run(_main())
+    assert limiter.tokens.available < 2_100
+    limiter.reconcile(reserved=8_000, actual=1_000)
+    assert limiter.tokens.available > 8_900
+
+
+def test_rate_limiter_unlimited_dimensions_are_skipped():
+    """Without quotas the limiter admits everything immediately."""
+    limiter = RateLimiter()
+
+    async def _main():
+        for _ in range(100):
+            await limiter.acquire(1_000_000)
+
+    asyncio.run(_main())
+    assert limiter.waited_seconds == 0
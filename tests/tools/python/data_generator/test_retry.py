@@ -0,0 +1,107 @@
+"""
+Unit tests for the data_generator.retry module.
+"""
+
+import asyncio
+from email.utils import formatdate
+from time import time
+
+import pytest
+from semantic_kernel.exceptions import (
+    KernelInvokeException,
+    ServiceContentFilterException,
+    ServiceResponseException,
+)
+
+from data_generator.retry import (
+    ContentFilteredError,
+    ErrorClass,
+    OutputParseError,
+    RetryPolicy,
+    classify_error,
+    retry_after_seconds,
+)
+
+from .conftest import make_api_error
+
+
+def _wrapped(exc: BaseException) -> KernelInvokeException:
+    """Wrap *exc* the way Semantic Kernel does when a service call fails."""
+    try:
+        try:
+            raise ServiceResponseException("service failed") from exc
+        except ServiceResponseException as service_exc:
+            raise KernelInvokeException("invoke failed") from service_exc
+    except KernelInvokeException as kernel_exc:
+        return kernel_exc
+
+
+@pytest.mark.parametrize(
+    ("exc", "expected"),
+    [
+        (make_api_error(429), ErrorClass.THROTTLED),
+        (make_api_error(500), ErrorClass.SERVER_ERROR),
+        (make_api_error(503), ErrorClass.SERVER_ERROR),
+        (asyncio.TimeoutError(), ErrorClass.TIMEOUT),
+        (OutputParseError("bad json"), ErrorClass.PARSE_ERROR),
+        (ContentFilteredError("filtered"), ErrorClass.CONTENT_FILTER),
+        (ServiceContentFilterException("filtered"), ErrorClass.CONTENT_FILTER),
+        (make_api_error(400), None),
+        (RuntimeError("boom"), None),
+    ],
+)
+def test_classify_error(exc, expected):
+    """Each transient failure maps to its class; anything else is final."""
+    assert classify_error(exc) is expected
+
+
+def test_classify_error_follows_cause_chain():
+    """SDK errors wrapped by Semantic Kernel are still recognised."""
+    assert classify_error(_wrapped(make_api_error(429))) is ErrorClass.THROTTLED
+
+
+def test_retry_after_ms_takes_precedence():
+    """Azure's millisecond hint wins over the coarser standard header."""
+    exc = make_api_error(429, {"retry-after-ms": "250", "retry-after": "3"})
+    assert retry_after_seconds(_wrapped(exc)) == pytest.approx(0.25)
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    """``Retry-After`` may be a delay in seconds or an absolute HTTP date."""
+    assert retry_after_seconds(make_api_error(429, {"retry-after": "7"})) == 7
+    date = formatdate(time() + 30, usegmt=True)
+    delay = retry_after_seconds(make_api_error(503, {"retry-after": date}))
+    assert 28 < delay <= 30
+
+
+def test_retry_after_missing_or_malformed():
+    """Without a usable header there is no hint."""
+    assert retry_after_seconds(make_api_error(429)) is None
+    assert retry_after_seconds(make_api_error(429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(RuntimeError("boom")) is None
+
+
+def test_delay_uses_full_jitter_within_bounds():
+    """Without a hint the delay is uniform in [0, base * 2**attempt]."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    exc = make_api_error(500)
+    delays = [policy.delay(2, exc) for _ in range(200)]
+    assert all(0 <= d <= 4 for d in delays)
+    assert max(delays) > 2                      # jitter spreads the delays
+    assert all(policy.delay(10, exc) <= 5 for _ in range(50))
+
+
+def test_delay_honours_hint_up_to_max_delay():
+    """A ``Retry-After`` hint is used as-is but never exceeds ``max_delay``."""
+    policy = RetryPolicy(max_delay=10.0)
+    assert policy.delay(0, make_api_error(429, {"retry-after": "4"})) == 4
+    assert policy.delay(0, make_api_error(429, {"retry-after": "120"})) == 10
+
+
+def test_budgets_default_per_class():
+    """Unlisted classes keep their default budget; ``disabled`` zeroes all."""
+    policy = RetryPolicy(budgets={ErrorClass.TIMEOUT: 5})
+    assert policy.budget(ErrorClass.TIMEOUT) == 5
+    assert policy.budget(ErrorClass.THROTTLED) == 6
+    disabled = RetryPolicy.disabled()
+    assert all(disabled.budget(error_class) == 0 for error_class in ErrorClass)
@@ -0,0 +1,112 @@
+"""
+Unit tests for the data_generator.routing module.
+"""
+
+import json
+
+import pytest
+
+from data_generator.routing import Route, load_routes, select_route
+
+_TABLE = [
+    Route(deployments=("fast",), scenarios=("retail-product",)),
+    Route(
+        deployments=("reasoning",),
+        complexities=("complex",),
+        output_formats=("json",),
+        reasoning_effort="high",
+    ),
+    Route(deployments=("fast",), name="default"),
+]
+
+
+@pytest.mark.parametrize(
+    ("scenario", "complexity", "output_format", "expected"),
+    [
+        ("retail-product", None, "yaml", 0),
+        ("healthcare-clinical-policy", "complex", "json", 1),
+        ("healthcare-clinical-policy", "complex", "yaml", 2),
+        ("healthcare-clinical-policy", "simple", "json", 2),
+    ],
+)
+def test_first_matching_route_wins(scenario, complexity, output_format, expected):
+    """Empty match keys accept anything; earlier rows take precedence."""
+    route = select_route(
+        _TABLE, scenario=scenario, complexity=complexity, output_format=output_format
+    )
+
+    assert route is _TABLE[expected]
+
+
+def test_no_route_matches():
+    """Without a catch-all row a run may match nothing."""
+    assert (
+        select_route(
+            _TABLE[:2], scenario="tech-support", complexity=None, output_format="txt"
+        )
+        is None
+    )
+
+
+def test_load_routes_yaml(tmp_path):
+    """Match keys take one value or a list; the quota keys are rpm and tpm."""
+    path = tmp_path / "routes.yaml"
+    path.write_text(
+        "- scenario: [retail-product, tech-support]\n"
+        "  deployments: fast\n"
+        "  reasoning_effort: low\n"
+        "  concurrency: 32\n"
+        "  rpm: 600\n"
+        "  tpm: 200000\n"
+        "- complexity: complex\n"
+        "  deployments: [reasoning-east, reasoning-west]\n"
+        "  name: reasoning\n",
+        encoding="utf-8",
+    )
+
+    simple, complex_ = load_routes(path)
+
+    assert simple == Route(
+        deployments=("fast",),
+        scenarios=("retail-product", "tech-support"),
+        reasoning_effort="low",
+        concurrency=32,
+        requests_per_minute=600,
+        tokens_per_minute=200000,
+    )
+    assert simple.label == "fast"
+    assert complex_.complexities == ("complex",)
+    assert complex_.label == "reasoning"
+
+
+def test_load_routes_json(tmp_path):
+    """JSON is accepted as well (it is a subset of YAML)."""
+    path = tmp_path / "routes.json"
+    path.write_text(
+        json.dumps([{"output_format": "txt", "deployments": ["a", "b"]}]),
+        encoding="utf-8",
+    )
+
+    assert load_routes(path) == [
+        Route(deployments=("a", "b"), output_formats=("txt",))
+    ]
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        ("{}", "non-empty list"),
+        ("- scenario: retail-product\n", "Invalid route #1"),
+        ("- {deployments: []}\n", "at least one deployment"),
+        ("- {deployments: fast, scenario: {a: b}}\n", "list of names"),
+        ("- {deployments: fast, reasoning_effort: max}\n", "reasoning effort"),
+        ("- {deployments: fast, concurrency: 0}\n", "positive"),
+    ],
+)
+def test_load_routes_rejects_bad_files(tmp_path, content, message):
+    """Malformed routing tables are reported with the offending entry."""
+    path = tmp_path / "routes.yaml"
+    path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError, match=message):
+        load_routes(path)
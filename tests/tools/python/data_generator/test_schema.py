@@ -0,0 +1,89 @@
+"""
+Unit tests for the data_generator.schema module.
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from data_generator.schema import (
+    RecordModel,
+    batch_model,
+    json_schema_format,
+    outline_model,
+    section_model,
+)
+
+
+class _Line(RecordModel):
+    sku: str
+    qty: int = 1
+
+
+class _Order(RecordModel):
+    order_id: str
+    lines: list[_Line]
+    note: str | None = None
+
+
+def test_strict_schema_closes_objects_and_requires_every_field():
+    """Optional fields stay nullable but become required; defaults go."""
+    fmt = json_schema_format(_Order, name="Order")
+    schema = fmt["json_schema"]["schema"]
+    line = schema["$defs"]["_Line"]
+
+    assert fmt["type"] == "json_schema"
+    assert fmt["json_schema"]["strict"] is True
+    assert schema["additionalProperties"] is False
+    assert schema["required"] == ["order_id", "lines", "note"]
+    assert {"type": "null"} in schema["properties"]["note"]["anyOf"]
+    assert "default" not in schema["properties"]["note"]
+    assert line["required"] == ["sku", "qty"]
+    assert line["additionalProperties"] is False
+
+
+def test_free_form_mapping_disables_strict_mode():
+    """``dict`` fields cannot be closed, so the schema is sent non-strict."""
+
+    class _Product(RecordModel):
+        attributes: dict[str, str]
+
+    fmt = json_schema_format(_Product, name="Product")
+
+    assert fmt["json_schema"]["strict"] is False
+
+
+def test_batch_model_wraps_records():
+    """The batch envelope is a ``records`` list, built once per model."""
+    model = batch_model(_Order)
+    parsed = model.model_validate({"records": [{"order_id": "o", "lines": []}]})
+
+    assert model is batch_model(_Order)
+    assert parsed.records[0].order_id == "o"
+
+
+def test_outline_model_lists_headings_and_drops_derived_fields():
+    """Section lists become headings; derived fields are not asked for."""
+    model = outline_model(_Order, ("lines",), ("note",))
+    parsed = model.model_validate({"order_id": 7, "lines": ["First line"]})
+
+    assert model is outline_model(_Order, ("lines",), ("note",))
+    assert list(model.model_fields) == ["order_id", "lines"]
+    assert parsed.order_id == "7"
+    with pytest.raises(ValidationError):
+        model.model_validate({"order_id": "o", "lines": [{"sku": "a"}]})
+
+
+def test_section_model_is_the_list_item_model():
+    """Only lists of records can be written item by item."""
+    assert section_model(_Order, "lines") is _Line
+    with pytest.raises(ValueError, match="not a list of records"):
+        section_model(_Order, "order_id")
+    with pytest.raises(ValueError, match="not a list of records"):
+        section_model(_Order, "missing")
+
+
+def test_record_model_accepts_numeric_ids():
+    """Ids echoed without quotes still validate; wrong shapes do not."""
+    assert _Order.model_validate({"order_id": 42, "lines": []}).order_id == "42"
+    with pytest.raises(ValidationError):
+        _Order.model_validate({"order_id": "o", "lines": [{"qty": 2}]})
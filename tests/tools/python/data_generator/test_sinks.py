@@ -0,0 +1,206 @@
+"""
+Unit tests for the data_generator.sinks module.
+"""
+
+import asyncio
+import io
+import json
+
+import pytest
+import yaml
+
+from data_generator.sinks import (
+    EncodedRecord,
+    FileSink,
+    JsonlSink,
+    SinkWriter,
+    create_sink,
+)
+
+
+def _read_jsonl(path):
+    """Return the rows of an uncompressed JSONL shard."""
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.mark.parametrize(
+    ("output_format", "load"),
+    [("json", json.loads), ("yaml", yaml.safe_load), ("txt", str)],
+)
+def test_file_sink_writes_one_file_per_record(tmp_path, output_format, load):
+    """Each record lands in ``<toolName>_<id>.<format>``."""
+    sink = FileSink(tmp_path, tool_name="Tool", output_format=output_format)
+    data = {"a": 1} if output_format != "txt" else "plain text"
+
+    path = sink.write("abc", data)
+
+    assert path == tmp_path / f"Tool_abc.{output_format}"
+    assert load(path.read_text(encoding="utf-8")) == data
+
+
+def test_jsonl_sink_rotates_and_publishes_shards(tmp_path):
+    """Shards hold ``records_per_shard`` rows and are renamed when complete."""
+    sink = JsonlSink(
+        tmp_path, tool_name="Tool", output_format="json", records_per_shard=2
+    )
+    paths = [sink.write(str(i), {"n": i}) for i in range(5)]
+
+    assert [p.name for p in paths] == [
+        "Tool-00001.jsonl",
+        "Tool-00001.jsonl",
+        "Tool-00002.jsonl",
+        "Tool-00002.jsonl",
+        "Tool-00003.jsonl",
+    ]
+    assert (tmp_path / "Tool-00003.jsonl.partial").exists()
+    sink.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "Tool-00001.jsonl",
+        "Tool-00002.jsonl",
+        "Tool-00003.jsonl",
+    ]
+    rows = _read_jsonl(tmp_path / "Tool-00002.jsonl")
+    assert rows == [
+        {"id": "2", "format": "json", "record": {"n": 2}},
+        {"id": "3", "format": "json", "record": {"n": 3}},
+    ]
+
+
+def test_sharded_sink_continues_numbering_and_drops_partials(tmp_path):
+    """A resumed run never overwrites shards and discards incomplete ones."""
+    (tmp_path / "Tool-00004.jsonl").write_text("", encoding="utf-8")
+    (tmp_path / "Tool-00005.jsonl.partial").write_text("{", encoding="utf-8")
+
+    sink = JsonlSink(tmp_path, tool_name="Tool", output_format="json")
+
+    assert sink.write("x", {}).name == "Tool-00005.jsonl"
+    sink.close()
+    assert not (tmp_path / "Tool-00005.jsonl.partial").exists()
+
+
+def test_jsonl_sink_zstd(tmp_path):
+    """Compressed shards decompress to the same JSON Lines."""
+    zstandard = pytest.importorskip("zstandard")
+    sink = JsonlSink(
+        tmp_path, tool_name="Tool", output_format="json", compression="zstd"
+    )
+    path = sink.write("a", {"k": "v"})
+    sink.close()
+
+    assert path.name == "Tool-00001.jsonl.zst"
+    with path.open("rb") as fp:
+        text = io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(fp), encoding="utf-8"
+        ).read()
+    assert json.loads(text) == {"id": "a", "format": "json", "record": {"k": "v"}}
+
+
+def test_parquet_sink(tmp_path):
+    """Parquet shards store the record as JSON text next to its id."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = create_sink(
+        "parquet",
+        tmp_path,
+        tool_name="Tool",
+        output_format="json",
+        records_per_shard=10,
+    )
+    for i in range(3):
+        sink.write(str(i), {"n": i})
+    sink.close()
+
+    table = pq.read_table(tmp_path / "Tool-00001.parquet")
+    assert table.column_names == ["id", "format", "record"]
+    assert [json.loads(r) for r in table.column("record").to_pylist()] == [
+        {"n": 0},
+        {"n": 1},
+        {"n": 2},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("kind", "output_format"),
+    [("files", "json"), ("files", "yaml"), ("files", "txt"), ("jsonl", "json")],
+)
+def test_encoded_records_are_stored_unchanged(tmp_path, kind, output_format):
+    """A record encoded ahead of time ends up byte-identical on disk."""
+    data = {"name": "Ünïcode", "items": [1, 2.5, None], "nested": {"b": True}}
+    if output_format == "txt":
+        data = "plain text"
+    outputs = []
+    for variant in ("plain", "encoded"):
+        sink = create_sink(
+            kind, tmp_path / variant, tool_name="Tool", output_format=output_format
+        )
+        encoded = EncodedRecord(type(sink).encode(data, output_format))
+        path = sink.write("abc", data if variant == "plain" else encoded)
+        sink.close()
+        if kind != "files":
+            path = next((tmp_path / variant).iterdir())
+        outputs.append(path.read_bytes())
+
+    assert outputs[0] == outputs[1]
+
+
+def test_create_sink_validation(tmp_path):
+    """Unknown sinks and unsupported compression are configuration errors."""
+    with pytest.raises(ValueError, match="Unknown sink"):
+        create_sink("csv", tmp_path, tool_name="Tool", output_format="json")
+    with pytest.raises(ValueError, match="does not support compression"):
+        create_sink(
+            "files",
+            tmp_path,
+            tool_name="Tool",
+            output_format="json",
+            compression="zstd",
+        )
+    with pytest.raises(ValueError, match="records_per_shard"):
+        create_sink(
+            "jsonl",
+            tmp_path,
+            tool_name="Tool",
+            output_format="json",
+            records_per_shard=0,
+        )
+
+
+def test_sink_writer_batches_from_a_single_task(tmp_path):
+    """Concurrent producers are serialised through one writer task."""
+    sink = JsonlSink(
+        tmp_path, tool_name="Tool", output_format="json", records_per_shard=1000
+    )
+
+    async def _main():
+        writer = SinkWriter(sink, max_pending=4)
+        writer.start()
+        paths = await asyncio.gather(*(writer.write(str(i), i) for i in range(50)))
+        await writer.close()
+        return paths
+
+    paths = asyncio.run(_main())
+
+    assert {p.name for p in paths} == {"Tool-00001.jsonl"}
+    rows = _read_jsonl(tmp_path / "Tool-00001.jsonl")
+    assert sorted(row["record"] for row in rows) == list(range(50))
+
+
+def test_sink_writer_reports_write_errors_per_record(tmp_path):
+    """A record the sink cannot store fails its own ``write`` call only."""
+    sink = FileSink(tmp_path, tool_name="Tool", output_format="json")
+
+    async def _main():
+        writer = SinkWriter(sink)
+        writer.start()
+        results = await asyncio.gather(
+            writer.write("ok", {}),
+            writer.write("bad", {"not": object()}),
+            return_exceptions=True,
+        )
+        await writer.close()
+        return results
+
+    ok, bad = asyncio.run(_main())
+
+    assert ok.name == "Tool_ok.json"
+    assert isinstance(bad, TypeError)
@@ -0,0 +1,112 @@
+"""
+Unit tests for the data_generator.telemetry module.
+"""
+
+import asyncio
+
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from data_generator.telemetry import (
+    Histogram,
+    RequestTiming,
+    RunTelemetry,
+    mark_first_byte,
+    time_request,
+)
+from data_generator.usage import TokenUsage
+
+
+def test_histogram_quantiles_are_within_bucket_error():
+    """Quantiles land within one bucket (~4.4%) of the exact value."""
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.05)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.05)
+    assert histogram.quantile(1.0) == 1.0
+    assert histogram.summary()["mean"] == pytest.approx(0.5005)
+
+
+def test_histogram_zeros_and_empty():
+    """Zero values have their own bucket; an empty histogram reports 0."""
+    histogram = Histogram()
+    assert histogram.quantile(0.5) == 0.0
+    assert histogram.summary() == {"count": 0}
+
+    for value in (0, 0, 0, 8):
+        histogram.record(value)
+    assert histogram.quantile(0.5) == 0.0
+    assert histogram.quantile(0.9) == 8
+
+
+def test_first_byte_hook_marks_the_current_request():
+    """The response hook reaches the timing of the request being made."""
+
+    async def _request():
+        with time_request() as timing:
+            await asyncio.wait_for(mark_first_byte(None), timeout=1)
+            await mark_first_byte(None)            # later responses ignored
+        await mark_first_byte(None)                # no request being timed
+        return timing
+
+    timing = asyncio.run(_request())
+
+    assert timing.first_byte is not None
+    assert timing.first_byte >= timing.sent
+
+
+def test_run_telemetry_exports_and_reports():
+    """Requests, retries and records reach OpenTelemetry and the report."""
+    reader = InMemoryMetricReader()
+    telemetry = RunTelemetry(
+        {"scenario": "s"}, meter_provider=MeterProvider(metric_readers=[reader])
+    )
+    telemetry.record_request(
+        deployment="d",
+        queue_wait=0.5,
+        timing=RequestTiming(sent=10.0, first_byte=10.2),
+        finished=11.0,
+        usage=TokenUsage(prompt_tokens=100, completion_tokens=40, cached_tokens=64),
+    )
+    telemetry.record_request(
+        deployment="d",
+        queue_wait=0.1,
+        timing=RequestTiming(sent=20.0),
+        finished=20.3,
+        usage=None,
+        outcome="throttled",
+    )
+    telemetry.record_retry("throttled")
+    telemetry.record_records("success")
+
+    report = telemetry.report(elapsed_seconds=2)
+    assert report["scenario"] == "s"
+    assert report["elapsed_seconds"] == 2
+    assert report["requests"] == {"ok": 1, "throttled": 1}
+    assert report["retries"] == {"throttled": 1}
+    assert report["records"] == {"success": 1}
+    assert report["latency_seconds"]["total"]["count"] == 2
+    assert report["latency_seconds"]["time_to_first_byte"]["count"] == 1
+    assert report["tokens"]["cached"]["total"] == 64
+
+    exported = {
+        metric.name: metric
+        for resource in reader.get_metrics_data().resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+    }
+    assert set(exported) == {
+        "data_generator.request.queue_wait",
+        "data_generator.request.time_to_first_byte",
+        "data_generator.request.duration",
+        "data_generator.request.tokens",
+        "data_generator.retries",
+        "data_generator.records",
+    }
+    duration = exported["data_generator.request.duration"].data.data_points
+    assert {dict(p.attributes)["outcome"] for p in duration} == {"ok", "throttled"}
+    assert all(dict(p.attributes)["scenario"] == "s" for p in duration)
@@ -0,0 +1,82 @@
+"""
+Unit tests for the data_generator.usage module.
+"""
+
+from types import SimpleNamespace
+
+from openai.types import CompletionUsage
+from openai.types.completion_usage import (
+    CompletionTokensDetails,
+    PromptTokensDetails,
+)
+from semantic_kernel.connectors.ai.completion_usage import (
+    CompletionUsage as SKCompletionUsage,
+)
+
+from data_generator.usage import TokenUsage
+
+
+def test_from_message_prefers_raw_openai_usage():
+    """Reasoning and cached token details come from ``inner_content``."""
+    message = SimpleNamespace(
+        inner_content=SimpleNamespace(
+            usage=CompletionUsage(
+                prompt_tokens=1000,
+                completion_tokens=300,
+                total_tokens=1300,
+                completion_tokens_details=CompletionTokensDetails(
+                    reasoning_tokens=200
+                ),
+                prompt_tokens_details=PromptTokensDetails(cached_tokens=768),
+            )
+        ),
+        metadata={},
+    )
+
+    usage = TokenUsage.from_message(message)
+
+    assert usage == TokenUsage(
+        prompt_tokens=1000,
+        completion_tokens=300,
+        reasoning_tokens=200,
+        cached_tokens=768,
+    )
+    assert usage.total_tokens == 1300
+
+
+def test_from_message_falls_back_to_sk_metadata():
+    """SK's own usage metadata is used when no raw response is attached."""
+    message = SimpleNamespace(
+        inner_content=None,
+        metadata={"usage": SKCompletionUsage(prompt_tokens=5, completion_tokens=7)},
+    )
+
+    assert TokenUsage.from_message(message) == TokenUsage(5, 7)
+
+
+def test_from_message_without_usage_returns_none():
+    """Responses without a usage block yield None."""
+    assert TokenUsage.from_message(SimpleNamespace(metadata=None)) is None
+
+
+def test_usage_addition():
+    """Usage records add element-wise."""
+    total = TokenUsage(1, 2, 3, 4) + TokenUsage(10, 20, 30, 40)
+    assert total == TokenUsage(11, 22, 33, 44)
+
+
+def test_usage_split_preserves_totals():
+    """A batched call's usage is shared out without losing tokens."""
+    usage = TokenUsage(prompt_tokens=10, completion_tokens=7, cached_tokens=2)
+
+    shares = usage.split(3)
+
+    assert [s.prompt_tokens for s in shares] == [4, 3, 3]
+    assert [s.completion_tokens for s in shares] == [3, 2, 2]
+    assert sum(shares, TokenUsage()) == usage
+
+
+def test_cache_hit_ratio():
+    """The ratio relates cached to prompt tokens and tolerates empty usage."""
+    assert TokenUsage(prompt_tokens=200, cached_tokens=150).cache_hit_ratio == 0.75
+    assert TokenUsage().cache_hit_ratio == 0.0
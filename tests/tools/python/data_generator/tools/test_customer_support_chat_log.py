@@ -227,7 +227,7 @@ class TestCustomerSupportChatLogTool:
         result = customer_support_tool.build_prompt("yaml", unique_id="test-id")
         assert "Return VALID YAML ONLY (no markdown fences)" in result
         assert "conversation_id: (echo above)" in result
-        assert "CONVERSATION DETAILS" in result
+        assert "RECORD DETAILS" in result
         assert "multi-turn customer support chat logs" in result
 
     def test_build_prompt_json(self, customer_support_tool):
@@ -235,7 +235,7 @@ class TestCustomerSupportChatLogTool:
         result = customer_support_tool.build_prompt("json", unique_id="test-id")
         assert "Return VALID JSON ONLY (no markdown fences)" in result
         assert '"conversation_id": "(echo above)"' in result
-        assert "CONVERSATION DETAILS" in result
+        assert "RECORD DETAILS" in result
         assert "multi-turn customer support chat logs" in result
 
     def test_build_prompt_text(self, customer_support_tool):
@@ -243,7 +243,7 @@ class TestCustomerSupportChatLogTool:
         result = customer_support_tool.build_prompt("text", unique_id="test-id")
         assert "Return plain text WITHOUT any YAML/JSON formatting markers" in result
         assert "Conversation ID: (echo above)" in result
-        assert "CONVERSATION DETAILS" in result
+        assert "RECORD DETAILS" in result
         assert "multi-turn customer support chat logs" in result
 
     def test_build_prompt_unknown_format(self, customer_support_tool):
@@ -3,6 +3,7 @@ Tests for the EcommerceOrderHistoryTool functionality.
 
 This test file contains an inline version of EcommerceOrderHistoryTool that doesn't rely
 on imports from the main module, ensuring tests can run without path setup issues.
+The local-numbers tests at the end exercise the real tool.
 """
 
 import argparse
@@ -12,6 +13,11 @@ from datetime import datetime, timezone
 
 import yaml
 
+from data_generator.tools.ecommerce_order_history import (
+    EcommerceOrderHistoryTool as LocalTool,
+    OrderHistoryNarrative,
+)
+
 
 class EcommerceOrderHistoryTool:
     """Generate synthetic e-commerce customer order histories.
@@ -663,3 +669,162 @@ class TestEcommerceOrderHistoryTool:
         default_tool = EcommerceOrderHistoryTool()
         default_result = default_tool.get_system_description()
         assert default_result == "E-commerce order histories in general retail"
+
+
+# ---------------------------------------------------------------------- #
+# Local numbers (real tool)                                              #
+# ---------------------------------------------------------------------- #
+_CREATED_AT = "2026-03-01T12:00:00+00:00"
+
+
+def _local_tool(**settings):
+    """The real tool with the local numbers switched on."""
+    tool = LocalTool()
+    tool.validate_args(
+        argparse.Namespace(
+            industry=settings.get("industry"),
+            orders_min=settings.get("orders_min", 3),
+            returns_percent=settings.get("returns_percent", 10),
+            local_numbers=True,
+        )
+    )
+    return tool
+
+
+def _orders(tool, customer_id):
+    """The history *tool* puts into a prompt for *customer_id* (no pool)."""
+    return tool.build_orders(
+        customer_id,
+        customer_id,
+        _CREATED_AT,
+        industry=tool.industry,
+        orders_min=tool.orders_min,
+        returns_percent=tool.returns_percent,
+    )
+
+
+def _narrative(tool, customer_id, **fields):
+    """A reply echoing the header *tool* writes for *customer_id*, plus *fields*."""
+    return {
+        "history_id": customer_id,
+        "customer_id": customer_id,
+        "created_at": _CREATED_AT,
+        "industry": tool.industry,
+        "orders_min": tool.orders_min,
+        "returns_percent": tool.returns_percent,
+        "product_names": [],
+        "return_reasons": [],
+        "reviews": [],
+        "interactions": [],
+        **fields,
+    }
+
+
+class TestLocalNumbers:
+    """Orders are built locally; the model only writes the text."""
+
+    def test_orders_add_up_and_are_seeded_by_customer_id(self):
+        """Totals are the sum of their lines and the same id gives the same history."""
+        tool = _local_tool(orders_min=6)
+
+        history = _orders(tool, "cust-1")
+
+        assert 6 <= len(history["orders"]) <= 8
+        for order in history["orders"]:
+            cents = sum(round(i["price"] * 100) * i["qty"] for i in order["items"])
+            assert round(order["total"] * 100) == cents
+            assert 1 <= len(order["items"]) <= 4
+        dates = [order["order_date"] for order in history["orders"]]
+        assert dates == sorted(dates)
+        assert all(d < _CREATED_AT for d in dates)
+        assert _orders(tool, "cust-1") == history
+        assert _orders(tool, "cust-2")["orders"] != history["orders"]
+
+    def test_returns_follow_returns_percent(self):
+        """At 100% every order old enough is returned, with a support contact."""
+        tool = _local_tool(orders_min=10, returns_percent=100)
+
+        history = _orders(tool, "cust-1")
+
+        returned = [o for o in history["orders"] if o["status"] == "returned"]
+        assert [r["order_id"] for r in history["returns"]] == [
+            o["order_id"] for o in returned
+        ]
+        assert len(history["interactions"]) >= len(returned) > 0
+        assert history["reviews"] == []
+        none = _orders(_local_tool(returns_percent=0), "cust-1")
+        assert none["returns"] == []
+
+    def test_prompt_lists_the_orders_after_the_instructions(self):
+        """The orders are per-record detail; the instructions are shared."""
+        tool = _local_tool()
+        first = tool.build_prompt("json", unique_id="cust-1")
+        second = tool.build_prompt("json", unique_id="cust-2")
+
+        details = first.index("## RECORD DETAILS")
+        assert first.index("Order 1 (") > details
+        assert first[:details] == second[: second.index("## RECORD DETAILS")]
+        assert '"product_names"' in first
+        assert "product_names:" in tool.build_prompt("yaml", unique_id="cust-1")
+
+    def test_post_process_merges_the_narrative(self):
+        """Names, reasons and notes fill in the rebuilt history."""
+        tool = _local_tool(returns_percent=50)
+        history = _orders(tool, "cust-1")
+        narrative = _narrative(tool, "cust-1", product_names=["Ceramic Mug"])
+
+        record = tool.post_process(json.dumps(narrative), "json")
+
+        tool.validate_record(record)
+        assert [o["total"] for o in record["orders"]] == [
+            o["total"] for o in history["orders"]
+        ]
+        assert record["orders"][0]["items"][0]["name"] == "Ceramic Mug"
+        items = [i for o in record["orders"] for i in o["items"]]
+        assert all(i["name"] for i in items)
+        assert all(r["reason"] for r in record["returns"])
+        assert all("order_id" not in c for c in record["interactions"])
+        # YAML turns the echoed timestamp into a datetime
+        assert tool.post_process(yaml.safe_dump(narrative), "yaml") == record
+        text = tool.post_process(json.dumps(narrative), "txt")
+        assert text.startswith("Customer ID: cust-1\n")
+
+    def test_unusable_narrative_is_returned_raw(self):
+        """Replies that do not parse or lack the id or timestamp are not merged."""
+        tool = _local_tool()
+
+        assert tool.post_process("{not json", "json") == "{not json"
+        for reply in ('{"reviews": []}', '{"customer_id": "c", "created_at": "x"}'):
+            assert tool.post_process(reply, "json") == reply
+        for bad in (
+            {"industry": None, "orders_min": None},
+            {"orders_min": 10**9},
+            {"returns_percent": 101},
+            {"orders_min": "many"},
+        ):
+            reply = json.dumps(_narrative(tool, "cust-1", **bad))
+            assert tool.post_process(reply, "json") == reply
+
+    def test_orders_follow_the_echoes_not_the_settings(self):
+        """A replayed or resumed reply rebuilds its orders under new flags."""
+        tool = _local_tool(industry="books", orders_min=10, returns_percent=100)
+        history = _orders(tool, "cust-1")
+        reply = json.dumps(_narrative(tool, "cust-1"))
+        assert "Orders Min: 10\n" in tool.build_prompt("json", unique_id="cust-1")
+
+        later = _local_tool(industry="garden", orders_min=1, returns_percent=0)
+        record = later.post_process(reply, "json")
+
+        assert record["industry"] == "books"
+        assert [o["order_id"] for o in record["orders"]] == [
+            o["order_id"] for o in history["orders"]
+        ]
+        assert [r["order_id"] for r in record["returns"]] == [
+            r["order_id"] for r in history["returns"]
+        ]
+        assert record["returns"]
+
+    def test_structured_outputs_ask_for_the_narrative(self):
+        """With local numbers the response model is the narrative only."""
+        assert LocalTool().response_model is LocalTool.record_model
+        assert _local_tool().response_model is OrderHistoryNarrative
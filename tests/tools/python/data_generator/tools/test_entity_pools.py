@@ -0,0 +1,248 @@
+"""
+Shared entity pools across the data_generator tools that refer to customers,
+products and employees.
+"""
+
+import argparse
+import json
+import pickle
+import re
+
+import pytest
+import yaml
+
+import data_generator.tools as tools
+from data_generator.engine import DataGenerator
+from data_generator.entities import EntityPool
+from data_generator.manifest import RunManifest
+
+
+@pytest.fixture()
+def pool(tmp_path):
+    """Return a small pool in a temporary directory."""
+    return EntityPool(tmp_path, size=40)
+
+
+def _attach(tool, pool):
+    """*tool* with *pool* attached."""
+    tool.use_entity_pool(pool)
+    return tool
+
+
+def _details(prompt):
+    """The per-record part of *prompt*."""
+    return prompt.partition("## RECORD DETAILS")[2]
+
+
+def test_tools_without_entities_reject_a_pool(pool):
+    """Attaching a pool to a tool that refers to no entities is an error."""
+    with pytest.raises(ValueError, match="does not use shared entities"):
+        tools.TechSupportTool().use_entity_pool(pool)
+
+
+def test_attaching_loads_the_tool_kinds(pool):
+    """The tool's kinds are generated on attach and travel with the tool."""
+    tool = _attach(tools.CustomerSupportChatLogTool(), pool)
+
+    assert (pool.directory / "customers.jsonl").exists()
+    assert not (pool.directory / "products.jsonl").exists()
+    copy = pickle.loads(pickle.dumps(tool))
+    assert copy.entity_pool.entities("customers") == pool.entities("customers")
+
+
+def test_chat_log_customer_comes_from_the_pool(pool):
+    """Prompt and post_process agree on the customer of a conversation."""
+    tool = _attach(tools.CustomerSupportChatLogTool(), pool)
+    customer = pool.sample("customers", "conv-1")[0]
+
+    assert customer["email"] in _details(tool.build_prompt("json", unique_id="conv-1"))
+    reply = {
+        "conversation_id": "conv-1",
+        "resolution_status": "resolved",
+        "customer_profile": {"name": "Invented", "email": "x", "plan_tier": "basic"},
+    }
+    record = tool.post_process(json.dumps(reply), "json")
+    assert record["customer_profile"] == {
+        "name": customer["name"],
+        "email": customer["email"],
+        "plan_tier": customer["plan_tier"],
+        "customer_id": customer["customer_id"],
+    }
+    assert tool.post_process(yaml.safe_dump(reply), "yaml") == record
+
+
+def test_hr_employee_comes_from_the_department(pool):
+    """Records are about pooled employees of the department, with managers."""
+    tool = _attach(tools.HREmployeeRecordTool(department="engineering"), pool)
+
+    record = tool.post_process(json.dumps({"record_id": "rec-1"}), "json")
+
+    profile = record["employee_profile"]
+    employee = pool.get("employees", profile["fictional_employee_id"])
+    assert employee["department"] == "Engineering"
+    assert profile["email"] == employee["email"]
+    if employee["manager_id"]:
+        manager = pool.get("employees", employee["manager_id"])
+        assert profile["manager"] == manager["name"]
+    prompt = _details(tool.build_prompt("json", unique_id="rec-1"))
+    assert f"Employee (immutable): {employee['employee_id']}" in prompt
+    # Departments missing from the pool draw from all staff
+    general = _attach(tools.HREmployeeRecordTool(), pool)
+    assert general.post_process('{"record_id": "rec-1"}', "json")["employee_profile"]
+
+
+def test_retail_products_walk_the_pool(pool):
+    """Record ids are the pooled products of the industry, then fresh ids."""
+    tool = _attach(tools.RetailProductTool(industry="beauty"), pool)
+    beauty = [p["product_id"] for p in pool.entities("products", category="Beauty")]
+
+    ids = [tool.get_unique_id() for _ in range(len(beauty) + 1)]
+
+    assert ids[:-1] == beauty
+    assert pool.get("products", ids[-1]) is None
+    product = pool.get("products", beauty[0])
+    prompt = _details(tool.build_prompt("json", unique_id=beauty[0]))
+    assert f"Name (immutable): {product['name']}" in prompt
+    record = tool.post_process(
+        json.dumps({"product_id": beauty[0], "name": "Other", "price": 1.0}), "json"
+    )
+    assert (record["name"], record["price"]) == (product["name"], product["price"])
+
+
+def test_retail_resume_continues_with_the_next_products(
+    pool, fake_completion, temp_output_dir
+):
+    """Resumed and repeated runs skip the products already in the directory."""
+    tool = _attach(tools.RetailProductTool(industry="beauty"), pool)
+    beauty = [p["product_id"] for p in pool.entities("products", category="Beauty")]
+    generator = DataGenerator(
+        tool,
+        azure_openai_endpoint="https://example.openai.azure.com",
+        azure_openai_deployment="test-deployment",
+        azure_openai_api_key="test-key",
+    )
+
+    def _reply(prompt):
+        product_id = re.search(r"Product ID \(immutable\): (\S+)", prompt)[1]
+        return json.dumps(
+            {
+                "product_id": product_id,
+                "created_at": "2026-03-01T12:00:00+00:00",
+                "category": "x",
+                "name": "x",
+                "description": "x",
+                "price": 1.0,
+                "currency": "USD",
+                "tags": [],
+                "attributes": {},
+                "stock_quantity": 1,
+            }
+        )
+
+    def _fail_second(prompt):
+        if len(fake_completion.prompts) == 2:
+            raise RuntimeError("boom")
+        return _reply(prompt)
+
+    def _generated():
+        return sorted(RunManifest(temp_output_dir).load().completed)
+
+    fake_completion.responder = _fail_second
+    generator.run(count=3, out_dir=temp_output_dir, concurrency=1)
+    assert _generated() == sorted([beauty[0], beauty[2]])
+
+    fake_completion.responder = _reply
+    generator.run(count=4, out_dir=temp_output_dir, concurrency=1, resume=True)
+    # The failed product is retried, then the walk continues
+    assert _generated() == sorted(beauty[:4])
+
+    generator.run(count=1, out_dir=temp_output_dir, concurrency=1)
+    assert _generated() == sorted(beauty[:5])
+
+
+def test_order_history_uses_pooled_customers_and_products(pool):
+    """Histories belong to pooled customers and price pooled products."""
+    tool = _attach(tools.EcommerceOrderHistoryTool(), pool)
+    customer = pool.sample("customers", "rec-1")[0]
+    product = pool.sample("products", customer["customer_id"])[0]
+
+    prompt = _details(tool.build_prompt("json", unique_id="rec-1"))
+    assert f"Customer ID (immutable): {customer['customer_id']}" in prompt
+    assert f"{product['product_id']} | {product['name']}" in prompt
+    reply = {
+        "customer_id": customer["customer_id"],
+        "orders": [
+            {
+                "items": [
+                    {"sku": product["product_id"], "name": "x", "qty": 2, "price": 1},
+                    {"sku": "SKU-OTHER", "name": "Other", "qty": 1, "price": 2.5},
+                ],
+                "total": 4.5,
+            }
+        ],
+    }
+    (order,) = tool.post_process(json.dumps(reply), "json")["orders"]
+    assert order["items"][0]["name"] == product["name"]
+    assert order["total"] == round(2 * product["price"] + 2.5, 2)
+
+
+def _local_orders_tool(pool):
+    """The order-history tool with local numbers and *pool* attached."""
+    tool = tools.EcommerceOrderHistoryTool()
+    tool.validate_args(
+        argparse.Namespace(
+            industry=None, orders_min=5, returns_percent=0, local_numbers=True
+        )
+    )
+    return _attach(tool, pool)
+
+
+def _local_orders(tool, record_id, customer_id):
+    """The local history of record *record_id* for *customer_id*."""
+    return tool.build_orders(
+        record_id,
+        customer_id,
+        "2026-03-01T12:00:00+00:00",
+        industry=tool.industry,
+        orders_min=5,
+        returns_percent=0,
+    )
+
+
+def test_local_order_numbers_use_pooled_products(pool):
+    """With local numbers the lines are pooled products at pool prices."""
+    tool = _local_orders_tool(pool)
+    customer_id = pool.sample("customers", "rec-1")[0]["customer_id"]
+
+    history = _local_orders(tool, "rec-1", customer_id)
+
+    for item in (i for order in history["orders"] for i in order["items"]):
+        product = pool.get("products", item["sku"])
+        assert (item["name"], item["price"]) == (product["name"], product["price"])
+    assert "| (name it) |" not in tool.build_prompt("json", unique_id="rec-1")
+
+
+def test_local_orders_of_a_pooled_customer_differ_per_record(pool):
+    """Two histories of the same pooled customer draw their own orders."""
+    tool = _local_orders_tool(pool)
+    customer_id = pool.sample("customers", "rec-1")[0]["customer_id"]
+
+    first = _local_orders(tool, "rec-1", customer_id)
+    second = _local_orders(tool, "rec-2", customer_id)
+
+    assert first["customer_id"] == second["customer_id"] == customer_id
+    assert not {o["order_id"] for o in first["orders"]} & {
+        o["order_id"] for o in second["orders"]
+    }
+    reply = {
+        "history_id": "rec-2",
+        "customer_id": customer_id,
+        "created_at": "2026-03-01T12:00:00+00:00",
+        "industry": tool.industry,
+        "orders_min": 5,
+        "returns_percent": 0,
+    }
+    record = tool.post_process(json.dumps(reply), "json")
+    assert [o["order_id"] for o in record["orders"]] == [
+        o["order_id"] for o in second["orders"]
+    ]
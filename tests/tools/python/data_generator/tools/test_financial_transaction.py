@@ -3,6 +3,7 @@ Tests for the FinancialTransactionTool functionality.
 
 This test file contains an inline version of FinancialTransactionTool that doesn't rely
 on imports from the main module, ensuring tests can run without path setup issues.
+The local-ledger tests at the end exercise the real tool.
 """
 
 import argparse
@@ -13,8 +14,15 @@ from datetime import date, timedelta
 from typing import Any
 from unittest.mock import Mock, patch
 
+import pytest
 import yaml
 
+from data_generator.schema import json_schema_format
+from data_generator.tools.financial_transaction import (
+    FinancialTransactionTool as LedgerTool,
+    StatementNarrative,
+)
+
 
 class FinancialTransactionTool:
     """Generate synthetic bank-account statements with ≥50 transactions.
@@ -608,4 +616,202 @@ class TestFinancialTransactionTool:
         
         result = tool.get_system_description()
         
-        assert result == "Financial transactions for savings accounts"
\ No newline at end of file
+        assert result == "Financial transactions for savings accounts"
+
+# ---------------------------------------------------------------------- #
+# Local ledger (real tool)                                               #
+# ---------------------------------------------------------------------- #
+def _ledger_tool(**settings):
+    """The real tool with the local ledger switched on."""
+    tool = LedgerTool()
+    tool.validate_args(
+        argparse.Namespace(
+            account_type=settings.get("account_type"),
+            transactions_max=settings.get("transactions_max", 50),
+            fraud_percent=settings.get("fraud_percent", 0),
+            local_ledger=True,
+        )
+    )
+    return tool
+
+
+def _ledger(tool, statement_id):
+    """The ledger *tool* puts into a prompt for *statement_id* today."""
+    header = tool._ledger_header(statement_id)
+    return tool.build_ledger(
+        statement_id,
+        header["start_date"],
+        header["end_date"],
+        account_type=header["account_type"],
+        lines=header["lines"],
+        duplicate=header["duplicate"],
+    )
+
+
+def _narrative(statement, **fields):
+    """A reply echoing the header of *statement*, plus *fields*."""
+    return {
+        "statement_id": statement["statement_id"],
+        "account_type": statement["account_type"],
+        "start_date": statement["start_date"],
+        "end_date": statement["end_date"],
+        "line_count": len(statement["transactions"]),
+        "duplicate_charge": False,
+        **fields,
+    }
+
+
+class TestLocalLedger:
+    """The ledger is built locally; the model only writes the narrative."""
+
+    def test_ledger_balances_and_is_seeded_by_statement_id(self):
+        """Running balances add up exactly and the same id gives the same ledger."""
+        tool = _ledger_tool(transactions_max=60)
+
+        statement, duplicates = _ledger(tool, "stmt-1")
+
+        transactions = statement["transactions"]
+        assert len(transactions) == 60
+        assert duplicates == {}
+        balance = round(statement["opening_balance"] * 100)
+        for tx in transactions:
+            balance += round(tx["amount"] * 100)
+            assert round(tx["balance_after"] * 100) == balance
+        assert round(statement["closing_balance"] * 100) == balance
+        dates = [tx["date"] for tx in transactions]
+        assert dates == sorted(dates)
+        assert statement["start_date"] <= dates[0]
+        assert dates[-1] <= statement["end_date"]
+        assert sum(tx["category"] == "salary" for tx in transactions) == 2
+        assert _ledger(tool, "stmt-1") == (statement, duplicates)
+        assert _ledger(tool, "stmt-2")[0]["transactions"] != transactions
+
+    def test_fraud_duplicates_one_debit(self):
+        """At 100% one debit is charged twice and flagged in the prompt."""
+        tool = _ledger_tool(transactions_max=20, fraud_percent=100)
+
+        statement, duplicates = _ledger(tool, "stmt-1")
+
+        ((copy, original),) = duplicates.items()
+        assert len(statement["transactions"]) == 21
+        transactions = statement["transactions"]
+        first, second = transactions[original], transactions[copy]
+        assert (first["date"], first["amount"], first["category"]) == (
+            second["date"],
+            second["amount"],
+            second["category"],
+        )
+        assert first["amount"] < 0
+        prompt = tool.build_prompt("json", unique_id="stmt-1")
+        assert f"{copy + 1} | " in prompt
+        assert f"same merchant as line {original + 1}" in prompt
+        assert "Duplicate Charge: true" in prompt
+
+    def test_prompt_lists_the_ledger_after_the_instructions(self):
+        """The ledger is per-record detail; the instructions are shared."""
+        tool = _ledger_tool()
+        first = tool.build_prompt("json", unique_id="stmt-1")
+        second = tool.build_prompt("json", unique_id="stmt-2")
+
+        details = first.index("## RECORD DETAILS")
+        assert first.index("Ledger (line | date | amount | category)") > details
+        assert first[:details] == second[: second.index("## RECORD DETAILS")]
+        assert '"descriptions"' in first
+        assert "descriptions:" in tool.build_prompt("yaml", unique_id="stmt-1")
+
+    def test_post_process_merges_the_narrative(self):
+        """Descriptions and summary fill in the rebuilt ledger."""
+        tool = _ledger_tool(transactions_max=10)
+        ledger, _ = _ledger(tool, "stmt-1")
+        narrative = _narrative(
+            ledger,
+            summary="A quiet month.",
+            descriptions=[f"Merchant {n}" for n in range(8)],
+        )
+
+        record = tool.post_process(json.dumps(narrative), "json")
+
+        tool.validate_record(record)
+        assert [tx["amount"] for tx in record["transactions"]] == [
+            tx["amount"] for tx in ledger["transactions"]
+        ]
+        assert record["summary"] == "A quiet month."
+        assert [tx["description"] for tx in record["transactions"][:8]] == [
+            f"Merchant {n}" for n in range(8)
+        ]
+        assert all(tx["description"] for tx in record["transactions"][8:])
+        assert tool.post_process(yaml.safe_dump(narrative), "yaml") == record
+        text = tool.post_process(json.dumps(narrative), "txt")
+        assert text.startswith("Statement ID: stmt-1\n")
+        assert "Description: Merchant 0" in text
+
+    def test_unusable_narrative_is_returned_raw(self):
+        """Replies that do not parse or lack the statement id are not merged."""
+        tool = _ledger_tool()
+
+        assert tool.post_process("{not json", "json") == "{not json"
+        assert tool.post_process('{"summary": "x"}', "json") == '{"summary": "x"}'
+        ledger, _ = _ledger(tool, "stmt-1")
+        for bad in (
+            {"line_count": None},
+            {"line_count": 1},
+            {"line_count": 10**9},
+            {"account_type": None, "line_count": "many"},
+            {"end_date": "1999-01-01"},
+            {"duplicate_charge": "maybe"},
+        ):
+            reply = json.dumps(_narrative(ledger, summary="x", **bad))
+            assert tool.post_process(reply, "json") == reply
+
+    def test_ledger_follows_the_echoes_not_the_clock_or_settings(self):
+        """A reply processed later, or by a reconfigured tool, rebuilds its ledger."""
+        tool = _ledger_tool(
+            account_type="savings", transactions_max=30, fraud_percent=100
+        )
+        clock = Mock(
+            today=Mock(return_value=date(2026, 3, 15)),
+            fromisoformat=date.fromisoformat,
+        )
+        with patch("data_generator.tools.financial_transaction.date", clock):
+            ledger, duplicates = _ledger(tool, "stmt-1")
+            prompt = tool.build_prompt("json", unique_id="stmt-1")
+        assert "Start Date: 2026-02-01" in prompt
+        reply = _narrative(ledger, duplicate_charge=True, summary="x", descriptions=[])
+
+        later = _ledger_tool(
+            account_type="credit", transactions_max=50, fraud_percent=0
+        )
+        record = later.post_process(json.dumps(reply), "json")
+        from_yaml = later.post_process(yaml.safe_dump(reply), "yaml")
+
+        assert duplicates
+        assert record["account_type"] == "savings"
+        assert record["start_date"] == "2026-02-01"
+        assert record["end_date"] == "2026-02-28"
+        assert [tx["amount"] for tx in record["transactions"]] == [
+            tx["amount"] for tx in ledger["transactions"]
+        ]
+        assert from_yaml == record
+
+    def test_ledger_size_is_bounded(self):
+        """Oversized ledgers are refused up front, not allocated."""
+        with pytest.raises(ValueError, match="--transactions-max"):
+            _ledger_tool(transactions_max=5000)
+
+    def test_structured_outputs_ask_for_the_narrative(self):
+        """With the local ledger the response model is the narrative only."""
+        assert LedgerTool().response_model is LedgerTool.record_model
+        tool = _ledger_tool()
+
+        assert tool.response_model is StatementNarrative
+        fmt = json_schema_format(tool.response_model, name=tool.toolName)
+        assert fmt["json_schema"]["schema"]["required"] == [
+            "statement_id",
+            "account_type",
+            "start_date",
+            "end_date",
+            "line_count",
+            "duplicate_charge",
+            "summary",
+            "descriptions",
+        ]
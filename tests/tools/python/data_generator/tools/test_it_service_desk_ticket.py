@@ -302,3 +302,35 @@ def test_tool_name_and_registry():
     tool = ITServiceDeskTicketTool()
     assert tool.name == "it-service-desk-ticket"
     assert tool.toolName == "ITServiceDeskTicket"
+
+
+def test_build_batch_prompt_shares_instructions(it_ticket_tool):
+    """Instructions and schema appear once; each record gets its own header."""
+    prompt = it_ticket_tool.build_batch_prompt(["id-1", "id-2", "id-3"])
+
+    assert prompt.count('"work_notes"') == 1
+    assert prompt.count("ON TICKET LIFECYCLE") == 1
+    for number, uid in enumerate(["id-1", "id-2", "id-3"], start=1):
+        assert f"Record {number} (id {uid}):\nTicket ID (immutable): {uid}" in prompt
+    assert "JSON array of exactly 3 objects" in prompt
+    assert len(prompt) < 2 * len(it_ticket_tool.build_prompt("json"))
+
+
+def test_split_batch_assigns_records_to_ids(it_ticket_tool):
+    """Elements are matched by echoed id first, then by position."""
+    raw = (
+        '{"tickets": ['
+        '{"ticket_id": "id-2", "status": "new"},'
+        '"not an object",'
+        '{"status": "closed"},'
+        '{"ticket_id": "id-2", "status": "duplicate"}'
+        "]}"
+    )
+
+    records = it_ticket_tool.split_batch(raw, ["id-1", "id-2", "id-3"])
+
+    assert records == {
+        "id-2": {"ticket_id": "id-2", "status": "new"},
+        "id-3": {"status": "closed"},
+    }
+    assert it_ticket_tool.split_batch("not json", ["id-1"]) == {}
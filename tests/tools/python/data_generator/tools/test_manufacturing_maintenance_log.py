@@ -3,6 +3,7 @@ Tests for the ManufacturingMaintenanceLogTool functionality.
 
 This test file contains an inline version of ManufacturingMaintenanceLogTool that doesn't rely
 on imports from the main module, ensuring tests can run without path setup issues.
+The local-numbers tests at the end exercise the real tool.
 """
 
 import argparse
@@ -12,6 +13,11 @@ from datetime import datetime, timezone
 
 import yaml
 
+from data_generator.tools.manufacturing_maintenance_log import (
+    MaintenanceNarrative,
+    ManufacturingMaintenanceLogTool as LocalTool,
+)
+
 
 class ManufacturingMaintenanceLogTool:
     """Generate synthetic manufacturing maintenance log entries.
@@ -529,4 +535,113 @@ class TestManufacturingMaintenanceLogTool:
         assert result["status"] == "open"
         assert result["actions_taken"] == []
         assert result["parts_used"] == []
-        assert result["follow_up_tasks"] == []
\ No newline at end of file
+        assert result["follow_up_tasks"] == []
+
+
+# ---------------------------------------------------------------------- #
+# Local numbers (real tool)                                              #
+# ---------------------------------------------------------------------- #
+_CREATED_AT = "2026-03-01T12:00:00+00:00"
+
+
+def _local_tool(plant="Plant B"):
+    """The real tool with the local numbers switched on."""
+    tool = LocalTool()
+    tool.validate_args(
+        argparse.Namespace(
+            plant=plant, line="Line 3", equipment_type="CNC", local_numbers=True
+        )
+    )
+    return tool
+
+
+def _job(tool, log_id):
+    """The job *tool* puts into a prompt for *log_id*."""
+    return tool.build_job(
+        log_id,
+        _CREATED_AT,
+        plant=tool.plant,
+        line=tool.line,
+        equipment_type=tool.equipment_type,
+    )
+
+
+class TestLocalNumbers:
+    """Jobs are built locally; the model only writes the notes."""
+
+    def test_jobs_are_consistent_and_seeded_by_log_id(self):
+        """Completed jobs last exactly their duration and end before the log."""
+        tool = _local_tool()
+        created_at = datetime.fromisoformat(_CREATED_AT)
+
+        jobs = [_job(tool, f"log-{n}") for n in range(50)]
+
+        for job in jobs:
+            start = datetime.fromisoformat(job["start_time"])
+            assert start < created_at
+            if job["status"] == "completed":
+                end = datetime.fromisoformat(job["end_time"])
+                assert end < created_at
+                assert (end - start).total_seconds() == job["duration_minutes"] * 60
+            else:
+                assert job["end_time"] is None
+            numbers = [part["part_number"] for part in job["parts_used"]]
+            assert numbers == sorted(set(numbers))
+        assert {job["status"] for job in jobs} >= {"completed", "in_progress"}
+        assert _job(tool, "log-0") == jobs[0]
+
+    def test_prompt_lists_the_job_after_the_instructions(self):
+        """The job is per-record detail; the instructions are shared."""
+        tool = _local_tool()
+        first = tool.build_prompt("json", unique_id="log-1")
+        second = tool.build_prompt("json", unique_id="log-2")
+
+        details = first.index("## RECORD DETAILS")
+        assert first.index("Duration (minutes):") > details
+        assert first[:details] == second[: second.index("## RECORD DETAILS")]
+        assert "technician:" in tool.build_prompt("yaml", unique_id="log-1")
+
+    def test_post_process_merges_the_narrative(self):
+        """The notes fill in the rebuilt job; missing ones get a generic text."""
+        tool = _local_tool()
+        narrative = {
+            "log_id": "log-1",
+            "created_at": _CREATED_AT,
+            "plant": "Plant B",
+            "line": "Line 3",
+            "equipment_type": "CNC",
+            "technician": "Jane Fake-Doe",
+            "actions_taken": ["Replaced spindle bearing"],
+        }
+
+        record = tool.post_process(json.dumps(narrative), "json")
+
+        tool.validate_record(record)
+        job = _job(tool, "log-1")
+        for key in ("plant", "equipment_id", "start_time", "duration_minutes", "parts_used"):
+            assert record[key] == job[key]
+        assert record["technician"] == "Jane Fake-Doe"
+        assert record["actions_taken"] == ["Replaced spindle bearing"]
+        assert record["issue_description"]
+        # YAML turns the echoed timestamp into a datetime
+        assert tool.post_process(yaml.safe_dump(narrative), "yaml") == record
+        text = tool.post_process(json.dumps(narrative), "text")
+        assert text.startswith("Log ID: log-1\n")
+        # A replay or resume under other flags keeps the echoed plant
+        assert _local_tool(plant="Plant C").post_process(
+            json.dumps(narrative), "json"
+        ) == record
+
+    def test_unusable_narrative_is_returned_raw(self):
+        """Replies that do not parse or lack the id or timestamp are not merged."""
+        tool = _local_tool()
+
+        assert tool.post_process("{not json", "json") == "{not json"
+        assert tool.post_process('{"log_id": "l"}', "json") == '{"log_id": "l"}'
+        reply = json.dumps({"log_id": "l", "created_at": _CREATED_AT})
+        assert tool.post_process(reply, "json") == reply
+
+    def test_structured_outputs_ask_for_the_narrative(self):
+        """With local numbers the response model is the narrative only."""
+        assert LocalTool().response_model is LocalTool.record_model
+        assert _local_tool().response_model is MaintenanceNarrative
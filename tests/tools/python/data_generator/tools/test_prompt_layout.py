@@ -0,0 +1,25 @@
+"""
+Prompt layout checks shared by every data_generator tool.
+"""
+
+import os
+
+import pytest
+
+import data_generator.tools as tools
+
+_TOOL_CLASSES = [getattr(tools, name) for name in tools.__all__]
+
+
+@pytest.mark.parametrize("tool_cls", _TOOL_CLASSES, ids=lambda cls: cls.name)
+@pytest.mark.parametrize("output_format", ["json", "yaml", "txt"])
+def test_per_record_values_come_last(tool_cls, output_format):
+    """Two records' prompts share everything up to the record details."""
+    tool = tool_cls()
+    first = tool.build_prompt(output_format, unique_id="record-1")
+    second = tool.build_prompt(output_format, unique_id="record-2")
+
+    details = first.index("## RECORD DETAILS")
+
+    assert len(os.path.commonprefix([first, second])) > details
+    assert first.index("record-1") > details
@@ -0,0 +1,35 @@
+"""
+Record-model checks shared by every data_generator tool that publishes one.
+"""
+
+import re
+
+import pytest
+
+import data_generator.tools as tools
+from data_generator.schema import json_schema_format
+
+_MODEL_TOOLS = [
+    getattr(tools, name)
+    for name in tools.__all__
+    if getattr(tools, name).record_model is not None
+]
+# Tools whose records hold a free-form mapping, which strict mode cannot express
+_NON_STRICT = {"retail-product"}
+
+
+@pytest.mark.parametrize("tool_cls", _MODEL_TOOLS, ids=lambda cls: cls.name)
+def test_model_matches_the_json_skeleton(tool_cls):
+    """The model has exactly the top-level keys the JSON prompt asks for."""
+    prompt = tool_cls().build_prompt("json", unique_id="record-1")
+    skeleton_keys = re.findall(r'^  "(\w+)":', prompt, flags=re.MULTILINE)
+
+    assert skeleton_keys == list(tool_cls.record_model.model_fields)
+
+
+@pytest.mark.parametrize("tool_cls", _MODEL_TOOLS, ids=lambda cls: cls.name)
+def test_schema_is_strict_unless_free_form(tool_cls):
+    """Every model converts to a response format; strict where possible."""
+    fmt = json_schema_format(tool_cls.record_model, name=tool_cls.toolName)
+
+    assert fmt["json_schema"]["strict"] is (tool_cls.name not in _NON_STRICT)
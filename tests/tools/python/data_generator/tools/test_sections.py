@@ -0,0 +1,89 @@
+"""
+Outline and section checks shared by every data_generator tool with sections.
+"""
+
+import os
+
+import pytest
+
+import data_generator.tools as tools
+from data_generator.schema import json_schema_format
+
+_SECTION_TOOLS = [
+    tools.HealthcareClinicalPolicyTool(complexity="complex"),
+    tools.LegalContractTool(),
+    tools.TechSupportSOPTool(),
+]
+
+
+@pytest.mark.parametrize("tool", _SECTION_TOOLS, ids=lambda tool: tool.name)
+def test_sections_are_lists_of_records(tool):
+    """Every section field has an item model; the outline schema is strict."""
+    for name in tool.section_fields:
+        assert tool.section_model(name) is not None
+    fmt = json_schema_format(tool.outline_model(), name=tool.toolName)
+
+    assert fmt["json_schema"]["strict"] is True
+
+
+@pytest.mark.parametrize("tool", _SECTION_TOOLS, ids=lambda tool: tool.name)
+def test_outline_prompt_extends_the_json_prompt(tool):
+    """The outline prompt keeps the record prompt and names every section."""
+    record = tool.build_prompt("json", unique_id="record-1")
+    outline = tool.build_outline_prompt(unique_id="record-1")
+    details = record.index("## RECORD DETAILS")
+
+    assert outline.startswith(record[:details].rstrip())
+    assert outline.index("## OUTLINE ONLY") < outline.index("## RECORD DETAILS")
+    assert outline.index("record-1") > outline.index("## RECORD DETAILS")
+    for name in tool.section_fields:
+        assert f'"{name}"' in outline
+
+
+@pytest.mark.parametrize("tool", _SECTION_TOOLS, ids=lambda tool: tool.name)
+def test_section_prompts_of_a_record_differ_only_at_the_end(tool):
+    """Sections of one record share the instructions and the outline."""
+    name = tool.section_fields[0]
+    outline = {"title": "Outline title", name: ["First heading", "Second heading"]}
+    first = tool.build_section_prompt(outline, name, 1)
+    second = tool.build_section_prompt(outline, name, 2)
+
+    assert len(os.path.commonprefix([first, second])) > first.index("Outline title")
+    assert first.rstrip().endswith("Heading: First heading")
+    assert f'Item: 2 of 2 in "{name}"' in second
+
+
+def test_healthcare_policies_have_sections_when_complex():
+    """Only complex policies are long enough to be written in sections."""
+    assert tools.HealthcareClinicalPolicyTool(complexity="medium").section_fields == ()
+    assert "clinical_procedures" in (
+        tools.HealthcareClinicalPolicyTool(complexity="complex").section_fields
+    )
+
+
+def test_legal_contract_full_text_is_assembled_from_the_clauses():
+    """The outline leaves full_text out; it is joined from the clauses."""
+    tool = tools.LegalContractTool()
+    outline = {
+        "contract_id": "LC-1",
+        "contract_type": "NDA",
+        "title": "Mutual NDA",
+        "parties": ["Alpha Corp", "Beta Inc"],
+        "effective_date": "2024-01-01",
+        "termination_date": None,
+        "governing_law": "Delaware",
+        "clauses": ["Confidentiality", "Term"],
+    }
+    clauses = [
+        {"clause_title": "Confidentiality", "clause_text": "Both parties agree."},
+        {"clause_title": "Term", "clause_text": "Two years."},
+    ]
+
+    assert "full_text" not in tool.outline_model().model_fields
+    record = tool.assemble_sections(outline, {"clauses": clauses})
+
+    tool.validate_record(record)
+    assert record["clauses"] == clauses
+    assert record["full_text"] == (
+        "Mutual NDA\n\nConfidentiality\nBoth parties agree.\n\nTerm\nTwo years."
+    )
@@ -215,4 +215,39 @@ def test_post_process_text():
 
 def test_get_system_description(tech_support_with_desc):
     """Test get_system_description returns the correct value."""
-    assert tech_support_with_desc.get_system_description() == "Test System Description"
\ No newline at end of file
+    assert tech_support_with_desc.get_system_description() == "Test System Description"
+
+def test_render_text_layout(tech_support_tool):
+    """A JSON record renders in the text skeleton's layout without a model."""
+    record = {
+        "case_id": "c-1",
+        "is_bug": True,
+        "tags": ["login", "sso"],
+        "customer": {"contact_email": "a@example.com"},
+        "conversation_history": [
+            {"role": "customer", "message": "Cannot log in", "timestamp": "t1"},
+            {"role": "agent", "message": "Looking into it", "timestamp": "t2"},
+        ],
+    }
+
+    assert tech_support_tool.render(record, "txt") == (
+        "Case ID: c-1\n"
+        "Is Bug: true\n"
+        "Tags: login, sso\n"
+        "Customer:\n"
+        "  Contact Email: a@example.com\n"
+        "Conversation History:\n"
+        "  - t1 [customer] Cannot log in\n"
+        "  - t2 [agent] Looking into it\n"
+    )
+
+
+def test_render_structured_formats(tech_support_tool):
+    """JSON and YAML keep the structure (the sink serialises it)."""
+    assert tech_support_tool.render('{"case_id": "c-1"}', "yaml") == {
+        "case_id": "c-1"
+    }
+    with pytest.raises(ValueError, match="Only JSON"):
+        tech_support_tool.render("case_id: c-1", "txt")
+    with pytest.raises(ValueError, match="unknown output format"):
+        tech_support_tool.render({}, "csv")
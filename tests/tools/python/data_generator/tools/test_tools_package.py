@@ -0,0 +1,71 @@
+"""
+Tests for lazy tool discovery in data_generator.tools.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import data_generator.tools as tools
+from data_generator.tool import DataGeneratorTool
+
+_PACKAGE_ROOT = Path(__file__).parents[5] / "src" / "tools" / "python"
+
+
+def _loaded_modules(code: str) -> set[str]:
+    """Run *code* in a fresh interpreter and return the modules it imported."""
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys\n{code}\nprint('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=_PACKAGE_ROOT,
+        check=True,
+    )
+    return set(proc.stdout.split())
+
+
+@pytest.mark.parametrize("name, module", sorted(tools.TOOL_MODULES.items()))
+def test_manifest_points_at_the_defining_module(name, module):
+    """Every manifest entry registers its scenario when loaded."""
+    assert tools.load_tool(name)
+    tool_cls = DataGeneratorTool._REGISTRY[name]
+    assert tool_cls.__module__ == f"data_generator.tools.{module}"
+    assert getattr(tools, tool_cls.__name__) is tool_cls
+
+
+def test_unknown_names():
+    """Unknown scenarios and attributes are reported, not imported."""
+    assert not tools.load_tool("no-such-scenario")
+    with pytest.raises(KeyError, match="no-such-scenario"):
+        DataGeneratorTool.from_name("no-such-scenario")
+    with pytest.raises(AttributeError):
+        tools.NoSuchTool  # noqa: B018
+    assert set(tools.TOOL_MODULES) <= set(DataGeneratorTool.available_names())
+
+
+def test_cli_import_skips_sdks_and_tools():
+    """Importing the CLI loads neither the SDKs nor any tool module."""
+    loaded = _loaded_modules("import data_generator.cli")
+
+    assert "semantic_kernel" not in loaded
+    assert "openai" not in loaded
+    assert "data_generator.engine" not in loaded
+    assert not {m for m in loaded if m.startswith("data_generator.tools.")}
+
+
+def test_from_name_imports_only_the_requested_tool():
+    """Looking up a scenario imports its module and no other tool."""
+    loaded = _loaded_modules(
+        "from data_generator import DataGeneratorTool\n"
+        "DataGeneratorTool.from_name('retail-product')"
+    )
+
+    tool_modules = {m for m in loaded if m.startswith("data_generator.tools.")}
+    assert tool_modules == {"data_generator.tools.retail_product"}
+    assert "semantic_kernel" not in loaded